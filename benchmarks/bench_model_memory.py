@@ -0,0 +1,93 @@
+"""
+Memory benchmark for InventoryQ OS data models
+Compares the per-object footprint of the dict-backed dataclasses with the
+__slots__-based compact variants at catalog scale
+
+Usage: python benchmarks/bench_model_memory.py [--items 1000000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.data_models import InventoryItem, Location, SectorType
+from src.models.compact_models import CompactInventoryItem, FrozenInventoryItem, shared_location
+
+
+CITIES = [
+    ('Mumbai', 'Maharashtra', 19.0760, 72.8777),
+    ('Delhi', 'Delhi', 28.7041, 77.1025),
+    ('Bangalore', 'Karnataka', 12.9716, 77.5946),
+    ('Chennai', 'Tamil Nadu', 13.0827, 80.2707),
+    ('Kolkata', 'West Bengal', 22.5726, 88.3639),
+]
+ITEM_TYPES = ['Oxygen Cylinders', 'Rice', 'Wheat', 'Emergency Kits', 'Insulin', 'Water Purification']
+SECTORS = list(SectorType)
+
+
+def fields_for(i: int):
+    """Field values for the i-th synthetic item, built from fresh strings like a DB fetch would"""
+    city, state, lat, lon = CITIES[i % len(CITIES)]
+    return dict(
+        inventory_id=f"INV_{i:07d}",
+        organization_id="".join(["ORG_", str(i % 50)]),
+        sector_type=SECTORS[i % len(SECTORS)],
+        item_type="".join([ITEM_TYPES[i % len(ITEM_TYPES)]]),
+        current_stock=float(i % 1000),
+        daily_consumption_rate=float(i % 37 + 1),
+        reorder_point=7.0,
+        critical_threshold=3.0,
+    ), ("".join([city]), "".join([state]), "".join(["India"]), lat, lon)
+
+
+def build_dataclasses(n: int):
+    items = []
+    for i in range(n):
+        fields, location = fields_for(i)
+        items.append(InventoryItem(location=Location(*location), **fields))
+    return items
+
+
+def build_compact(n: int, cls=CompactInventoryItem):
+    items = []
+    for i in range(n):
+        fields, location = fields_for(i)
+        items.append(cls(location=shared_location(*location), **fields))
+    return items
+
+
+def measure(builder, n: int) -> int:
+    """Bytes still allocated after building n items"""
+    gc.collect()
+    tracemalloc.start()
+    items = builder(n)
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    gc.collect()
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    results = [
+        ('dataclass (dict-backed)', measure(build_dataclasses, args.items)),
+        ('compact (__slots__)', measure(build_compact, args.items)),
+        ('frozen compact', measure(lambda n: build_compact(n, FrozenInventoryItem), args.items)),
+    ]
+
+    baseline = results[0][1]
+    print(f"Items: {args.items:,}")
+    for name, total in results:
+        print(f"{name:<26} {total / 2**20:9.1f} MiB  {total / args.items:7.1f} B/item  "
+              f"{100.0 * (1 - total / baseline):5.1f}% smaller")
+
+
+if __name__ == '__main__':
+    main()
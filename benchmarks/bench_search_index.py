@@ -0,0 +1,80 @@
+"""
+Latency benchmark for the inventory search index
+Builds the index over a synthetic snapshot, applies a delta, and times ranked
+queries against the str.contains scan the search box used before
+
+Usage: python benchmarks/bench_search_index.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.analytics.search_index import InventorySearchIndex
+
+
+ITEM_TYPES = ['OXYGEN', 'RICE', 'WHEAT', 'EMERGENCY_KIT', 'BLOOD_BAGS', 'INSULIN', 'WATER', 'BLANKETS']
+CITIES = ['Delhi', 'Mumbai', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'New Delhi']
+SECTORS = ['HOSPITAL', 'PDS', 'NGO']
+
+QUERIES = ['hosp_00001', 'insulin pune', 'oxygen', 'emergency kit chennai', 'dehli rice', 'blood']
+
+
+def synthetic_inventory(rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    sectors = rng.choice(SECTORS, size=rows)
+    return pd.DataFrame({
+        'INVENTORY_ID': [f"{sector[:4]}_{i:07d}" for i, sector in enumerate(sectors)],
+        'ITEM_TYPE': rng.choice(ITEM_TYPES, size=rows),
+        'LOCATION_CITY': rng.choice(CITIES, size=rows),
+        'SECTOR_TYPE': sectors,
+        'ORGANIZATION_ID': [f"ORG_{sector}_{n:03d}" for sector, n in zip(sectors, rng.integers(1, 200, size=rows))],
+    })
+
+
+def best_of(fn, repeat=20):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--delta', type=int, default=5_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    df = synthetic_inventory(args.rows, rng)
+
+    start = time.perf_counter()
+    index = InventorySearchIndex(df)
+    build_s = time.perf_counter() - start
+
+    delta = df.sample(n=min(args.delta, args.rows), random_state=args.seed).copy()
+    delta['LOCATION_CITY'] = 'Pune'
+    start = time.perf_counter()
+    index.apply_delta(delta)
+    delta_s = time.perf_counter() - start
+
+    print(f"Rows: {args.rows:,}   build {build_s:.2f}s   delta of {len(delta):,} rows {delta_s * 1000:.1f}ms")
+    for query in [df['INVENTORY_ID'].iloc[42]] + QUERIES:
+        search_ms = best_of(lambda: index.search(query, limit=20)) * 1000
+        print(f"{query!r:<26} {len(index.match_ids(query)):>9,} matches   top-20 {search_ms:8.3f}ms")
+
+    term = 'oxygen'
+    scan_ms = best_of(lambda: df['ITEM_TYPE'].str.contains(term, case=False, na=False) |
+                      df['LOCATION_CITY'].str.contains(term, case=False, na=False), repeat=3) * 1000
+    print(f"str.contains scan for {term!r}: {scan_ms:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
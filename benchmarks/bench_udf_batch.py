@@ -0,0 +1,56 @@
+"""
+Throughput benchmark for the simulation UDFs
+Compares per-row scalar calls with the pandas batch variants, the way a
+scalar vs vectorized UDF would process inventory_master joined to vendors
+
+Usage: python benchmarks/bench_udf_batch.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.udfs.simulation_udfs import SIMULATION_CITIES, SIMULATION_VENDORS, get_weather_data, get_vendor_status
+from src.udfs.batch_udfs import get_weather_data_batch, get_vendor_status_batch
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    cities = pd.Series(rng.choice(list(SIMULATION_CITIES) + ['Pune'], size=args.rows))
+    vendors = pd.Series(rng.choice(list(SIMULATION_VENDORS), size=args.rows))
+
+    scalar_weather, scalar_weather_s = timed(lambda: [get_weather_data(city) for city in cities])
+    batch_weather, batch_weather_s = timed(get_weather_data_batch, cities)
+    scalar_vendor, scalar_vendor_s = timed(
+        lambda: [get_vendor_status(vendor, city) for vendor, city in zip(vendors, cities)]
+    )
+    batch_vendor, batch_vendor_s = timed(get_vendor_status_batch, vendors, cities)
+
+    assert list(batch_weather) == scalar_weather
+    assert list(batch_vendor) == scalar_vendor
+
+    print(f"Rows: {args.rows:,}")
+    for name, scalar_s, batch_s in (('get_weather_data', scalar_weather_s, batch_weather_s),
+                                    ('get_vendor_status', scalar_vendor_s, batch_vendor_s)):
+        print(f"{name:<18} scalar {args.rows / scalar_s:12,.0f} rows/s   "
+              f"batch {args.rows / batch_s:12,.0f} rows/s   {scalar_s / batch_s:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
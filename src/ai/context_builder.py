@@ -0,0 +1,245 @@
+"""
+Token-budgeted inventory context for Cortex prompts
+Summarizes a snapshot as totals, a per-city/sector rollup and the riskiest
+items in a compact pipe-delimited encoding that never exceeds a byte ceiling
+"""
+from typing import Hashable, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.kpi_engine import snapshot_fingerprint
+
+
+DEFAULT_MAX_TOKENS = 1500
+DEFAULT_TOP_K = 25
+# Conservative estimate for English/number-heavy text
+BYTES_PER_TOKEN = 4
+# Share of the space left after the totals that the rollup may take before the top items
+ROLLUP_SHARE = 0.4
+MEMO_SIZE = 8
+
+# sector_config defaults (see SectorConfig in db_operations)
+CRITICALITY_MULTIPLIERS = {'HOSPITAL': 2.0, 'NGO': 1.8, 'PDS': 1.5}
+DEFAULT_MULTIPLIER = 1.0
+MIN_DAYS = 0.1
+
+ROLLUP_HEADER = "city|sector|items|critical|warning|min_days|avg_days"
+TOP_RISK_HEADER = "item|city|sector|stock|daily_use|days|status"
+
+
+@dataclass(frozen=True)
+class InventoryContext:
+    """Prompt context and how much of the snapshot it covers"""
+    text: str
+    rollup_rows: int
+    rollup_total: int
+    top_items: int
+    top_total: int
+    truncated: bool
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.text.encode('utf-8'))
+
+
+def _cell(value) -> str:
+    """Compact cell text: one decimal for floats, no delimiters or line breaks"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return '-'
+    if isinstance(value, (float, np.floating)):
+        return f"{value:.1f}".rstrip('0').rstrip('.') if abs(value) < 1e6 else f"{value:.3g}"
+    return ' '.join(str(value).replace('|', '/').split())
+
+
+def _row(values: Sequence) -> str:
+    return '|'.join(_cell(value) for value in values)
+
+
+def _column(df: pd.DataFrame, column: str, default=None) -> pd.Series:
+    if column in df:
+        return df[column]
+    return pd.Series(default, index=df.index, dtype=object)
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def risk_scores(df_inventory: pd.DataFrame) -> np.ndarray:
+    """
+    Risk per row: sector criticality multiplier / days remaining
+
+    Rows without a days-remaining value score 0 (never selected as riskiest).
+    """
+    days = _numeric(df_inventory, 'DAYS_REMAINING')
+    multipliers = (_column(df_inventory, 'SECTOR_TYPE').astype(object)
+                   .map(CRITICALITY_MULTIPLIERS).fillna(DEFAULT_MULTIPLIER).to_numpy(dtype=np.float64))
+    with np.errstate(invalid='ignore'):
+        scores = multipliers / np.maximum(days, MIN_DAYS)
+    return np.nan_to_num(scores, nan=0.0)
+
+
+def rollup_lines(df_inventory: pd.DataFrame) -> List[str]:
+    """Per-city/sector rollup, most critical groups first"""
+    status = _column(df_inventory, 'STATUS').astype(object)
+    frame = pd.DataFrame({
+        'city': _column(df_inventory, 'LOCATION_CITY').astype(object).fillna('-').to_numpy(),
+        'sector': _column(df_inventory, 'SECTOR_TYPE').astype(object).fillna('-').to_numpy(),
+        'critical': (status == 'CRITICAL').to_numpy(dtype=np.int64),
+        'warning': (status == 'WARNING').to_numpy(dtype=np.int64),
+        'days': _numeric(df_inventory, 'DAYS_REMAINING')
+    })
+    groups = frame.groupby(['city', 'sector'], sort=False).agg(
+        items=('critical', 'size'), critical=('critical', 'sum'), warning=('warning', 'sum'),
+        min_days=('days', 'min'), avg_days=('days', 'mean')
+    ).reset_index()
+    groups = groups.sort_values(['critical', 'warning', 'min_days', 'city', 'sector'],
+                                ascending=[False, False, True, True, True], na_position='last')
+    return [_row(values) for values in groups.itertuples(index=False, name=None)]
+
+
+def top_risk_lines(df_inventory: pd.DataFrame, top_k: int) -> Tuple[List[str], int]:
+    """The top_k riskiest items (highest risk first) and how many items were at risk"""
+    scores = risk_scores(df_inventory)
+    at_risk = np.flatnonzero(scores > 0)
+    if top_k <= 0 or at_risk.size == 0:
+        return [], int(at_risk.size)
+    if at_risk.size > top_k:
+        # Everything above the k-th score, then the earliest rows tied with it
+        threshold = -np.partition(-scores[at_risk], top_k - 1)[top_k - 1]
+        above = at_risk[scores[at_risk] > threshold]
+        tied = at_risk[scores[at_risk] == threshold][:top_k - above.size]
+        at_risk = np.concatenate([above, tied])
+    # Stable tie-break on row position keeps the text identical across rebuilds
+    order = at_risk[np.lexsort((at_risk, -scores[at_risk]))]
+
+    columns = [
+        _column(df_inventory, 'ITEM_TYPE').to_numpy(dtype=object)[order],
+        _column(df_inventory, 'LOCATION_CITY').to_numpy(dtype=object)[order],
+        _column(df_inventory, 'SECTOR_TYPE').to_numpy(dtype=object)[order],
+        _numeric(df_inventory, 'CURRENT_STOCK')[order],
+        _numeric(df_inventory, 'DAILY_CONSUMPTION_RATE')[order],
+        _numeric(df_inventory, 'DAYS_REMAINING')[order],
+        _column(df_inventory, 'STATUS').to_numpy(dtype=object)[order]
+    ]
+    return [_row(values) for values in zip(*columns)], int(np.count_nonzero(scores > 0))
+
+
+def _sizes(lines: Sequence[str]) -> np.ndarray:
+    """Encoded size of each line including its newline"""
+    return np.fromiter((len(line.encode('utf-8')) + 1 for line in lines), dtype=np.int64, count=len(lines))
+
+
+def _section_fit(header_size: int, sizes: np.ndarray, limit: int) -> Tuple[int, int]:
+    """Rows of a section that fit in limit bytes, and the bytes used (header only counted with a row)"""
+    if sizes.size == 0 or header_size + sizes[0] > limit:
+        return 0, 0
+    used = np.cumsum(sizes)
+    count = int(np.searchsorted(used, limit - header_size, side='right'))
+    return count, header_size + int(used[count - 1])
+
+
+def build_inventory_context(df_inventory: pd.DataFrame, max_tokens: int = DEFAULT_MAX_TOKENS,
+                            top_k: int = DEFAULT_TOP_K) -> InventoryContext:
+    """
+    Compact inventory summary for an AI prompt, bounded by a token budget
+
+    Args:
+        df_inventory: Inventory snapshot
+        max_tokens: Budget for the returned text (hard ceiling of max_tokens * BYTES_PER_TOKEN bytes)
+        top_k: Riskiest items to list
+
+    Returns:
+        InventoryContext whose text fits the budget whatever the catalog size
+    """
+    max_bytes = max(0, max_tokens) * BYTES_PER_TOKEN
+    if df_inventory.empty:
+        text = "No inventory data available for analysis."
+        return InventoryContext(text if len(text) < max_bytes else '', 0, 0, 0, 0, False)
+
+    status = _column(df_inventory, 'STATUS').astype(object)
+    days = _numeric(df_inventory, 'DAYS_REMAINING')
+    totals = (f"TOTALS items={len(df_inventory)} critical={int((status == 'CRITICAL').sum())} "
+              f"warning={int((status == 'WARNING').sum())} "
+              f"avg_days={_cell(float(np.nanmean(days)) if np.isfinite(days).any() else None)}")
+    rollup = rollup_lines(df_inventory)
+    top, at_risk = top_risk_lines(df_inventory, top_k)
+    rollup_header = f"BY CITY/SECTOR ({len(rollup)} groups) {ROLLUP_HEADER}"
+    top_header = f"TOP RISK (multiplier/days, {len(top)} of {at_risk} at risk) {TOP_RISK_HEADER}"
+
+    def omitted(groups: int, items: int) -> str:
+        return f"(omitted {groups} groups, {items} items for size)"
+
+    totals_size, rollup_header_size, top_header_size = _sizes([totals, rollup_header, top_header])
+    rollup_sizes, top_sizes = _sizes(rollup), _sizes(top)
+    remaining = max_bytes - totals_size
+    if remaining < 0:
+        return InventoryContext('', 0, len(rollup), 0, at_risk, True)
+
+    rollup_count, rollup_used = _section_fit(rollup_header_size, rollup_sizes, remaining)
+    top_count, top_used = _section_fit(top_header_size, top_sizes, remaining - rollup_used)
+    note = False
+    if rollup_count < len(rollup) or top_count < len(top):
+        # Reserve the omission note (if it fits at all), give the rollup its share
+        # first, then the top items, then hand what they left back to the rollup
+        note_size = len(omitted(len(rollup), len(top)).encode('utf-8')) + 1
+        note = note_size <= remaining
+        remaining -= note_size if note else 0
+        rollup_count, rollup_used = _section_fit(rollup_header_size, rollup_sizes, int(remaining * ROLLUP_SHARE))
+        top_count, top_used = _section_fit(top_header_size, top_sizes, remaining - rollup_used)
+        rollup_count, rollup_used = _section_fit(rollup_header_size, rollup_sizes, remaining - top_used)
+
+    lines = [totals]
+    if rollup_count:
+        lines += [rollup_header] + rollup[:rollup_count]
+    if top_count:
+        lines += [top_header] + top[:top_count]
+    if note:
+        lines.append(omitted(len(rollup) - rollup_count, len(top) - top_count))
+    truncated = rollup_count < len(rollup) or top_count < at_risk
+    return InventoryContext('\n'.join(lines), rollup_count, len(rollup), top_count, at_risk, truncated)
+
+
+class ContextBuilder:
+    """Memoizes InventoryContexts per snapshot fingerprint and budget (small LRU)"""
+
+    def __init__(self, max_tokens: int = DEFAULT_MAX_TOKENS, top_k: int = DEFAULT_TOP_K,
+                 memo_size: int = MEMO_SIZE):
+        self.max_tokens = max_tokens
+        self.top_k = top_k
+        self.memo_size = max(1, memo_size)
+        self._memo: "OrderedDict[Hashable, InventoryContext]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def build(self, df_inventory: pd.DataFrame, max_tokens: Optional[int] = None,
+              top_k: Optional[int] = None) -> InventoryContext:
+        """Context for a snapshot, computed at most once per fingerprint and budget"""
+        max_tokens = self.max_tokens if max_tokens is None else max_tokens
+        top_k = self.top_k if top_k is None else top_k
+        key = (snapshot_fingerprint(df_inventory), max_tokens, top_k)
+        with self._lock:
+            context = self._memo.get(key)
+            if context is not None:
+                self._memo.move_to_end(key)
+                self.stats['hits'] += 1
+                return context
+
+        context = build_inventory_context(df_inventory, max_tokens, top_k)
+        with self._lock:
+            self.stats['misses'] += 1
+            self._memo[key] = context
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return context
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
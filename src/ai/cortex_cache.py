@@ -0,0 +1,237 @@
+"""
+Cached Snowflake Cortex completions for InventoryQ OS
+Caches responses by (model, normalized prompt, snapshot version) with TTL and
+LRU eviction, shares in-flight calls between sessions, and answers many
+per-item prompts with one set-based CORTEX.COMPLETE query
+"""
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+import hashlib
+import threading
+import time
+
+from src.database.query_layer import StatementTemplate, compile_named, execute, register_template
+
+
+DEFAULT_MODEL = 'llama3-70b'
+DEFAULT_TTL_S = 900
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_BATCH_ROWS = 100
+
+COMPLETE_SQL = register_template('cortex.complete', """
+    SELECT SNOWFLAKE.CORTEX.COMPLETE(:model, :prompt) AS RESPONSE
+""")
+
+CacheKey = Tuple[str, str, Hashable]
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Whitespace-insensitive form of a prompt (indentation of f-string templates varies)"""
+    return ' '.join(str(prompt).split())
+
+
+def prompt_key(model: str, prompt: str, snapshot_version: Hashable = None) -> CacheKey:
+    digest = hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()
+    return (model, digest, snapshot_version)
+
+
+@lru_cache(maxsize=None)
+def batch_template(rows: int) -> StatementTemplate:
+    """
+    One CORTEX.COMPLETE per row of a bound VALUES list, in a single query
+
+    Compiled once per batch size (batches are at most DEFAULT_BATCH_ROWS rows).
+    """
+    values = ", ".join(f"(:key{i}, :prompt{i})" for i in range(rows))
+    sql = f"""
+        SELECT column1 AS PROMPT_KEY, SNOWFLAKE.CORTEX.COMPLETE(:model, column2) AS RESPONSE
+        FROM VALUES {values}
+    """
+    qmark_sql, pyformat_sql, params = compile_named(sql)
+    return StatementTemplate(f'cortex.complete_batch.{rows}', sql, qmark_sql, pyformat_sql, params)
+
+
+def _row_value(row: Any, position: int, name: str) -> Any:
+    """Column from a Snowpark Row, a dict or a cursor tuple"""
+    if isinstance(row, (tuple, list)):
+        return row[position]
+    try:
+        return row[name]
+    except (KeyError, IndexError, TypeError):
+        return row[position]
+
+
+class CortexCache:
+    """
+    Cortex completions with a TTL + LRU response cache and single-flight calls
+
+    Works with a Snowpark session or a snowflake.connector cursor (anything
+    query_layer.execute accepts). Failed or empty completions are not cached.
+    """
+
+    def __init__(self, model: str = DEFAULT_MODEL, ttl_s: float = DEFAULT_TTL_S,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, batch_rows: int = DEFAULT_BATCH_ROWS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.model = model
+        self.ttl_s = ttl_s
+        self.max_entries = max(1, max_entries)
+        self.batch_rows = max(1, batch_rows)
+        self.clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[CacheKey, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'queries': 0, 'evictions': 0}
+
+    def _cached(self, key: CacheKey) -> Optional[str]:
+        """Fresh cached response (lock held)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, response = entry
+        if self.clock() - stored_at >= self.ttl_s:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return response
+
+    def _store(self, key: CacheKey, response: Optional[str]):
+        """Cache a response (lock held)"""
+        if not response:
+            return
+        self._entries[key] = (self.clock(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _finish(self, key: CacheKey, future: Future, response: Optional[str] = None,
+                error: Optional[BaseException] = None):
+        with self._lock:
+            if error is None:
+                self._store(key, response)
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(response)
+
+    def complete(self, target: Any, prompt: str, snapshot_version: Hashable = None,
+                 model: Optional[str] = None) -> Optional[str]:
+        """
+        One completion, served from cache or shared with an identical running call
+
+        Args:
+            target: Snowpark session or connector cursor
+            prompt: Prompt text
+            snapshot_version: Version of the data the prompt describes
+            model: Cortex model (defaults to the cache's model)
+
+        Returns:
+            Response text, or None if Cortex returned nothing
+        """
+        model = model or self.model
+        key = prompt_key(model, prompt, snapshot_version)
+        with self._lock:
+            response = self._cached(key)
+            if response is not None:
+                self.stats['hits'] += 1
+                return response
+            waiting = self._inflight.get(key)
+            if waiting is None:
+                future: Future = Future()
+                self._inflight[key] = future
+                self.stats['misses'] += 1
+                self.stats['queries'] += 1
+            else:
+                self.stats['coalesced'] += 1
+        if waiting is not None:
+            return waiting.result()
+
+        try:
+            rows = execute(target, COMPLETE_SQL, {'model': model, 'prompt': prompt})
+            response = _row_value(rows[0], 0, 'RESPONSE') if rows else None
+        except BaseException as error:
+            self._finish(key, future, error=error)
+            raise
+        self._finish(key, future, response)
+        return response
+
+    def complete_many(self, target: Any, prompts: Mapping[Hashable, str], snapshot_version: Hashable = None,
+                      model: Optional[str] = None) -> Dict[Hashable, Optional[str]]:
+        """
+        Completions for many prompts (e.g. one insight per item) in as few queries as possible
+
+        Cached prompts are answered locally, prompts already running elsewhere
+        are awaited, identical prompts are sent once, and the rest go out in
+        one set-based query per batch_rows prompts.
+
+        Args:
+            target: Snowpark session or connector cursor
+            prompts: Caller key (e.g. INVENTORY_ID) -> prompt text
+            snapshot_version: Version of the data the prompts describe
+            model: Cortex model (defaults to the cache's model)
+
+        Returns:
+            Caller key -> response text (None where Cortex returned nothing)
+        """
+        model = model or self.model
+        keys = {name: prompt_key(model, prompt, snapshot_version) for name, prompt in prompts.items()}
+        results: Dict[CacheKey, Optional[str]] = {}
+        waiting: Dict[CacheKey, Future] = {}
+        owned: Dict[CacheKey, Tuple[Future, str]] = {}
+
+        with self._lock:
+            for name, key in keys.items():
+                if key in results or key in waiting or key in owned:
+                    continue
+                response = self._cached(key)
+                if response is not None:
+                    self.stats['hits'] += 1
+                    results[key] = response
+                elif key in self._inflight:
+                    self.stats['coalesced'] += 1
+                    waiting[key] = self._inflight[key]
+                else:
+                    self.stats['misses'] += 1
+                    future: Future = Future()
+                    self._inflight[key] = future
+                    owned[key] = (future, prompts[name])
+
+        pending = list(owned.items())
+        for start in range(0, len(pending), self.batch_rows):
+            batch = pending[start:start + self.batch_rows]
+            values: Dict[str, Any] = {'model': model}
+            for i, (key, (_, prompt)) in enumerate(batch):
+                values[f'key{i}'] = key[1]
+                values[f'prompt{i}'] = prompt
+            try:
+                with self._lock:
+                    self.stats['queries'] += 1
+                rows = execute(target, batch_template(len(batch)), values)
+            except BaseException as error:
+                for key, (future, _) in pending[start:]:
+                    self._finish(key, future, error=error)
+                raise
+            responses = {_row_value(row, 0, 'PROMPT_KEY'): _row_value(row, 1, 'RESPONSE') for row in rows}
+            for key, (future, _) in batch:
+                results[key] = responses.get(key[1])
+                self._finish(key, future, results[key])
+
+        for key, future in waiting.items():
+            results[key] = future.result()
+        return {name: results[key] for name, key in keys.items()}
+
+    def invalidate(self, snapshot_version: Hashable = None):
+        """Drop responses for one snapshot version (all responses when None)"""
+        with self._lock:
+            if snapshot_version is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[2] == snapshot_version]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
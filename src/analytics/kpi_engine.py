@@ -0,0 +1,241 @@
+"""
+KPI aggregation engine for InventoryQ OS
+Computes status counts, risk buckets, per-city/per-item aggregates and value
+totals in one vectorized pass per inventory snapshot, memoized on a fingerprint
+"""
+from typing import Dict, Hashable, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+
+
+ESTIMATED_UNIT_COST = 50
+STATUS_LABELS = ('CRITICAL', 'WARNING', 'NORMAL')
+
+# Days-remaining bucket edges: HIGH < 3 <= MEDIUM < 7 <= LOW
+RISK_LABELS = ('HIGH', 'MEDIUM', 'LOW')
+RISK_EDGES = (3.0, 7.0)
+
+FINGERPRINT_COLUMNS = (
+    'INVENTORY_ID', 'ITEM_TYPE', 'LOCATION_CITY', 'CURRENT_STOCK',
+    'DAILY_CONSUMPTION_RATE', 'REORDER_POINT', 'DAYS_REMAINING', 'STATUS'
+)
+MEMO_SIZE = 8
+
+
+@dataclass(frozen=True)
+class KpiSnapshot:
+    """All dashboard/report KPIs for one inventory snapshot"""
+    total_items: int
+    status_counts: Dict[str, int]
+    status_stock_value: Dict[str, float]
+    status_reorder_value: Dict[str, float]
+    risk_counts: Dict[str, int]
+    avg_days: float
+    total_stock: float
+    total_value: float
+    avg_consumption: float
+    daily_consumption: float
+    location_count: int
+    category_count: int
+    by_city: pd.DataFrame = field(repr=False)
+    by_item: pd.DataFrame = field(repr=False)
+    unit_cost: float = ESTIMATED_UNIT_COST
+    fingerprint: Optional[Hashable] = None
+
+    @property
+    def critical_items(self) -> int:
+        return self.status_counts['CRITICAL']
+
+    @property
+    def warning_items(self) -> int:
+        return self.status_counts['WARNING']
+
+    @property
+    def normal_items(self) -> int:
+        return self.status_counts['NORMAL']
+
+    @property
+    def critical_value(self) -> float:
+        return self.status_stock_value['CRITICAL']
+
+    @property
+    def monthly_consumption_value(self) -> float:
+        return self.daily_consumption * 30 * self.unit_cost
+
+    def percent_of_items(self, count: int) -> float:
+        """Share of all items, 0 for an empty snapshot"""
+        return count / self.total_items * 100 if self.total_items else 0.0
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _codes(df: pd.DataFrame, column: str, categories=None) -> Tuple[np.ndarray, pd.Index]:
+    """Integer codes per row (-1 for missing/unknown) and the code labels"""
+    if column not in df:
+        return np.full(len(df), -1, dtype=np.int64), pd.Index([])
+    if categories is not None:
+        codes = pd.Categorical(df[column], categories=list(categories)).codes.astype(np.int64)
+        return codes, pd.Index(categories)
+    codes, uniques = pd.factorize(df[column], sort=True)
+    return codes.astype(np.int64), pd.Index(uniques)
+
+
+def _group_table(codes: np.ndarray, labels: pd.Index, name: str, status: np.ndarray,
+                 days: np.ndarray, stock: np.ndarray, unit_cost: float) -> pd.DataFrame:
+    """Counts, status split, mean days and stock per group from bincounts"""
+    groups = len(labels)
+    valid = codes >= 0
+    group_codes = codes[valid]
+
+    items = np.bincount(group_codes, minlength=groups)
+    has_status = valid & (status >= 0)
+    by_status = np.bincount(
+        codes[has_status] * len(STATUS_LABELS) + status[has_status],
+        minlength=groups * len(STATUS_LABELS)
+    ).reshape(groups, len(STATUS_LABELS))
+
+    has_days = valid & ~np.isnan(days)
+    days_sum = np.bincount(codes[has_days], weights=days[has_days], minlength=groups)
+    days_count = np.bincount(codes[has_days], minlength=groups)
+    stock_sum = np.bincount(group_codes, weights=np.nan_to_num(stock[valid]), minlength=groups)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_days = np.where(days_count > 0, days_sum / np.maximum(days_count, 1), np.nan)
+
+    table = pd.DataFrame({
+        name: labels,
+        'ITEMS': items,
+        'CRITICAL': by_status[:, 0],
+        'WARNING': by_status[:, 1],
+        'NORMAL': by_status[:, 2],
+        'AVG_DAYS': avg_days,
+        'TOTAL_STOCK': stock_sum,
+        'VALUE': stock_sum * unit_cost,
+    })
+    return table
+
+
+def compute_kpis(df_inventory: pd.DataFrame, unit_cost: float = ESTIMATED_UNIT_COST,
+                 fingerprint: Optional[Hashable] = None) -> KpiSnapshot:
+    """
+    Compute every KPI for an inventory frame in one vectorized pass
+
+    Args:
+        df_inventory: unified_inventory_view rows (upper-case column names)
+        unit_cost: Estimated value per stock unit
+        fingerprint: Optional snapshot fingerprint stored on the result
+
+    Returns:
+        KpiSnapshot
+    """
+    status, _ = _codes(df_inventory, 'STATUS', STATUS_LABELS)
+    days = _numeric(df_inventory, 'DAYS_REMAINING')
+    stock = _numeric(df_inventory, 'CURRENT_STOCK')
+    rate = _numeric(df_inventory, 'DAILY_CONSUMPTION_RATE')
+    reorder = _numeric(df_inventory, 'REORDER_POINT')
+
+    has_status = status >= 0
+    status_counts = np.bincount(status[has_status], minlength=len(STATUS_LABELS))
+    status_stock = np.bincount(status[has_status], weights=np.nan_to_num(stock[has_status]),
+                               minlength=len(STATUS_LABELS))
+    status_reorder = np.bincount(status[has_status], weights=np.nan_to_num(reorder[has_status]),
+                                 minlength=len(STATUS_LABELS))
+
+    has_days = ~np.isnan(days)
+    risk_counts = np.bincount(np.digitize(days[has_days], RISK_EDGES), minlength=len(RISK_LABELS))
+
+    city_codes, cities = _codes(df_inventory, 'LOCATION_CITY')
+    item_codes, item_types = _codes(df_inventory, 'ITEM_TYPE')
+
+    total_stock = float(np.nansum(stock))
+    has_rate = ~np.isnan(rate)
+
+    return KpiSnapshot(
+        total_items=len(df_inventory),
+        status_counts={label: int(status_counts[i]) for i, label in enumerate(STATUS_LABELS)},
+        status_stock_value={label: float(status_stock[i]) * unit_cost for i, label in enumerate(STATUS_LABELS)},
+        status_reorder_value={label: float(status_reorder[i]) * unit_cost for i, label in enumerate(STATUS_LABELS)},
+        risk_counts={label: int(risk_counts[i]) for i, label in enumerate(RISK_LABELS)},
+        avg_days=float(days[has_days].mean()) if has_days.any() else float('nan'),
+        total_stock=total_stock,
+        total_value=total_stock * unit_cost,
+        avg_consumption=float(rate[has_rate].mean()) if has_rate.any() else float('nan'),
+        daily_consumption=float(np.nansum(rate)),
+        location_count=len(cities),
+        category_count=len(item_types),
+        by_city=_group_table(city_codes, cities, 'LOCATION_CITY', status, days, stock, unit_cost),
+        by_item=_group_table(item_codes, item_types, 'ITEM_TYPE', status, days, stock, unit_cost),
+        unit_cost=unit_cost,
+        fingerprint=fingerprint
+    )
+
+
+def snapshot_fingerprint(df_inventory: pd.DataFrame) -> Hashable:
+    """
+    Identify an inventory snapshot
+
+    Uses the loader-assigned snapshot version when present (O(1)); otherwise
+    hashes the KPI input columns.
+    """
+    version = df_inventory.attrs.get(SNAPSHOT_VERSION_ATTR)
+    if version is not None:
+        return ('version', version, len(df_inventory))
+    columns = [column for column in FINGERPRINT_COLUMNS if column in df_inventory]
+    if not columns or df_inventory.empty:
+        return ('empty', tuple(columns))
+    hashes = pd.util.hash_pandas_object(df_inventory[columns], index=False).to_numpy()
+    # Order-sensitive combination so reordered frames are distinguished
+    weights = np.arange(1, len(hashes) + 1, dtype=np.uint64)
+    return ('content', len(df_inventory), tuple(columns), int(np.bitwise_xor.reduce(hashes * weights)))
+
+
+class KpiEngine:
+    """Memoizes KpiSnapshots by snapshot fingerprint (small LRU)"""
+
+    def __init__(self, unit_cost: float = ESTIMATED_UNIT_COST, memo_size: int = MEMO_SIZE):
+        self.unit_cost = unit_cost
+        self.memo_size = max(1, memo_size)
+        self._memo: "OrderedDict[Hashable, KpiSnapshot]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def kpis(self, df_inventory: pd.DataFrame) -> KpiSnapshot:
+        """KPIs for a snapshot, computed at most once per fingerprint"""
+        key = snapshot_fingerprint(df_inventory)
+        with self._lock:
+            snapshot = self._memo.get(key)
+            if snapshot is not None:
+                self._memo.move_to_end(key)
+                self.stats['hits'] += 1
+                return snapshot
+
+        snapshot = compute_kpis(df_inventory, self.unit_cost, fingerprint=key)
+        with self._lock:
+            self.stats['misses'] += 1
+            self._memo[key] = snapshot
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+
+
+_default_engine = KpiEngine()
+
+
+def get_kpis(df_inventory: pd.DataFrame) -> KpiSnapshot:
+    """KPIs from the process-wide engine shared by every page"""
+    return _default_engine.kpis(df_inventory)
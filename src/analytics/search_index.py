@@ -0,0 +1,424 @@
+"""
+In-process inverted index for inventory search
+Tokenizes item type, city, organization, sector and inventory id once per
+snapshot and answers prefix, fuzzy and multi-term queries with ranked results
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from collections import Counter
+import bisect
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.database.incremental_loader import KEY_COLUMN, SNAPSHOT_VERSION_ATTR
+
+
+WORD_FIELDS = ('ITEM_TYPE', 'LOCATION_CITY', 'ORGANIZATION_ID', 'SECTOR_TYPE')
+ID_FIELD = KEY_COLUMN
+
+# Per query term, a row scores the best of: exact token, token prefix, fuzzy token
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.7
+FUZZY_WEIGHT = 0.5  # divided by the edit distance
+
+MAX_PREFIX_EXPANSIONS = 64
+MIN_FUZZY_LENGTH = 4
+
+# Deltas live in a small side layer until they reach this share of the index
+COMPACT_MIN_CHANGES = 1024
+COMPACT_RATIO = 0.1
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+_EDGES = re.compile(r'^[^a-z0-9]+|[^a-z0-9]+$')
+_EMPTY = np.empty(0, dtype=np.int64)
+_PREFIX_END = '\U0010ffff'
+
+
+def _chunks(value) -> List[str]:
+    """Lower-cased whitespace chunks with leading/trailing punctuation removed"""
+    if value is None or (isinstance(value, float) and value != value):
+        return []
+    chunks = (_EDGES.sub('', chunk) for chunk in str(value).lower().split())
+    return [chunk for chunk in chunks if chunk]
+
+
+def tokenize(value) -> List[str]:
+    """Index tokens of a value: each chunk plus its alphanumeric parts (EMERGENCY_KIT -> emergency_kit, emergency, kit)"""
+    tokens = {}
+    for chunk in _chunks(value):
+        tokens[chunk] = None
+        for part in _TOKEN.findall(chunk):
+            tokens[part] = None
+    return list(tokens)
+
+
+def query_terms(text: str) -> List[str]:
+    """Query terms: whole chunks, so "hosp_001" or "emergency_kit" stay one term"""
+    return list(dict.fromkeys(_chunks(text)))
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent swaps cost 1), or limit + 1 once exceeded"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class InventorySearchIndex:
+    """
+    Inverted index over one inventory snapshot
+
+    Word fields map tokens to sorted NumPy arrays of row numbers; inventory ids
+    are kept in one sorted array so exact and prefix id lookups are binary
+    searches. Deltas go to a small side layer (added postings plus deleted
+    rows) and are folded into a rebuild once they grow past COMPACT_RATIO.
+    Ties in ranking keep snapshot order, so the most urgent rows come first.
+    """
+
+    def __init__(self, df_inventory: pd.DataFrame, version=None):
+        self.version = version if version is not None else df_inventory.attrs.get(SNAPSHOT_VERSION_ATTR)
+        self._lock = threading.RLock()
+        self._build(df_inventory)
+
+    def _build(self, df_inventory: pd.DataFrame):
+        size = len(df_inventory)
+        self.fields = tuple(field for field in WORD_FIELDS if field in df_inventory)
+        self._ids = df_inventory[ID_FIELD].astype(str).to_numpy(dtype=object)
+        self._values = {field: df_inventory[field].to_numpy(dtype=object) for field in self.fields}
+        self._size = size
+        self._base_lookup: Optional[pd.Index] = None
+
+        # Ids: one sorted array of lower-cased keys for exact and prefix lookups
+        id_keys = np.asarray([inventory_id.lower() for inventory_id in self._ids], dtype=str)
+        order = np.argsort(id_keys, kind='stable')
+        self._id_keys = id_keys[order]
+        self._id_docs = order.astype(np.int64)
+
+        # Words: rows grouped per distinct field value, then fanned out to the value's tokens
+        grouped: Dict[str, List[np.ndarray]] = {}
+        for field in self.fields:
+            codes, uniques = pd.factorize(self._values[field])
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            for code, value in enumerate(uniques):
+                docs = order[bounds[code]:bounds[code + 1]].astype(np.int64)
+                for token in tokenize(value):
+                    grouped.setdefault(token, []).append(docs)
+        self._postings = {
+            token: arrays[0] if len(arrays) == 1 else np.unique(np.concatenate(arrays))
+            for token, arrays in grouped.items()
+        }
+
+        self._deleted: Set[int] = set()
+        self._alive: Optional[np.ndarray] = None
+        self._added: Dict[str, Set[int]] = {}
+        self._added_rows: List[Optional[Tuple[str, tuple]]] = []
+        self._added_lookup: Dict[str, int] = {}
+        self._added_ids: Dict[str, Set[int]] = {}
+        self._added_id_keys: Optional[List[str]] = None
+        self._vocabulary: Optional[List[str]] = None
+        self._grams: Optional[Dict[str, Set[str]]] = None
+
+    def __len__(self) -> int:
+        return self._size + sum(row is not None for row in self._added_rows) - len(self._deleted)
+
+    # Postings
+
+    def _live(self, docs: np.ndarray) -> np.ndarray:
+        """Drop deleted base rows from a sorted array of row numbers"""
+        if not self._deleted or not docs.size:
+            return docs
+        if self._alive is None:
+            self._alive = np.ones(self._size, dtype=bool)
+            self._alive[np.fromiter(self._deleted, dtype=np.int64, count=len(self._deleted))] = False
+        split = np.searchsorted(docs, self._size)
+        base = docs[:split]
+        return np.concatenate([base[self._alive[base]], docs[split:]])
+
+    def _posting(self, token: str) -> np.ndarray:
+        docs = self._postings.get(token, _EMPTY)
+        added = self._added.get(token)
+        if added:
+            # Added rows are numbered after every base row, so appending keeps the order
+            docs = np.concatenate([docs, np.fromiter(sorted(added), dtype=np.int64, count=len(added))])
+        return self._live(docs)
+
+    def _terms(self) -> List[str]:
+        """Sorted word vocabulary (rebuilt lazily after deltas)"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(set(self._postings) | set(self._added))
+            self._grams = None
+        return self._vocabulary
+
+    def _gram_index(self) -> Dict[str, Set[str]]:
+        if self._grams is None:
+            grams: Dict[str, Set[str]] = {}
+            for term in self._terms():
+                if term.isalpha():
+                    for gram in _trigrams(term):
+                        grams.setdefault(gram, set()).add(term)
+            self._grams = grams
+        return self._grams
+
+    def _fuzzy_terms(self, term: str) -> List[Tuple[str, int]]:
+        """Alphabetic vocabulary terms within the edit budget (1, or 2 for long terms)"""
+        limit = 1 if len(term) <= 6 else 2
+        grams = _trigrams(term)
+        # An edit destroys at most three padded trigrams, an adjacent swap four
+        required = len(grams) - 4 * limit
+        gram_index = self._gram_index()
+        if required > 0:
+            counts = Counter(candidate for gram in grams for candidate in gram_index.get(gram, ()))
+            candidates = [candidate for candidate, shared in counts.items() if shared >= required]
+        else:
+            candidates = {candidate for terms in gram_index.values() for candidate in terms}
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(term, candidate, limit)
+            if 0 < distance <= limit:
+                matches.append((candidate, distance))
+        return matches
+
+    def _id_matches(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(exact, prefix) row numbers for inventory ids"""
+        # Search with keys of the array's own width; a mismatched width would copy the whole array
+        width = self._id_keys.dtype.itemsize // 4
+        if len(term) <= width:
+            key = np.array(term, dtype=self._id_keys.dtype)
+            lo = np.searchsorted(self._id_keys, key, side='left')
+            hi = np.searchsorted(self._id_keys, key, side='right')
+            end = hi
+            if len(term) < width:
+                end = np.searchsorted(self._id_keys, np.array(term + _PREFIX_END, dtype=self._id_keys.dtype))
+        else:
+            lo = hi = end = 0
+        exact = [self._id_docs[lo:hi]]
+        prefix = [self._id_docs[hi:end]]
+        if self._added_ids:
+            if self._added_id_keys is None:
+                self._added_id_keys = sorted(self._added_ids)
+            keys = self._added_id_keys
+            start = bisect.bisect_left(keys, term)
+            for key in keys[start:bisect.bisect_left(keys, term + _PREFIX_END, lo=start)]:
+                docs = self._added_ids[key]
+                target = exact if key == term else prefix
+                target.append(np.fromiter(sorted(docs), dtype=np.int64, count=len(docs)))
+        exact = np.sort(np.concatenate(exact)) if len(exact) > 1 else exact[0]
+        return self._live(exact), self._live(np.sort(np.concatenate(prefix)))
+
+    def _expand(self, term: str) -> List[Tuple[float, np.ndarray]]:
+        """Every (weight, rows) group that one query term matches"""
+        groups = []
+        terms = self._terms()
+        start = bisect.bisect_left(terms, term)
+        end = bisect.bisect_left(terms, term + _PREFIX_END, lo=start)
+        for candidate in terms[start:min(end, start + MAX_PREFIX_EXPANSIONS + 1)]:
+            groups.append((EXACT_WEIGHT if candidate == term else PREFIX_WEIGHT, self._posting(candidate)))
+        if len(term) >= MIN_FUZZY_LENGTH and term.isalpha():
+            for candidate, distance in self._fuzzy_terms(term):
+                if not candidate.startswith(term):
+                    groups.append((FUZZY_WEIGHT / distance, self._posting(candidate)))
+        exact, prefix = self._id_matches(term)
+        groups.append((EXACT_WEIGHT, exact))
+        groups.append((PREFIX_WEIGHT, prefix))
+        return [(weight, docs) for weight, docs in groups if docs.size]
+
+    def _match(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Matching rows (ascending) and each row's best weight for one query term"""
+        groups = self._expand(term)
+        if not groups:
+            return _EMPTY, np.empty(0)
+        if len(groups) == 1:
+            weight, docs = groups[0]
+            return docs, np.full(docs.size, weight)
+        # Highest weight first, so a stable sort keeps each row's best match in front
+        groups.sort(key=lambda group: -group[0])
+        docs = np.concatenate([group for _, group in groups])
+        weights = np.concatenate([np.full(group.size, weight) for weight, group in groups])
+        order = np.argsort(docs, kind='stable')
+        docs, weights = docs[order], weights[order]
+        first = np.ones(docs.size, dtype=bool)
+        first[1:] = docs[1:] != docs[:-1]
+        return docs[first], weights[first]
+
+    def _score(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Rows matching every query term, with summed weights"""
+        docs, scores = _EMPTY, np.empty(0)
+        for position, term in enumerate(query_terms(text)):
+            term_docs, term_weights = self._match(term)
+            if position == 0:
+                docs, scores = term_docs, term_weights
+            else:
+                # Both sides are sorted and unique: binary-search the smaller side into the larger
+                if docs.size > term_docs.size:
+                    docs, scores, term_docs, term_weights = term_docs, term_weights, docs, scores
+                found = np.minimum(np.searchsorted(term_docs, docs), max(term_docs.size - 1, 0))
+                common = term_docs[found] == docs if term_docs.size else np.zeros(docs.size, dtype=bool)
+                docs, scores = docs[common], scores[common] + term_weights[found[common]]
+            if not docs.size:
+                break
+        return docs, scores
+
+    def _doc_id(self, doc: int) -> str:
+        if doc < self._size:
+            return self._ids[doc]
+        return self._added_rows[doc - self._size][0]
+
+    # Queries
+
+    def search(self, text: str, limit: Optional[int] = 20) -> List[Tuple[str, float]]:
+        """
+        Ranked search across every indexed field
+
+        Every query term must match (exact, prefix or fuzzy) some field of a row.
+
+        Args:
+            text: Free-text query
+            limit: Maximum number of hits, or None for all
+
+        Returns:
+            List of (inventory_id, score), best first; ties keep snapshot order
+        """
+        with self._lock:
+            docs, scores = self._score(text)
+            if limit is not None and docs.size > limit:
+                if limit <= 0:
+                    return []
+                kth = np.partition(scores, docs.size - limit)[docs.size - limit]
+                better = np.flatnonzero(scores > kth)
+                ties = np.flatnonzero(scores == kth)[:limit - better.size]
+                keep = np.concatenate([better, ties])
+                docs, scores = docs[keep], scores[keep]
+            order = np.lexsort((docs, -scores))
+            return [(self._doc_id(int(docs[i])), float(scores[i])) for i in order]
+
+    def match_ids(self, text: str) -> List[str]:
+        """Every inventory id matching the query, unranked"""
+        with self._lock:
+            docs, _ = self._score(text)
+            return [self._doc_id(int(doc)) for doc in docs]
+
+    # Incremental maintenance
+
+    def _base_positions(self, inventory_id: str) -> np.ndarray:
+        if self._base_lookup is None:
+            self._base_lookup = pd.Index(self._ids)
+        return self._base_lookup.get_indexer_for([inventory_id])
+
+    def _remove(self, inventory_id: str):
+        doc = self._added_lookup.pop(inventory_id, None)
+        if doc is not None:
+            _, values = self._added_rows[doc - self._size]
+            self._added_rows[doc - self._size] = None
+            for value in values:
+                for token in tokenize(value):
+                    docs = self._added.get(token)
+                    if docs is not None:
+                        docs.discard(doc)
+                        if not docs:
+                            del self._added[token]
+            key = inventory_id.lower()
+            self._added_ids[key].discard(doc)
+            if not self._added_ids[key]:
+                del self._added_ids[key]
+            return
+        for position in self._base_positions(inventory_id):
+            if position >= 0:
+                self._deleted.add(int(position))
+
+    def apply_delta(self, delta: pd.DataFrame, removed_ids: Iterable[str] = ()):
+        """
+        Replace rows whose ids appear in the delta and add new ones
+
+        Args:
+            delta: Changed or new rows (later rows win for repeated ids)
+            removed_ids: Ids deleted since the indexed snapshot
+        """
+        with self._lock:
+            for inventory_id in removed_ids:
+                self._remove(str(inventory_id))
+            ids = delta[ID_FIELD].astype(str).tolist()
+            columns = [delta[field].tolist() if field in delta else [None] * len(ids) for field in self.fields]
+            for row, inventory_id in enumerate(ids):
+                self._remove(inventory_id)
+                values = tuple(column[row] for column in columns)
+                doc = self._size + len(self._added_rows)
+                self._added_rows.append((inventory_id, values))
+                self._added_lookup[inventory_id] = doc
+                self._added_ids.setdefault(inventory_id.lower(), set()).add(doc)
+                for value in values:
+                    for token in tokenize(value):
+                        self._added.setdefault(token, set()).add(doc)
+
+            self._vocabulary = None
+            self._grams = None
+            self._added_id_keys = None
+            self._alive = None
+            changes = len(self._deleted) + len(self._added_rows)
+            if changes > max(COMPACT_MIN_CHANGES, COMPACT_RATIO * self._size):
+                self._compact()
+
+    def _compact(self):
+        """Rebuild from the live rows, base rows first, then added rows in arrival order"""
+        live = np.ones(self._size, dtype=bool)
+        if self._deleted:
+            live[list(self._deleted)] = False
+        added = [row for row in self._added_rows if row is not None]
+        frame = {ID_FIELD: np.concatenate([self._ids[live], np.array([row[0] for row in added], dtype=object)])}
+        for position, field in enumerate(self.fields):
+            frame[field] = np.concatenate([
+                self._values[field][live], np.array([row[1][position] for row in added], dtype=object)
+            ])
+        self._build(pd.DataFrame(frame))
+
+
+class SearchIndexManager:
+    """
+    Keeps the search index in step with the incremental loader
+
+    A new snapshot version whose delta came from the indexed version is
+    applied incrementally; anything else (first use, full reloads, skipped
+    versions) rebuilds the index once for that version.
+    """
+
+    def __init__(self):
+        self._index: Optional[InventorySearchIndex] = None
+        self._lock = threading.Lock()
+        self.stats = {'builds': 0, 'deltas': 0}
+
+    def index_for(self, df_inventory: pd.DataFrame, loader=None) -> InventorySearchIndex:
+        version = df_inventory.attrs.get(SNAPSHOT_VERSION_ATTR)
+        if version is None:
+            return InventorySearchIndex(df_inventory)
+        with self._lock:
+            index = self._index
+            if index is not None and index.version == version:
+                return index
+            if (index is not None and loader is not None and loader.version == version
+                    and loader.delta_base_version == index.version and loader.last_delta is not None):
+                index.apply_delta(loader.last_delta, getattr(loader, 'last_removed_ids', ()))
+                index.version = version
+                self.stats['deltas'] += 1
+                return index
+            self._index = InventorySearchIndex(df_inventory, version)
+            self.stats['builds'] += 1
+            return self._index
@@ -0,0 +1,248 @@
+"""
+Warehouse-side dashboard aggregations for InventoryQ OS
+Pushes the heatmap pivot, per-city summaries, status counts and top-N queries
+down to Snowflake so only small result sets reach the Streamlit process
+"""
+from typing import Any, Callable, Hashable, Optional
+from collections import OrderedDict
+import threading
+
+import pandas as pd
+
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+
+
+DEFAULT_VIEW = 'unified_inventory_view'
+DEFAULT_TOP_N = 10
+MEMO_SIZE = 32
+
+TOP_STOCK_COLUMNS = ('INVENTORY_ID', 'ITEM_TYPE', 'LOCATION_CITY', 'CURRENT_STOCK', 'STATUS')
+LOCATION_SUMMARY_COLUMNS = ('TOTAL_ITEMS', 'TOTAL_STOCK', 'AVG_DAYS_REMAINING')
+
+
+def _limit(n: int) -> int:
+    """LIMIT values are inlined, so they must be plain non-negative integers"""
+    n = int(n)
+    if n < 0:
+        raise ValueError("Limit must be non-negative")
+    return n
+
+
+# SQL builders. Every query returns at most one row per group (or N rows).
+
+def heatmap_sql(view_name: str = DEFAULT_VIEW) -> str:
+    """Mean DAYS_REMAINING per (city, item type) cell"""
+    return f"""
+        SELECT LOCATION_CITY, ITEM_TYPE, AVG(DAYS_REMAINING) AS AVG_DAYS
+        FROM {view_name}
+        WHERE LOCATION_CITY IS NOT NULL AND ITEM_TYPE IS NOT NULL AND DAYS_REMAINING IS NOT NULL
+        GROUP BY LOCATION_CITY, ITEM_TYPE
+    """
+
+
+def location_summary_sql(view_name: str = DEFAULT_VIEW) -> str:
+    """Item count, total stock and mean days remaining per city, riskiest first"""
+    return f"""
+        SELECT
+            LOCATION_CITY,
+            COUNT(INVENTORY_ID) AS TOTAL_ITEMS,
+            ROUND(COALESCE(SUM(CURRENT_STOCK), 0), 2) AS TOTAL_STOCK,
+            ROUND(AVG(DAYS_REMAINING), 2) AS AVG_DAYS_REMAINING
+        FROM {view_name}
+        WHERE LOCATION_CITY IS NOT NULL
+        GROUP BY LOCATION_CITY
+        ORDER BY AVG_DAYS_REMAINING ASC NULLS LAST, LOCATION_CITY
+    """
+
+
+def critical_by_city_sql(view_name: str = DEFAULT_VIEW, limit: Optional[int] = None) -> str:
+    """CRITICAL item count per city (cities without critical items included), highest first"""
+    limit_clause = f"LIMIT {_limit(limit)}" if limit is not None else ""
+    return f"""
+        SELECT
+            LOCATION_CITY,
+            SUM(CASE WHEN STATUS = 'CRITICAL' THEN 1 ELSE 0 END) AS CRITICAL_ITEMS
+        FROM {view_name}
+        WHERE LOCATION_CITY IS NOT NULL
+        GROUP BY LOCATION_CITY
+        ORDER BY CRITICAL_ITEMS DESC, LOCATION_CITY
+        {limit_clause}
+    """
+
+
+def status_counts_sql(view_name: str = DEFAULT_VIEW) -> str:
+    """Number of items per status, most frequent first"""
+    return f"""
+        SELECT STATUS, COUNT(*) AS ITEMS
+        FROM {view_name}
+        WHERE STATUS IS NOT NULL
+        GROUP BY STATUS
+        ORDER BY ITEMS DESC, STATUS
+    """
+
+
+def top_stock_sql(view_name: str = DEFAULT_VIEW, n: int = DEFAULT_TOP_N) -> str:
+    """The N rows with the highest CURRENT_STOCK"""
+    return f"""
+        SELECT {', '.join(TOP_STOCK_COLUMNS)}
+        FROM {view_name}
+        WHERE CURRENT_STOCK IS NOT NULL
+        ORDER BY CURRENT_STOCK DESC, INVENTORY_ID
+        LIMIT {_limit(n)}
+    """
+
+
+# Shaping of the (small) warehouse results into the frames the pages plot
+
+def shape_heatmap(rows: pd.DataFrame) -> pd.DataFrame:
+    """City x item type matrix of mean days remaining, empty cells filled with 0"""
+    if rows.empty:
+        return pd.DataFrame(dtype=float)
+    pivot = rows.pivot(index='LOCATION_CITY', columns='ITEM_TYPE', values='AVG_DAYS')
+    pivot = pivot.sort_index().sort_index(axis=1).fillna(0).astype(float)
+    pivot.columns.name = 'ITEM_TYPE'
+    return pivot
+
+
+def shape_location_summary(rows: pd.DataFrame) -> pd.DataFrame:
+    frame = rows.set_index('LOCATION_CITY')[list(LOCATION_SUMMARY_COLUMNS)]
+    return frame.astype({'TOTAL_ITEMS': 'int64', 'TOTAL_STOCK': float, 'AVG_DAYS_REMAINING': float})
+
+
+def shape_counts(rows: pd.DataFrame, key: str, value: str) -> pd.Series:
+    return pd.Series(rows[value].to_numpy(dtype='int64'), index=pd.Index(rows[key], name=key), name=value)
+
+
+def shape_top_stock(rows: pd.DataFrame) -> pd.DataFrame:
+    frame = rows[list(TOP_STOCK_COLUMNS)].reset_index(drop=True)
+    return frame.astype({'CURRENT_STOCK': float})
+
+
+# Local equivalents over an in-memory frame, used when no session is available
+
+def local_heatmap(df_inventory: pd.DataFrame) -> pd.DataFrame:
+    rows = df_inventory.dropna(subset=['LOCATION_CITY', 'ITEM_TYPE', 'DAYS_REMAINING'])
+    rows = rows.groupby(['LOCATION_CITY', 'ITEM_TYPE'], as_index=False)['DAYS_REMAINING'].mean()
+    return shape_heatmap(rows.rename(columns={'DAYS_REMAINING': 'AVG_DAYS'}))
+
+
+def local_location_summary(df_inventory: pd.DataFrame) -> pd.DataFrame:
+    rows = df_inventory.groupby('LOCATION_CITY', as_index=False).agg(
+        TOTAL_ITEMS=('INVENTORY_ID', 'count'),
+        TOTAL_STOCK=('CURRENT_STOCK', 'sum'),
+        AVG_DAYS_REMAINING=('DAYS_REMAINING', 'mean')
+    )
+    rows[['TOTAL_STOCK', 'AVG_DAYS_REMAINING']] = rows[['TOTAL_STOCK', 'AVG_DAYS_REMAINING']].round(2)
+    rows = rows.sort_values(['AVG_DAYS_REMAINING', 'LOCATION_CITY'], na_position='last', kind='stable')
+    return shape_location_summary(rows)
+
+
+def local_critical_by_city(df_inventory: pd.DataFrame, limit: Optional[int] = None) -> pd.Series:
+    rows = (df_inventory['STATUS'] == 'CRITICAL').groupby(df_inventory['LOCATION_CITY']).sum()
+    rows = rows.rename('CRITICAL_ITEMS').reset_index()
+    rows = rows.sort_values(['CRITICAL_ITEMS', 'LOCATION_CITY'], ascending=[False, True], kind='stable')
+    if limit is not None:
+        rows = rows.head(_limit(limit))
+    return shape_counts(rows, 'LOCATION_CITY', 'CRITICAL_ITEMS')
+
+
+def local_status_counts(df_inventory: pd.DataFrame) -> pd.Series:
+    rows = df_inventory['STATUS'].dropna().value_counts().rename('ITEMS').reset_index()
+    rows = rows.sort_values(['ITEMS', 'STATUS'], ascending=[False, True], kind='stable')
+    return shape_counts(rows, 'STATUS', 'ITEMS')
+
+
+def local_top_stock(df_inventory: pd.DataFrame, n: int = DEFAULT_TOP_N) -> pd.DataFrame:
+    rows = df_inventory.dropna(subset=['CURRENT_STOCK'])
+    rows = rows.sort_values(['CURRENT_STOCK', 'INVENTORY_ID'], ascending=[False, True], kind='stable')
+    return shape_top_stock(rows.head(_limit(n)))
+
+
+class DashboardAggregator:
+    """
+    Runs dashboard aggregations in the warehouse, memoized per snapshot version
+
+    The small result of each query is kept under the snapshot version
+    stamped by the incremental loader, so reruns of a page on the same
+    snapshot cost no query. The query reads the live view when the version
+    is first seen; every write path refreshes the snapshot, so a later write
+    always arrives with a new version and a new query. Without a session, or
+    if the query fails, the aggregate is computed from the in-memory frame.
+    """
+
+    def __init__(self, view_name: str = DEFAULT_VIEW, memo_size: int = MEMO_SIZE):
+        self.view_name = view_name
+        self.memo_size = max(1, memo_size)
+        self._memo: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'queries': 0, 'local': 0}
+
+    def _run(self, name: str, args: tuple, session, df_inventory: Optional[pd.DataFrame],
+             sql: str, shape: Callable[[pd.DataFrame], Any],
+             local: Callable[[pd.DataFrame], Any]) -> Any:
+        version = df_inventory.attrs.get(SNAPSHOT_VERSION_ATTR) if df_inventory is not None else None
+        # Row slices keep their snapshot's attrs; the length keeps their local fallbacks apart
+        key = (name, args, version, len(df_inventory)) if version is not None else None
+        if key is not None:
+            with self._lock:
+                if key in self._memo:
+                    self._memo.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return self._memo[key]
+
+        result = None
+        if session is not None:
+            try:
+                result = shape(session.sql(sql).to_pandas())
+                source = 'queries'
+            except Exception:
+                if df_inventory is None:
+                    raise
+        if result is None:
+            if df_inventory is None:
+                raise ValueError("A session or an inventory frame is required")
+            result = local(df_inventory)
+            source = 'local'
+
+        with self._lock:
+            self.stats[source] += 1
+            if key is not None:
+                self._memo[key] = result
+                self._memo.move_to_end(key)
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return result
+
+    def heatmap(self, session, df_inventory: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Mean days remaining pivot (LOCATION_CITY rows x ITEM_TYPE columns, fill 0)"""
+        return self._run('heatmap', (), session, df_inventory, heatmap_sql(self.view_name),
+                         shape_heatmap, local_heatmap)
+
+    def location_summary(self, session, df_inventory: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """TOTAL_ITEMS, TOTAL_STOCK and AVG_DAYS_REMAINING per city, lowest days first"""
+        return self._run('location_summary', (), session, df_inventory,
+                         location_summary_sql(self.view_name),
+                         shape_location_summary, local_location_summary)
+
+    def critical_by_city(self, session, df_inventory: Optional[pd.DataFrame] = None,
+                         limit: Optional[int] = None) -> pd.Series:
+        """CRITICAL item count per city, highest first"""
+        return self._run('critical_by_city', (limit,), session, df_inventory,
+                         critical_by_city_sql(self.view_name, limit),
+                         lambda rows: shape_counts(rows, 'LOCATION_CITY', 'CRITICAL_ITEMS'),
+                         lambda df: local_critical_by_city(df, limit))
+
+    def status_counts(self, session, df_inventory: Optional[pd.DataFrame] = None) -> pd.Series:
+        """Item count per STATUS, most frequent first"""
+        return self._run('status_counts', (), session, df_inventory, status_counts_sql(self.view_name),
+                         lambda rows: shape_counts(rows, 'STATUS', 'ITEMS'), local_status_counts)
+
+    def top_stock(self, session, df_inventory: Optional[pd.DataFrame] = None,
+                  n: int = DEFAULT_TOP_N) -> pd.DataFrame:
+        """The n highest-stock rows (INVENTORY_ID, ITEM_TYPE, LOCATION_CITY, CURRENT_STOCK, STATUS)"""
+        return self._run('top_stock', (n,), session, df_inventory, top_stock_sql(self.view_name, n),
+                         shape_top_stock, lambda df: local_top_stock(df, n))
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
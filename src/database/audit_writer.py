@@ -0,0 +1,301 @@
+"""
+Asynchronous audit log writer for InventoryQ OS
+Buffers audit records in a bounded in-process queue and flushes them from a
+background thread as multi-row INSERTs, spilling to disk when the warehouse
+is unreachable so UI actions never wait on the database
+"""
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+import atexit
+import glob
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+
+from src.database.query_layer import executemany, register_template
+
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL_MS = 500
+DEFAULT_MAX_QUEUE = 10000
+DEFAULT_ENQUEUE_TIMEOUT_S = 0.05
+DEFAULT_SPILL_ROOT = os.path.join(tempfile.gettempdir(), 'inventoryq_audit_spill')
+# A claimed spill file untouched this long belongs to a replay that died
+STALE_CLAIM_S = 600
+
+SPILL_SUFFIX = '.jsonl'
+CLAIM_SUFFIX = '.replaying'
+
+APP_AUDIT_LOG_COLUMNS = ('timestamp', 'user_name', 'action', 'details')
+AUDIT_LOG_COLUMNS = ('log_id', 'action_type', 'inventory_id', 'new_values', 'timestamp', 'reasoning')
+
+
+def build_multi_row_insert(table: str, columns: Sequence[str],
+                           records: Sequence[Dict[str, Any]],
+                           sql_defaults: Optional[Dict[str, str]] = None) -> Tuple[str, List[Any]]:
+    """
+    Build one INSERT ... VALUES (...), (...) statement for a batch of records
+
+    Args:
+        table: Target table
+        columns: Columns to insert, in order
+        records: Records keyed by column name
+        sql_defaults: Columns whose value is a SQL expression (e.g. CURRENT_USER())
+                      instead of a bound parameter
+
+    Returns:
+        Tuple of (sql, flattened qmark parameters)
+    """
+    sql_defaults = sql_defaults or {}
+    placeholders = ", ".join(sql_defaults.get(column, '?') for column in columns)
+    bound_columns = [column for column in columns if column not in sql_defaults]
+
+    values_sql = ",\n".join(f"({placeholders})" for _ in records)
+    params = [record.get(column) for record in records for column in bound_columns]
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES\n{values_sql}", params
+
+
+def snowpark_audit_sink(session_provider: Callable[[], Any],
+                        table: str = 'APP_AUDIT_LOG') -> Callable[[List[Dict[str, Any]]], None]:
+    """
+    Flush function writing APP_AUDIT_LOG batches through a Snowpark session
+
+    Args:
+        session_provider: Callable returning a live Snowpark session
+        table: Audit table name
+    """
+    def flush(records: List[Dict[str, Any]]):
+        sql, params = build_multi_row_insert(
+            table, APP_AUDIT_LOG_COLUMNS, records,
+            sql_defaults={'user_name': 'CURRENT_USER()'}
+        )
+        session_provider().sql(sql, params=params).collect()
+
+    flush.spill_name = f"snowpark_{table}"
+    return flush
+
+
+def connector_audit_sink(pool: Any, table: str = 'audit_log') -> Callable[[List[Dict[str, Any]]], None]:
+    """
+    Flush function writing audit_log batches through a pooled snowflake.connector connection
+
+    Uses executemany, which the connector rewrites into a single multi-row INSERT.
+
+    Args:
+        pool: ConnectionPool (or anything with a connection() context manager)
+        table: Audit table name
+    """
+    statement = register_template(
+        f'{table}.audit_insert',
+        f"INSERT INTO {table} ({', '.join(AUDIT_LOG_COLUMNS)}) "
+        f"VALUES ({', '.join(':' + column for column in AUDIT_LOG_COLUMNS)})"
+    )
+
+    def flush(records: List[Dict[str, Any]]):
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                executemany(cursor, statement, [
+                    {column: record.get(column) for column in AUDIT_LOG_COLUMNS} for record in records
+                ])
+                conn.commit()
+            finally:
+                cursor.close()
+
+    flush.spill_name = f"connector_{table}"
+    return flush
+
+
+class AuditLogWriter:
+    """
+    Background, batched audit log pipeline with disk spill
+
+    Spill files live in a directory per sink (named by the sink's spill_name,
+    i.e. its target table), so a writer only ever replays records meant for
+    its own table. A file is claimed with an atomic rename before it is
+    replayed, so writers in several processes never send it twice.
+    """
+
+    def __init__(self, flush_fn: Callable[[List[Dict[str, Any]]], None],
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval_ms: int = DEFAULT_FLUSH_INTERVAL_MS,
+                 max_queue: int = DEFAULT_MAX_QUEUE,
+                 spill_dir: Optional[str] = None,
+                 enqueue_timeout: float = DEFAULT_ENQUEUE_TIMEOUT_S,
+                 register_atexit: bool = True):
+        self.flush_fn = flush_fn
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.enqueue_timeout = enqueue_timeout
+        self.spill_dir = spill_dir or os.path.join(DEFAULT_SPILL_ROOT,
+                                                   getattr(flush_fn, 'spill_name', 'default'))
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._flush_requested = threading.Event()
+        self._io_lock = threading.Lock()
+        self.stats = {'enqueued': 0, 'written': 0, 'spilled': 0, 'replayed': 0, 'failed_flushes': 0}
+
+        self._worker = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+        self._worker.start()
+
+        if register_atexit:
+            atexit.register(self.close)
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """
+        Queue an audit record without waiting on the warehouse
+
+        When the queue is full the caller waits at most enqueue_timeout
+        (backpressure); after that the record is spilled to disk instead.
+
+        Returns:
+            True if queued, False if it had to be spilled
+        """
+        record = dict(record)
+        record.setdefault('timestamp', datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f'))
+
+        if self._stop.is_set():
+            self._spill([record])
+            return False
+
+        try:
+            self._queue.put(record, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self._spill([record])
+            return False
+
+        self.stats['enqueued'] += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._flush_requested.set()
+        return True
+
+    def pending(self) -> int:
+        """Records still waiting in memory"""
+        return self._queue.qsize()
+
+    def spilled_files(self) -> List[str]:
+        """Spill files waiting to be replayed"""
+        return sorted(glob.glob(os.path.join(self.spill_dir, f"audit_spill_*{SPILL_SUFFIX}")))
+
+    def _release_stale_claims(self):
+        """Return files claimed by a replay that never finished (e.g. a killed process)"""
+        now = time.time()
+        for claimed in glob.glob(os.path.join(self.spill_dir, f"audit_spill_*{CLAIM_SUFFIX}")):
+            try:
+                if now - os.path.getmtime(claimed) > STALE_CLAIM_S:
+                    os.rename(claimed, claimed[:-len(CLAIM_SUFFIX)] + SPILL_SUFFIX)
+            except OSError:
+                pass
+
+    def _drain(self, limit: int) -> List[Dict[str, Any]]:
+        """Take up to limit records off the queue without blocking"""
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _spill(self, records: List[Dict[str, Any]]):
+        """Durably write records to a new spill file"""
+        if not records:
+            return
+        path = os.path.join(
+            self.spill_dir, f"audit_spill_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}{SPILL_SUFFIX}"
+        )
+        self._write_file(path, records)
+        self.stats['spilled'] += len(records)
+
+    def _write_file(self, path: str, records: List[Dict[str, Any]]):
+        """Write via a temporary name so other processes never see a partial file"""
+        partial = path + '.tmp'
+        with self._io_lock:
+            with open(partial, 'w', encoding='utf-8') as spill_file:
+                for record in records:
+                    spill_file.write(json.dumps(record, default=str) + "\n")
+                spill_file.flush()
+                os.fsync(spill_file.fileno())
+            os.replace(partial, path)
+
+    def _write(self, records: List[Dict[str, Any]]) -> bool:
+        """Flush one batch; spill it if the database is unreachable"""
+        if not records:
+            return True
+        try:
+            self.flush_fn(records)
+        except Exception:
+            self.stats['failed_flushes'] += 1
+            self._spill(records)
+            return False
+        self.stats['written'] += len(records)
+        return True
+
+    def _replay_spill(self):
+        """Re-send spilled batches once the database is reachable again"""
+        self._release_stale_claims()
+        for path in self.spilled_files():
+            claimed = path[:-len(SPILL_SUFFIX)] + CLAIM_SUFFIX
+            try:
+                # Atomic: if another writer got here first, the rename fails
+                os.rename(path, claimed)
+                os.utime(claimed)
+            except OSError:
+                continue
+            with self._io_lock:
+                try:
+                    with open(claimed, encoding='utf-8') as spill_file:
+                        records = [json.loads(line) for line in spill_file if line.strip()]
+                except (OSError, ValueError):
+                    continue
+            sent = 0
+            try:
+                for sent in range(0, len(records), self.batch_size):
+                    self.flush_fn(records[sent:sent + self.batch_size])
+            except Exception:
+                # Still unreachable; give back only what was not sent and try again later
+                self.stats['failed_flushes'] += 1
+                self.stats['replayed'] += sent
+                if sent:
+                    self._write_file(claimed, records[sent:])
+                os.rename(claimed, path)
+                return
+            os.remove(claimed)
+            self.stats['replayed'] += len(records)
+
+    def _run(self):
+        """Worker loop: flush every batch_size records or flush_interval seconds"""
+        while not self._stop.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+
+    def flush(self):
+        """Write everything currently queued, then replay any spilled batches"""
+        healthy = True
+        while True:
+            batch = self._drain(self.batch_size)
+            if not batch:
+                break
+            healthy = self._write(batch) and healthy
+        if healthy and self.spilled_files():
+            self._replay_spill()
+
+    def close(self, timeout: float = 5.0):
+        """Flush-on-shutdown hook: stop the worker and persist whatever is left"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._flush_requested.set()
+        self._worker.join(timeout)
+        self.flush()
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
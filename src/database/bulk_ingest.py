@@ -0,0 +1,279 @@
+"""
+Bulk ingest helpers for InventoryQ OS
+Normalizes item iterables, columnar batches and CSV/Parquet files into one
+columnar layout and validates whole batches with NumPy in a single pass
+"""
+from typing import Any, Container, Dict, Iterable, List, Mapping, Tuple, Union
+from dataclasses import dataclass, field
+from datetime import datetime
+import os
+
+import numpy as np
+
+from src.models.data_models import SectorType
+
+
+STRING_COLUMNS = ('inventory_id', 'organization_id', 'sector_type', 'item_type', 'city', 'state', 'country')
+NUMERIC_COLUMNS = ('current_stock', 'daily_consumption_rate', 'reorder_point', 'critical_threshold')
+OPTIONAL_COLUMNS = ('latitude', 'longitude', 'last_updated')
+REQUIRED_COLUMNS = STRING_COLUMNS + NUMERIC_COLUMNS
+
+# inventory_master column names accepted as aliases
+COLUMN_ALIASES = {
+    'location_city': 'city',
+    'location_state': 'state',
+    'location_country': 'country',
+    'location_latitude': 'latitude',
+    'location_longitude': 'longitude',
+}
+
+REJECT_MISSING_VALUE = 'MISSING_VALUE'
+REJECT_UNKNOWN_SECTOR = 'UNKNOWN_SECTOR'
+REJECT_INVALID_NUMBER = 'INVALID_NUMBER'
+REJECT_NEGATIVE_STOCK = 'NEGATIVE_STOCK'
+REJECT_ZERO_CONSUMPTION = 'ZERO_CONSUMPTION'
+REJECT_THRESHOLD_ORDER = 'THRESHOLD_ORDER'
+REJECT_DUPLICATE_IN_BATCH = 'DUPLICATE_IN_BATCH'
+REJECT_DUPLICATE_ID = 'DUPLICATE_ID'
+
+_SECTORS = {sector.value: sector for sector in SectorType}
+_SECTORS.update({sector: sector for sector in SectorType})
+
+Columns = Dict[str, List[Any]]
+
+
+@dataclass
+class RowRejection:
+    """One rejected input row"""
+    row: int
+    inventory_id: Any
+    reasons: List[str]
+
+
+@dataclass
+class BulkLoadReport:
+    """Outcome of a bulk insert or upsert"""
+    total: int = 0
+    inserted: int = 0
+    updated: int = 0
+    rejected: List[RowRejection] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.rejected
+
+    @property
+    def rejected_count(self) -> int:
+        return len(self.rejected)
+
+    def reason_counts(self) -> Dict[str, int]:
+        """Number of rows failing each rule"""
+        counts: Dict[str, int] = {}
+        for rejection in self.rejected:
+            for reason in rejection.reasons:
+                counts[reason] = counts.get(reason, 0) + 1
+        return counts
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Rejections as plain records (e.g. for st.dataframe or a CSV download)"""
+        return [
+            {'row': r.row, 'inventory_id': r.inventory_id, 'reasons': ', '.join(r.reasons)}
+            for r in self.rejected
+        ]
+
+
+def _normalize_name(name: str) -> str:
+    name = str(name).strip().lower()
+    return COLUMN_ALIASES.get(name, name)
+
+
+def read_table_file(path: Union[str, os.PathLike]) -> Columns:
+    """Read a CSV or Parquet file into columns (pandas imported lazily)"""
+    import pandas as pd
+
+    extension = os.path.splitext(os.fspath(path))[1].lower()
+    if extension == '.csv':
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    elif extension in ('.parquet', '.pq'):
+        frame = pd.read_parquet(path)
+    else:
+        raise ValueError(f"Unsupported file type for bulk ingest: {extension or path}")
+    return {column: frame[column].tolist() for column in frame.columns}
+
+
+def _columns_from_items(items: Iterable[Any]) -> Columns:
+    """Pivot InventoryItem objects or row mappings into columns"""
+    columns: Columns = {name: [] for name in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+    for item in items:
+        if isinstance(item, Mapping):
+            row = {_normalize_name(key): value for key, value in item.items()}
+            for name in columns:
+                columns[name].append(row.get(name))
+            continue
+        location = item.location
+        columns['inventory_id'].append(item.inventory_id)
+        columns['organization_id'].append(item.organization_id)
+        columns['sector_type'].append(item.sector_type)
+        columns['item_type'].append(item.item_type)
+        columns['current_stock'].append(item.current_stock)
+        columns['daily_consumption_rate'].append(item.daily_consumption_rate)
+        columns['reorder_point'].append(item.reorder_point)
+        columns['critical_threshold'].append(item.critical_threshold)
+        columns['city'].append(location.city if location else None)
+        columns['state'].append(location.state if location else None)
+        columns['country'].append(location.country if location else None)
+        columns['latitude'].append(location.latitude if location else None)
+        columns['longitude'].append(location.longitude if location else None)
+        columns['last_updated'].append(item.last_updated)
+    return columns
+
+
+def load_columns(source: Any) -> Columns:
+    """
+    Normalize any supported bulk source into a dict of equal-length columns
+
+    Args:
+        source: Iterable of InventoryItem objects or row dicts, a columnar
+                batch (dict of sequences or DataFrame), or a CSV/Parquet path
+
+    Returns:
+        Dict of column name -> list, using InventoryItem field names
+    """
+    if isinstance(source, (str, os.PathLike)):
+        raw = read_table_file(source)
+    elif hasattr(source, 'columns') and hasattr(source, 'to_dict'):
+        raw = {column: source[column].tolist() for column in source.columns}
+    elif isinstance(source, Mapping):
+        raw = {column: list(values) for column, values in source.items()}
+    else:
+        raw = _columns_from_items(source)
+
+    columns = {_normalize_name(name): values for name, values in raw.items()}
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Bulk ingest source is missing columns: {', '.join(missing)}")
+
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("Bulk ingest columns must all have the same length")
+    size = lengths.pop() if lengths else 0
+    for name in OPTIONAL_COLUMNS:
+        columns.setdefault(name, [None] * size)
+    return columns
+
+
+def is_blank(value: Any) -> bool:
+    """None, NaN/NaT or an empty string"""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    try:
+        return bool(value != value)
+    except (TypeError, ValueError):
+        return False
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def float_column(values: List[Any]) -> np.ndarray:
+    """Float array for a column; unparseable or blank values become NaN"""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.fromiter((_to_float(value) for value in values), dtype=np.float64, count=len(values))
+
+
+def parse_timestamp(value: Any):
+    """Best-effort datetime for last_updated values from files or frames"""
+    if is_blank(value):
+        return None
+    if hasattr(value, 'to_pydatetime'):
+        return value.to_pydatetime()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+    return value
+
+
+def validate_batch(columns: Columns, existing_ids: Container[str],
+                   allow_existing: bool) -> Tuple[np.ndarray, np.ndarray, List[RowRejection]]:
+    """
+    Validate every row of a columnar batch at once
+
+    Args:
+        columns: Output of load_columns
+        existing_ids: Ids already stored (the primary id index)
+        allow_existing: True for upserts; False rejects ids that already exist
+
+    Returns:
+        Tuple of (accepted row numbers, per-row "already exists" mask, rejections)
+    """
+    ids = columns['inventory_id']
+    size = len(ids)
+    failures: Dict[str, np.ndarray] = {}
+
+    missing = np.zeros(size, dtype=bool)
+    for name in STRING_COLUMNS:
+        missing |= np.fromiter((is_blank(value) for value in columns[name]), dtype=bool, count=size)
+    failures[REJECT_MISSING_VALUE] = missing
+
+    failures[REJECT_UNKNOWN_SECTOR] = np.fromiter(
+        (not is_blank(value) and _SECTORS.get(value) is None for value in columns['sector_type']),
+        dtype=bool, count=size
+    )
+
+    stock = float_column(columns['current_stock'])
+    rate = float_column(columns['daily_consumption_rate'])
+    reorder = float_column(columns['reorder_point'])
+    critical = float_column(columns['critical_threshold'])
+    invalid = ~(np.isfinite(stock) & np.isfinite(rate) & np.isfinite(reorder) & np.isfinite(critical))
+    failures[REJECT_INVALID_NUMBER] = invalid
+
+    with np.errstate(invalid='ignore'):
+        failures[REJECT_NEGATIVE_STOCK] = stock < 0
+        failures[REJECT_ZERO_CONSUMPTION] = rate <= 0
+        failures[REJECT_THRESHOLD_ORDER] = (critical < 0) | (critical > reorder)
+
+    # One pass over the ids for both duplicate checks
+    in_batch = np.zeros(size, dtype=bool)
+    exists = np.zeros(size, dtype=bool)
+    seen = set()
+    for row, item_id in enumerate(ids):
+        if is_blank(item_id):
+            continue
+        item_id = str(item_id)
+        if item_id in seen:
+            in_batch[row] = True
+        else:
+            seen.add(item_id)
+        exists[row] = item_id in existing_ids
+    failures[REJECT_DUPLICATE_IN_BATCH] = in_batch
+    if not allow_existing:
+        failures[REJECT_DUPLICATE_ID] = exists
+
+    rejected_mask = np.zeros(size, dtype=bool)
+    for mask in failures.values():
+        rejected_mask |= mask
+
+    rejections = [
+        RowRejection(
+            row=int(row),
+            inventory_id=ids[row],
+            reasons=[reason for reason, mask in failures.items() if mask[row]]
+        )
+        for row in np.flatnonzero(rejected_mask)
+    ]
+    return np.flatnonzero(~rejected_mask), exists, rejections
+
+
+def sector_for(value: Any) -> SectorType:
+    """SectorType for an enum member or its string value"""
+    return _SECTORS[value]
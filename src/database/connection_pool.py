@@ -0,0 +1,250 @@
+"""
+Connection pool for the snowflake.connector based apps
+Provides checkout/checkin semantics, health checks, max-idle eviction and
+per-thread connection affinity so data-access functions stop reconnecting
+(or closing the shared connection) on every query
+"""
+from typing import Any, Callable, Dict, List
+from contextlib import contextmanager
+import threading
+import time
+
+
+DEFAULT_MAX_SIZE = 8
+DEFAULT_MAX_IDLE_SECONDS = 300
+DEFAULT_HEALTH_CHECK_INTERVAL = 30
+DEFAULT_CHECKOUT_TIMEOUT = 10
+HEALTH_CHECK_SQL = "SELECT 1"
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no connection becomes available within the checkout timeout"""
+
+
+class _PooledConnection:
+    """Bookkeeping for one physical connection"""
+
+    def __init__(self, conn: Any):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_checked = self.created_at
+
+
+class ConnectionPool:
+    """Thread-safe pool of warehouse connections"""
+
+    def __init__(self, connect_fn: Callable[[], Any], max_size: int = DEFAULT_MAX_SIZE,
+                 max_idle_seconds: float = DEFAULT_MAX_IDLE_SECONDS,
+                 health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+                 checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT):
+        self.connect_fn = connect_fn
+        self.max_size = max(1, max_size)
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+
+        self._idle: List[_PooledConnection] = []
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._closed = False
+        self.stats = {'created': 0, 'reused': 0, 'evicted': 0, 'failed_health_checks': 0}
+
+    @property
+    def size(self) -> int:
+        """Physical connections currently open (idle + in use)"""
+        with self._condition:
+            return len(self._idle) + len(self._in_use)
+
+    @staticmethod
+    def _is_closed(conn: Any) -> bool:
+        """Connector connections expose is_closed(); treat errors as closed"""
+        try:
+            is_closed = getattr(conn, 'is_closed', None)
+            return bool(is_closed()) if callable(is_closed) else False
+        except Exception:
+            return True
+
+    @staticmethod
+    def _close_quietly(conn: Any):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, pooled: _PooledConnection) -> bool:
+        """Ping connections that have been idle longer than the check interval (lock not held)"""
+        if self._is_closed(pooled.conn):
+            return False
+        if time.monotonic() - pooled.last_checked < self.health_check_interval:
+            return True
+        try:
+            cursor = pooled.conn.cursor()
+            try:
+                cursor.execute(HEALTH_CHECK_SQL)
+                cursor.fetchone()
+            finally:
+                cursor.close()
+        except Exception:
+            with self._condition:
+                self.stats['failed_health_checks'] += 1
+            return False
+        pooled.last_checked = time.monotonic()
+        return True
+
+    def _take_expired(self) -> List[Any]:
+        """Remove idle connections past max_idle_seconds and return them for closing (caller holds the lock)"""
+        now = time.monotonic()
+        keep, expired = [], []
+        for pooled in self._idle:
+            if now - pooled.last_used > self.max_idle_seconds:
+                expired.append(pooled.conn)
+                self.stats['evicted'] += 1
+            else:
+                keep.append(pooled)
+        self._idle = keep
+        return expired
+
+    def checkout(self) -> Any:
+        """
+        Take a connection out of the pool for exclusive use
+
+        Reuses the most recently returned healthy connection, opens a new one
+        while under max_size, and otherwise waits up to checkout_timeout.
+        Health checks, closes and connects run outside the lock; the popped
+        connection (or a placeholder) holds its slot meanwhile.
+        """
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            expired: List[Any] = []
+            try:
+                with self._condition:
+                    while True:
+                        if self._closed:
+                            raise RuntimeError("Connection pool is closed")
+                        expired.extend(self._take_expired())
+                        if self._idle or len(self._in_use) < self.max_size:
+                            break
+
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise PoolExhaustedError(
+                                f"No connection available after {self.checkout_timeout}s "
+                                f"({self.max_size} in use)"
+                            )
+                        self._condition.wait(remaining)
+
+                    if not self._idle:
+                        # Reserve the slot before connecting outside the lock
+                        placeholder = _PooledConnection(None)
+                        self._in_use[id(placeholder)] = placeholder
+                        break
+                    pooled = self._idle.pop()
+                    self._in_use[id(pooled.conn)] = pooled
+            finally:
+                for conn in expired:
+                    self._close_quietly(conn)
+
+            if self._healthy(pooled):
+                with self._condition:
+                    self.stats['reused'] += 1
+                return pooled.conn
+            self._close_quietly(pooled.conn)
+            with self._condition:
+                self._in_use.pop(id(pooled.conn), None)
+                self.stats['evicted'] += 1
+                self._condition.notify()
+
+        try:
+            conn = self.connect_fn()
+        except Exception:
+            with self._condition:
+                self._in_use.pop(id(placeholder), None)
+                self._condition.notify()
+            raise
+
+        pooled = _PooledConnection(conn)
+        with self._condition:
+            self._in_use.pop(id(placeholder), None)
+            self._in_use[id(conn)] = pooled
+            self.stats['created'] += 1
+        return conn
+
+    def checkin(self, conn: Any, discard: bool = False):
+        """Return a connection; closed or discarded connections are dropped"""
+        with self._condition:
+            pooled = self._in_use.pop(id(conn), None)
+            if pooled is None:
+                return
+            drop = discard or self._closed or self._is_closed(conn)
+            if not drop:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            self._condition.notify()
+        if drop:
+            self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager yielding a pooled connection
+
+        Nested use on the same thread reuses the connection already held by
+        that thread, so helpers can call each other without extra checkouts.
+        A connection that raised a connector error is discarded on exit.
+        """
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self.checkout()
+        self._local.conn = conn
+        self._local.depth = 1
+        failed = False
+        try:
+            yield conn
+        except Exception as error:
+            failed = _is_connection_error(error)
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self.checkin(conn, discard=failed)
+
+    @contextmanager
+    def cursor(self):
+        """Context manager yielding a cursor on this thread's pooled connection"""
+        with self.connection() as conn:
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                try:
+                    cur.close()
+                except Exception:
+                    pass
+
+    def close_all(self):
+        """Close idle connections and stop handing out new ones"""
+        with self._condition:
+            self._closed = True
+            for pooled in self._idle:
+                self._close_quietly(pooled.conn)
+            self._idle = []
+            self._condition.notify_all()
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """Heuristic for errors that leave the connection unusable"""
+    message = str(error).lower()
+    return (
+        type(error).__name__ in ('OperationalError', 'InterfaceError')
+        or 'connection is closed' in message
+        or '250002' in message
+    )
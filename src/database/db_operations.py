@@ -1,10 +1,18 @@
 """
 Database operations for ResQ OS
 """
-from typing import List, Dict, Optional
+from typing import Any, Iterable, List, Dict, Optional, Tuple
 from datetime import datetime
+import bisect
 import json
 from src.models.data_models import InventoryItem, SectorType, Location, SectorConfig
+from src.database.bulk_ingest import (
+    BulkLoadReport, float_column, load_columns, parse_timestamp, sector_for, validate_batch
+)
+
+
+# Insertion-ordered id set: dict keys with None values
+IdIndex = Dict[str, Dict[str, None]]
 
 
 class DatabaseOperations:
@@ -14,12 +22,95 @@ class DatabaseOperations:
         # In a real implementation, this would connect to Snowflake
         # For now, we'll use in-memory storage for testing
         self.inventory_data: Dict[str, InventoryItem] = {}
+        
+        # Secondary indexes kept consistent on insert, update and delete
+        self._org_index: IdIndex = {}
+        self._sector_index: Dict[SectorType, Dict[str, None]] = {}
+        self._city_index: IdIndex = {}
+        self._days_index: List[Tuple[float, str]] = []
+        self._index_keys: Dict[str, Tuple[str, SectorType, str, float]] = {}
+        
         self.sector_configs: Dict[str, SectorConfig] = {
             'HOSPITAL': SectorConfig(SectorType.HOSPITAL, 2.0, 3, 1),
             'PDS': SectorConfig(SectorType.PDS, 1.5, 7, 2),
             'NGO': SectorConfig(SectorType.NGO, 1.8, 5, 1)
         }
     
+    def _index_item(self, item: InventoryItem):
+        """Add an item to every secondary index"""
+        item_id = item.inventory_id
+        city = item.location.city if item.location else None
+        days = item.days_remaining()
+        
+        self._org_index.setdefault(item.organization_id, {})[item_id] = None
+        self._sector_index.setdefault(item.sector_type, {})[item_id] = None
+        self._city_index.setdefault(city, {})[item_id] = None
+        bisect.insort(self._days_index, (days, item_id))
+        
+        # Remember the indexed keys so later mutations of the item cannot strand entries
+        self._index_keys[item_id] = (item.organization_id, item.sector_type, city, days)
+    
+    def _unindex_item(self, item_id: str):
+        """Remove an item from every secondary index"""
+        keys = self._index_keys.pop(item_id, None)
+        if keys is None:
+            return
+        organization_id, sector_type, city, days = keys
+        
+        for index, key in ((self._org_index, organization_id),
+                           (self._sector_index, sector_type),
+                           (self._city_index, city)):
+            ids = index.get(key)
+            if ids is not None:
+                ids.pop(item_id, None)
+                if not ids:
+                    del index[key]
+        
+        position = bisect.bisect_left(self._days_index, (days, item_id))
+        if position < len(self._days_index) and self._days_index[position] == (days, item_id):
+            del self._days_index[position]
+    
+    def _index_items(self, items: List[InventoryItem]):
+        """Index a batch of items, re-sorting the days index once instead of per item"""
+        new_days = []
+        for item in items:
+            item_id = item.inventory_id
+            city = item.location.city if item.location else None
+            days = item.days_remaining()
+            self._org_index.setdefault(item.organization_id, {})[item_id] = None
+            self._sector_index.setdefault(item.sector_type, {})[item_id] = None
+            self._city_index.setdefault(city, {})[item_id] = None
+            self._index_keys[item_id] = (item.organization_id, item.sector_type, city, days)
+            new_days.append((days, item_id))
+        self._days_index.extend(new_days)
+        self._days_index.sort()
+    
+    def _unindex_items(self, item_ids: Iterable[str]):
+        """Remove a batch of items from every index with one pass over the days index"""
+        dropped = set()
+        for item_id in item_ids:
+            keys = self._index_keys.pop(item_id, None)
+            if keys is None:
+                continue
+            organization_id, sector_type, city, _days = keys
+            for index, key in ((self._org_index, organization_id),
+                               (self._sector_index, sector_type),
+                               (self._city_index, city)):
+                ids = index.get(key)
+                if ids is not None:
+                    ids.pop(item_id, None)
+                    if not ids:
+                        del index[key]
+            dropped.add(item_id)
+        if dropped:
+            self._days_index[:] = [entry for entry in self._days_index if entry[1] not in dropped]
+    
+    def _items_for(self, ids: Optional[Dict[str, None]]) -> List[InventoryItem]:
+        """Resolve an id index entry to items (cost proportional to the result)"""
+        if not ids:
+            return []
+        return [self.inventory_data[item_id] for item_id in ids]
+    
     def insert_inventory_item(self, item: InventoryItem) -> bool:
         """Insert an inventory item into the database"""
         try:
@@ -27,76 +118,142 @@ class DatabaseOperations:
             if item.inventory_id in self.inventory_data:
                 return False
             self.inventory_data[item.inventory_id] = item
+            self._index_item(item)
+            return True
+        except Exception:
+            self.inventory_data.pop(item.inventory_id, None)
+            return False
+    
+    def update_inventory_item(self, item: InventoryItem) -> bool:
+        """Replace an existing inventory item and re-index it"""
+        try:
+            if item.inventory_id not in self.inventory_data:
+                return False
+            self._unindex_item(item.inventory_id)
+            self.inventory_data[item.inventory_id] = item
+            self._index_item(item)
             return True
         except Exception:
             return False
     
+    def delete_inventory_item(self, inventory_id: str) -> bool:
+        """Delete an inventory item and drop it from every index"""
+        if inventory_id not in self.inventory_data:
+            return False
+        self._unindex_item(inventory_id)
+        del self.inventory_data[inventory_id]
+        return True
+    
+    def _bulk_write(self, source: Any, upsert: bool) -> BulkLoadReport:
+        """Validate a whole batch, then write every accepted row and index them together"""
+        columns = load_columns(source)
+        accepted, exists, rejections = validate_batch(columns, self.inventory_data, allow_existing=upsert)
+        report = BulkLoadReport(total=len(columns['inventory_id']), rejected=rejections)
+        if not len(accepted):
+            return report
+        
+        numbers = {name: float_column(columns[name])
+                   for name in ('current_stock', 'daily_consumption_rate', 'reorder_point',
+                                'critical_threshold', 'latitude', 'longitude')}
+        locations: Dict[Tuple, Location] = {}
+        items = []
+        for row in accepted:
+            latitude = numbers['latitude'][row]
+            longitude = numbers['longitude'][row]
+            location_key = (
+                str(columns['city'][row]), str(columns['state'][row]), str(columns['country'][row]),
+                None if latitude != latitude else float(latitude),
+                None if longitude != longitude else float(longitude)
+            )
+            location = locations.get(location_key)
+            if location is None:
+                location = locations[location_key] = Location(*location_key)
+            items.append(InventoryItem(
+                inventory_id=str(columns['inventory_id'][row]),
+                organization_id=str(columns['organization_id'][row]),
+                sector_type=sector_for(columns['sector_type'][row]),
+                item_type=str(columns['item_type'][row]),
+                current_stock=float(numbers['current_stock'][row]),
+                daily_consumption_rate=float(numbers['daily_consumption_rate'][row]),
+                reorder_point=float(numbers['reorder_point'][row]),
+                critical_threshold=float(numbers['critical_threshold'][row]),
+                location=location,
+                last_updated=parse_timestamp(columns['last_updated'][row])
+            ))
+        
+        replaced = [item.inventory_id for item, row in zip(items, accepted) if exists[row]]
+        self._unindex_items(replaced)
+        for item in items:
+            self.inventory_data[item.inventory_id] = item
+        self._index_items(items)
+        
+        report.updated = len(replaced)
+        report.inserted = len(items) - len(replaced)
+        return report
+    
+    def insert_many(self, source: Any) -> BulkLoadReport:
+        """
+        Insert a batch of new inventory items
+        
+        Args:
+            source: Iterable of InventoryItem objects or row dicts, a columnar
+                    batch (dict of sequences or DataFrame), or a CSV/Parquet path
+        
+        Returns:
+            BulkLoadReport; rows with invalid values or ids that already exist
+            are listed in report.rejected with their reasons
+        """
+        return self._bulk_write(source, upsert=False)
+    
+    def upsert_many(self, source: Any) -> BulkLoadReport:
+        """Insert new items and replace existing ones (same sources as insert_many)"""
+        return self._bulk_write(source, upsert=True)
+    
     def get_unified_inventory(self) -> List[InventoryItem]:
         """Get all inventory items across all sectors"""
         return list(self.inventory_data.values())
     
     def get_inventory_by_organization(self, organization_id: str) -> List[InventoryItem]:
         """Get inventory items for a specific organization"""
-        return [
-            item for item in self.inventory_data.values() 
-            if item.organization_id == organization_id
-        ]
+        return self._items_for(self._org_index.get(organization_id))
     
     def get_inventory_by_sector(self, sector_type: SectorType) -> List[InventoryItem]:
         """Get inventory items for a specific sector"""
-        return [
-            item for item in self.inventory_data.values() 
-            if item.sector_type == sector_type
-        ]
+        return self._items_for(self._sector_index.get(sector_type))
+    
+    def get_inventory_by_city(self, city: str) -> List[InventoryItem]:
+        """Get inventory items stocked in a specific city"""
+        return self._items_for(self._city_index.get(city))
+    
+    def get_inventory_by_days_remaining(self, max_days: float,
+                                        min_days: float = float('-inf')) -> List[InventoryItem]:
+        """Get items with min_days <= days remaining <= max_days, lowest first"""
+        start = bisect.bisect_left(self._days_index, (min_days, ''))
+        items = []
+        for days, item_id in self._days_index[start:]:
+            if days > max_days:
+                break
+            items.append(self.inventory_data[item_id])
+        return items
     
     def insert_test_data(self) -> bool:
         """Insert test data for all three sectors"""
         try:
-            # Hospital test data
-            hospital_item = InventoryItem(
-                inventory_id="HOSP_001",
-                organization_id="ORG_HOSPITAL_001",
-                sector_type=SectorType.HOSPITAL,
-                item_type="OXYGEN",
-                current_stock=100.0,
-                daily_consumption_rate=10.0,
-                reorder_point=30.0,
-                critical_threshold=3.0,
-                location=Location("Bangalore", "Karnataka", "India"),
-                last_updated=datetime.now()
-            )
-            
-            # PDS test data
-            pds_item = InventoryItem(
-                inventory_id="PDS_001",
-                organization_id="ORG_PDS_001",
-                sector_type=SectorType.PDS,
-                item_type="RICE",
-                current_stock=500.0,
-                daily_consumption_rate=25.0,
-                reorder_point=100.0,
-                critical_threshold=7.0,
-                location=Location("Delhi", "Delhi", "India"),
-                last_updated=datetime.now()
-            )
-            
-            # NGO test data
-            ngo_item = InventoryItem(
-                inventory_id="NGO_001",
-                organization_id="ORG_NGO_001",
-                sector_type=SectorType.NGO,
-                item_type="EMERGENCY_KIT",
-                current_stock=50.0,
-                daily_consumption_rate=5.0,
-                reorder_point=15.0,
-                critical_threshold=5.0,
-                location=Location("Mumbai", "Maharashtra", "India"),
-                last_updated=datetime.now()
-            )
-            
-            self.insert_inventory_item(hospital_item)
-            self.insert_inventory_item(pds_item)
-            self.insert_inventory_item(ngo_item)
+            now = datetime.now()
+            self.insert_many({
+                'inventory_id': ["HOSP_001", "PDS_001", "NGO_001"],
+                'organization_id': ["ORG_HOSPITAL_001", "ORG_PDS_001", "ORG_NGO_001"],
+                'sector_type': [SectorType.HOSPITAL, SectorType.PDS, SectorType.NGO],
+                'item_type': ["OXYGEN", "RICE", "EMERGENCY_KIT"],
+                'current_stock': [100.0, 500.0, 50.0],
+                'daily_consumption_rate': [10.0, 25.0, 5.0],
+                'reorder_point': [30.0, 100.0, 15.0],
+                'critical_threshold': [3.0, 7.0, 5.0],
+                'city': ["Bangalore", "Delhi", "Mumbai"],
+                'state': ["Karnataka", "Delhi", "Maharashtra"],
+                'country': ["India", "India", "India"],
+                'last_updated': [now, now, now]
+            })
             
             return True
         except Exception:
@@ -104,15 +261,20 @@ class DatabaseOperations:
     
     def validate_multi_tenant_access(self, organization_id: str) -> bool:
         """Validate that organization can only access its own data"""
-        org_items = self.get_inventory_by_organization(organization_id)
+        org_ids = self._org_index.get(organization_id, {})
         
-        # Check that all returned items belong to the organization
-        for item in org_items:
-            if item.organization_id != organization_id:
+        # Check that every indexed item still belongs to the organization
+        for item_id in org_ids:
+            if self.inventory_data[item_id].organization_id != organization_id:
                 return False
         
         return True
     
     def clear_data(self):
         """Clear all data (for testing purposes)"""
-        self.inventory_data.clear()
\ No newline at end of file
+        self.inventory_data.clear()
+        self._org_index.clear()
+        self._sector_index.clear()
+        self._city_index.clear()
+        self._days_index.clear()
+        self._index_keys.clear()
\ No newline at end of file
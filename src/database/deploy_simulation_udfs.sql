@@ -16,65 +16,66 @@ RUNTIME_VERSION = '3.9'
 HANDLER = 'get_weather'
 AS
 $$
-def get_weather(city):
-    """
-    Deterministic weather simulation for consistent demo behavior
-    Returns realistic weather data based on city
-    """
-    weather_conditions = {
-        'Bangalore': {
-            'condition': 'Rain',
-            'risk_multiplier': 1.5,
-            'temperature': 24,
-            'humidity': 85,
-            'visibility': 'Good',
-            'wind_speed': 15
-        },
-        'Delhi': {
-            'condition': 'Haze',
-            'risk_multiplier': 1.2,
-            'temperature': 28,
-            'humidity': 60,
-            'visibility': 'Low',
-            'wind_speed': 8
-        },
-        'Mumbai': {
-            'condition': 'Clear',
-            'risk_multiplier': 1.0,
-            'temperature': 32,
-            'humidity': 70,
-            'visibility': 'Excellent',
-            'wind_speed': 12
-        },
-        'Chennai': {
-            'condition': 'Humid',
-            'risk_multiplier': 1.1,
-            'temperature': 35,
-            'humidity': 80,
-            'visibility': 'Good',
-            'wind_speed': 10
-        },
-        'Kolkata': {
-            'condition': 'Overcast',
-            'risk_multiplier': 1.3,
-            'temperature': 30,
-            'humidity': 75,
-            'visibility': 'Fair',
-            'wind_speed': 6
-        }
-    }
-    
-    # Default weather for unknown cities
-    default_weather = {
+# Lookup tables are built once per UDF process, not once per row
+WEATHER_CONDITIONS = {
+    'Bangalore': {
+        'condition': 'Rain',
+        'risk_multiplier': 1.5,
+        'temperature': 24,
+        'humidity': 85,
+        'visibility': 'Good',
+        'wind_speed': 15
+    },
+    'Delhi': {
+        'condition': 'Haze',
+        'risk_multiplier': 1.2,
+        'temperature': 28,
+        'humidity': 60,
+        'visibility': 'Low',
+        'wind_speed': 8
+    },
+    'Mumbai': {
         'condition': 'Clear',
         'risk_multiplier': 1.0,
-        'temperature': 25,
-        'humidity': 65,
+        'temperature': 32,
+        'humidity': 70,
+        'visibility': 'Excellent',
+        'wind_speed': 12
+    },
+    'Chennai': {
+        'condition': 'Humid',
+        'risk_multiplier': 1.1,
+        'temperature': 35,
+        'humidity': 80,
         'visibility': 'Good',
         'wind_speed': 10
+    },
+    'Kolkata': {
+        'condition': 'Overcast',
+        'risk_multiplier': 1.3,
+        'temperature': 30,
+        'humidity': 75,
+        'visibility': 'Fair',
+        'wind_speed': 6
     }
-    
-    return weather_conditions.get(city, default_weather)
+}
+
+# Default weather for unknown cities
+DEFAULT_WEATHER = {
+    'condition': 'Clear',
+    'risk_multiplier': 1.0,
+    'temperature': 25,
+    'humidity': 65,
+    'visibility': 'Good',
+    'wind_speed': 10
+}
+
+def get_weather(city):
+    """
+    Deterministic weather simulation for consistent demo behavior
+    Returns realistic weather data based on city
+    """
+    return WEATHER_CONDITIONS.get(city, DEFAULT_WEATHER)
 $$;
 
 -- Vendor Status Simulation UDF
@@ -85,73 +86,83 @@ RUNTIME_VERSION = '3.9'
 HANDLER = 'get_vendor_status'
 AS
 $$
-def get_vendor_status(vendor, location):
-    """
-    Realistic vendor availability and latency simulation
-    Provides deterministic vendor performance data
-    """
-    vendor_data = {
-        'Blinkit': {
-            'status': 'Available',
-            'latency_ms': 12,
-            'delivery_time_minutes': 15,
-            'reliability_score': 0.95,
-            'coverage_areas': ['Bangalore', 'Delhi', 'Mumbai'],
-            'capacity_utilization': 0.75
-        },
-        'Dunzo': {
-            'status': 'Offline',
-            'latency_ms': 0,
-            'delivery_time_minutes': None,
-            'reliability_score': 0.0,
-            'coverage_areas': [],
-            'capacity_utilization': 0.0
-        },
-        'Zepto': {
-            'status': 'Available',
-            'latency_ms': 18,
-            'delivery_time_minutes': 20,
-            'reliability_score': 0.88,
-            'coverage_areas': ['Mumbai', 'Bangalore'],
-            'capacity_utilization': 0.82
-        },
-        'Swiggy_Instamart': {
-            'status': 'Available',
-            'latency_ms': 25,
-            'delivery_time_minutes': 30,
-            'reliability_score': 0.92,
-            'coverage_areas': ['Bangalore', 'Delhi', 'Mumbai', 'Chennai'],
-            'capacity_utilization': 0.68
-        },
-        'BigBasket': {
-            'status': 'Available',
-            'latency_ms': 45,
-            'delivery_time_minutes': 120,
-            'reliability_score': 0.85,
-            'coverage_areas': ['Bangalore', 'Delhi', 'Mumbai', 'Chennai', 'Kolkata'],
-            'capacity_utilization': 0.55
-        }
-    }
-    
-    # Default vendor data for unknown vendors
-    default_vendor = {
-        'status': 'Unknown',
-        'latency_ms': 999,
+# Lookup tables are built once per UDF process, not once per row
+VENDOR_DATA = {
+    'Blinkit': {
+        'status': 'Available',
+        'latency_ms': 12,
+        'delivery_time_minutes': 15,
+        'reliability_score': 0.95,
+        'coverage_areas': ['Bangalore', 'Delhi', 'Mumbai'],
+        'capacity_utilization': 0.75
+    },
+    'Dunzo': {
+        'status': 'Offline',
+        'latency_ms': 0,
         'delivery_time_minutes': None,
         'reliability_score': 0.0,
         'coverage_areas': [],
         'capacity_utilization': 0.0
+    },
+    'Zepto': {
+        'status': 'Available',
+        'latency_ms': 18,
+        'delivery_time_minutes': 20,
+        'reliability_score': 0.88,
+        'coverage_areas': ['Mumbai', 'Bangalore'],
+        'capacity_utilization': 0.82
+    },
+    'Swiggy_Instamart': {
+        'status': 'Available',
+        'latency_ms': 25,
+        'delivery_time_minutes': 30,
+        'reliability_score': 0.92,
+        'coverage_areas': ['Bangalore', 'Delhi', 'Mumbai', 'Chennai'],
+        'capacity_utilization': 0.68
+    },
+    'BigBasket': {
+        'status': 'Available',
+        'latency_ms': 45,
+        'delivery_time_minutes': 120,
+        'reliability_score': 0.85,
+        'coverage_areas': ['Bangalore', 'Delhi', 'Mumbai', 'Chennai', 'Kolkata'],
+        'capacity_utilization': 0.55
     }
-    
-    vendor_info = vendor_data.get(vendor, default_vendor)
-    
-    # Adjust availability based on location coverage
-    if location and vendor_info['status'] == 'Available':
-        if location not in vendor_info['coverage_areas']:
-            vendor_info = vendor_info.copy()
-            vendor_info['status'] = 'Not_Available_In_Location'
-            vendor_info['delivery_time_minutes'] = None
-    
+}
+
+# Default vendor data for unknown vendors
+DEFAULT_VENDOR = {
+    'status': 'Unknown',
+    'latency_ms': 999,
+    'delivery_time_minutes': None,
+    'reliability_score': 0.0,
+    'coverage_areas': [],
+    'capacity_utilization': 0.0
+}
+
+CITIES = ['Bangalore', 'Delhi', 'Mumbai', 'Chennai', 'Kolkata']
+
+# Precomputed vendor x city availability matrix
+VENDOR_OUT_OF_AREA = {
+    vendor: dict(info, status='Not_Available_In_Location', delivery_time_minutes=None)
+    for vendor, info in VENDOR_DATA.items() if info['status'] == 'Available'
+}
+VENDOR_CITY_STATUS = {
+    (vendor, city): VENDOR_OUT_OF_AREA[vendor]
+    if vendor in VENDOR_OUT_OF_AREA and city not in info['coverage_areas'] else info
+    for vendor, info in VENDOR_DATA.items() for city in CITIES
+}
+
+def get_vendor_status(vendor, location):
+    """
+    Realistic vendor availability and latency simulation
+    Provides deterministic vendor performance data
+    """
+    if not location:
+        return VENDOR_DATA.get(vendor, DEFAULT_VENDOR)
+    vendor_info = VENDOR_CITY_STATUS.get((vendor, location))
+    if vendor_info is None:
+        vendor_info = VENDOR_OUT_OF_AREA.get(vendor) or VENDOR_DATA.get(vendor, DEFAULT_VENDOR)
     return vendor_info
 $$;
 
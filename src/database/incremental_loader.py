@@ -0,0 +1,249 @@
+"""
+Incremental inventory loader for InventoryQ OS
+Keeps the last unified_inventory_view snapshot and a high-water mark on
+last_updated so refreshes only pull rows that changed since the previous load
+"""
+from typing import Iterable, List, Optional, Sequence, Tuple
+from datetime import datetime
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+INVENTORY_COLUMNS = [
+    'INVENTORY_ID',
+    'ORGANIZATION_ID',
+    'ITEM_TYPE',
+    'LOCATION_CITY',
+    'CURRENT_STOCK',
+    'DAILY_CONSUMPTION_RATE',
+    'DAYS_REMAINING',
+    'STATUS',
+    'REORDER_POINT',
+    'CRITICAL_THRESHOLD',
+    'SECTOR_TYPE',
+    'LOCATION_LATITUDE',
+    'LOCATION_LONGITUDE',
+    'UNIT_COST'
+]
+
+WATERMARK_COLUMN = 'LAST_UPDATED'
+KEY_COLUMN = 'INVENTORY_ID'
+
+# DataFrame.attrs key carrying a process-unique id for each distinct snapshot
+SNAPSHOT_VERSION_ATTR = 'snapshot_version'
+_snapshot_versions = itertools.count(1)
+
+# Same ordering as the former ORDER BY: CRITICAL, WARNING, everything else
+STATUS_SORT_RANK = {'CRITICAL': 1, 'WARNING': 2}
+DEFAULT_STATUS_RANK = 3
+
+# DAYS_REMAINING is capped at 999999 by the view, so ranks never overlap
+RANK_SPAN = 1e7
+
+
+def inventory_sort_keys(df: pd.DataFrame) -> np.ndarray:
+    """
+    Single float sort key equivalent to ORDER BY status rank, DAYS_REMAINING
+
+    Missing DAYS_REMAINING values sort last within their status tier.
+    """
+    ranks = df['STATUS'].map(STATUS_SORT_RANK).fillna(DEFAULT_STATUS_RANK).to_numpy(dtype=float)
+    days = pd.to_numeric(df['DAYS_REMAINING'], errors='coerce').to_numpy(dtype=float)
+    days = np.clip(np.nan_to_num(days, nan=RANK_SPAN - 1), -RANK_SPAN + 1, RANK_SPAN - 1)
+    return ranks * RANK_SPAN * 2 + days
+
+
+def rank_inventory(df: pd.DataFrame) -> pd.DataFrame:
+    """Full client-side rank, used only for the initial snapshot"""
+    order = np.argsort(inventory_sort_keys(df), kind='stable')
+    return df.iloc[order].reset_index(drop=True)
+
+
+def merge_ranked(snapshot: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge changed rows into an already ranked snapshot
+
+    Rows in the delta replace snapshot rows with the same INVENTORY_ID.
+    Only the delta is sorted; its rows are then placed into the untouched
+    remainder with a binary search, so the snapshot is never fully re-sorted.
+
+    Args:
+        snapshot: Ranked snapshot
+        delta: Changed or new rows, in any order
+
+    Returns:
+        New ranked snapshot
+    """
+    if delta.empty:
+        return snapshot
+
+    delta = delta.drop_duplicates(subset=KEY_COLUMN, keep='last')
+    base = snapshot[~snapshot[KEY_COLUMN].isin(delta[KEY_COLUMN])]
+    delta_sorted = rank_inventory(delta)
+
+    positions = np.searchsorted(
+        inventory_sort_keys(base), inventory_sort_keys(delta_sorted), side='right'
+    )
+    order = np.insert(np.arange(len(base)), positions, len(base) + np.arange(len(delta_sorted)))
+
+    combined = pd.concat([base, delta_sorted], ignore_index=True)
+    return combined.iloc[order].reset_index(drop=True)
+
+
+def changed_rows(snapshot: pd.DataFrame, delta: pd.DataFrame) -> pd.DataFrame:
+    """
+    Delta rows that are new or differ from the snapshot row with the same INVENTORY_ID
+
+    The >= delta query always re-reads the rows at the high-water mark; those
+    come back unchanged and must not produce a new snapshot version.
+    """
+    if delta.empty:
+        return delta
+    delta = delta.drop_duplicates(subset=KEY_COLUMN, keep='last')
+    current = snapshot.drop_duplicates(subset=KEY_COLUMN, keep='last').set_index(KEY_COLUMN)
+    known = delta[KEY_COLUMN].isin(current.index).to_numpy()
+    if not known.any():
+        return delta
+
+    before = current.reindex(delta.loc[known, KEY_COLUMN])
+    after = delta.loc[known]
+    same = np.ones(int(known.sum()), dtype=bool)
+    for column in after.columns:
+        if column == KEY_COLUMN:
+            continue
+        if column not in before:
+            same[:] = False
+            break
+        old = before[column].to_numpy()
+        new = after[column].to_numpy()
+        same &= (old == new) | (pd.isna(old) & pd.isna(new))
+    unchanged = np.zeros(len(delta), dtype=bool)
+    unchanged[known] = same
+    return delta[~unchanged]
+
+
+class IncrementalInventoryLoader:
+    """Delta-based loader for unified_inventory_view"""
+
+    def __init__(self, columns: Optional[Sequence[str]] = None,
+                 view_name: str = 'unified_inventory_view'):
+        self.columns: List[str] = list(columns or INVENTORY_COLUMNS)
+        if WATERMARK_COLUMN not in self.columns:
+            self.columns.append(WATERMARK_COLUMN)
+        self.view_name = view_name
+        self.snapshot: Optional[pd.DataFrame] = None
+        self.high_water_mark: Optional[datetime] = None
+        self.last_delta_rows = 0
+        self.version: Optional[int] = None
+        # Rows merged into the current version and the version they were applied to
+        self.last_delta: Optional[pd.DataFrame] = None
+        self.last_removed_ids: Tuple[str, ...] = ()
+        self.delta_base_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _select_sql(self) -> str:
+        """Column list shared by the full and delta queries"""
+        return f"SELECT {', '.join(self.columns)} FROM {self.view_name}"
+
+    def _stamp_version(self):
+        """Give the current snapshot a new version id (read back by downstream caches)"""
+        self.version = next(_snapshot_versions)
+        self.snapshot.attrs[SNAPSHOT_VERSION_ATTR] = self.version
+
+    def _advance_watermark(self, rows: pd.DataFrame):
+        """Move the high-water mark to the newest last_updated seen"""
+        if rows.empty or WATERMARK_COLUMN not in rows:
+            return
+        newest = pd.to_datetime(rows[WATERMARK_COLUMN]).max()
+        if pd.isna(newest):
+            return
+        newest = newest.to_pydatetime()
+        if self.high_water_mark is None or newest > self.high_water_mark:
+            self.high_water_mark = newest
+
+    def full_load(self, session) -> pd.DataFrame:
+        """Read the whole view once and rank it client-side"""
+        df = session.sql(self._select_sql()).to_pandas()
+        self.snapshot = rank_inventory(df)
+        self.last_delta = None
+        self.last_removed_ids = ()
+        self.delta_base_version = None
+        self._stamp_version()
+        self.high_water_mark = None
+        self._advance_watermark(df)
+        self.last_delta_rows = len(df)
+        return self.snapshot
+
+    def fetch_delta(self, session) -> pd.DataFrame:
+        """Rows whose last_updated is at or after the high-water mark"""
+        # >= rather than > so rows committed within the same timestamp tick are not missed
+        return session.sql(
+            f"{self._select_sql()} WHERE {WATERMARK_COLUMN} >= ?",
+            params=[self.high_water_mark]
+        ).to_pandas()
+
+    def fetch_row_count(self, session) -> int:
+        """Server-side row count, used to detect deletions"""
+        result = session.sql(f"SELECT COUNT(*) AS ROW_COUNT FROM {self.view_name}").collect()
+        return int(result[0]['ROW_COUNT']) if result else 0
+
+    def refresh(self, session) -> pd.DataFrame:
+        """
+        Return an up-to-date ranked snapshot, fetching only changed rows
+
+        Falls back to a full load on first use, after invalidate(), when the
+        snapshot has no high-water mark, or when rows were deleted server-side.
+        """
+        with self._lock:
+            if self.snapshot is None or self.high_water_mark is None:
+                return self.full_load(session).copy()
+
+            fetched = self.fetch_delta(session)
+            delta = changed_rows(self.snapshot, fetched)
+            merged = merge_ranked(self.snapshot, delta)
+
+            if len(merged) != self.fetch_row_count(session):
+                return self.full_load(session).copy()
+
+            if merged is not self.snapshot:
+                self.snapshot = merged
+                self.last_delta = delta
+                self.last_removed_ids = ()
+                self.delta_base_version = self.version
+                self._stamp_version()
+            self.last_delta_rows = len(delta)
+            self._advance_watermark(fetched)
+            return self.snapshot.copy()
+
+    def invalidate(self):
+        """Drop the snapshot so the next refresh performs a full load"""
+        with self._lock:
+            self.snapshot = None
+            self.high_water_mark = None
+
+    def discard(self, inventory_ids: Iterable[str]) -> int:
+        """
+        Remove rows deleted by this process from the snapshot
+
+        Keeps the snapshot's row count in line with the view so the next
+        refresh stays a delta fetch instead of falling back to a full load.
+
+        Returns:
+            Number of rows removed
+        """
+        removed_ids = tuple(dict.fromkeys(str(inventory_id) for inventory_id in inventory_ids))
+        with self._lock:
+            if self.snapshot is None or not removed_ids:
+                return 0
+            keep = ~self.snapshot[KEY_COLUMN].astype(str).isin(removed_ids)
+            removed = int((~keep).sum())
+            if removed:
+                self.snapshot = self.snapshot[keep].reset_index(drop=True)
+                self.last_delta = self.snapshot.iloc[:0]
+                self.last_removed_ids = removed_ids
+                self.delta_base_version = self.version
+                self._stamp_version()
+            return removed
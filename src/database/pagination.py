@@ -0,0 +1,350 @@
+"""
+Paginated inventory grid backend for InventoryQ OS
+Keyset pagination with search, status/location filters and a stable sort,
+served by SQL against the warehouse or by an index over the cached snapshot
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+
+
+DEFAULT_VIEW = 'unified_inventory_view'
+GRID_COLUMNS = (
+    'INVENTORY_ID', 'ITEM_TYPE', 'LOCATION_CITY', 'CURRENT_STOCK',
+    'DAILY_CONSUMPTION_RATE', 'DAYS_REMAINING', 'STATUS'
+)
+KEY_COLUMN = 'INVENTORY_ID'
+SEARCH_COLUMNS = ('ITEM_TYPE', 'LOCATION_CITY')
+
+NUMERIC_SORT_COLUMNS = ('CURRENT_STOCK', 'DAILY_CONSUMPTION_RATE', 'DAYS_REMAINING')
+TEXT_SORT_COLUMNS = ('INVENTORY_ID', 'ITEM_TYPE', 'LOCATION_CITY', 'STATUS')
+SORTABLE_COLUMNS = NUMERIC_SORT_COLUMNS + TEXT_SORT_COLUMNS
+
+# Missing sort values are replaced so every key is totally ordered (and comparable in a cursor)
+NUMERIC_NULL_KEY = 1e300
+TEXT_NULL_KEY = ''
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+SORT_KEY_ALIAS = 'GRID_SORT_KEY'
+
+# '!' rather than a backslash, which Snowflake string literals would treat as an escape
+LIKE_ESCAPE = '!'
+INDEX_SLOTS = 2
+
+# (sort key, INVENTORY_ID) of the last row on the previous page
+Cursor = Tuple[Any, str]
+
+# Search hook: (snapshot, search text) -> matching inventory ids
+SearchMatcher = Callable[[pd.DataFrame, str], Iterable[str]]
+
+
+@dataclass(frozen=True)
+class GridQuery:
+    """Filters, search and sort for one grid; page_size is capped at MAX_PAGE_SIZE"""
+    search: str = ''
+    status: Optional[str] = None
+    location: Optional[str] = None
+    sort_by: str = 'DAYS_REMAINING'
+    descending: bool = False
+    page_size: int = DEFAULT_PAGE_SIZE
+
+    def normalized(self) -> 'GridQuery':
+        if self.sort_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {self.sort_by}")
+        return replace(
+            self,
+            search=(self.search or '').strip(),
+            status=self.status or None,
+            location=self.location or None,
+            page_size=min(max(int(self.page_size), 1), MAX_PAGE_SIZE)
+        )
+
+
+@dataclass
+class GridPage:
+    """One page of grid rows and the cursor for the next page"""
+    rows: pd.DataFrame
+    cursor: Optional[Cursor] = None
+    next_cursor: Optional[Cursor] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def _escape_like(term: str) -> str:
+    for char in (LIKE_ESCAPE, '%', '_'):
+        term = term.replace(char, LIKE_ESCAPE + char)
+    return term
+
+
+def _sort_key_sql(column: str) -> str:
+    null_key = repr(NUMERIC_NULL_KEY) if column in NUMERIC_SORT_COLUMNS else "''"
+    return f"COALESCE({column}, {null_key})"
+
+
+def _where_sql(query: GridQuery) -> Tuple[List[str], List[Any]]:
+    """Filter predicates and their bind values"""
+    clauses, params = [], []
+    if query.search:
+        pattern = f"%{_escape_like(query.search.lower())}%"
+        clauses.append('(' + ' OR '.join(
+            f"LOWER({column}) LIKE ? ESCAPE '{LIKE_ESCAPE}'" for column in SEARCH_COLUMNS
+        ) + ')')
+        params.extend([pattern] * len(SEARCH_COLUMNS))
+    if query.status:
+        clauses.append('STATUS = ?')
+        params.append(query.status)
+    if query.location:
+        clauses.append('LOCATION_CITY = ?')
+        params.append(query.location)
+    return clauses, params
+
+
+def page_sql(query: GridQuery, cursor: Optional[Cursor] = None,
+             view_name: str = DEFAULT_VIEW,
+             columns: Sequence[str] = GRID_COLUMNS) -> Tuple[str, List[Any]]:
+    """
+    Build the keyset query for one page
+
+    One extra row is requested so the caller can tell whether another page follows.
+
+    Returns:
+        Tuple of (SQL with ? placeholders, bind values)
+    """
+    query = query.normalized()
+    sort_key = _sort_key_sql(query.sort_by)
+    clauses, params = _where_sql(query)
+    if cursor is not None:
+        op = '<' if query.descending else '>'
+        clauses.append(f"({sort_key} {op} ? OR ({sort_key} = ? AND {KEY_COLUMN} {op} ?))")
+        params.extend([cursor[0], cursor[0], cursor[1]])
+
+    direction = 'DESC' if query.descending else 'ASC'
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    sql = f"""
+        SELECT {', '.join(columns)}, {sort_key} AS {SORT_KEY_ALIAS}
+        FROM {view_name}
+        {where}
+        ORDER BY {SORT_KEY_ALIAS} {direction}, {KEY_COLUMN} {direction}
+        LIMIT {query.page_size + 1}
+    """
+    return sql, params
+
+
+def count_sql(query: GridQuery, view_name: str = DEFAULT_VIEW) -> Tuple[str, List[Any]]:
+    """Number of rows matching the filters (for "page x of y")"""
+    clauses, params = _where_sql(query.normalized())
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+    return f"SELECT COUNT(*) AS ROW_COUNT FROM {view_name} {where}", params
+
+
+def _finish_page(rows: pd.DataFrame, keys: Sequence[Any], query: GridQuery,
+                 cursor: Optional[Cursor]) -> GridPage:
+    """Trim the look-ahead row and derive the next cursor from the last kept row"""
+    next_cursor = None
+    if len(rows) > query.page_size:
+        rows = rows.iloc[:query.page_size]
+        last = query.page_size - 1
+        next_cursor = (keys[last], str(rows[KEY_COLUMN].iloc[last]))
+    return GridPage(rows=rows.reset_index(drop=True), cursor=cursor, next_cursor=next_cursor)
+
+
+class LocalGridIndex:
+    """
+    Grid index over one cached snapshot
+
+    Search goes through the matcher when one is given (e.g. the inverted
+    search index), otherwise through a substring scan of text lower-cased
+    once. Each sort column's (key, id) order is built on first use, so a page
+    costs one vectorized filter plus a binary search for the cursor.
+    """
+
+    def __init__(self, df_inventory: pd.DataFrame, columns: Sequence[str] = GRID_COLUMNS,
+                 matcher: Optional[Callable[[str], Iterable[str]]] = None):
+        self.columns = [column for column in columns if column in df_inventory]
+        self.frame = df_inventory[self.columns].reset_index(drop=True)
+        self._ids = self.frame[KEY_COLUMN].astype(str).to_numpy(dtype=object)
+        self._matcher = matcher
+        self._search: Optional[pd.Series] = None
+        self._orders: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self._masks: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _search_text(self) -> pd.Series:
+        if self._search is None:
+            # NUL separator keeps a search term from matching across the two columns
+            search = None
+            for column in (column for column in SEARCH_COLUMNS if column in self.frame):
+                text = self.frame[column].astype(object).where(self.frame[column].notna(), '').astype(str).str.lower()
+                search = text if search is None else search + '\x00' + text
+            self._search = search if search is not None else pd.Series([''] * len(self.frame))
+        return self._search
+
+    def _search_mask(self, term: str) -> np.ndarray:
+        if self._matcher is not None:
+            return pd.Series(self._ids).isin(list(self._matcher(term))).to_numpy(dtype=bool)
+        return self._search_text().str.contains(term.lower(), regex=False).to_numpy(dtype=bool)
+
+    def _sort_keys(self, column: str) -> np.ndarray:
+        if column in NUMERIC_SORT_COLUMNS:
+            values = pd.to_numeric(self.frame[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            return np.where(np.isnan(values), NUMERIC_NULL_KEY, values)
+        values = self.frame[column].astype(object)
+        return values.where(values.notna(), TEXT_NULL_KEY).astype(str).to_numpy(dtype=object)
+
+    def _order(self, column: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Row order by (sort key, id) with the keys and ids in that order"""
+        with self._lock:
+            cached = self._orders.get(column)
+        if cached is not None:
+            return cached
+        keys = self._sort_keys(column)
+        order = pd.DataFrame({'key': keys, 'id': self._ids}).sort_values(
+            ['key', 'id'], kind='mergesort'
+        ).index.to_numpy(dtype=np.int64)
+        result = (order, keys[order], self._ids[order])
+        with self._lock:
+            self._orders[column] = result
+        return result
+
+    @staticmethod
+    def _position(keys: np.ndarray, ids: np.ndarray, cursor: Cursor, side: str) -> int:
+        """bisect over (key, id) pairs: keys first, then ids within the tied run"""
+        lo = int(np.searchsorted(keys, cursor[0], side='left'))
+        hi = int(np.searchsorted(keys, cursor[0], side='right'))
+        return lo + int(np.searchsorted(ids[lo:hi], str(cursor[1]), side=side))
+
+    def mask(self, query: GridQuery) -> np.ndarray:
+        """Rows matching the filters and search (memoized for the last few filter sets)"""
+        query = query.normalized()
+        key = (query.search.lower(), query.status, query.location)
+        with self._lock:
+            cached = self._masks.get(key)
+            if cached is not None:
+                self._masks.move_to_end(key)
+                return cached
+
+        mask = np.ones(len(self.frame), dtype=bool)
+        if query.search:
+            mask &= self._search_mask(query.search)
+        if query.status:
+            mask &= (self.frame['STATUS'] == query.status).to_numpy(dtype=bool)
+        if query.location:
+            mask &= (self.frame['LOCATION_CITY'] == query.location).to_numpy(dtype=bool)
+
+        with self._lock:
+            self._masks[key] = mask
+            while len(self._masks) > 8:
+                self._masks.popitem(last=False)
+        return mask
+
+    def count(self, query: GridQuery) -> int:
+        return int(self.mask(query).sum())
+
+    def page(self, query: GridQuery, cursor: Optional[Cursor] = None) -> GridPage:
+        """Rows after the cursor in (sort key, id) order, at most page_size of them"""
+        query = query.normalized()
+        order, keys, ids = self._order(query.sort_by)
+        if query.descending:
+            stop = self._position(keys, ids, cursor, 'left') if cursor is not None else len(order)
+            candidates = order[:stop][::-1]
+        else:
+            start = self._position(keys, ids, cursor, 'right') if cursor is not None else 0
+            candidates = order[start:]
+
+        hits = candidates[self.mask(query)[candidates]][:query.page_size + 1]
+        keys = self._sort_keys(query.sort_by)[hits].tolist()
+        return _finish_page(self.frame.iloc[hits], keys, query, cursor)
+
+
+class InventoryGrid:
+    """
+    Page source for the inventory grids
+
+    A snapshot produced by the incremental loader (it carries a snapshot
+    version) is served from a LocalGridIndex built once per version; any
+    other request is answered by a keyset query against the warehouse.
+    The optional search hook replaces substring search on the local path.
+    """
+
+    def __init__(self, view_name: str = DEFAULT_VIEW, columns: Sequence[str] = GRID_COLUMNS,
+                 index_slots: int = INDEX_SLOTS, search: Optional[SearchMatcher] = None):
+        self.view_name = view_name
+        self.columns = tuple(columns)
+        self.search = search
+        self.index_slots = max(1, index_slots)
+        self._indexes: "OrderedDict[Any, LocalGridIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _new_index(self, df_inventory: pd.DataFrame) -> LocalGridIndex:
+        matcher = None
+        if self.search is not None:
+            search = self.search
+            matcher = lambda term: search(df_inventory, term)
+        return LocalGridIndex(df_inventory, self.columns, matcher)
+
+    def local_index(self, df_inventory: pd.DataFrame) -> LocalGridIndex:
+        """Index for a snapshot, shared by every page request on the same version"""
+        version = df_inventory.attrs.get(SNAPSHOT_VERSION_ATTR)
+        if version is None:
+            return self._new_index(df_inventory)
+        with self._lock:
+            index = self._indexes.get(version)
+            if index is not None:
+                self._indexes.move_to_end(version)
+                return index
+        index = self._new_index(df_inventory)
+        with self._lock:
+            self._indexes[version] = index
+            while len(self._indexes) > self.index_slots:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _use_local(self, session, df_inventory: Optional[pd.DataFrame]) -> bool:
+        if df_inventory is None:
+            if session is None:
+                raise ValueError("A session or an inventory frame is required")
+            return False
+        return session is None or df_inventory.attrs.get(SNAPSHOT_VERSION_ATTR) is not None
+
+    def page(self, query: GridQuery, cursor: Optional[Cursor] = None, session=None,
+             df_inventory: Optional[pd.DataFrame] = None) -> GridPage:
+        """
+        Fetch one page of grid rows
+
+        Args:
+            query: Filters, search, sort and page size
+            cursor: next_cursor of the previous page, or None for the first page
+            session: Snowpark session for the SQL path
+            df_inventory: Cached snapshot for the local path
+
+        Returns:
+            GridPage holding at most query.page_size rows
+        """
+        query = query.normalized()
+        if self._use_local(session, df_inventory):
+            return self.local_index(df_inventory).page(query, cursor)
+
+        sql, params = page_sql(query, cursor, self.view_name, self.columns)
+        rows = session.sql(sql, params=params).to_pandas()
+        keys = rows[SORT_KEY_ALIAS].tolist()
+        return _finish_page(rows.drop(columns=[SORT_KEY_ALIAS]), keys, query, cursor)
+
+    def count(self, query: GridQuery, session=None, df_inventory: Optional[pd.DataFrame] = None) -> int:
+        """Rows matching the query's filters and search"""
+        if self._use_local(session, df_inventory):
+            return self.local_index(df_inventory).count(query)
+        sql, params = count_sql(query, self.view_name)
+        result = session.sql(sql, params=params).collect()
+        return int(result[0]['ROW_COUNT']) if result else 0
@@ -0,0 +1,225 @@
+"""
+Parameterized statement layer for InventoryQ OS
+Named-parameter templates compiled once per process and executed with bound
+values through a Snowpark session or a snowflake.connector cursor, so the SQL
+text stays identical across calls (plan and result cache reuse) and quotes in
+user text can no longer break a statement
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from dataclasses import dataclass
+import re
+import threading
+
+import pandas as pd
+
+
+DEFAULT_BATCH_ROWS = 1000
+DEFAULT_FETCH_ROWS = 50000
+
+# Quoted strings, quoted identifiers and :: casts are skipped; :name is a parameter
+_TOKENS = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|::|:([A-Za-z_]\w*)")
+_VALUES_GROUP = re.compile(r"\bVALUES\s*(\(.*\))\s*;?\s*$", re.IGNORECASE | re.DOTALL)
+
+
+def compile_named(sql: str) -> Tuple[str, str, Tuple[str, ...]]:
+    """
+    Translate :name placeholders into positional form
+
+    Returns:
+        Tuple of (qmark SQL for Snowpark, pyformat SQL for the connector,
+        parameter names in placeholder order)
+    """
+    names: List[str] = []
+    qmark: List[str] = []
+    pyformat: List[str] = []
+    position = 0
+    for match in _TOKENS.finditer(sql):
+        if match.group(1) is None:
+            continue
+        literal = sql[position:match.start()]
+        qmark.append(literal)
+        pyformat.append(literal.replace('%', '%%'))
+        qmark.append('?')
+        pyformat.append('%s')
+        names.append(match.group(1))
+        position = match.end()
+    qmark.append(sql[position:])
+    pyformat.append(sql[position:].replace('%', '%%'))
+    return ''.join(qmark), ''.join(pyformat), tuple(names)
+
+
+@dataclass(frozen=True)
+class StatementTemplate:
+    """A registered statement with named parameters"""
+    name: str
+    sql: str
+    qmark_sql: str
+    pyformat_sql: str
+    params: Tuple[str, ...]
+
+    def bind(self, values: Optional[Mapping[str, Any]] = None) -> List[Any]:
+        """Positional parameter list for one set of named values"""
+        values = values or {}
+        missing = [name for name in dict.fromkeys(self.params) if name not in values]
+        if missing:
+            raise KeyError(f"Statement '{self.name}' is missing parameters: {', '.join(missing)}")
+        return [values[name] for name in self.params]
+
+    def multi_row(self, rows: int, style: str = 'qmark') -> str:
+        """The statement with its VALUES group repeated for a multi-row INSERT"""
+        sql = self.qmark_sql if style == 'qmark' else self.pyformat_sql
+        match = _VALUES_GROUP.search(sql)
+        if match is None:
+            raise ValueError(f"Statement '{self.name}' has no single VALUES group to repeat")
+        group = match.group(1)
+        return sql[:match.start(1)] + ",\n".join(group for _ in range(rows))
+
+
+_templates: Dict[str, StatementTemplate] = {}
+_templates_lock = threading.Lock()
+
+
+def register_template(name: str, sql: str) -> StatementTemplate:
+    """
+    Compile and register a statement once
+
+    Registering the same name with the same SQL again (e.g. on a Streamlit
+    rerun) returns the existing template; different SQL under a taken name
+    is an error.
+    """
+    with _templates_lock:
+        template = _templates.get(name)
+        if template is not None:
+            if template.sql != sql:
+                raise ValueError(f"Statement '{name}' is already registered with different SQL")
+            return template
+        qmark_sql, pyformat_sql, params = compile_named(sql)
+        template = StatementTemplate(name, sql, qmark_sql, pyformat_sql, params)
+        _templates[name] = template
+        return template
+
+
+def get_template(name: str) -> StatementTemplate:
+    return _templates[name]
+
+
+def _template(template: Any) -> StatementTemplate:
+    return template if isinstance(template, StatementTemplate) else get_template(template)
+
+
+def _is_snowpark(target: Any) -> bool:
+    return hasattr(target, 'sql')
+
+
+def execute(target: Any, template: Any, values: Optional[Mapping[str, Any]] = None) -> List[Any]:
+    """
+    Run a template with bound values
+
+    Args:
+        target: Snowpark session, or a DB-API cursor from snowflake.connector
+        template: StatementTemplate or registered name
+        values: Named parameter values
+
+    Returns:
+        Result rows (Snowpark Rows or cursor tuples; empty for statements
+        without a result set)
+    """
+    template = _template(template)
+    params = template.bind(values)
+    if _is_snowpark(target):
+        return target.sql(template.qmark_sql, params=params).collect()
+    target.execute(template.pyformat_sql, params)
+    return target.fetchall() if target.description else []
+
+
+def executemany(target: Any, template: Any, rows: Iterable[Mapping[str, Any]],
+                batch_rows: int = DEFAULT_BATCH_ROWS) -> int:
+    """
+    Run a template for many sets of values in as few calls as possible
+
+    Cursors use executemany, which the connector rewrites into one multi-row
+    INSERT. Snowpark sessions get the template's VALUES group repeated per row
+    (one statement per batch_rows rows), so only INSERT ... VALUES templates
+    are accepted there.
+
+    Returns:
+        Number of rows bound
+    """
+    template = _template(template)
+    bound = [template.bind(row) for row in rows]
+    if not bound:
+        return 0
+    if not _is_snowpark(target):
+        target.executemany(template.pyformat_sql, bound)
+        return len(bound)
+
+    batch_rows = max(1, batch_rows)
+    for start in range(0, len(bound), batch_rows):
+        batch = bound[start:start + batch_rows]
+        sql = template.multi_row(len(batch))
+        target.sql(sql, params=[value for params in batch for value in params]).collect()
+    return len(bound)
+
+
+def fetch_batches(target: Any, template: Any, values: Optional[Mapping[str, Any]] = None,
+                  batch_rows: int = DEFAULT_FETCH_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Stream a query result as DataFrame batches instead of collecting it
+
+    Snowpark sessions use to_pandas_batches(); cursors use the connector's
+    Arrow-based fetch_pandas_batches() when available, otherwise fetchmany.
+    Batch sizes follow the driver's result chunks (at most batch_rows rows
+    on the fetchmany path).
+    """
+    template = _template(template)
+    params = template.bind(values)
+    if _is_snowpark(target):
+        yield from target.sql(template.qmark_sql, params=params).to_pandas_batches()
+        return
+    target.execute(template.pyformat_sql, params)
+    if hasattr(target, 'fetch_pandas_batches'):
+        yield from target.fetch_pandas_batches()
+        return
+    columns = [column[0] for column in target.description or ()]
+    while True:
+        rows = target.fetchmany(max(1, batch_rows))
+        if not rows:
+            return
+        yield pd.DataFrame.from_records(rows, columns=columns)
+
+
+def fetch_arrow_batches(target: Any, template: Any, values: Optional[Mapping[str, Any]] = None,
+                        batch_rows: int = DEFAULT_FETCH_ROWS) -> Iterator[Any]:
+    """
+    Stream a query result as pyarrow RecordBatches
+
+    Uses the driver's native Arrow result chunks where it has them (cursor
+    fetch_arrow_batches(), Snowpark to_arrow_batches()), so they reach the
+    writer without a pandas round trip; otherwise converts fetch_batches output.
+    """
+    import pyarrow as pa
+
+    template = _template(template)
+    params = template.bind(values)
+    if _is_snowpark(target):
+        frame = target.sql(template.qmark_sql, params=params)
+        if hasattr(frame, 'to_arrow_batches'):
+            for table in frame.to_arrow_batches():
+                yield from table.to_batches() if isinstance(table, pa.Table) else [table]
+            return
+        for batch in frame.to_pandas_batches():
+            yield pa.RecordBatch.from_pandas(batch, preserve_index=False)
+        return
+    if hasattr(target, 'fetch_arrow_batches'):
+        target.execute(template.pyformat_sql, params)
+        for table in target.fetch_arrow_batches():
+            yield from table.to_batches()
+        return
+    for batch in fetch_batches(target, template, values, batch_rows):
+        yield pa.RecordBatch.from_pandas(batch, preserve_index=False)
+
+
+def values_list(count: int, columns: Sequence[str] = ('value',)) -> str:
+    """Bound VALUES rows (qmark) for staging a list: (?), (?), ... or (?, ?), ..."""
+    group = "(" + ", ".join('?' for _ in columns) + ")"
+    return ", ".join(group for _ in range(count))
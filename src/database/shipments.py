@@ -0,0 +1,402 @@
+"""
+Inbound shipment posting for InventoryQ OS
+Resolves receipt lines (form entries, CSV uploads or ASN documents) to
+inventory ids and posts them in one transaction: stock increments on
+inventory_master plus RESTOCK rows in inventory_transactions, deduplicated
+by idempotency key so a retried post never counts a line twice
+"""
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+import hashlib
+import io
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.database.audit_writer import build_multi_row_insert
+from src.database.bulk_ingest import REJECT_DUPLICATE_IN_BATCH, RowRejection, is_blank
+
+
+DEFAULT_MASTER = 'inventory_master'
+DEFAULT_TRANSACTIONS = 'inventory_transactions'
+DEFAULT_STAGE_TABLE = 'shipment_receipts_stage'
+STAGE_CHUNK_ROWS = 1000
+
+TRANSACTION_TYPE = 'RESTOCK'
+TRANSACTION_PREFIX = 'RCV_'
+
+REJECT_UNRESOLVED_ITEM = 'UNRESOLVED_ITEM'
+REJECT_AMBIGUOUS_ITEM = 'AMBIGUOUS_ITEM'
+REJECT_INVALID_QUANTITY = 'INVALID_QUANTITY'
+# Without a reference two different documents could derive the same transaction_id
+REJECT_MISSING_REFERENCE = 'MISSING_REFERENCE'
+
+RECEIPT_FIELDS = ('inventory_id', 'item_type', 'location_city', 'organization_id',
+                  'quantity', 'supplier', 'reference', 'line_number', 'idempotency_key')
+
+# Header names accepted from CSV files and ASN documents
+RECEIPT_ALIASES = {
+    'item': 'item_type',
+    'city': 'location_city',
+    'location': 'location_city',
+    'qty': 'quantity',
+    'quantity_received': 'quantity',
+    'received_quantity': 'quantity',
+    'vendor': 'supplier',
+    'asn_number': 'reference',
+    'po_number': 'reference',
+    'shipment_id': 'reference',
+    'line': 'line_number',
+    'line_no': 'line_number',
+}
+
+STAGE_COLUMNS = ('transaction_id', 'inventory_id', 'line_order', 'quantity')
+
+
+@dataclass
+class ShipmentPostingResult:
+    """Outcome of one posting"""
+    lines: int = 0
+    posted: int = 0
+    duplicates: int = 0
+    rejected: List[RowRejection] = field(default_factory=list)
+    quantities: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.rejected
+
+    @property
+    def total_quantity(self) -> float:
+        return float(sum(self.quantities.values()))
+
+
+def _field_name(name: Any) -> str:
+    name = str(name).strip().lower().replace(' ', '_')
+    return RECEIPT_ALIASES.get(name, name)
+
+
+def _normalize_lines(rows: Iterable[Mapping[str, Any]],
+                     defaults: Optional[Mapping[str, Any]] = None) -> pd.DataFrame:
+    """Receipt frame with every RECEIPT_FIELDS column; header-level values fill blanks"""
+    frame = pd.DataFrame([{_field_name(key): value for key, value in row.items()} for row in rows])
+    for name in RECEIPT_FIELDS:
+        if name not in frame:
+            frame[name] = None
+    frame = frame[list(RECEIPT_FIELDS)].astype(object)
+    for name, value in (defaults or {}).items():
+        name = _field_name(name)
+        if name in frame and not is_blank(value):
+            frame[name] = [value if is_blank(current) else current for current in frame[name]]
+    return frame
+
+
+def _with_reference(frame: pd.DataFrame, reference: Optional[str]) -> pd.DataFrame:
+    if not is_blank(reference):
+        frame['reference'] = [reference if is_blank(current) else current for current in frame['reference']]
+    return frame
+
+
+def read_receipt_file(source: Any, name: Optional[str] = None, reference: Optional[str] = None) -> pd.DataFrame:
+    """
+    Receipt lines from a CSV file or a JSON advance shipping notice (ASN)
+
+    An ASN is an object with header fields (asn_number, supplier, ...) and a
+    "lines" list; header values apply to every line that leaves them blank.
+
+    Args:
+        source: Path, bytes or a binary file object (e.g. a Streamlit upload)
+        name: File name used to pick the format when source is not a path
+        reference: Upload reference for lines (and ASNs) that carry none, e.g. a
+                   per-upload nonce, so identical lines in two uploads stay distinct
+    """
+    if isinstance(source, (str, os.PathLike)):
+        name = os.fspath(source)
+        with open(source, 'rb') as handle:
+            payload = handle.read()
+    elif isinstance(source, bytes):
+        payload = source
+    else:
+        payload = source.read()
+        name = name or getattr(source, 'name', None)
+
+    extension = os.path.splitext(name or '')[1].lower()
+    if extension == '.json':
+        document = json.loads(payload)
+        if isinstance(document, list):
+            return _with_reference(_normalize_lines(document), reference)
+        header = {key: value for key, value in document.items() if key != 'lines'}
+        return _with_reference(_normalize_lines(document.get('lines', []), header), reference)
+    if extension == '.csv':
+        frame = pd.read_csv(io.BytesIO(payload), dtype=str, keep_default_na=False)
+        return _with_reference(_normalize_lines(frame.to_dict('records')), reference)
+    raise ValueError(f"Unsupported shipment file type: {extension or name}")
+
+
+def receipt_frame(lines: Any) -> pd.DataFrame:
+    """Normalize a receipt frame, a list of line mappings or an ASN mapping"""
+    if isinstance(lines, pd.DataFrame):
+        return _normalize_lines(lines.to_dict('records'))
+    if isinstance(lines, Mapping):
+        header = {key: value for key, value in lines.items() if key != 'lines'}
+        return _normalize_lines(lines.get('lines', []), header)
+    return _normalize_lines(lines)
+
+
+def idempotency_keys(frame: pd.DataFrame) -> List[str]:
+    """
+    transaction_id per line
+
+    An explicit idempotency_key wins; otherwise the key is derived from the
+    shipment reference, line number, item and quantity, so re-posting the same
+    document (or retrying after a timeout) yields the same ids. Lines with
+    neither are rejected by resolve_lines.
+    """
+    keys = []
+    for position, row in enumerate(frame.itertuples(index=False)):
+        if not is_blank(row.idempotency_key):
+            source = f"key|{str(row.idempotency_key).strip()}"
+        else:
+            line = position if is_blank(row.line_number) else str(row.line_number).strip()
+            item = row.inventory_id if not is_blank(row.inventory_id) else f"{row.item_type}@{row.location_city}"
+            source = f"{row.reference}|{line}|{item}|{row.quantity}"
+        keys.append(TRANSACTION_PREFIX + hashlib.sha1(source.encode('utf-8')).hexdigest()[:32])
+    return keys
+
+
+def resolve_lines(frame: pd.DataFrame, df_inventory: pd.DataFrame) -> Tuple[pd.DataFrame, List[RowRejection]]:
+    """
+    Resolve every receipt line to an inventory_id in one vectorized pass
+
+    Lines naming an inventory_id must exist in the snapshot; otherwise the
+    (item_type, location_city[, organization_id]) combination must match
+    exactly one item.
+
+    Returns:
+        Tuple of (posting frame with transaction_id, inventory_id, line_order,
+        quantity; rejections)
+    """
+    lines = frame.reset_index(drop=True).copy()
+    lines['line_order'] = np.arange(len(lines))
+    lines['transaction_id'] = idempotency_keys(lines)
+    quantity = pd.to_numeric(lines['quantity'], errors='coerce')
+    failures: Dict[int, List[str]] = {}
+
+    def fail(positions, reason):
+        for position in positions:
+            failures.setdefault(int(position), []).append(reason)
+
+    fail(np.flatnonzero(~(np.isfinite(quantity.to_numpy(dtype=float, na_value=np.nan)) & (quantity > 0))),
+         REJECT_INVALID_QUANTITY)
+    unreferenced = lines['reference'].map(is_blank) & lines['idempotency_key'].map(is_blank)
+    fail(np.flatnonzero(unreferenced.to_numpy(dtype=bool)), REJECT_MISSING_REFERENCE)
+
+    known = df_inventory[['INVENTORY_ID', 'ITEM_TYPE', 'LOCATION_CITY']].copy()
+    known['ORGANIZATION_ID'] = df_inventory['ORGANIZATION_ID'] if 'ORGANIZATION_ID' in df_inventory else None
+    known = known.astype(object).where(known.notna(), None)
+    known_ids = set(known['INVENTORY_ID'].astype(str))
+
+    direct = lines['inventory_id'].map(lambda value: not is_blank(value))
+    resolved = pd.Series([None] * len(lines), dtype=object)
+    direct_ids = lines.loc[direct, 'inventory_id'].astype(str).str.strip()
+    resolved[direct] = direct_ids
+    fail(direct_ids.index[~direct_ids.isin(known_ids)], REJECT_UNRESOLVED_ITEM)
+
+    def text(series):
+        return series.map(lambda value: None if is_blank(value) else str(value).strip().lower())
+
+    by_name = lines.loc[~direct]
+    if not by_name.empty:
+        candidates = pd.DataFrame({
+            'INVENTORY_ID': known['INVENTORY_ID'],
+            'item': text(known['ITEM_TYPE']),
+            'city': text(known['LOCATION_CITY']),
+            'org': text(known['ORGANIZATION_ID']),
+        })
+        wanted = pd.DataFrame({
+            'position': by_name.index,
+            'item': text(by_name['item_type']).to_numpy(),
+            'city': text(by_name['location_city']).to_numpy(),
+            'org': text(by_name['organization_id']).to_numpy(),
+        })
+        matches = wanted.merge(candidates.drop(columns='org'), on=['item', 'city'], how='left')
+        matches = matches.merge(candidates[['INVENTORY_ID', 'org']], on='INVENTORY_ID', how='left',
+                                suffixes=('', '_item'))
+        # An organization on the line narrows the match; without one any organization matches
+        matches = matches[matches['org'].isna() | (matches['org'] == matches['org_item'])]
+        found = matches.dropna(subset=['INVENTORY_ID']).groupby('position')['INVENTORY_ID']
+        counts = found.nunique().reindex(by_name.index, fill_value=0)
+        fail(counts.index[counts == 0], REJECT_UNRESOLVED_ITEM)
+        fail(counts.index[counts > 1], REJECT_AMBIGUOUS_ITEM)
+        unique = counts.index[counts == 1]
+        resolved[unique] = found.first().reindex(unique).to_numpy()
+
+    seen = set()
+    for position, key in enumerate(lines['transaction_id']):
+        if key in seen:
+            fail([position], REJECT_DUPLICATE_IN_BATCH)
+        seen.add(key)
+
+    lines['inventory_id'] = resolved
+    lines['quantity'] = quantity
+    rejections = [
+        RowRejection(row=position, inventory_id=lines.at[position, 'inventory_id'], reasons=reasons)
+        for position, reasons in sorted(failures.items())
+    ]
+    accepted = lines.drop(index=list(failures)).reset_index(drop=True)
+    return accepted[list(STAGE_COLUMNS)], rejections
+
+
+# SQL. The stage is created outside the transaction (DDL commits implicitly in Snowflake).
+
+def stage_table_sql(stage_table: str = DEFAULT_STAGE_TABLE) -> str:
+    return f"""
+        CREATE TEMPORARY TABLE IF NOT EXISTS {stage_table} (
+            transaction_id VARCHAR(50),
+            inventory_id VARCHAR(50),
+            line_order INTEGER,
+            quantity FLOAT
+        )
+    """
+
+
+def dedupe_sql(stage_table: str = DEFAULT_STAGE_TABLE, transactions: str = DEFAULT_TRANSACTIONS) -> str:
+    """Drop staged lines whose idempotency key was already posted"""
+    return f"""
+        DELETE FROM {stage_table}
+        WHERE transaction_id IN (SELECT transaction_id FROM {transactions})
+    """
+
+
+def stock_update_sql(stage_table: str = DEFAULT_STAGE_TABLE, master: str = DEFAULT_MASTER) -> str:
+    """One UPDATE adding the summed quantities per item"""
+    return f"""
+        UPDATE {master} AS m
+        SET current_stock = m.current_stock + s.quantity,
+            last_updated = CURRENT_TIMESTAMP
+        FROM (
+            SELECT inventory_id, SUM(quantity) AS quantity
+            FROM {stage_table}
+            GROUP BY inventory_id
+        ) AS s
+        WHERE m.inventory_id = s.inventory_id
+    """
+
+
+def movements_sql(stage_table: str = DEFAULT_STAGE_TABLE, master: str = DEFAULT_MASTER,
+                  transactions: str = DEFAULT_TRANSACTIONS) -> str:
+    """
+    RESTOCK rows for every staged line, run after the stock update
+
+    stock_level is the running level after each line: the updated stock minus
+    the quantities of the item's later lines in the same posting.
+    """
+    return f"""
+        INSERT INTO {transactions}
+            (transaction_id, inventory_id, transaction_date, stock_level, consumption_amount, transaction_type)
+        SELECT
+            s.transaction_id,
+            s.inventory_id,
+            CURRENT_DATE,
+            m.current_stock - COALESCE(SUM(s.quantity) OVER (
+                PARTITION BY s.inventory_id ORDER BY s.line_order
+                ROWS BETWEEN 1 FOLLOWING AND UNBOUNDED FOLLOWING
+            ), 0),
+            NULL,
+            '{TRANSACTION_TYPE}'
+        FROM {stage_table} s
+        JOIN {master} m ON m.inventory_id = s.inventory_id
+    """
+
+
+def posted_sql(stage_table: str = DEFAULT_STAGE_TABLE) -> str:
+    return f"""
+        SELECT inventory_id AS INVENTORY_ID, COUNT(*) AS LINES, SUM(quantity) AS QUANTITY
+        FROM {stage_table}
+        GROUP BY inventory_id
+    """
+
+
+class ShipmentPoster:
+    """
+    Posts receipt batches with a constant number of statements
+
+    One statement per STAGE_CHUNK_ROWS staged lines, then dedupe, a single
+    stock UPDATE and a single movements INSERT inside one transaction. The
+    idempotency check and the writes commit (or roll back) together.
+    """
+
+    def __init__(self, master: str = DEFAULT_MASTER, transactions: str = DEFAULT_TRANSACTIONS,
+                 stage_table: str = DEFAULT_STAGE_TABLE, chunk_rows: int = STAGE_CHUNK_ROWS):
+        self.master = master
+        self.transactions = transactions
+        self.stage_table = stage_table
+        self.chunk_rows = max(1, chunk_rows)
+        self._lock = threading.Lock()
+
+    def _stage(self, session, accepted: pd.DataFrame):
+        session.sql(stage_table_sql(self.stage_table)).collect()
+        session.sql(f"DELETE FROM {self.stage_table}").collect()
+        records = accepted.to_dict('records')
+        for start in range(0, len(records), self.chunk_rows):
+            chunk = [
+                {'transaction_id': r['transaction_id'], 'inventory_id': r['inventory_id'],
+                 'line_order': int(r['line_order']), 'quantity': float(r['quantity'])}
+                for r in records[start:start + self.chunk_rows]
+            ]
+            sql, params = build_multi_row_insert(self.stage_table, STAGE_COLUMNS, chunk)
+            session.sql(sql, params=params).collect()
+
+    def post(self, session, lines: Any, df_inventory: pd.DataFrame) -> ShipmentPostingResult:
+        """
+        Resolve and post receipt lines
+
+        Args:
+            session: Snowpark session
+            lines: Receipt frame, list of line mappings, ASN mapping or the
+                   output of read_receipt_file
+            df_inventory: Inventory snapshot used to resolve items
+
+        Returns:
+            ShipmentPostingResult (rejected lines are not posted; lines whose
+            idempotency key was already posted are counted as duplicates)
+        """
+        frame = receipt_frame(lines)
+        accepted, rejections = resolve_lines(frame, df_inventory)
+        result = ShipmentPostingResult(lines=len(frame), rejected=rejections)
+        if accepted.empty:
+            return result
+
+        with self._lock:
+            self._stage(session, accepted)
+            session.sql("BEGIN TRANSACTION").collect()
+            try:
+                session.sql(dedupe_sql(self.stage_table, self.transactions)).collect()
+                posted = session.sql(posted_sql(self.stage_table)).collect()
+                session.sql(stock_update_sql(self.stage_table, self.master)).collect()
+                session.sql(movements_sql(self.stage_table, self.master, self.transactions)).collect()
+                session.sql("COMMIT").collect()
+            except Exception:
+                session.sql("ROLLBACK").collect()
+                raise
+
+        result.quantities = {str(row['INVENTORY_ID']): float(row['QUANTITY']) for row in posted}
+        result.posted = int(sum(int(row['LINES']) for row in posted))
+        result.duplicates = len(accepted) - result.posted
+        return result
+
+
+def single_receipt(inventory_id: str, quantity: float, supplier: str = '',
+                   reference: Optional[str] = None) -> List[Dict[str, Any]]:
+    """One-line receipt as posted from the manual shipment form"""
+    return [{'inventory_id': inventory_id, 'quantity': quantity, 'supplier': supplier,
+             'reference': reference, 'line_number': 1}]
+
+
+def summarize_rejections(rejections: Sequence[RowRejection]) -> List[Dict[str, Any]]:
+    """Rejected lines as plain records (e.g. for st.dataframe)"""
+    return [{'line': r.row + 1, 'inventory_id': r.inventory_id, 'reasons': ', '.join(r.reasons)}
+            for r in rejections]
@@ -0,0 +1,195 @@
+"""
+Stale-while-revalidate snapshot cache for InventoryQ OS
+Serves the last good inventory snapshot immediately while one background
+refresh replaces it, so an expired TTL never blocks a rerun, concurrent
+sessions share a single query, and writers invalidate only this snapshot
+"""
+from typing import Any, Callable, Optional
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime
+import itertools
+import threading
+import time
+
+import pandas as pd
+
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+
+
+DEFAULT_MAX_AGE_S = 300
+DEFAULT_RETRY_AFTER_S = 5
+
+
+@dataclass(frozen=True)
+class SnapshotInfo:
+    """Freshness of the cached snapshot (for status displays)"""
+    version: Optional[Any]
+    loaded_at: Optional[datetime]
+    age_seconds: Optional[float]
+    stale: bool
+    refreshing: bool
+    last_error: Optional[str]
+
+
+class SnapshotCache:
+    """
+    Shared snapshot with background revalidation and single-flight loads
+
+    get() returns the cached frame straight away; once it is older than
+    max_age_s (or was invalidated) the same call starts one background
+    refresh. Only the very first load, or a load after invalidate(drop=True),
+    makes callers wait, and then every waiting caller shares that one load.
+    A failed refresh keeps the last good snapshot and is retried after
+    retry_after_s.
+    """
+
+    def __init__(self, load_fn: Callable[[], pd.DataFrame], max_age_s: float = DEFAULT_MAX_AGE_S,
+                 retry_after_s: float = DEFAULT_RETRY_AFTER_S,
+                 clock: Callable[[], float] = time.monotonic):
+        self.load_fn = load_fn
+        self.max_age_s = max_age_s
+        self.retry_after_s = retry_after_s
+        self.clock = clock
+        self._snapshot: Optional[pd.DataFrame] = None
+        self._version: Optional[Any] = None
+        self._loaded_at: Optional[float] = None
+        self._loaded_wall: Optional[datetime] = None
+        self._installed_flight = 0
+        self._flights = itertools.count(1)
+        self._inflight: Optional[Future] = None
+        self._inflight_id = 0
+        self._invalidated_at = 0
+        self._last_error: Optional[BaseException] = None
+        self._failed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'loads': 0, 'coalesced': 0, 'errors': 0}
+
+    def _is_stale(self) -> bool:
+        if self._loaded_at is None or self._installed_flight <= self._invalidated_at:
+            return True
+        return self.clock() - self._loaded_at >= self.max_age_s
+
+    def _may_retry(self) -> bool:
+        return self._failed_at is None or self.clock() - self._failed_at >= self.retry_after_s
+
+    def _start_refresh(self) -> Future:
+        """Start a load unless an equally fresh one is already running (lock held)"""
+        if self._inflight is not None and self._inflight_id > self._invalidated_at:
+            self.stats['coalesced'] += 1
+            return self._inflight
+
+        flight = next(self._flights)
+        future: Future = Future()
+        self._inflight, self._inflight_id = future, flight
+        thread = threading.Thread(target=self._load, args=(flight, future),
+                                  name='snapshot-refresh', daemon=True)
+        thread.start()
+        return future
+
+    def _load(self, flight: int, future: Future):
+        try:
+            frame = self.load_fn()
+        except BaseException as error:
+            with self._lock:
+                self.stats['errors'] += 1
+                self._last_error = error
+                self._failed_at = self.clock()
+                if self._inflight is future:
+                    self._inflight = None
+            future.set_exception(error)
+            return
+
+        with self._lock:
+            self.stats['loads'] += 1
+            # A slower, older flight never replaces a snapshot from a newer one
+            if flight > self._installed_flight:
+                self._snapshot = frame
+                self._version = frame.attrs.get(SNAPSHOT_VERSION_ATTR, flight)
+                self._loaded_at = self.clock()
+                self._loaded_wall = datetime.now()
+                self._installed_flight = flight
+                self._last_error = None
+                self._failed_at = None
+            if self._inflight is future:
+                self._inflight = None
+            result = self._snapshot
+        future.set_result(result)
+
+    def get(self) -> pd.DataFrame:
+        """
+        The current snapshot, revalidated in the background when stale
+
+        Returns:
+            A shallow copy of the shared frame (column changes stay local; the
+            values must be treated as read-only)
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None:
+                if self._is_stale():
+                    self.stats['stale_hits'] += 1
+                    if self._may_retry():
+                        self._start_refresh()
+                else:
+                    self.stats['hits'] += 1
+                return snapshot.copy(deep=False)
+            self.stats['misses'] += 1
+            future = self._start_refresh()
+        return future.result().copy(deep=False)
+
+    def refresh(self, wait: bool = False, timeout: Optional[float] = None) -> Optional[pd.DataFrame]:
+        """
+        Revalidate now (joining a running refresh that started after the last invalidation)
+
+        Args:
+            wait: Block until the refreshed snapshot is installed
+            timeout: Seconds to wait at most
+
+        Returns:
+            The refreshed snapshot when waiting, otherwise None
+        """
+        with self._lock:
+            future = self._start_refresh()
+        if not wait:
+            return None
+        return future.result(timeout).copy(deep=False)
+
+    def invalidate(self, drop: bool = False):
+        """
+        Mark the snapshot stale after a write
+
+        The next get() serves the current frame and refreshes in the
+        background; a refresh already running started too early and will be
+        followed by a new one. With drop=True the snapshot is discarded and
+        the next get() waits for a fresh load.
+        """
+        with self._lock:
+            self._invalidated_at = self._inflight_id if self._inflight is not None else self._installed_flight
+            self._failed_at = None
+            if drop:
+                self._snapshot = None
+                self._version = None
+                self._loaded_at = None
+                self._loaded_wall = None
+
+    @property
+    def version(self) -> Optional[Any]:
+        return self._version
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        loaded_at = self._loaded_at
+        return None if loaded_at is None else max(0.0, self.clock() - loaded_at)
+
+    def info(self) -> SnapshotInfo:
+        with self._lock:
+            error = self._last_error
+            return SnapshotInfo(
+                version=self._version,
+                loaded_at=self._loaded_wall,
+                age_seconds=None if self._loaded_at is None else max(0.0, self.clock() - self._loaded_at),
+                stale=self._is_stale(),
+                refreshing=self._inflight is not None,
+                last_error=None if error is None else str(error)
+            )
@@ -0,0 +1,343 @@
+"""
+Bulk write-back of data editor changes for InventoryQ OS
+Diffs the edited grid page against the rows it was loaded from and applies
+every insert, update and delete with one staged MERGE into inventory_master
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.database.bulk_ingest import (
+    REJECT_DUPLICATE_IN_BATCH, REJECT_INVALID_NUMBER, REJECT_MISSING_VALUE, REJECT_NEGATIVE_STOCK,
+    REJECT_THRESHOLD_ORDER, REJECT_UNKNOWN_SECTOR, REJECT_ZERO_CONSUMPTION, RowRejection, is_blank,
+    sector_for
+)
+from src.database.incremental_loader import KEY_COLUMN, WATERMARK_COLUMN
+
+
+DEFAULT_TARGET = 'inventory_master'
+DEFAULT_STAGE_TABLE = 'inventory_edits_stage'
+
+OP_INSERT = 'I'
+OP_UPDATE = 'U'
+OP_DELETE = 'D'
+
+# Editor (view) column -> inventory_master column. STATUS, DAYS_REMAINING etc. are derived.
+EDITABLE_COLUMNS = {
+    'ORGANIZATION_ID': 'organization_id',
+    'SECTOR_TYPE': 'sector_type',
+    'ITEM_TYPE': 'item_type',
+    'LOCATION_CITY': 'location_city',
+    'CURRENT_STOCK': 'current_stock',
+    'DAILY_CONSUMPTION_RATE': 'daily_consumption_rate',
+    'REORDER_POINT': 'reorder_point',
+    'CRITICAL_THRESHOLD': 'critical_threshold',
+}
+REQUIRED_STRINGS = ('ORGANIZATION_ID', 'SECTOR_TYPE', 'ITEM_TYPE')
+NUMERIC_EDITABLE = ('CURRENT_STOCK', 'DAILY_CONSUMPTION_RATE', 'REORDER_POINT', 'CRITICAL_THRESHOLD')
+
+# Columns of the grid page the editor is loaded from (LAST_UPDATED is the concurrency token)
+EDITOR_GRID_COLUMNS = (
+    KEY_COLUMN, 'ORGANIZATION_ID', 'SECTOR_TYPE', 'ITEM_TYPE', 'LOCATION_CITY', 'CURRENT_STOCK',
+    'DAILY_CONSUMPTION_RATE', 'REORDER_POINT', 'CRITICAL_THRESHOLD', 'STATUS', WATERMARK_COLUMN
+)
+
+STAGE_KEY_COLUMNS = ('op', 'inventory_id', 'expected_last_updated')
+_STAGE_TYPES = {
+    'op': 'VARCHAR', 'inventory_id': 'VARCHAR', 'expected_last_updated': 'TIMESTAMP_NTZ',
+    'organization_id': 'VARCHAR', 'sector_type': 'VARCHAR', 'item_type': 'VARCHAR',
+    'location_city': 'VARCHAR', 'current_stock': 'FLOAT', 'daily_consumption_rate': 'FLOAT',
+    'reorder_point': 'FLOAT', 'critical_threshold': 'FLOAT',
+}
+
+
+@dataclass
+class EditorChanges:
+    """Row-level delta between the loaded page and the edited frame"""
+    columns: List[str]
+    inserts: List[Dict[str, Any]] = field(default_factory=list)
+    updates: List[Dict[str, Any]] = field(default_factory=list)
+    deletes: List[Dict[str, Any]] = field(default_factory=list)
+    rejected: List[RowRejection] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+    @property
+    def empty(self) -> bool:
+        return self.total == 0
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Stage rows: inserts, then updates, then deletes"""
+        return self.inserts + self.updates + self.deletes
+
+
+@dataclass
+class WriteBackResult:
+    """Outcome of one Save"""
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    conflicts: List[str] = field(default_factory=list)
+    rejected: List[RowRejection] = field(default_factory=list)
+    changed_ids: List[str] = field(default_factory=list)
+    deleted_ids: List[str] = field(default_factory=list)
+
+    @property
+    def applied(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+    @property
+    def ok(self) -> bool:
+        return not self.conflicts and not self.rejected
+
+
+def _same(left: Any, right: Any, numeric: bool) -> bool:
+    if is_blank(left) or is_blank(right):
+        return is_blank(left) and is_blank(right)
+    if numeric:
+        try:
+            return bool(np.isclose(float(left), float(right), rtol=0, atol=1e-9))
+        except (TypeError, ValueError):
+            return False
+    return str(left).strip() == str(right).strip()
+
+
+def _value(value: Any, numeric: bool) -> Any:
+    """Python scalar to bind for a stage column"""
+    if is_blank(value):
+        return None
+    if numeric:
+        return float(value)
+    return str(value).strip()
+
+
+def _timestamp(value: Any) -> Optional[str]:
+    """ISO text for the concurrency token (bound as text, cast in SQL)"""
+    if is_blank(value):
+        return None
+    return pd.Timestamp(value).isoformat()
+
+
+def _row_failures(row: pd.Series, columns: Sequence[str], inserting: bool) -> List[str]:
+    """Validation rules of the bulk ingest path, limited to the columns being written"""
+    reasons = []
+    required = [column for column in REQUIRED_STRINGS if inserting or column in columns]
+    if any(column not in row or is_blank(row[column]) for column in required):
+        reasons.append(REJECT_MISSING_VALUE)
+    if 'SECTOR_TYPE' in row and not is_blank(row['SECTOR_TYPE']):
+        try:
+            sector_for(str(row['SECTOR_TYPE']).strip())
+        except KeyError:
+            reasons.append(REJECT_UNKNOWN_SECTOR)
+
+    numbers = {}
+    for column in NUMERIC_EDITABLE:
+        if column in columns:
+            try:
+                numbers[column] = float(row[column])
+            except (TypeError, ValueError):
+                numbers[column] = np.nan
+    if any(not np.isfinite(value) for value in numbers.values()) or (
+            inserting and len(numbers) < len(NUMERIC_EDITABLE)):
+        reasons.append(REJECT_INVALID_NUMBER)
+    if numbers.get('CURRENT_STOCK', 0) < 0:
+        reasons.append(REJECT_NEGATIVE_STOCK)
+    if numbers.get('DAILY_CONSUMPTION_RATE', 1) <= 0:
+        reasons.append(REJECT_ZERO_CONSUMPTION)
+    critical = numbers.get('CRITICAL_THRESHOLD', 0)
+    if critical < 0 or critical > numbers.get('REORDER_POINT', np.inf):
+        reasons.append(REJECT_THRESHOLD_ORDER)
+    return reasons
+
+
+def diff_editor_frames(original: pd.DataFrame, edited: pd.DataFrame) -> EditorChanges:
+    """
+    Row-level delta between a grid page and the frame returned by st.data_editor
+
+    Rows are matched on INVENTORY_ID, so an edited id is a delete plus an
+    insert. Only editable columns present in the edited frame are compared
+    and written; invalid or duplicated rows are rejected, not staged.
+
+    Args:
+        original: Page rows as loaded, including LAST_UPDATED
+        edited: Editor output (num_rows="dynamic": rows may be added or removed)
+
+    Returns:
+        EditorChanges
+    """
+    if WATERMARK_COLUMN not in original:
+        raise ValueError(f"The original rows need {WATERMARK_COLUMN} for optimistic concurrency")
+    columns = [column for column in EDITABLE_COLUMNS if column in edited]
+    changes = EditorChanges(columns=columns)
+
+    before = {str(row[KEY_COLUMN]): row for _, row in original.iterrows() if not is_blank(row[KEY_COLUMN])}
+    seen = set()
+    for position, (_, row) in enumerate(edited.iterrows()):
+        inventory_id = row.get(KEY_COLUMN)
+        if is_blank(inventory_id):
+            # Rows added and left completely empty are ignored
+            if any(not is_blank(row[column]) for column in columns):
+                changes.rejected.append(RowRejection(position, None, [REJECT_MISSING_VALUE]))
+            continue
+        inventory_id = str(inventory_id).strip()
+        if inventory_id in seen:
+            changes.rejected.append(RowRejection(position, inventory_id, [REJECT_DUPLICATE_IN_BATCH]))
+            continue
+        seen.add(inventory_id)
+
+        previous = before.get(inventory_id)
+        if previous is not None:
+            changed = [column for column in columns
+                       if column not in previous or not _same(previous[column], row[column],
+                                                              column in NUMERIC_EDITABLE)]
+            if not changed:
+                continue
+        reasons = _row_failures(row, columns, inserting=previous is None)
+        if reasons:
+            changes.rejected.append(RowRejection(position, inventory_id, reasons))
+            continue
+
+        record = {
+            'op': OP_INSERT if previous is None else OP_UPDATE,
+            'inventory_id': inventory_id,
+            'expected_last_updated': None if previous is None else _timestamp(previous[WATERMARK_COLUMN]),
+        }
+        for column in columns:
+            record[EDITABLE_COLUMNS[column]] = _value(row[column], column in NUMERIC_EDITABLE)
+        if previous is None:
+            changes.inserts.append(record)
+        else:
+            changes.updates.append(record)
+
+    for inventory_id, previous in before.items():
+        if inventory_id not in seen:
+            record = dict.fromkeys(EDITABLE_COLUMNS[column] for column in columns)
+            record.update(op=OP_DELETE, inventory_id=inventory_id,
+                          expected_last_updated=_timestamp(previous[WATERMARK_COLUMN]))
+            changes.deletes.append(record)
+    return changes
+
+
+def stage_columns(changes: EditorChanges) -> List[str]:
+    return list(STAGE_KEY_COLUMNS) + [EDITABLE_COLUMNS[column] for column in changes.columns]
+
+
+def stage_sql(changes: EditorChanges, stage_table: str = DEFAULT_STAGE_TABLE) -> Tuple[str, List[Any]]:
+    """
+    One statement creating the temporary stage table from bound VALUES rows
+
+    APPLIED_AT is taken from the warehouse clock once for the whole stage, so
+    the delta refresh (last_updated >= high-water mark) sees every written row.
+    """
+    columns = stage_columns(changes)
+    placeholders = ", ".join('?' for _ in columns)
+    values_sql = ",\n".join(f"({placeholders})" for _ in changes.records())
+    select_list = ", ".join(
+        f"${position}::{_STAGE_TYPES[column]} AS {column}" for position, column in enumerate(columns, 1)
+    )
+    params = [record.get(column) for record in changes.records() for column in columns]
+    sql = f"""
+        CREATE OR REPLACE TEMPORARY TABLE {stage_table} AS
+        SELECT {select_list}, CURRENT_TIMESTAMP()::TIMESTAMP_NTZ AS applied_at
+        FROM VALUES
+        {values_sql}
+    """
+    return sql, params
+
+
+def merge_sql(changes: EditorChanges, stage_table: str = DEFAULT_STAGE_TABLE,
+              target: str = DEFAULT_TARGET) -> str:
+    """
+    Single MERGE applying every staged row
+
+    Updates and deletes only touch rows whose last_updated still equals the
+    value the editor was loaded with; other rows are left for the conflict check.
+    """
+    written = [EDITABLE_COLUMNS[column] for column in changes.columns]
+    unchanged = "EQUAL_NULL(t.last_updated, s.expected_last_updated)"
+    set_list = ", ".join([f"{column} = s.{column}" for column in written] + ["last_updated = s.applied_at"])
+    insert_columns = ", ".join(['inventory_id'] + written + ['last_updated'])
+    insert_values = ", ".join(['s.inventory_id'] + [f"s.{column}" for column in written] + ['s.applied_at'])
+    return f"""
+        MERGE INTO {target} t
+        USING {stage_table} s
+        ON t.inventory_id = s.inventory_id
+        WHEN MATCHED AND s.op = '{OP_DELETE}' AND {unchanged} THEN DELETE
+        WHEN MATCHED AND s.op = '{OP_UPDATE}' AND {unchanged} THEN UPDATE SET {set_list}
+        WHEN NOT MATCHED AND s.op = '{OP_INSERT}' THEN INSERT ({insert_columns}) VALUES ({insert_values})
+    """
+
+
+def conflict_sql(stage_table: str = DEFAULT_STAGE_TABLE, target: str = DEFAULT_TARGET) -> str:
+    """Staged rows the MERGE did not apply (changed, deleted or created by someone else)"""
+    return f"""
+        SELECT s.inventory_id AS INVENTORY_ID
+        FROM {stage_table} s
+        LEFT JOIN {target} t ON t.inventory_id = s.inventory_id
+        WHERE (s.op IN ('{OP_INSERT}', '{OP_UPDATE}')
+               AND (t.inventory_id IS NULL OR NOT EQUAL_NULL(t.last_updated, s.applied_at)))
+           OR (s.op = '{OP_DELETE}' AND t.inventory_id IS NOT NULL)
+        ORDER BY s.inventory_id
+    """
+
+
+def merge_counts(rows: Sequence[Any]) -> Tuple[int, int, int]:
+    """(inserted, updated, deleted) from the MERGE result row, in clause order"""
+    if not rows:
+        return 0, 0, 0
+    values = list(rows[0])
+    values += [0] * (3 - len(values))
+    return int(values[0]), int(values[1]), int(values[2])
+
+
+class InventoryWriteBack:
+    """
+    Persists data editor changes in a constant number of round-trips
+
+    Staging and MERGE are two statements regardless of how many rows changed;
+    the conflict query only runs when the MERGE applied fewer rows than staged.
+    The stage table is per session and reused, so saves are serialized.
+    """
+
+    def __init__(self, target: str = DEFAULT_TARGET, stage_table: str = DEFAULT_STAGE_TABLE):
+        self.target = target
+        self.stage_table = stage_table
+        self._lock = threading.Lock()
+
+    def apply(self, session, original: pd.DataFrame, edited: pd.DataFrame) -> WriteBackResult:
+        """
+        Diff, stage and MERGE the edits of one grid page
+
+        Args:
+            session: Snowpark session
+            original: Page rows the editor was loaded with (including LAST_UPDATED)
+            edited: st.data_editor output
+
+        Returns:
+            WriteBackResult (conflicting ids were not written)
+        """
+        changes = diff_editor_frames(original, edited)
+        result = WriteBackResult(rejected=changes.rejected)
+        if changes.empty:
+            return result
+
+        with self._lock:
+            sql, params = stage_sql(changes, self.stage_table)
+            session.sql(sql, params=params).collect()
+            rows = session.sql(merge_sql(changes, self.stage_table, self.target)).collect()
+            result.inserted, result.updated, result.deleted = merge_counts(rows)
+            if result.applied < changes.total:
+                conflicts = session.sql(conflict_sql(self.stage_table, self.target)).collect()
+                result.conflicts = [str(row['INVENTORY_ID']) for row in conflicts]
+
+        conflicted = set(result.conflicts)
+        result.changed_ids = [record['inventory_id'] for record in changes.inserts + changes.updates
+                              if record['inventory_id'] not in conflicted]
+        result.deleted_ids = [record['inventory_id'] for record in changes.deletes
+                              if record['inventory_id'] not in conflicted]
+        return result
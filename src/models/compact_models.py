@@ -0,0 +1,267 @@
+"""
+Compact, __slots__-based variants of the InventoryQ OS data models
+Same constructors and days_remaining/is_critical API as data_models, with
+interned string fields, optional immutability and a shared Location flyweight
+"""
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from dataclasses import FrozenInstanceError
+import sys
+import threading
+
+from src.models import data_models
+
+
+_MISSING = object()
+
+
+class SlottedModel:
+    """Base class providing dataclass-like behaviour on top of __slots__"""
+
+    __slots__ = ()
+
+    # Field order, defaults and interned fields are declared by each subclass
+    _fields: Tuple[str, ...] = ()
+    _defaults: Dict[str, Any] = {}
+    _interned: FrozenSet[str] = frozenset()
+    _frozen = False
+    _dataclass: Optional[type] = None
+
+    def __init__(self, *args, **kwargs):
+        if len(args) > len(self._fields):
+            raise TypeError(
+                f"{type(self).__name__}() takes {len(self._fields)} positional arguments "
+                f"but {len(args)} were given"
+            )
+        values = dict(zip(self._fields, args))
+        for name, value in kwargs.items():
+            if name not in self._fields:
+                raise TypeError(f"{type(self).__name__}() got an unexpected keyword argument '{name}'")
+            if name in values:
+                raise TypeError(f"{type(self).__name__}() got multiple values for argument '{name}'")
+            values[name] = value
+
+        for name in self._fields:
+            value = values.get(name, _MISSING)
+            if value is _MISSING:
+                if name in self._defaults:
+                    value = self._defaults[name]
+                else:
+                    raise TypeError(f"{type(self).__name__}() missing required argument: '{name}'")
+            object.__setattr__(self, name, self._prepare(name, value))
+
+        self._post_init()
+
+    def _prepare(self, name: str, value: Any) -> Any:
+        """Intern designated string fields so equal strings share one object"""
+        if name in self._interned and type(value) is str:
+            return sys.intern(value)
+        return value
+
+    def _post_init(self):
+        """Hook for subclasses (mirrors dataclass __post_init__)"""
+
+    def __setattr__(self, name: str, value: Any):
+        if self._frozen:
+            raise FrozenInstanceError(f"cannot assign to field '{name}'")
+        object.__setattr__(self, name, self._prepare(name, value))
+
+    def __delattr__(self, name: str):
+        if self._frozen:
+            raise FrozenInstanceError(f"cannot delete field '{name}'")
+        object.__delattr__(self, name)
+
+    def _astuple(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, SlottedModel):
+            return self._fields == other._fields and self._astuple() == other._astuple()
+        if self._dataclass is not None and type(other) is self._dataclass:
+            return self._astuple() == tuple(getattr(other, name) for name in self._fields)
+        return NotImplemented
+
+    def __hash__(self):
+        if not self._frozen:
+            raise TypeError(f"unhashable type: '{type(self).__name__}'")
+        return hash(self._astuple())
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+    def __getstate__(self):
+        return self._astuple()
+
+    def __setstate__(self, state):
+        for name, value in zip(self._fields, state):
+            object.__setattr__(self, name, value)
+
+    def to_dataclass(self):
+        """Convert to the equivalent dict-backed dataclass from data_models"""
+        return self._dataclass(**{name: getattr(self, name) for name in self._fields})
+
+    @classmethod
+    def from_dataclass(cls, obj: Any):
+        """Build a compact variant from a data_models dataclass instance"""
+        return cls(**{name: getattr(obj, name) for name in cls._fields})
+
+
+class CompactLocation(SlottedModel):
+    """Location data structure"""
+    __slots__ = ('city', 'state', 'country', 'latitude', 'longitude')
+    _fields = __slots__
+    _defaults = {'latitude': None, 'longitude': None}
+    _interned = frozenset({'city', 'state', 'country'})
+    _dataclass = data_models.Location
+
+
+class FrozenLocation(CompactLocation):
+    """Immutable, hashable location (safe to share between items)"""
+    __slots__ = ()
+    _frozen = True
+
+
+_location_cache: Dict[Tuple[Any, ...], FrozenLocation] = {}
+_location_cache_lock = threading.Lock()
+
+
+def shared_location(city: str, state: str, country: str,
+                    latitude: Optional[float] = None,
+                    longitude: Optional[float] = None) -> FrozenLocation:
+    """
+    Flyweight lookup: one FrozenLocation instance per distinct location
+
+    There are only a handful of cities, so a million items end up pointing
+    at a few shared Location objects instead of a million copies.
+    """
+    key = (city, state, country, latitude, longitude)
+    location = _location_cache.get(key)
+    if location is None:
+        with _location_cache_lock:
+            location = _location_cache.setdefault(
+                key, FrozenLocation(city, state, country, latitude, longitude)
+            )
+    return location
+
+
+def as_shared_location(location: Any) -> Any:
+    """Map any Location-like object onto its shared flyweight"""
+    if location is None or isinstance(location, FrozenLocation):
+        return location
+    return shared_location(
+        location.city, location.state, location.country, location.latitude, location.longitude
+    )
+
+
+def clear_location_cache():
+    """Drop all cached flyweights (for testing purposes)"""
+    with _location_cache_lock:
+        _location_cache.clear()
+
+
+class CompactInventoryItem(SlottedModel):
+    """Core inventory item data model"""
+    __slots__ = (
+        'inventory_id', 'organization_id', 'sector_type', 'item_type', 'current_stock',
+        'daily_consumption_rate', 'reorder_point', 'critical_threshold', 'location', 'last_updated'
+    )
+    _fields = __slots__
+    _defaults = {'last_updated': None}
+    _interned = frozenset({'organization_id', 'item_type'})
+    _dataclass = data_models.InventoryItem
+
+    def _prepare(self, name: str, value: Any) -> Any:
+        if name == 'location':
+            return as_shared_location(value)
+        return SlottedModel._prepare(self, name, value)
+
+    def days_remaining(self) -> float:
+        """Calculate days until stockout"""
+        if self.daily_consumption_rate <= 0:
+            return float('inf')
+        return self.current_stock / self.daily_consumption_rate
+
+    def is_critical(self) -> bool:
+        """Check if stock is at critical level"""
+        return self.days_remaining() <= self.critical_threshold
+
+    def to_dataclass(self):
+        item = SlottedModel.to_dataclass(self)
+        if self.location is not None:
+            item.location = self.location.to_dataclass()
+        return item
+
+
+class FrozenInventoryItem(CompactInventoryItem):
+    """Immutable inventory item"""
+    __slots__ = ()
+    _frozen = True
+
+
+class CompactPurchaseOrder(SlottedModel):
+    """Purchase order data model"""
+    __slots__ = (
+        'order_id', 'inventory_id', 'quantity', 'urgency_level', 'estimated_delivery',
+        'vendor_info', 'auto_generated', 'created_at', 'reasoning'
+    )
+    _fields = __slots__
+    _interned = frozenset({'urgency_level'})
+    _dataclass = data_models.PurchaseOrder
+
+
+class CompactExternalData(SlottedModel):
+    """External data from APIs or simulation"""
+    __slots__ = ('weather_conditions', 'traffic_delays', 'vendor_availability', 'data_source', 'timestamp')
+    _fields = __slots__
+    _interned = frozenset({'data_source'})
+    _dataclass = data_models.ExternalData
+
+
+class CompactHospitalSupply(CompactInventoryItem):
+    """Hospital-specific supply model"""
+    __slots__ = ('oxygen_purity_level', 'medical_grade_required', 'patient_capacity')
+    _fields = CompactInventoryItem._fields + __slots__
+    _defaults = {**CompactInventoryItem._defaults, 'oxygen_purity_level': 99.5,
+                 'medical_grade_required': True, 'patient_capacity': 100}
+    _dataclass = data_models.HospitalSupply
+
+
+class CompactPDSSupply(CompactInventoryItem):
+    """PDS-specific supply model"""
+    __slots__ = ('grain_quality_grade', 'government_allocation', 'distribution_schedule')
+    _fields = CompactInventoryItem._fields + __slots__
+    _defaults = {**CompactInventoryItem._defaults, 'grain_quality_grade': "A",
+                 'government_allocation': 1000.0, 'distribution_schedule': None}
+    _interned = CompactInventoryItem._interned | {'grain_quality_grade'}
+    _dataclass = data_models.PDSSupply
+
+    def _post_init(self):
+        if self.distribution_schedule is None:
+            object.__setattr__(self, 'distribution_schedule', {})
+
+
+class CompactNGOSupply(CompactInventoryItem):
+    """NGO-specific supply model"""
+    __slots__ = ('emergency_type', 'kit_contents', 'deployment_readiness')
+    _fields = CompactInventoryItem._fields + __slots__
+    _defaults = {**CompactInventoryItem._defaults, 'emergency_type': "DISASTER",
+                 'kit_contents': None, 'deployment_readiness': True}
+    _interned = CompactInventoryItem._interned | {'emergency_type'}
+    _dataclass = data_models.NGOSupply
+
+    def _post_init(self):
+        if self.kit_contents is None:
+            object.__setattr__(self, 'kit_contents', [])
+
+
+class CompactSectorConfig(SlottedModel):
+    """Sector configuration data model"""
+    __slots__ = ('sector_type', 'criticality_multiplier', 'default_reorder_days', 'priority_level')
+    _fields = __slots__
+    _dataclass = data_models.SectorConfig
+
+
+class FrozenSectorConfig(CompactSectorConfig):
+    """Immutable sector configuration"""
+    __slots__ = ()
+    _frozen = True
@@ -0,0 +1,294 @@
+"""
+Columnar inventory store for InventoryQ OS
+Holds inventory items as NumPy columns with dictionary-encoded categoricals
+and evaluates days remaining, criticality and status over the whole set at once
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from datetime import datetime
+
+import numpy as np
+
+from src.models.data_models import InventoryItem, Location, SectorType
+
+
+STATUS_LABELS = ('CRITICAL', 'WARNING', 'NORMAL')
+STATUS_CRITICAL, STATUS_WARNING, STATUS_NORMAL = range(len(STATUS_LABELS))
+
+CATEGORICAL_COLUMNS = ('organization_id', 'sector_type', 'item_type', 'city', 'state', 'country')
+NUMERIC_COLUMNS = (
+    'current_stock', 'daily_consumption_rate', 'reorder_point',
+    'critical_threshold', 'latitude', 'longitude'
+)
+MISSING_CODE = -1
+INITIAL_CAPACITY = 1024
+
+
+class CategoryDictionary:
+    """String dictionary for one categorical column"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        """Code for a value, adding it to the dictionary if unseen"""
+        if value is None:
+            return MISSING_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: Optional[str]) -> Optional[int]:
+        """Existing code for a value without growing the dictionary"""
+        if value is None:
+            return MISSING_CODE
+        return self.codes.get(value)
+
+    def decode(self, code: int) -> Optional[str]:
+        return None if code == MISSING_CODE else self.values[code]
+
+    def copy(self) -> 'CategoryDictionary':
+        """Independent dictionary with the same codes"""
+        clone = CategoryDictionary()
+        clone.values = list(self.values)
+        clone.codes = dict(self.codes)
+        return clone
+
+
+class InventoryFrame:
+    """Array-backed store of inventory items with lazy InventoryItem views"""
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        capacity = max(1, capacity)
+        self._size = 0
+        self.inventory_ids: List[str] = []
+        self._row_by_id: Dict[str, int] = {}
+        self.dictionaries: Dict[str, CategoryDictionary] = {
+            column: CategoryDictionary() for column in CATEGORICAL_COLUMNS
+        }
+        self._codes: Dict[str, np.ndarray] = {
+            column: np.full(capacity, MISSING_CODE, dtype=np.int32) for column in CATEGORICAL_COLUMNS
+        }
+        self._numeric: Dict[str, np.ndarray] = {
+            column: np.full(capacity, np.nan, dtype=np.float64) for column in NUMERIC_COLUMNS
+        }
+        self._last_updated = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[us]')
+
+    @classmethod
+    def from_items(cls, items: Iterable[InventoryItem]) -> 'InventoryFrame':
+        """Build a frame from InventoryItem objects"""
+        items = list(items)
+        frame = cls(capacity=len(items) or INITIAL_CAPACITY)
+        frame.extend(items)
+        return frame
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, inventory_id: str) -> bool:
+        return inventory_id in self._row_by_id
+
+    def _reserve(self, needed: int):
+        """Grow every column geometrically so appends are amortized O(1)"""
+        capacity = len(self._last_updated)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for column, codes in self._codes.items():
+            grown = np.full(new_capacity, MISSING_CODE, dtype=np.int32)
+            grown[:self._size] = codes[:self._size]
+            self._codes[column] = grown
+        for column, values in self._numeric.items():
+            grown = np.full(new_capacity, np.nan, dtype=np.float64)
+            grown[:self._size] = values[:self._size]
+            self._numeric[column] = grown
+        grown_dates = np.full(new_capacity, np.datetime64('NaT'), dtype='datetime64[us]')
+        grown_dates[:self._size] = self._last_updated[:self._size]
+        self._last_updated = grown_dates
+
+    def append(self, item: InventoryItem) -> bool:
+        """Append one item; returns False for a duplicate inventory_id"""
+        return self.extend([item]) == 1
+
+    def extend(self, items: Iterable[InventoryItem]) -> int:
+        """
+        Append items, skipping duplicate inventory_ids
+
+        Returns:
+            Number of items added
+        """
+        items = list(items)
+        self._reserve(self._size + len(items))
+        added = 0
+        for item in items:
+            if item.inventory_id in self._row_by_id:
+                continue
+            row = self._size
+            location = item.location
+            self._codes['organization_id'][row] = self.dictionaries['organization_id'].encode(item.organization_id)
+            self._codes['sector_type'][row] = self.dictionaries['sector_type'].encode(
+                item.sector_type.value if isinstance(item.sector_type, SectorType) else item.sector_type
+            )
+            self._codes['item_type'][row] = self.dictionaries['item_type'].encode(item.item_type)
+            self._codes['city'][row] = self.dictionaries['city'].encode(location.city if location else None)
+            self._codes['state'][row] = self.dictionaries['state'].encode(location.state if location else None)
+            self._codes['country'][row] = self.dictionaries['country'].encode(location.country if location else None)
+
+            self._numeric['current_stock'][row] = item.current_stock
+            self._numeric['daily_consumption_rate'][row] = item.daily_consumption_rate
+            self._numeric['reorder_point'][row] = item.reorder_point
+            self._numeric['critical_threshold'][row] = item.critical_threshold
+            if location is not None:
+                self._numeric['latitude'][row] = np.nan if location.latitude is None else location.latitude
+                self._numeric['longitude'][row] = np.nan if location.longitude is None else location.longitude
+            if item.last_updated is not None:
+                self._last_updated[row] = np.datetime64(item.last_updated, 'us')
+
+            self.inventory_ids.append(item.inventory_id)
+            self._row_by_id[item.inventory_id] = row
+            self._size += 1
+            added += 1
+        return added
+
+    def numeric(self, column: str) -> np.ndarray:
+        """Read-only view of a numeric column"""
+        view = self._numeric[column][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def codes(self, column: str) -> np.ndarray:
+        """Read-only view of a categorical column's codes"""
+        view = self._codes[column][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def categories(self, column: str) -> List[str]:
+        """Distinct values of a categorical column, indexed by code"""
+        return list(self.dictionaries[column].values)
+
+    def mask(self, column: str, value: str) -> np.ndarray:
+        """Boolean mask of rows where a categorical column equals value"""
+        if isinstance(value, SectorType):
+            value = value.value
+        code = self.dictionaries[column].lookup(value)
+        if code is None:
+            return np.zeros(self._size, dtype=bool)
+        return self._codes[column][:self._size] == code
+
+    def days_remaining(self) -> np.ndarray:
+        """Days until stockout for every item (inf when consumption <= 0)"""
+        stock = self._numeric['current_stock'][:self._size]
+        rate = self._numeric['daily_consumption_rate'][:self._size]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            days = stock / rate
+        return np.where(rate <= 0, np.inf, days)
+
+    def is_critical(self) -> np.ndarray:
+        """Boolean mask of items at or below their critical threshold"""
+        return self.days_remaining() <= self._numeric['critical_threshold'][:self._size]
+
+    def status_codes(self) -> np.ndarray:
+        """
+        Status per item using the unified_inventory_view rules
+
+        CRITICAL when days remaining <= critical_threshold, WARNING when
+        days remaining <= reorder_point, otherwise NORMAL.
+        """
+        days = self.days_remaining()
+        return np.select(
+            [days <= self._numeric['critical_threshold'][:self._size],
+             days <= self._numeric['reorder_point'][:self._size]],
+            [STATUS_CRITICAL, STATUS_WARNING],
+            default=STATUS_NORMAL
+        ).astype(np.int8)
+
+    def status_labels(self) -> np.ndarray:
+        """Status strings per item"""
+        return np.asarray(STATUS_LABELS, dtype=object)[self.status_codes()]
+
+    def status_counts(self) -> Dict[str, int]:
+        """Count of items per status"""
+        counts = np.bincount(self.status_codes(), minlength=len(STATUS_LABELS))
+        return {label: int(counts[code]) for code, label in enumerate(STATUS_LABELS)}
+
+    def select(self, mask: np.ndarray) -> 'InventoryFrame':
+        """New frame holding only the rows where mask is True"""
+        rows = np.flatnonzero(mask)
+        subset = InventoryFrame(capacity=len(rows) or 1)
+        # Same codes, but appends to the subset must not grow the parent's dictionaries
+        subset.dictionaries = {column: dictionary.copy() for column, dictionary in self.dictionaries.items()}
+        for column in CATEGORICAL_COLUMNS:
+            subset._codes[column][:len(rows)] = self._codes[column][rows]
+        for column in NUMERIC_COLUMNS:
+            subset._numeric[column][:len(rows)] = self._numeric[column][rows]
+        subset._last_updated[:len(rows)] = self._last_updated[rows]
+        subset.inventory_ids = [self.inventory_ids[row] for row in rows]
+        subset._row_by_id = {inventory_id: i for i, inventory_id in enumerate(subset.inventory_ids)}
+        subset._size = len(rows)
+        return subset
+
+    def item(self, row: int) -> InventoryItem:
+        """Materialize the InventoryItem for one row"""
+        if row < 0:
+            row += self._size
+        if not 0 <= row < self._size:
+            raise IndexError(row)
+
+        def decode(column: str) -> Optional[str]:
+            return self.dictionaries[column].decode(int(self._codes[column][row]))
+
+        def optional_float(column: str) -> Optional[float]:
+            value = self._numeric[column][row]
+            return None if np.isnan(value) else float(value)
+
+        last_updated = self._last_updated[row]
+        return InventoryItem(
+            inventory_id=self.inventory_ids[row],
+            organization_id=decode('organization_id'),
+            sector_type=SectorType(decode('sector_type')),
+            item_type=decode('item_type'),
+            current_stock=float(self._numeric['current_stock'][row]),
+            daily_consumption_rate=float(self._numeric['daily_consumption_rate'][row]),
+            reorder_point=float(self._numeric['reorder_point'][row]),
+            critical_threshold=float(self._numeric['critical_threshold'][row]),
+            location=Location(
+                city=decode('city'),
+                state=decode('state'),
+                country=decode('country'),
+                latitude=optional_float('latitude'),
+                longitude=optional_float('longitude')
+            ),
+            last_updated=None if np.isnat(last_updated) else last_updated.astype(datetime)
+        )
+
+    def get(self, inventory_id: str) -> Optional[InventoryItem]:
+        """Materialize an item by id, or None if absent"""
+        row = self._row_by_id.get(inventory_id)
+        return None if row is None else self.item(row)
+
+    def items(self, rows: Optional[Sequence[int]] = None) -> Iterator[InventoryItem]:
+        """Lazily materialize items for the given rows (all rows by default)"""
+        for row in (range(self._size) if rows is None else rows):
+            yield self.item(int(row))
+
+    def __iter__(self) -> Iterator[InventoryItem]:
+        return self.items()
+
+    def to_pandas(self):
+        """DataFrame view with categorical columns (pandas imported lazily)"""
+        import pandas as pd
+
+        data = {'inventory_id': list(self.inventory_ids)}
+        for column in CATEGORICAL_COLUMNS:
+            data[column] = pd.Categorical.from_codes(
+                self._codes[column][:self._size], categories=self.categories(column)
+            )
+        for column in NUMERIC_COLUMNS:
+            data[column] = self._numeric[column][:self._size].copy()
+        data['last_updated'] = self._last_updated[:self._size].copy()
+        data['days_remaining'] = self.days_remaining()
+        data['status'] = pd.Categorical.from_codes(self.status_codes(), categories=list(STATUS_LABELS))
+        return pd.DataFrame(data)
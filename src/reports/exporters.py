@@ -0,0 +1,460 @@
+"""
+Streaming inventory exports for InventoryQ OS
+Writes CSV, NDJSON, JSON, Excel, Parquet and Arrow IPC chunk by chunk from
+result batches into a spooled temporary file (optionally compressed), so memory
+is bounded by the batch size rather than by the size of the export
+"""
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+import gzip
+import importlib.util
+import io
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.database.incremental_loader import INVENTORY_COLUMNS, SNAPSHOT_VERSION_ATTR
+from src.database.query_layer import fetch_arrow_batches, fetch_batches, register_template
+
+
+EXPORT_CHUNK_ROWS = 50000
+# Exports up to this size stay in memory; larger ones roll over to a temp file
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+READ_CHUNK_BYTES = 1024 * 1024
+EXCEL_MAX_ROWS = 1048576
+EXCEL_SHEET_NAME = 'Inventory_Data'
+
+# Low-cardinality columns written dictionary-encoded in Parquet/Arrow exports
+DICTIONARY_COLUMNS = ('LOCATION_CITY', 'ITEM_TYPE', 'STATUS')
+METADATA_PREFIX = 'inventoryq.'
+
+# Compression choice -> codec inside the file for the columnar formats
+PARQUET_CODECS = {None: 'snappy', 'gzip': 'gzip', 'zstd': 'zstd'}
+ARROW_CODECS = {None: None, 'zstd': 'zstd'}
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """
+    File extension and MIME type of one export format
+
+    Text formats are compressed as a whole (compressible); columnar formats
+    compress inside the file with the codec their codecs map gives.
+    """
+    key: str
+    extension: str
+    mime: str
+    compressible: bool = True
+    codecs: Optional[Mapping[Optional[str], Optional[str]]] = None
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    'csv': ExportFormat('csv', 'csv', 'text/csv'),
+    'ndjson': ExportFormat('ndjson', 'ndjson', 'application/x-ndjson'),
+    'json': ExportFormat('json', 'json', 'application/json'),
+    # xlsx is already a zip container
+    'xlsx': ExportFormat('xlsx', 'xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                         compressible=False),
+    'parquet': ExportFormat('parquet', 'parquet', 'application/vnd.apache.parquet',
+                            compressible=False, codecs=PARQUET_CODECS),
+    'arrow': ExportFormat('arrow', 'arrow', 'application/vnd.apache.arrow.file',
+                          compressible=False, codecs=ARROW_CODECS),
+}
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+# Export Options labels in the reports page
+FORMAT_LABELS = {
+    'Excel (.xlsx)': 'xlsx',
+    'CSV (.csv)': 'csv',
+    'NDJSON (.ndjson)': 'ndjson',
+    'JSON (.json)': 'json',
+    'Parquet (.parquet)': 'parquet',
+    'Arrow IPC (.arrow)': 'arrow',
+}
+
+COMPRESSION_SUFFIXES = {'gzip': ('gz', 'application/gzip'), 'zstd': ('zst', 'application/zstd')}
+
+
+def compression_choices(fmt: Optional[str]) -> List[Optional[str]]:
+    """
+    Compression options that work for a format here (None first)
+
+    Columnar formats offer their codecs; text formats offer gzip, plus zstd
+    when the optional zstandard package is installed. Unknown formats (e.g.
+    the PDF report) and xlsx offer only None.
+    """
+    export_format = EXPORT_FORMATS.get(fmt)
+    if export_format is None:
+        return [None]
+    if export_format.codecs is not None:
+        return list(export_format.codecs)
+    if not export_format.compressible:
+        return [None]
+    return [None] + [compression for compression in COMPRESSION_SUFFIXES
+                     if compression != 'zstd' or importlib.util.find_spec('zstandard') is not None]
+
+
+# Export scopes stream straight from the view; only Summary Report projects columns
+SUMMARY_COLUMNS = ['INVENTORY_ID', 'ITEM_TYPE', 'LOCATION_CITY', 'STATUS', 'DAYS_REMAINING']
+_ORDER_BY = """
+    ORDER BY CASE STATUS WHEN 'CRITICAL' THEN 1 WHEN 'WARNING' THEN 2 ELSE 3 END, DAYS_REMAINING
+"""
+EXPORT_ALL_SQL = register_template('export.inventory.all', f"""
+    SELECT {', '.join(INVENTORY_COLUMNS)} FROM unified_inventory_view
+    {_ORDER_BY}
+""")
+EXPORT_BY_STATUS_SQL = register_template('export.inventory.by_status', f"""
+    SELECT {', '.join(INVENTORY_COLUMNS)} FROM unified_inventory_view
+    WHERE STATUS = :status
+    {_ORDER_BY}
+""")
+EXPORT_SUMMARY_SQL = register_template('export.inventory.summary', f"""
+    SELECT {', '.join(SUMMARY_COLUMNS)} FROM unified_inventory_view
+    {_ORDER_BY}
+""")
+
+
+@dataclass
+class ExportArtifact:
+    """A finished export, rewound and ready to be read or handed to a download button"""
+    file: BinaryIO
+    file_name: str
+    mime: str
+    format: str
+    compression: Optional[str]
+    rows: int
+    size_bytes: int
+
+    def iter_bytes(self, chunk_bytes: int = READ_CHUNK_BYTES) -> Iterator[bytes]:
+        """Contents in chunks (for writing to a response or another file)"""
+        self.file.seek(0)
+        while True:
+            chunk = self.file.read(chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+        self.file.seek(0)
+
+    @property
+    def on_disk(self) -> bool:
+        """Whether the spool rolled over to a temporary file"""
+        return bool(getattr(self.file, '_rolled', False))
+
+    def close(self):
+        self.file.close()
+
+
+def frame_batches(df: pd.DataFrame, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Row slices of an in-memory frame (views, no copies)"""
+    chunk_rows = max(1, chunk_rows)
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def scope_batches(session: Any, df_inventory: pd.DataFrame, export_scope: str,
+                  chunk_rows: int = EXPORT_CHUNK_ROWS, arrow: bool = False) -> Iterator[Any]:
+    """
+    Batches for an Export Scope
+
+    Streams from unified_inventory_view through the warehouse session when
+    one is available (as Arrow RecordBatches with arrow=True), otherwise
+    slices the in-memory snapshot.
+    """
+    if session is not None:
+        fetch = fetch_arrow_batches if arrow else fetch_batches
+        if export_scope == "Critical Items Only":
+            return fetch(session, EXPORT_BY_STATUS_SQL, {'status': 'CRITICAL'}, chunk_rows)
+        if export_scope == "Summary Report":
+            return fetch(session, EXPORT_SUMMARY_SQL, None, chunk_rows)
+        return fetch(session, EXPORT_ALL_SQL, None, chunk_rows)
+
+    if export_scope == "Critical Items Only":
+        df_inventory = df_inventory[df_inventory['STATUS'] == 'CRITICAL']
+    elif export_scope == "Summary Report":
+        df_inventory = df_inventory[[column for column in SUMMARY_COLUMNS if column in df_inventory]]
+    return frame_batches(df_inventory, chunk_rows)
+
+
+def scope_columns(df_inventory: pd.DataFrame, export_scope: str) -> List[str]:
+    """Header columns for a scope (used when the export has no rows)"""
+    columns = SUMMARY_COLUMNS if export_scope == "Summary Report" else list(df_inventory.columns)
+    return columns or list(INVENTORY_COLUMNS)
+
+
+def _compressed(sink: BinaryIO, compression: Optional[str]) -> BinaryIO:
+    """Binary writer compressing into sink (closing it finishes the stream, not the sink)"""
+    if compression is None:
+        return _Unclosable(sink)
+    if compression == 'gzip':
+        # mtime=0 keeps identical exports byte-identical
+        return gzip.GzipFile(fileobj=sink, mode='wb', mtime=0)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError as error:
+            raise ValueError("zstd compression needs the zstandard package") from error
+        return zstandard.ZstdCompressor().stream_writer(sink, closefd=False)
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+class _Unclosable(io.RawIOBase):
+    """Pass-through writer whose close() leaves the underlying file open"""
+
+    def __init__(self, sink: BinaryIO):
+        self.sink = sink
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return self.sink.write(data)
+
+
+def _write_text(fmt: str, out: io.TextIOBase, batches: Iterable[pd.DataFrame], columns: Sequence[str]) -> int:
+    """CSV, NDJSON or JSON text, one batch at a time"""
+    rows = 0
+    header_written = False
+    if fmt == 'json':
+        out.write('[')
+    for batch in batches:
+        if fmt == 'csv':
+            batch.to_csv(out, index=False, header=not header_written, lineterminator='\n')
+            header_written = True
+        elif len(batch):
+            if fmt == 'ndjson':
+                text = batch.to_json(orient='records', lines=True)
+                out.write(text if text.endswith('\n') else text + '\n')
+            else:
+                out.write(('\n' if rows == 0 else ',\n') + batch.to_json(orient='records')[1:-1])
+        rows += len(batch)
+    if fmt == 'csv' and not header_written:
+        out.write(','.join(columns) + '\n')
+    if fmt == 'json':
+        out.write('\n]' if rows else ']')
+    return rows
+
+
+def _excel_value(value: Any) -> Any:
+    """openpyxl-compatible cell value"""
+    if value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _write_xlsx(sink: BinaryIO, batches: Iterable[pd.DataFrame], columns: Sequence[str]) -> int:
+    """Write-only workbook (rows are flushed as they are appended), new sheet every EXCEL_MAX_ROWS"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet, sheet_rows, sheets, rows = None, 0, 0, 0
+    header = list(columns)
+    for batch in batches:
+        header = list(batch.columns)
+        for record in batch.itertuples(index=False, name=None):
+            if sheet is None or sheet_rows >= EXCEL_MAX_ROWS:
+                sheets += 1
+                sheet = workbook.create_sheet(EXCEL_SHEET_NAME if sheets == 1 else f"{EXCEL_SHEET_NAME}_{sheets}")
+                sheet.append(header)
+                sheet_rows = 1
+            sheet.append([_excel_value(value) for value in record])
+            sheet_rows += 1
+            rows += 1
+    if sheet is None:
+        workbook.create_sheet(EXCEL_SHEET_NAME).append(header)
+    workbook.save(sink)
+    return rows
+
+
+class _DictionaryEncoder:
+    """
+    Dictionary-encodes string columns against one growing dictionary per column
+
+    Each batch's dictionary extends the previous one, so Arrow IPC files can
+    carry dictionary deltas instead of (unsupported) replacements.
+    """
+
+    def __init__(self, columns: Sequence[str]):
+        import pyarrow as pa
+
+        self.dictionaries = {column: pa.array([], type=pa.string()) for column in columns}
+
+    def encode(self, column: str, array: Any) -> Any:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if pa.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+        array = array.cast(pa.string())
+        dictionary = self.dictionaries[column]
+        uniques = pc.unique(array).drop_null()
+        unseen = pc.filter(uniques, pc.invert(pc.is_in(uniques, value_set=dictionary)))
+        if len(unseen):
+            dictionary = pa.concat_arrays([dictionary, unseen])
+            self.dictionaries[column] = dictionary
+        indices = pc.index_in(array, value_set=dictionary).cast(pa.int32())
+        return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+
+def _record_batches(batches: Iterable[Any]) -> Iterator[Any]:
+    """Arrow RecordBatches from Arrow batches/tables or DataFrames (one schema for all DataFrames)"""
+    import pyarrow as pa
+
+    schema = None
+    for batch in batches:
+        if isinstance(batch, pa.RecordBatch):
+            yield batch
+        elif isinstance(batch, pa.Table):
+            yield from batch.to_batches()
+        else:
+            if schema is None:
+                schema = pa.Schema.from_pandas(batch, preserve_index=False)
+                # All-null columns in the first batch would pin a null type
+                for index, field in enumerate(schema):
+                    if pa.types.is_null(field.type):
+                        schema = schema.set(index, field.with_type(pa.string()))
+            yield pa.RecordBatch.from_pandas(batch, schema=schema, preserve_index=False)
+
+
+def _write_columnar(fmt: str, sink: BinaryIO, batches: Iterable[Any], columns: Sequence[str],
+                    codec: Optional[str], metadata: Mapping[str, str]) -> int:
+    """Parquet (one row group per batch) or Arrow IPC file with dictionary-encoded categoricals"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    encoder = _DictionaryEncoder(DICTIONARY_COLUMNS)
+    schema_metadata = {f"{METADATA_PREFIX}{key}": str(value) for key, value in metadata.items()}
+    schema, writer, rows = None, None, 0
+
+    def open_writer(schema):
+        if fmt == 'parquet':
+            return pq.ParquetWriter(sink, schema, compression=codec)
+        options = pa.ipc.IpcWriteOptions(compression=codec, emit_dictionary_deltas=True)
+        return pa.ipc.new_file(sink, schema, options=options)
+
+    try:
+        for batch in _record_batches(batches):
+            arrays = [encoder.encode(name, array) if name in encoder.dictionaries else array
+                      for name, array in zip(batch.schema.names, batch.columns)]
+            batch = pa.RecordBatch.from_arrays(arrays, names=batch.schema.names)
+            if schema is None:
+                schema = batch.schema.with_metadata(schema_metadata)
+                writer = open_writer(schema)
+            elif not batch.schema.equals(schema, check_metadata=False):
+                # Driver chunks can differ in numeric width; conform to the first chunk
+                batch = pa.Table.from_batches([batch]).cast(schema).combine_chunks().to_batches()[0]
+            if fmt == 'parquet':
+                writer.write_table(pa.Table.from_batches([batch], schema=schema))
+            else:
+                writer.write_batch(batch)
+            rows += batch.num_rows
+        if writer is None:
+            string_type = pa.dictionary(pa.int32(), pa.string())
+            schema = pa.schema([(column, string_type if column in encoder.dictionaries else pa.string())
+                                for column in columns], metadata=schema_metadata)
+            writer = open_writer(schema)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def read_columnar(source: Any) -> pd.DataFrame:
+    """
+    Read a Parquet or Arrow IPC export back (for re-ingest)
+
+    Dictionary-encoded columns come back as categoricals and the export
+    metadata (e.g. snapshot_version) as DataFrame.attrs.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+        magic = source.read(6)
+        source.seek(0)
+    else:
+        with open(source, 'rb') as handle:
+            magic = handle.read(6)
+    table = pq.read_table(source) if magic[:4] == b'PAR1' else pa.ipc.open_file(source).read_all()
+
+    metadata = {key.decode('utf-8'): value.decode('utf-8') for key, value in (table.schema.metadata or {}).items()}
+    df = table.to_pandas()
+    for key, value in metadata.items():
+        if key.startswith(METADATA_PREFIX):
+            name = key[len(METADATA_PREFIX):]
+            df.attrs[name] = int(value) if value.isdigit() else value
+    return df
+
+
+def export_batches(batches: Iterable[Any], fmt: str, compression: Optional[str] = None,
+                   columns: Sequence[str] = (), file_stem: str = 'inventory_export',
+                   spool_max_bytes: int = SPOOL_MAX_BYTES,
+                   metadata: Optional[Mapping[str, Any]] = None) -> ExportArtifact:
+    """
+    Write an export from result batches
+
+    Args:
+        batches: DataFrames (fetch_batches, frame_batches) or, for Parquet and
+            Arrow, pyarrow RecordBatches/Tables (fetch_arrow_batches)
+        fmt: 'csv', 'ndjson', 'json', 'xlsx', 'parquet' or 'arrow'
+        compression: None, 'gzip' or 'zstd' (ignored for xlsx; a codec inside
+            the file for Parquet, zstd only for Arrow)
+        columns: Header to write when there are no batches
+        file_stem: Download file name without timestamp or extension
+        spool_max_bytes: Size above which the export is spooled to disk
+        metadata: Key/values stored in the Parquet/Arrow schema metadata
+
+    Returns:
+        ExportArtifact rewound to the start of the file
+    """
+    export_format = EXPORT_FORMATS.get(fmt)
+    if export_format is None:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if export_format.codecs is not None and compression not in export_format.codecs:
+        raise ValueError(f"{fmt} exports support {', '.join(str(c) for c in export_format.codecs)} compression")
+    if export_format.codecs is None and not export_format.compressible:
+        compression = None
+    elif compression is not None and compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}")
+
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_max_bytes, mode='w+b')
+    try:
+        if fmt in COLUMNAR_FORMATS:
+            rows = _write_columnar(fmt, spool, batches, columns, export_format.codecs[compression],
+                                   metadata or {})
+        elif fmt == 'xlsx':
+            rows = _write_xlsx(spool, batches, columns)
+        else:
+            writer = _compressed(spool, compression)
+            text = io.TextIOWrapper(writer, encoding='utf-8', newline='', write_through=True)
+            rows = _write_text(fmt, text, batches, columns)
+            text.flush()
+            text.detach()
+            writer.close()
+    except BaseException:
+        spool.close()
+        raise
+
+    size_bytes = spool.tell()
+    spool.seek(0)
+    name = f"{file_stem}_{datetime.now().strftime('%Y%m%d_%H%M')}.{export_format.extension}"
+    mime = export_format.mime
+    if compression is not None and export_format.compressible:
+        suffix, mime = COMPRESSION_SUFFIXES[compression]
+        name = f"{name}.{suffix}"
+    return ExportArtifact(spool, name, mime, fmt, compression, rows, size_bytes)
+
+
+def export_frame(df: pd.DataFrame, fmt: str, compression: Optional[str] = None,
+                 chunk_rows: int = EXPORT_CHUNK_ROWS, **kwargs) -> ExportArtifact:
+    """export_batches over an in-memory frame (its snapshot version goes into columnar metadata)"""
+    version = df.attrs.get(SNAPSHOT_VERSION_ATTR)
+    if version is not None:
+        kwargs['metadata'] = {SNAPSHOT_VERSION_ATTR: version, **kwargs.get('metadata', {})}
+    return export_batches(frame_batches(df, chunk_rows), fmt, compression, columns=list(df.columns), **kwargs)
@@ -0,0 +1,420 @@
+"""
+Background report jobs for InventoryQ OS
+Builds reports on a small worker pool and keeps every result in a
+content-addressed on-disk cache keyed by (report type, parameters, snapshot
+version), so repeat requests are served from disk and the common reports are
+prebuilt as soon as a new snapshot arrives
+"""
+from typing import Any, BinaryIO, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+from src.analytics.kpi_engine import snapshot_fingerprint
+from src.reports.exporters import READ_CHUNK_BYTES, ExportArtifact
+
+
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'inventoryq_reports')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_WORKERS = 2
+DEFAULT_PREBUILD_INTERVAL_S = 60
+PREBUILT_VERSIONS_KEPT = 8
+
+# Snapshot versions come from a per-process counter, so persisted keys built
+# from them are scoped to this process; content fingerprints are not
+BOOT_ID = uuid.uuid4().hex
+
+JSON_MIME = 'application/json'
+
+# A builder returns an ExportArtifact, raw bytes, or a JSON-serializable payload
+ReportBuilder = Callable[..., Any]
+PrebuildRequest = Tuple[str, Mapping[str, Any]]
+
+
+def job_key(report_type: str, params: Optional[Mapping[str, Any]], snapshot_version: Hashable) -> str:
+    """Stable hex key of (report type, parameters, snapshot version)"""
+    canonical = json.dumps([report_type, dict(params or {}), snapshot_version],
+                           sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def artifact_snapshot_key(df_inventory: pd.DataFrame) -> Hashable:
+    """snapshot_fingerprint made safe for the on-disk cache, which outlives the process"""
+    fingerprint = snapshot_fingerprint(df_inventory)
+    if fingerprint[0] == 'version':
+        return (BOOT_ID,) + tuple(fingerprint)
+    return fingerprint
+
+
+@dataclass(frozen=True)
+class CachedReport:
+    """A finished report on disk (the blob is shared by every key with the same content)"""
+    key: str
+    report_type: str
+    digest: str
+    path: str
+    file_name: str
+    mime: str
+    size_bytes: int
+    created_at: float
+
+    def open(self) -> BinaryIO:
+        return open(self.path, 'rb')
+
+    def read_bytes(self) -> bytes:
+        with self.open() as handle:
+            return handle.read()
+
+    def payload(self) -> Any:
+        """Decoded JSON payload (quick reports)"""
+        return json.loads(self.read_bytes().decode('utf-8'))
+
+
+class ArtifactStore:
+    """
+    Content-addressed report cache on disk with LRU eviction
+
+    Blobs live under objects/<sha256[:2]>/<sha256> and keys under
+    keys/<key>.json; a blob is deleted once no key refers to it. Entries are
+    evicted least recently used first when the unique blob bytes exceed
+    max_bytes or the key count exceeds max_entries. The index is rebuilt from
+    the keys directory on start, so the cache survives restarts.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max(1, max_entries)
+        self._objects = os.path.join(root, 'objects')
+        self._keys = os.path.join(root, 'keys')
+        os.makedirs(self._objects, exist_ok=True)
+        os.makedirs(self._keys, exist_ok=True)
+        self._entries: "OrderedDict[str, CachedReport]" = OrderedDict()
+        self._refs: Dict[str, int] = {}
+        self._blob_sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'deduplicated': 0, 'evictions': 0}
+        self._load_index()
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self._objects, digest[:2], digest)
+
+    def _key_path(self, key: str) -> str:
+        return os.path.join(self._keys, f"{key}.json")
+
+    def _load_index(self):
+        records = []
+        for name in os.listdir(self._keys):
+            path = os.path.join(self._keys, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as handle:
+                    record = json.load(handle)
+                records.append((os.path.getmtime(path), record))
+            except (OSError, ValueError):
+                continue
+        # Oldest access first, so the OrderedDict starts in LRU order
+        for _, record in sorted(records, key=lambda item: item[0]):
+            entry = CachedReport(path=self._blob_path(record['digest']), **record)
+            if os.path.exists(entry.path):
+                self._add(entry)
+            else:
+                self._remove_file(self._key_path(entry.key))
+        self._evict()
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._blob_sizes.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[CachedReport]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not os.path.exists(entry.path):
+                if entry is not None:
+                    self._drop(key)
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+        try:
+            os.utime(self._key_path(key))
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key: str, report_type: str, source: Any, file_name: str, mime: str) -> CachedReport:
+        """
+        Store a report under key
+
+        Args:
+            key: job_key of the report
+            report_type: Report name (for status displays)
+            source: bytes or a binary file object (read from the start, in chunks)
+            file_name: Download file name
+            mime: MIME type
+
+        Returns:
+            The cached entry
+        """
+        digest, size_bytes, temp_path = self._write_blob(source)
+        blob_path = self._blob_path(digest)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        with self._lock:
+            if os.path.exists(blob_path):
+                os.remove(temp_path)
+                self.stats['deduplicated'] += 1
+            else:
+                os.replace(temp_path, blob_path)
+            entry = CachedReport(key=key, report_type=report_type, digest=digest, path=blob_path,
+                                 file_name=file_name, mime=mime, size_bytes=size_bytes, created_at=time.time())
+            if key in self._entries:
+                self._drop(key, keep_blob=digest)
+            self._write_key(entry)
+            self._add(entry)
+            self.stats['stores'] += 1
+            self._evict()
+        return entry
+
+    def _write_blob(self, source: Any) -> Tuple[str, int, str]:
+        digest = hashlib.sha256()
+        size_bytes = 0
+        handle, temp_path = tempfile.mkstemp(dir=self._objects, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as out:
+                if isinstance(source, (bytes, bytearray)):
+                    chunks: Iterable[bytes] = (bytes(source),)
+                else:
+                    source.seek(0)
+                    chunks = iter(lambda: source.read(READ_CHUNK_BYTES), b'')
+                for chunk in chunks:
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size_bytes += len(chunk)
+        except BaseException:
+            self._remove_file(temp_path)
+            raise
+        return digest.hexdigest(), size_bytes, temp_path
+
+    def _write_key(self, entry: CachedReport):
+        record = {name: getattr(entry, name) for name in
+                  ('key', 'report_type', 'digest', 'file_name', 'mime', 'size_bytes', 'created_at')}
+        handle, temp_path = tempfile.mkstemp(dir=self._keys, suffix='.tmp')
+        with os.fdopen(handle, 'w', encoding='utf-8') as out:
+            json.dump(record, out)
+        os.replace(temp_path, self._key_path(entry.key))
+
+    def _add(self, entry: CachedReport):
+        self._entries[entry.key] = entry
+        self._refs[entry.digest] = self._refs.get(entry.digest, 0) + 1
+        self._blob_sizes[entry.digest] = entry.size_bytes
+
+    def _drop(self, key: str, keep_blob: Optional[str] = None):
+        """Forget a key and delete its blob once unreferenced (lock held)"""
+        entry = self._entries.pop(key)
+        self._remove_file(self._key_path(key))
+        self._refs[entry.digest] -= 1
+        if self._refs[entry.digest] == 0:
+            del self._refs[entry.digest]
+            del self._blob_sizes[entry.digest]
+            if entry.digest != keep_blob:
+                self._remove_file(entry.path)
+
+    def _evict(self):
+        # The newest entry always stays, even when it alone exceeds max_bytes
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries
+                                          or self.total_bytes > self.max_bytes):
+            self._drop(next(iter(self._entries)))
+            self.stats['evictions'] += 1
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+
+class ReportJobs:
+    """
+    Report job queue over a worker pool, backed by an ArtifactStore
+
+    submit() answers from the store when the report for this snapshot was
+    already built, joins a job that is still running for the same key, and
+    otherwise queues one. prebuild() queues a list of reports ahead of time;
+    start_prebuild() does so from a background thread whenever the snapshot
+    version changes (e.g. after the overnight load, before the morning rush).
+    """
+
+    def __init__(self, builders: Mapping[str, ReportBuilder], store: Optional[ArtifactStore] = None,
+                 workers: int = DEFAULT_WORKERS):
+        self.builders = dict(builders)
+        self.store = store if store is not None else ArtifactStore()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='report-job')
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._prebuild_thread: Optional[threading.Thread] = None
+        self._prebuild_stop = threading.Event()
+        self._prebuilt_versions: "OrderedDict[Hashable, None]" = OrderedDict()
+        self.stats = {'cached': 0, 'coalesced': 0, 'built': 0, 'errors': 0, 'prebuilt': 0}
+
+    def key(self, report_type: str, df_inventory: pd.DataFrame, params: Optional[Mapping[str, Any]] = None) -> str:
+        return job_key(report_type, params, artifact_snapshot_key(df_inventory))
+
+    def cached(self, report_type: str, df_inventory: pd.DataFrame,
+               params: Optional[Mapping[str, Any]] = None) -> Optional[CachedReport]:
+        """The stored report for this snapshot, without building it"""
+        return self.store.get(self.key(report_type, df_inventory, params))
+
+    def running(self, report_type: str, df_inventory: pd.DataFrame,
+                params: Optional[Mapping[str, Any]] = None) -> bool:
+        with self._lock:
+            future = self._inflight.get(self.key(report_type, df_inventory, params))
+        return future is not None and not future.done()
+
+    def submit(self, report_type: str, df_inventory: pd.DataFrame, params: Optional[Mapping[str, Any]] = None,
+               **context) -> "Future[CachedReport]":
+        """
+        Queue a report unless it is cached or already running
+
+        Args:
+            report_type: A registered builder name
+            df_inventory: Inventory snapshot (read-only; its version is part of the key)
+            params: Report parameters (part of the key; JSON-serializable)
+            **context: Extra builder arguments that do not change the result (e.g. a session)
+
+        Returns:
+            Future resolving to the CachedReport
+        """
+        if report_type not in self.builders:
+            raise ValueError(f"Unknown report type: {report_type}")
+        key = self.key(report_type, df_inventory, params)
+        cached = self.store.get(key)
+        with self._lock:
+            if cached is not None:
+                self.stats['cached'] += 1
+                future: Future = Future()
+                future.set_result(cached)
+                return future
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future
+            future = self._executor.submit(self._build, key, report_type, df_inventory, dict(params or {}), context)
+            self._inflight[key] = future
+        future.add_done_callback(lambda _: self._finished(key, future))
+        return future
+
+    def get(self, report_type: str, df_inventory: pd.DataFrame, params: Optional[Mapping[str, Any]] = None,
+            timeout: Optional[float] = None, **context) -> CachedReport:
+        """Cached report, or wait for it to be built"""
+        return self.submit(report_type, df_inventory, params, **context).result(timeout)
+
+    def _finished(self, key: str, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _build(self, key: str, report_type: str, df_inventory: pd.DataFrame, params: Dict[str, Any],
+               context: Dict[str, Any]) -> CachedReport:
+        try:
+            output = self.builders[report_type](df_inventory, **params, **context)
+            if isinstance(output, ExportArtifact):
+                try:
+                    entry = self.store.put(key, report_type, output.file, output.file_name, output.mime)
+                finally:
+                    output.close()
+            elif isinstance(output, (bytes, bytearray)):
+                entry = self.store.put(key, report_type, output, f"{report_type}.bin", 'application/octet-stream')
+            else:
+                data = json.dumps(output, separators=(',', ':'), default=str).encode('utf-8')
+                entry = self.store.put(key, report_type, data, f"{report_type}.json", JSON_MIME)
+        except BaseException:
+            with self._lock:
+                self.stats['errors'] += 1
+            raise
+        with self._lock:
+            self.stats['built'] += 1
+        return entry
+
+    def prebuild(self, df_inventory: pd.DataFrame, requests: Iterable[PrebuildRequest],
+                 **context) -> List["Future[CachedReport]"]:
+        """Queue every (report type, params) request that is not cached yet for this snapshot"""
+        futures = []
+        for report_type, params in requests:
+            if self.store.get(self.key(report_type, df_inventory, params)) is None:
+                futures.append(self.submit(report_type, df_inventory, params, **context))
+        with self._lock:
+            self.stats['prebuilt'] += len(futures)
+        return futures
+
+    def prebuild_if_new(self, df_inventory: pd.DataFrame, requests: Iterable[PrebuildRequest],
+                        **context) -> List["Future[CachedReport]"]:
+        """prebuild() once per snapshot version"""
+        version = snapshot_fingerprint(df_inventory)
+        with self._lock:
+            if version in self._prebuilt_versions:
+                return []
+            self._prebuilt_versions[version] = None
+            while len(self._prebuilt_versions) > PREBUILT_VERSIONS_KEPT:
+                self._prebuilt_versions.popitem(last=False)
+        return self.prebuild(df_inventory, requests, **context)
+
+    def start_prebuild(self, snapshot_fn: Callable[[], pd.DataFrame], requests: Iterable[PrebuildRequest],
+                       interval_s: float = DEFAULT_PREBUILD_INTERVAL_S, **context):
+        """
+        Poll snapshot_fn every interval_s seconds and prebuild for each new snapshot
+
+        Idempotent: a second call while the thread runs does nothing.
+        """
+        requests = list(requests)
+        with self._lock:
+            if self._prebuild_thread is not None and self._prebuild_thread.is_alive():
+                return
+            self._prebuild_stop.clear()
+            self._prebuild_thread = threading.Thread(
+                target=self._prebuild_loop, args=(snapshot_fn, requests, interval_s, context),
+                name='report-prebuild', daemon=True
+            )
+            self._prebuild_thread.start()
+
+    def _prebuild_loop(self, snapshot_fn: Callable[[], pd.DataFrame], requests: List[PrebuildRequest],
+                       interval_s: float, context: Dict[str, Any]):
+        while not self._prebuild_stop.is_set():
+            try:
+                self.prebuild_if_new(snapshot_fn(), requests, **context)
+            except Exception:
+                # A failed snapshot load is retried on the next tick
+                with self._lock:
+                    self.stats['errors'] += 1
+            self._prebuild_stop.wait(interval_s)
+
+    def stop_prebuild(self, timeout: Optional[float] = None):
+        self._prebuild_stop.set()
+        thread = self._prebuild_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def shutdown(self, wait: bool = True):
+        self.stop_prebuild()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,125 @@
+"""
+Minimal streaming PDF writer for InventoryQ OS reports
+Writes PDF 1.4 pages (standard Type 1 fonts, text and filled rectangles) to a
+binary sink one page at a time, so only the current page is held in memory
+"""
+from typing import BinaryIO, List, Optional, Sequence, Tuple
+import zlib
+
+
+A4 = (595.0, 842.0)
+
+# Standard 14 fonts need no embedding; resource name -> base font
+FONTS = {'F1': 'Helvetica', 'F2': 'Helvetica-Bold', 'F3': 'Courier'}
+
+_CATALOG, _PAGES = 1, 2
+_FIRST_FONT = 3
+
+_ESCAPES = str.maketrans({'\\': '\\\\', '(': '\\(', ')': '\\)', '\r': ' ', '\n': ' '})
+
+
+def pdf_string(text: str) -> str:
+    """Literal string operand: escaped and limited to characters WinAnsiEncoding can show"""
+    return '(' + str(text).translate(_ESCAPES) + ')'
+
+
+class PdfPage:
+    """Drawing operations for one page (coordinates in points from the bottom-left)"""
+
+    def __init__(self):
+        self._ops: List[str] = []
+
+    def text(self, x: float, y: float, text: str, font: str = 'F1', size: float = 10):
+        self._ops.append(f"BT /{font} {size:g} Tf {x:.2f} {y:.2f} Td {pdf_string(text)} Tj ET")
+
+    def lines(self, x: float, y: float, lines: Sequence[str], font: str = 'F3', size: float = 8,
+              leading: float = 10):
+        """Consecutive lines from a text block (lines must already be pdf_string operands)"""
+        if not lines:
+            return
+        self._ops.append(f"BT /{font} {size:g} Tf {leading:g} TL {x:.2f} {y:.2f} Td {lines[0]} Tj")
+        self._ops.append(' '.join(f"{line} '" for line in lines[1:]))
+        self._ops.append("ET")
+
+    def rect(self, x: float, y: float, width: float, height: float,
+             color: Tuple[float, float, float] = (0.55, 0.36, 0.96)):
+        r, g, b = color
+        self._ops.append(f"{r:.3f} {g:.3f} {b:.3f} rg {x:.2f} {y:.2f} {width:.2f} {height:.2f} re f 0 g")
+
+    def content(self) -> bytes:
+        return '\n'.join(self._ops).encode('cp1252', errors='replace')
+
+
+class PdfWriter:
+    """
+    Streams pages to a binary sink and writes the page tree and xref on close()
+
+    Page content is deflated and written as soon as the page is added; only
+    object offsets and page references are kept until the end.
+    """
+
+    def __init__(self, sink: BinaryIO, page_size: Tuple[float, float] = A4, title: Optional[str] = None):
+        self.sink = sink
+        self.page_size = page_size
+        self.title = title
+        self._position = 0
+        self._offsets = {}
+        self._next_object = _FIRST_FONT + len(FONTS)
+        self._pages: List[int] = []
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data: bytes):
+        self.sink.write(data)
+        self._position += len(data)
+
+    def _object(self, number: int, body: bytes):
+        self._offsets[number] = self._position
+        self._write(f"{number} 0 obj\n".encode('ascii') + body + b"\nendobj\n")
+
+    def _allocate(self) -> int:
+        number = self._next_object
+        self._next_object += 1
+        return number
+
+    @property
+    def page_count(self) -> int:
+        return len(self._pages)
+
+    def add_page(self, page: PdfPage):
+        content = zlib.compress(page.content())
+        stream_number, page_number = self._allocate(), self._allocate()
+        self._object(stream_number, f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode('ascii')
+                     + content + b"\nendstream")
+        width, height = self.page_size
+        self._object(page_number, (
+            f"<< /Type /Page /Parent {_PAGES} 0 R /MediaBox [0 0 {width:g} {height:g}] "
+            f"/Contents {stream_number} 0 R >>"
+        ).encode('ascii'))
+        self._pages.append(page_number)
+
+    def close(self):
+        """Write fonts, page tree, catalog, xref and trailer"""
+        fonts = []
+        for index, (name, base_font) in enumerate(FONTS.items()):
+            number = _FIRST_FONT + index
+            self._object(number, (f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} "
+                                  f"/Encoding /WinAnsiEncoding >>").encode('ascii'))
+            fonts.append(f"/{name} {number} 0 R")
+        kids = ' '.join(f"{number} 0 R" for number in self._pages)
+        # Resources are inherited by every page from the tree root
+        self._object(_PAGES, (f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} "
+                              f"/Resources << /Font << {' '.join(fonts)} >> >> >>").encode('ascii'))
+        info = ''
+        if self.title:
+            info_number = self._allocate()
+            self._object(info_number, f"<< /Title {pdf_string(self.title)} >>".encode('cp1252', errors='replace'))
+            info = f" /Info {info_number} 0 R"
+        self._object(_CATALOG, f"<< /Type /Catalog /Pages {_PAGES} 0 R >>".encode('ascii'))
+
+        xref_at = self._position
+        count = self._next_object
+        entries = ["0000000000 65535 f \n"]
+        entries += [f"{self._offsets.get(number, 0):010d} 00000 n \n" for number in range(1, count)]
+        self._write(f"xref\n0 {count}\n".encode('ascii') + ''.join(entries).encode('ascii'))
+        self._write(f"trailer\n<< /Size {count} /Root {_CATALOG} 0 R{info} >>\nstartxref\n{xref_at}\n%%EOF\n"
+                    .encode('ascii'))
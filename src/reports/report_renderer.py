@@ -0,0 +1,418 @@
+"""
+Inventory report renderer for InventoryQ OS
+Renders the professional report from pre-aggregated tables through templates
+compiled once per process, streaming HTML or PDF chunks into a file or buffer
+"""
+from typing import Any, BinaryIO, Dict, Iterator, List, Mapping, Optional, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+import html
+import re
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.kpi_engine import KpiSnapshot, get_kpis
+from src.reports.exporters import SPOOL_MAX_BYTES, ExportArtifact
+from src.reports.pdf_writer import A4, PdfPage, PdfWriter, pdf_string
+
+
+REPORT_FORMATS = {'html': ('html', 'text/html'), 'pdf': ('pdf', 'application/pdf')}
+CRITICAL_COLUMNS = ['ITEM_TYPE', 'LOCATION_CITY', 'CURRENT_STOCK', 'DAYS_REMAINING', 'STATUS']
+ROWS_PER_CHUNK = 2000
+CHART_CITIES = 10
+
+RECOMMENDATIONS = (
+    "Immediate procurement required for critical items",
+    "Monitor warning items closely for potential stock-outs",
+    "Consider increasing safety stock levels for high-consumption items",
+    "Review supplier lead times and adjust reorder points accordingly",
+    "Implement automated alerts for critical stock levels",
+)
+
+_FIELD = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class CompiledTemplate:
+    """
+    {{ field }} template compiled once into a str.format pattern
+
+    Values are inserted as given; callers pass HTML-escaped text.
+    """
+
+    def __init__(self, source: str):
+        parts = _FIELD.split(source)
+        pattern = []
+        for index, part in enumerate(parts):
+            if index % 2:
+                pattern.append('{' + str(index // 2) + '}')
+            else:
+                pattern.append(part.replace('{', '{{').replace('}', '}}'))
+        self.fields = tuple(parts[1::2])
+        self.pattern = ''.join(pattern)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        return self.pattern.format(*[values[name] for name in self.fields])
+
+    def render_rows(self, columns: Mapping[str, Sequence[str]], start: int = 0,
+                    stop: Optional[int] = None) -> str:
+        """One rendering per row of equally long, pre-formatted columns"""
+        pattern = self.pattern
+        selected = [columns[name][start:stop] for name in self.fields]
+        return ''.join([pattern.format(*row) for row in zip(*selected)])
+
+
+DOCUMENT_HEAD = CompiledTemplate("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>InventoryQ OS - {{report_type}}</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; }
+        .header { background: #8b5cf6; color: white; padding: 20px; text-align: center; }
+        .section { margin: 20px 0; }
+        .metric { display: inline-block; margin: 10px; padding: 15px; border: 1px solid #ddd; }
+        table { width: 100%; border-collapse: collapse; margin: 10px 0; }
+        th, td { border: 1px solid #ddd; padding: 8px; text-align: left; }
+        th { background-color: #f2f2f2; }
+        .critical { background-color: #fee; }
+        .warning { background-color: #fef3cd; }
+        .normal { background-color: #d4edda; }
+        .bar-row { display: flex; align-items: center; margin: 4px 0; }
+        .bar-label { width: 180px; }
+        .bar { background: #ef4444; height: 14px; margin-right: 8px; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>InventoryQ OS - Professional Report</h1>
+        <h2>{{report_type}}</h2>
+        <p>Generated: {{generated}}</p>
+    </div>
+
+    <div class="section">
+        <h2>Executive Summary</h2>
+        <div class="metric"><strong>Total Items:</strong> {{total_items}}</div>
+        <div class="metric"><strong>Critical Items:</strong> {{critical_items}}</div>
+        <div class="metric"><strong>Warning Items:</strong> {{warning_items}}</div>
+        <div class="metric"><strong>Normal Items:</strong> {{normal_items}}</div>
+        <div class="metric"><strong>Average Days Remaining:</strong> {{avg_days}}</div>
+    </div>
+""")
+CHART_OPEN = """
+    <div class="section">
+        <h2>Critical Items by Location</h2>
+"""
+CHART_ROW = CompiledTemplate("""        <div class="bar-row"><span class="bar-label">{{city}}</span><span class="bar" style="width: {{width}}%"></span>{{count}}</div>
+""")
+CHART_CLOSE = """    </div>
+"""
+CRITICAL_TABLE_OPEN = """
+    <div class="section">
+        <h2>Critical Items Requiring Attention</h2>
+        <table>
+            <tr><th>Item Type</th><th>Location</th><th>Current Stock</th><th>Days Remaining</th><th>Status</th></tr>
+"""
+CRITICAL_ROW = CompiledTemplate("""            <tr class="critical"><td>{{item}}</td><td>{{city}}</td><td>{{stock}}</td><td>{{days}}</td><td>{{status}}</td></tr>
+""")
+TABLE_CLOSE = """        </table>
+    </div>
+"""
+RECOMMENDATIONS_BLOCK = """
+    <div class="section">
+        <h2>Recommendations</h2>
+        <ul>
+""" + ''.join(f"            <li>{html.escape(text)}</li>\n" for text in RECOMMENDATIONS) + """        </ul>
+    </div>
+"""
+LOCATION_TABLE_OPEN = """
+    <div class="section">
+        <h2>Location Summary</h2>
+        <table>
+            <tr><th>Location</th><th>Total Items</th><th>Critical Items</th><th>Average Days Supply</th></tr>
+"""
+LOCATION_ROW = CompiledTemplate("""            <tr><td>{{city}}</td><td>{{items}}</td><td>{{critical}}</td><td>{{avg_days}}</td></tr>
+""")
+DOCUMENT_FOOT = CompiledTemplate("""
+    <div class="section">
+        <h2>Report Footer</h2>
+        <p><strong>Report Type:</strong> {{report_type}}</p>
+        <p><strong>Generated By:</strong> InventoryQ OS Enterprise System</p>
+        <p><strong>Data Source:</strong> Snowflake Database</p>
+        <p><strong>Report Date:</strong> {{generated}}</p>
+    </div>
+</body>
+</html>
+""")
+
+
+@dataclass(frozen=True)
+class ReportData:
+    """Everything the report shows, aggregated once before rendering"""
+    report_type: str
+    generated_at: datetime
+    kpis: KpiSnapshot
+    critical: pd.DataFrame
+    locations: pd.DataFrame
+    include_charts: bool = True
+    include_recommendations: bool = True
+
+    @property
+    def generated(self) -> str:
+        return self.generated_at.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def prepare_report(df_inventory: pd.DataFrame, report_type: str, include_charts: bool = True,
+                   include_recommendations: bool = True, kpis: Optional[KpiSnapshot] = None) -> ReportData:
+    """Critical rows (one filter over the snapshot) and the per-city KPI table"""
+    kpis = kpis or get_kpis(df_inventory)
+    columns = [column for column in CRITICAL_COLUMNS if column in df_inventory]
+    critical = df_inventory.loc[df_inventory['STATUS'] == 'CRITICAL', columns] if 'STATUS' in df_inventory \
+        else pd.DataFrame(columns=CRITICAL_COLUMNS)
+    return ReportData(report_type, datetime.now(), kpis, critical, kpis.by_city,
+                      include_charts, include_recommendations)
+
+
+def _text(values: Any, escape: bool = False) -> np.ndarray:
+    """Cell text per value (HTML-escaped if asked), converting each distinct value once"""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    convert = (lambda value: html.escape(str(value))) if escape else str
+    labels = np.array([convert(value) for value in uniques] + [''], dtype=object)
+    return labels[codes]
+
+
+def _number(values: Any, spec: str) -> np.ndarray:
+    numbers = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.array([format(value, spec) for value in numbers.tolist()], dtype=object)
+
+
+def _column(df: pd.DataFrame, column: str) -> pd.Series:
+    return df[column] if column in df else pd.Series(None, index=df.index, dtype=object)
+
+
+def critical_columns(data: ReportData, escape: bool = True) -> Dict[str, np.ndarray]:
+    """Formatted critical-item columns for the row templates"""
+    critical = data.critical
+    return {
+        'item': _text(_column(critical, 'ITEM_TYPE'), escape),
+        'city': _text(_column(critical, 'LOCATION_CITY'), escape),
+        'stock': _number(_column(critical, 'CURRENT_STOCK'), '.0f'),
+        'days': _number(_column(critical, 'DAYS_REMAINING'), '.1f'),
+        'status': _text(_column(critical, 'STATUS'), escape),
+    }
+
+
+def location_columns(data: ReportData, escape: bool = True) -> Dict[str, np.ndarray]:
+    locations = data.locations
+    return {
+        'city': _text(_column(locations, 'LOCATION_CITY'), escape),
+        'items': _number(_column(locations, 'ITEMS'), '.0f'),
+        'critical': _number(_column(locations, 'CRITICAL'), '.0f'),
+        'avg_days': _number(_column(locations, 'AVG_DAYS'), '.1f'),
+    }
+
+
+def chart_rows(data: ReportData) -> pd.DataFrame:
+    """Cities with the most critical items (for the bar chart)"""
+    locations = data.locations
+    if locations.empty or 'CRITICAL' not in locations:
+        return locations.iloc[:0]
+    top = locations[locations['CRITICAL'] > 0].nlargest(CHART_CITIES, 'CRITICAL')
+    return top[['LOCATION_CITY', 'CRITICAL']]
+
+
+def render_html(data: ReportData, rows_per_chunk: int = ROWS_PER_CHUNK) -> Iterator[str]:
+    """The HTML report as a stream of chunks (one per rows_per_chunk table rows)"""
+    kpis = data.kpis
+    yield DOCUMENT_HEAD.render({
+        'report_type': html.escape(data.report_type),
+        'generated': data.generated,
+        'total_items': kpis.total_items,
+        'critical_items': kpis.critical_items,
+        'warning_items': kpis.warning_items,
+        'normal_items': kpis.normal_items,
+        'avg_days': f"{kpis.avg_days:.1f}",
+    })
+
+    if data.include_charts:
+        top = chart_rows(data)
+        if not top.empty:
+            peak = float(top['CRITICAL'].max())
+            yield CHART_OPEN + CHART_ROW.render_rows({
+                'city': _text(top['LOCATION_CITY'], escape=True),
+                'width': _number(top['CRITICAL'] / peak * 70, '.1f'),
+                'count': _number(top['CRITICAL'], '.0f'),
+            }) + CHART_CLOSE
+
+    yield CRITICAL_TABLE_OPEN
+    columns = critical_columns(data)
+    for start in range(0, len(data.critical), max(1, rows_per_chunk)):
+        yield CRITICAL_ROW.render_rows(columns, start, start + rows_per_chunk)
+    yield TABLE_CLOSE
+
+    if data.include_recommendations:
+        yield RECOMMENDATIONS_BLOCK
+
+    yield LOCATION_TABLE_OPEN
+    yield LOCATION_ROW.render_rows(location_columns(data))
+    yield TABLE_CLOSE
+    yield DOCUMENT_FOOT.render({'report_type': html.escape(data.report_type), 'generated': data.generated})
+
+
+# PDF layout (points, A4 portrait)
+MARGIN = 40
+TABLE_SIZE, TABLE_LEADING = 8, 10
+CRITICAL_WIDTHS = (('item', 26, '<'), ('city', 20, '<'), ('stock', 12, '>'), ('days', 10, '>'), ('status', 10, '>'))
+LOCATION_WIDTHS = (('city', 30, '<'), ('items', 12, '>'), ('critical', 12, '>'), ('avg_days', 14, '>'))
+
+
+def _fixed_width_lines(columns: Mapping[str, np.ndarray], widths) -> List[str]:
+    """Courier table lines (as PDF string operands), built column-wise"""
+    line = None
+    for name, width, align in widths:
+        cells = pd.Series(columns[name], dtype=object).str.slice(0, width)
+        cells = cells.str.ljust(width) if align == '<' else cells.str.rjust(width)
+        line = cells if line is None else line + ' ' + cells
+    if line is None:
+        return []
+    return ('(' + line.str.replace('\\', '\\\\', regex=False).str.replace('(', '\\(', regex=False)
+            .str.replace(')', '\\)', regex=False) + ')').tolist()
+
+
+def _header_line(widths) -> str:
+    labels = {'item': 'Item Type', 'city': 'Location', 'stock': 'Stock', 'days': 'Days',
+              'status': 'Status', 'items': 'Items', 'critical': 'Critical', 'avg_days': 'Avg Days'}
+    return ' '.join(labels[name].ljust(width) if align == '<' else labels[name].rjust(width)
+                    for name, width, align in widths)
+
+
+class _PdfLayout:
+    """Top-to-bottom flow over PdfWriter pages"""
+
+    def __init__(self, writer: PdfWriter):
+        self.writer = writer
+        self.width, self.height = writer.page_size
+        self.page: Optional[PdfPage] = None
+        self.y = 0.0
+
+    def _new_page(self):
+        self.finish()
+        self.page = PdfPage()
+        self.y = self.height - MARGIN
+
+    def room(self, height: float):
+        if self.page is None or self.y - height < MARGIN:
+            self._new_page()
+
+    def text(self, text: str, font: str = 'F1', size: float = 10, gap: float = 4):
+        self.room(size + gap)
+        self.y -= size + gap
+        self.page.text(MARGIN, self.y, text, font, size)
+
+    def table(self, header: str, lines: Sequence[str]):
+        """Rows in Courier, continued across pages with the header repeated"""
+        start = 0
+        while True:
+            self.room(TABLE_LEADING * 2)
+            fit = int((self.y - MARGIN) // TABLE_LEADING) - 1
+            block = [pdf_string(header)] + list(lines[start:start + fit])
+            self.y -= TABLE_LEADING
+            self.page.lines(MARGIN, self.y, block, 'F3', TABLE_SIZE, TABLE_LEADING)
+            self.y -= TABLE_LEADING * (len(block) - 1)
+            start += fit
+            if start >= len(lines):
+                break
+            self._new_page()
+
+    def bar(self, label: str, value: float, peak: float):
+        self.room(14)
+        self.y -= 14
+        self.page.text(MARGIN, self.y, label[:28], 'F1', 9)
+        width = (self.width - 2 * MARGIN - 200) * value / peak
+        self.page.rect(MARGIN + 160, self.y - 1, max(width, 1), 9, (0.94, 0.27, 0.27))
+        self.page.text(MARGIN + 166 + width, self.y, f"{value:.0f}", 'F1', 9)
+
+    def finish(self):
+        if self.page is not None:
+            self.writer.add_page(self.page)
+            self.page = None
+
+
+def write_pdf(data: ReportData, sink: BinaryIO) -> int:
+    """
+    Render the report as PDF into a binary sink, page by page
+
+    Returns:
+        Number of pages written
+    """
+    kpis = data.kpis
+    writer = PdfWriter(sink, A4, title=f"InventoryQ OS - {data.report_type}")
+    layout = _PdfLayout(writer)
+    layout.text("InventoryQ OS - Professional Report", 'F2', 18)
+    layout.text(data.report_type, 'F2', 13)
+    layout.text(f"Generated: {data.generated}", 'F1', 9)
+
+    layout.text("Executive Summary", 'F2', 13, gap=14)
+    for label, value in (("Total Items", kpis.total_items), ("Critical Items", kpis.critical_items),
+                         ("Warning Items", kpis.warning_items), ("Normal Items", kpis.normal_items),
+                         ("Average Days Remaining", f"{kpis.avg_days:.1f}")):
+        layout.text(f"{label}: {value}", 'F1', 10)
+
+    if data.include_charts:
+        top = chart_rows(data)
+        if not top.empty:
+            layout.text("Critical Items by Location", 'F2', 13, gap=14)
+            peak = float(top['CRITICAL'].max())
+            for city, count in zip(_text(top['LOCATION_CITY']), top['CRITICAL'].tolist()):
+                layout.bar(city, float(count), peak)
+
+    layout.text("Critical Items Requiring Attention", 'F2', 13, gap=14)
+    layout.table(_header_line(CRITICAL_WIDTHS), _fixed_width_lines(critical_columns(data, escape=False),
+                                                                   CRITICAL_WIDTHS))
+    if data.include_recommendations:
+        layout.text("Recommendations", 'F2', 13, gap=14)
+        for text in RECOMMENDATIONS:
+            layout.text(f"- {text}", 'F1', 10)
+
+    layout.text("Location Summary", 'F2', 13, gap=14)
+    layout.table(_header_line(LOCATION_WIDTHS), _fixed_width_lines(location_columns(data, escape=False),
+                                                                   LOCATION_WIDTHS))
+    layout.text(f"Report Type: {data.report_type}  |  Generated By: InventoryQ OS Enterprise System  |  "
+                f"Report Date: {data.generated}", 'F1', 8, gap=14)
+    layout.finish()
+    writer.close()
+    return writer.page_count
+
+
+def render_report(data: ReportData, fmt: str = 'html', file_stem: str = 'inventory_report',
+                  spool_max_bytes: int = SPOOL_MAX_BYTES) -> ExportArtifact:
+    """
+    Render the report into a spooled file
+
+    Args:
+        data: Prepared report tables
+        fmt: 'html' or 'pdf'
+        file_stem: Download file name without timestamp or extension
+        spool_max_bytes: Size above which the report is spooled to disk
+
+    Returns:
+        ExportArtifact rewound to the start (rows = critical items listed)
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {fmt}")
+    extension, mime = REPORT_FORMATS[fmt]
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_max_bytes, mode='w+b')
+    try:
+        if fmt == 'pdf':
+            write_pdf(data, spool)
+        else:
+            for chunk in render_html(data):
+                spool.write(chunk.encode('utf-8'))
+    except BaseException:
+        spool.close()
+        raise
+    size_bytes = spool.tell()
+    spool.seek(0)
+    name = f"{file_stem}_{data.generated_at.strftime('%Y%m%d_%H%M')}.{extension}"
+    return ExportArtifact(spool, name, mime, fmt, None, len(data.critical), size_bytes)
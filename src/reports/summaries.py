@@ -0,0 +1,107 @@
+"""
+Quick report payloads for InventoryQ OS
+Computes the Executive Summary, Critical Items, Location Analysis and Forecast
+reports as JSON-serializable payloads (no Streamlit calls), so report jobs can
+build them in the background and cache them on disk
+"""
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from src.analytics.kpi_engine import ESTIMATED_UNIT_COST, KpiSnapshot
+from src.analytics.purchase_orders import cover_quantities
+
+
+FORECAST_HORIZONS = (7, 14, 30)
+FORECAST_ITEMS = 10
+
+CRITICAL_REPORT_COLUMNS = [
+    'ITEM_TYPE', 'LOCATION_CITY', 'CURRENT_STOCK', 'DAYS_REMAINING',
+    'DAILY_CONSUMPTION_RATE', 'REORDER_POINT', 'RECOMMENDED_ORDER', 'ESTIMATED_COST'
+]
+
+
+def table_payload(frame: pd.DataFrame) -> Dict[str, Any]:
+    """A frame as {'index', 'index_name', 'columns', 'data'} with plain JSON values (NaN becomes null)"""
+    return {
+        'index': frame.index.tolist(),
+        'index_name': frame.index.name,
+        'columns': [str(column) for column in frame.columns],
+        'data': frame.astype(object).where(frame.notna(), None).to_numpy().tolist()
+    }
+
+
+def payload_frame(table: Dict[str, Any]) -> pd.DataFrame:
+    """Inverse of table_payload"""
+    frame = pd.DataFrame(table['data'], index=table['index'], columns=table['columns'])
+    frame.index.name = table.get('index_name')
+    return frame
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def executive_summary(kpis: KpiSnapshot) -> Dict[str, Any]:
+    """Headline metrics table plus the values the insights are chosen from"""
+    metrics = pd.DataFrame({
+        'Metric': [
+            'Total Inventory Items',
+            'Critical Items (Action Required)',
+            'Warning Items (Monitor)',
+            'Normal Items (Healthy)',
+            'Total Inventory Value',
+            'Average Days Remaining',
+            'Locations Monitored',
+            'Item Categories'
+        ],
+        'Value': [
+            f"{kpis.total_items:,}",
+            f"{kpis.critical_items} ({kpis.percent_of_items(kpis.critical_items):.1f}%)",
+            f"{kpis.warning_items}",
+            f"{kpis.normal_items}",
+            f"₹{kpis.total_value:,.0f}",
+            f"{kpis.avg_days:.1f} days",
+            f"{kpis.location_count}",
+            f"{kpis.category_count}"
+        ]
+    })
+    return {
+        'metrics': table_payload(metrics),
+        'critical_items': _plain(kpis.critical_items),
+        'avg_days': float(kpis.avg_days)
+    }
+
+
+def critical_items(df_inventory: pd.DataFrame, unit_cost: float = ESTIMATED_UNIT_COST) -> Dict[str, Any]:
+    """Every CRITICAL row with its recommended order and estimated cost"""
+    critical = df_inventory[df_inventory['STATUS'] == 'CRITICAL']
+    orders = cover_quantities(critical['REORDER_POINT'].to_numpy(dtype=float),
+                              critical['CURRENT_STOCK'].to_numpy(dtype=float),
+                              critical['DAILY_CONSUMPTION_RATE'].to_numpy(dtype=float))
+    table = critical.reindex(columns=CRITICAL_REPORT_COLUMNS[:6]).assign(
+        RECOMMENDED_ORDER=orders, ESTIMATED_COST=orders * unit_cost
+    ).reset_index(drop=True)
+    return {'items': table_payload(table)}
+
+
+def location_analysis(location_summary: pd.DataFrame) -> Dict[str, Any]:
+    """The per-city summary (TOTAL_ITEMS, TOTAL_STOCK, AVG_DAYS_REMAINING), riskiest first"""
+    return {'locations': table_payload(location_summary)}
+
+
+def forecast(df_inventory: pd.DataFrame, items: int = FORECAST_ITEMS) -> Dict[str, Any]:
+    """Projected stock after 7, 14 and 30 days at the current consumption rate"""
+    head = df_inventory.head(items)
+    stock = head['CURRENT_STOCK'].to_numpy(dtype=float)
+    rate = head['DAILY_CONSUMPTION_RATE'].to_numpy(dtype=float)
+    table = pd.DataFrame({
+        'Item': head['ITEM_TYPE'].to_numpy(),
+        'Location': head['LOCATION_CITY'].to_numpy(),
+        'Current': stock
+    })
+    for days in FORECAST_HORIZONS:
+        table[f"{days} Days"] = np.maximum(0.0, stock - rate * days)
+    return {'forecast': table_payload(table)}
+
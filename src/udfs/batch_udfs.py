@@ -0,0 +1,154 @@
+"""
+Vectorized (pandas batch) variants of the simulation UDFs for ResQ OS
+Each batch resolves its distinct keys once through the scalar lookups and
+broadcasts the results, instead of invoking Python once per row
+"""
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from src.udfs.simulation_udfs import (
+    get_weather_data, get_vendor_status, _udf_weather_tables, _udf_vendor_tables
+)
+
+
+def _none_if_missing(value: Any) -> Any:
+    """None for NaN/None so the scalar lookups see their usual missing value"""
+    return None if value is None or (isinstance(value, float) and value != value) else value
+
+
+def _broadcast(codes: np.ndarray, results: list) -> np.ndarray:
+    """Object array of results[code] per row"""
+    table = np.empty(len(results), dtype=object)
+    table[:] = results
+    return table[codes]
+
+
+def map_unique(values: pd.Series, lookup: Callable[[Any], Any]) -> pd.Series:
+    """Apply lookup once per distinct value (missing values included) and broadcast"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    results = [lookup(_none_if_missing(value)) for value in uniques]
+    return pd.Series(_broadcast(codes, results), index=values.index)
+
+
+def get_weather_data_batch(cities: pd.Series) -> pd.Series:
+    """
+    Batch equivalent of get_weather_data
+
+    Args:
+        cities: Series of city names
+
+    Returns:
+        Series of weather dictionaries aligned with the input index
+    """
+    return map_unique(cities, get_weather_data)
+
+
+def get_vendor_status_batch(vendors: pd.Series, locations: pd.Series) -> pd.Series:
+    """
+    Batch equivalent of get_vendor_status
+
+    Args:
+        vendors: Series of vendor names
+        locations: Series of locations, aligned with vendors
+
+    Returns:
+        Series of vendor status dictionaries aligned with the vendors index
+    """
+    vendor_codes, vendor_uniques = pd.factorize(vendors, use_na_sentinel=False)
+    location_codes, location_uniques = pd.factorize(np.asarray(locations, dtype=object), use_na_sentinel=False)
+
+    # Combine the two code arrays into one key per (vendor, location) pair
+    width = max(len(location_uniques), 1)
+    pair_keys, inverse = np.unique(
+        vendor_codes.astype(np.int64) * width + location_codes, return_inverse=True
+    )
+    results = [
+        get_vendor_status(_none_if_missing(vendor_uniques[key // width]),
+                          _none_if_missing(location_uniques[key % width]))
+        for key in pair_keys
+    ]
+    return pd.Series(_broadcast(inverse.reshape(-1), results), index=vendors.index)
+
+
+# Runs inside the UDF; mirrors map_unique above
+_UDF_BATCH_HELPER_SOURCE = """
+def _map_unique(values, lookup):
+    codes, uniques = pandas.factorize(values, use_na_sentinel=False)
+    results = numpy.empty(len(uniques), dtype=object)
+    results[:] = [lookup(value) for value in uniques]
+    return pandas.Series(results[codes], index=values.index)
+"""
+
+
+def get_snowflake_weather_batch_udf_sql() -> str:
+    """
+    Generate SQL for creating the vectorized weather UDF
+
+    Returns:
+        SQL string to create get_weather_data_batch in Snowflake
+    """
+    return """
+CREATE OR REPLACE FUNCTION get_weather_data_batch(city STRING)
+RETURNS OBJECT
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.8'
+PACKAGES = ('pandas', 'numpy')
+HANDLER = 'get_weather_batch'
+AS
+$$
+import numpy
+import pandas
+from _snowflake import vectorized
+
+{tables}
+def get_weather(city):
+    if city != city:
+        city = None
+    return WEATHER_CONDITIONS.get(city, DEFAULT_WEATHER)
+{helpers}
+@vectorized(input=pandas.DataFrame)
+def get_weather_batch(df):
+    return _map_unique(df[0], get_weather)
+$$;
+""".replace("{tables}", _udf_weather_tables()).replace("{helpers}", _UDF_BATCH_HELPER_SOURCE)
+
+
+def get_snowflake_vendor_batch_udf_sql() -> str:
+    """
+    Generate SQL for creating the vectorized vendor status UDF
+
+    Returns:
+        SQL string to create get_vendor_status_batch in Snowflake
+    """
+    return """
+CREATE OR REPLACE FUNCTION get_vendor_status_batch(vendor STRING, location STRING)
+RETURNS OBJECT
+LANGUAGE PYTHON
+RUNTIME_VERSION = '3.8'
+PACKAGES = ('pandas', 'numpy')
+HANDLER = 'get_vendor_status_batch'
+AS
+$$
+import numpy
+import pandas
+from _snowflake import vectorized
+
+{tables}
+def get_vendor_status(pair):
+    vendor, location = pair
+    if not location:
+        return VENDOR_DATA.get(vendor, DEFAULT_VENDOR)
+    vendor_info = VENDOR_CITY_STATUS.get((vendor, location))
+    if vendor_info is None:
+        vendor_info = VENDOR_OUT_OF_AREA.get(vendor) or VENDOR_DATA.get(vendor, DEFAULT_VENDOR)
+    return vendor_info
+{helpers}
+@vectorized(input=pandas.DataFrame)
+def get_vendor_status_batch(df):
+    clean = df.astype(object).where(df.notna(), None)
+    pairs = pandas.Series(list(zip(clean[0], clean[1])), index=df.index)
+    return _map_unique(pairs, get_vendor_status)
+$$;
+""".replace("{tables}", _udf_vendor_tables()).replace("{helpers}", _UDF_BATCH_HELPER_SOURCE)
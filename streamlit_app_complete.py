@@ -17,6 +17,11 @@ import json
 import time
 import uuid
 
+from src.analytics.purchase_orders import build_purchase_orders, persist_purchase_orders
+from src.database.connection_pool import ConnectionPool
+from src.database.query_layer import execute, register_template
+from src.database.snapshot_cache import SnapshotCache
+
 # Page configuration with dark theme
 st.set_page_config(
     page_title="InventoryQ: Zero-Touch Inventory",
@@ -183,39 +188,44 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # FEATURE 1: Real-Time Snowflake Engine (NO MOCK DATA)
+def connect_snowflake():
+    """Open one physical Snowflake connection (used by the connection pool)"""
+    # Production Snowflake Connection
+    if hasattr(st, 'secrets') and 'snowflake' in st.secrets:
+        return snowflake.connector.connect(
+            user=st.secrets.snowflake.user,
+            password=st.secrets.snowflake.password,
+            account=st.secrets.snowflake.account,
+            warehouse=st.secrets.snowflake.warehouse,
+            database=st.secrets.snowflake.database,
+            schema=st.secrets.snowflake.schema,
+            client_session_keep_alive=True
+        )
+    
+    # Development connection - UPDATE WITH YOUR CREDENTIALS
+    return snowflake.connector.connect(
+        user="YASMEEN",  # Replace with actual username
+        password="Yas@2003512meen",  # Replace with actual password
+        account="WUUMPEX-SZ31095",  # Replace with actual account
+        warehouse="COMPUTE_WH",
+        database="INVENTORYQ_OS_DB",
+        schema="PUBLIC",
+        client_session_keep_alive=True
+    )
+
 @st.cache_resource
 def init_snowflake_connection():
-    """Initialize Snowflake connection - REAL DATABASE ONLY"""
+    """Initialize the shared Snowflake connection pool - REAL DATABASE ONLY"""
     try:
-        # Production Snowflake Connection
-        if hasattr(st, 'secrets') and 'snowflake' in st.secrets:
-            conn = snowflake.connector.connect(
-                user=st.secrets.snowflake.user,
-                password=st.secrets.snowflake.password,
-                account=st.secrets.snowflake.account,
-                warehouse=st.secrets.snowflake.warehouse,
-                database=st.secrets.snowflake.database,
-                schema=st.secrets.snowflake.schema
-            )
-        else:
-            # Development connection - UPDATE WITH YOUR CREDENTIALS
-            conn = snowflake.connector.connect(
-                user="YASMEEN",  # Replace with actual username
-                password="Yas@2003512meen",  # Replace with actual password
-                account="WUUMPEX-SZ31095",  # Replace with actual account
-                warehouse="COMPUTE_WH",
-                database="INVENTORYQ_OS_DB",
-                schema="PUBLIC"
-            )
+        pool = ConnectionPool(connect_snowflake)
         
-        # Test connection
-        cursor = conn.cursor()
-        cursor.execute("SELECT CURRENT_DATABASE(), CURRENT_SCHEMA()")
-        result = cursor.fetchone()
-        cursor.close()
+        # Test connection (the connection goes back into the pool afterwards)
+        with pool.cursor() as cursor:
+            cursor.execute("SELECT CURRENT_DATABASE(), CURRENT_SCHEMA()")
+            result = cursor.fetchone()
         
         st.success(f"🟢 **Real-Time Database Connected:** {result[0]}.{result[1]}")
-        return conn
+        return pool
         
     except Exception as e:
         st.error(f"❌ **CRITICAL: Snowflake Connection Failed**")
@@ -223,13 +233,9 @@ def init_snowflake_connection():
         st.error("**Solution:** Update database credentials in the code or Streamlit secrets")
         st.stop()  # Stop execution - NO FALLBACK TO MOCK DATA
 
-@st.cache_data(ttl=30)  # Refresh every 30 seconds for real-time feel
-def fetch_real_inventory_data():
-    """Fetch REAL inventory data from Snowflake - NO MOCK DATA"""
-    conn = init_snowflake_connection()
-    
-    try:
-        cursor = conn.cursor()
+def query_real_inventory(pool):
+    """Run the unified_inventory_view query (called by the snapshot cache, off the script thread)"""
+    with pool.cursor() as cursor:
         # Real query to unified_inventory_view
         cursor.execute("""
             SELECT 
@@ -245,15 +251,25 @@ def fetch_real_inventory_data():
         
         columns = [desc[0] for desc in cursor.description]
         data = cursor.fetchall()
-        df = pd.DataFrame(data, columns=columns)
-        
-        cursor.close()
-        conn.close()
-        
-        # Add real-time timestamp
-        df['last_fetched'] = datetime.now()
-        
-        return df
+    
+    df = pd.DataFrame(data, columns=columns)
+    
+    # Add real-time timestamp
+    df['last_fetched'] = datetime.now()
+    
+    return df
+
+@st.cache_resource
+def get_inventory_cache():
+    """Shared inventory snapshot, revalidated in the background every 30 seconds"""
+    pool = init_snowflake_connection()
+    return SnapshotCache(lambda: query_real_inventory(pool), max_age_s=30)
+
+def fetch_real_inventory_data():
+    """Fetch REAL inventory data from Snowflake - NO MOCK DATA"""
+    try:
+        # Served from the shared snapshot; an expired one is refreshed behind the scenes
+        return get_inventory_cache().get()
         
     except Exception as e:
         st.error(f"❌ **Database Query Failed:** {str(e)}")
@@ -262,72 +278,80 @@ def fetch_real_inventory_data():
 @st.cache_data(ttl=30)
 def fetch_real_purchase_orders():
     """Fetch REAL purchase orders from Snowflake"""
-    conn = init_snowflake_connection()
+    pool = init_snowflake_connection()
     
     try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT 
-                order_id, inventory_id, quantity, urgency_level,
-                supplier_name, auto_generated, created_at, reasoning,
-                estimated_delivery
-            FROM purchase_orders 
-            ORDER BY created_at DESC 
-            LIMIT 20
-        """)
-        
-        columns = [desc[0] for desc in cursor.description]
-        data = cursor.fetchall()
-        df = pd.DataFrame(data, columns=columns)
-        
-        cursor.close()
-        conn.close()
+        with pool.cursor() as cursor:
+            cursor.execute("""
+                SELECT 
+                    order_id, inventory_id, quantity, urgency_level,
+                    supplier_name, auto_generated, created_at, reasoning,
+                    estimated_delivery
+                FROM purchase_orders 
+                ORDER BY created_at DESC 
+                LIMIT 20
+            """)
+            
+            columns = [desc[0] for desc in cursor.description]
+            data = cursor.fetchall()
         
-        return df
+        return pd.DataFrame(data, columns=columns)
         
     except Exception as e:
         st.warning(f"⚠️ **Purchase Orders Query Failed:** {str(e)}")
         # Return empty DataFrame if no orders exist yet
         return pd.DataFrame()
 
+# Statement templates (compiled once; values are always bound)
+CURRENT_STOCK_SQL = register_template('inventory_master.current_stock', """
+    SELECT current_stock FROM inventory_master WHERE inventory_id = :inventory_id
+""")
+SET_STOCK_SQL = register_template('inventory_master.set_stock', """
+    UPDATE inventory_master
+    SET current_stock = :current_stock,
+        last_updated = CURRENT_TIMESTAMP()
+    WHERE inventory_id = :inventory_id
+""")
+CHAOS_AUDIT_SQL = register_template('audit_log.chaos_simulation', """
+    INSERT INTO audit_log (
+        log_id, action_type, inventory_id, old_values, new_values,
+        reasoning, severity_level
+    ) VALUES (
+        :log_id, 'CHAOS_SIMULATION', :inventory_id,
+        :old_values, :new_values,
+        'Chaos simulation executed via Streamlit', 'CRITICAL'
+    )
+""")
+
 def execute_real_chaos_simulation(inventory_id, new_stock_level=0):
     """Execute REAL SQL UPDATE for chaos simulation - LIVE DATABASE"""
-    conn = init_snowflake_connection()
+    pool = init_snowflake_connection()
     
     try:
-        cursor = conn.cursor()
-        
-        # Get current stock for logging
-        cursor.execute(f"SELECT current_stock FROM inventory_master WHERE inventory_id = '{inventory_id}'")
-        old_stock = cursor.fetchone()[0]
-        
-        # Execute REAL UPDATE
-        cursor.execute(f"""
-            UPDATE inventory_master 
-            SET current_stock = {new_stock_level}, 
-                last_updated = CURRENT_TIMESTAMP()
-            WHERE inventory_id = '{inventory_id}'
-        """)
-        
-        # Log the chaos action
-        log_id = str(uuid.uuid4())
-        cursor.execute(f"""
-            INSERT INTO audit_log (
-                log_id, action_type, inventory_id, old_values, new_values, 
-                reasoning, severity_level
-            ) VALUES (
-                '{log_id}', 'CHAOS_SIMULATION', '{inventory_id}', 
-                'stock: {old_stock}', 'stock: {new_stock_level}',
-                'Chaos simulation executed via Streamlit', 'CRITICAL'
-            )
-        """)
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with pool.connection() as conn:
+            cursor = conn.cursor()
+            
+            # Get current stock for logging
+            old_stock = execute(cursor, CURRENT_STOCK_SQL, {'inventory_id': inventory_id})[0][0]
+            
+            # Execute REAL UPDATE
+            execute(cursor, SET_STOCK_SQL, {'inventory_id': inventory_id, 'current_stock': new_stock_level})
+            
+            # Log the chaos action
+            execute(cursor, CHAOS_AUDIT_SQL, {
+                'log_id': str(uuid.uuid4()),
+                'inventory_id': inventory_id,
+                'old_values': f"stock: {old_stock}",
+                'new_values': f"stock: {new_stock_level}"
+            })
+            
+            conn.commit()
+            cursor.close()
         
-        # Clear cache to show updated data immediately
-        st.cache_data.clear()
+        # Revalidate the inventory snapshot to show updated data immediately; a refresh
+        # started before the write would not see it, so invalidate first
+        get_inventory_cache().invalidate()
+        get_inventory_cache().refresh(wait=True)
         
         st.toast(f"💥 **CHAOS EXECUTED:** {inventory_id} stock: {old_stock} → {new_stock_level}", icon="🚨")
         return True
@@ -336,56 +360,32 @@ def execute_real_chaos_simulation(inventory_id, new_stock_level=0):
         st.error(f"❌ **Chaos Simulation Failed:** {str(e)}")
         return False
 
-def generate_ai_purchase_order(inventory_item):
-    """Generate AI-powered purchase order recommendation"""
-    conn = init_snowflake_connection()
+def place_ai_purchase_orders(candidates):
+    """Draft purchase orders for every candidate row at once and insert them as one batch"""
+    pool = init_snowflake_connection()
     
-    try:
-        # Calculate intelligent order quantity
-        safety_stock = inventory_item['daily_consumption_rate'] * 7  # 7 days safety
-        current_deficit = max(0, inventory_item['reorder_point'] - inventory_item['current_stock'])
-        recommended_qty = safety_stock + current_deficit
-        
-        # Determine urgency based on days remaining
-        if inventory_item['days_remaining'] <= 1:
-            urgency = "CRITICAL"
-        elif inventory_item['days_remaining'] <= 3:
-            urgency = "HIGH"
-        else:
-            urgency = "MEDIUM"
-        
-        # Generate order ID
-        order_id = f"AI-{inventory_item['sector_type']}-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
-        # AI reasoning
-        reasoning = f"AI Analysis: {inventory_item['days_remaining']:.1f} days remaining. " \
-                   f"Current stock ({inventory_item['current_stock']}) below reorder point " \
-                   f"({inventory_item['reorder_point']}). Recommended safety stock: {safety_stock:.0f} units."
-        
-        # Insert into database
+    # Safety stock (7 days) plus the deficit, urgency from days remaining, ids assigned in bulk
+    batch = build_purchase_orders(candidates, rule='safety', prefix='AI')
+    
+    with pool.connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(f"""
-            INSERT INTO purchase_orders (
-                order_id, inventory_id, quantity, urgency_level,
-                supplier_name, auto_generated, reasoning, estimated_delivery
-            ) VALUES (
-                '{order_id}', '{inventory_item['inventory_id']}', {recommended_qty}, '{urgency}',
-                'AI-Selected Supplier', TRUE, '{reasoning}', 
-                DATEADD(day, 2, CURRENT_TIMESTAMP())
-            )
-        """)
-        
+        persist_purchase_orders(cursor, batch)
         conn.commit()
         cursor.close()
-        conn.close()
-        
-        st.cache_data.clear()  # Refresh data
+    
+    fetch_real_purchase_orders.clear()  # Refresh orders only
+    return batch
+
+def generate_ai_purchase_order(inventory_item):
+    """Generate AI-powered purchase order recommendation"""
+    try:
+        order = place_ai_purchase_orders(inventory_item.to_frame().T).orders.iloc[0]
         
         return {
-            'order_id': order_id,
-            'quantity': recommended_qty,
-            'urgency': urgency,
-            'reasoning': reasoning
+            'order_id': order['ORDER_ID'],
+            'quantity': order['QUANTITY'],
+            'urgency': order['URGENCY_LEVEL'],
+            'reasoning': order['REASONING']
         }
         
     except Exception as e:
@@ -684,7 +684,9 @@ def main():
     col1, col2 = st.sidebar.columns(2)
     with col1:
         if st.button("🔄 Refresh Data"):
-            st.cache_data.clear()
+            get_inventory_cache().invalidate()
+            get_inventory_cache().refresh(wait=True)
+            fetch_real_purchase_orders.clear()
             st.rerun()
     
     with col2:
@@ -868,11 +870,18 @@ def main():
             if not reorder_needed.empty:
                 st.markdown('<h3 class="warning-text">🚨 AI-Drafted Orders Awaiting Approval</h3>', unsafe_allow_html=True)
                 
-                for _, item in reorder_needed.iterrows():
-                    # Calculate recommended order quantity
-                    safety_stock = item['daily_consumption_rate'] * 7  # 7 days safety stock
-                    recommended_qty = safety_stock + (item['reorder_point'] - item['current_stock'])
-                    
+                # Quantities and urgency for every candidate in one vectorized pass
+                drafts = build_purchase_orders(reorder_needed, rule='safety', prefix='AI').orders
+                
+                if st.button(f"✅ Approve All {len(reorder_needed)} Orders", key="approve_all_orders"):
+                    try:
+                        batch = place_ai_purchase_orders(reorder_needed)
+                        st.toast(f"🚀 **{batch.count} Orders Approved** (₹{batch.total_cost:,.0f})", icon="✅")
+                    except Exception as e:
+                        st.error(f"❌ **AI Order Generation Failed:** {str(e)}")
+                
+                for (_, item), recommended_qty, urgency in zip(reorder_needed.iterrows(), drafts['QUANTITY'],
+                                                               drafts['URGENCY_LEVEL']):
                     with st.expander(f"🔴 **URGENT:** {item['item_type']} - {item['location_city']}", expanded=True):
                         col1, col2, col3 = st.columns(3)
                         
@@ -886,7 +895,6 @@ def main():
                         
                         with col3:
                             st.metric("🤖 AI Recommended Qty", f"{recommended_qty:.0f}")
-                            urgency = "CRITICAL" if item['days_remaining'] <= 1 else "HIGH"
                             st.metric("🚨 Urgency Level", urgency)
                         
                         # Auto-approval buttons
@@ -16,6 +16,11 @@ import time
 import uuid
 import io
 
+from src.ai.cortex_cache import CortexCache
+from src.database.audit_writer import AuditLogWriter, connector_audit_sink
+from src.database.connection_pool import ConnectionPool
+from src.database.snapshot_cache import SnapshotCache
+
 # Page configuration
 st.set_page_config(
     page_title="InventoryQ OS - Production Edition",
@@ -245,28 +250,32 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # PHASE 2: REAL BACKEND LOGIC (NO MOCKS)
+def connect_snowflake():
+    """Open one physical Snowflake connection (used by the connection pool)"""
+    # Snowflake Connection Credentials
+    return snowflake.connector.connect(
+        user="YASMEEN",
+        password="Yas@2003512meen",
+        account="WUUMPEX-SZ31095",
+        warehouse="COMPUTE_WH",
+        database="INVENTORYQ_OS_DB",
+        schema="PUBLIC",
+        client_session_keep_alive=True
+    )
+
 @st.cache_resource
 def init_snowflake_connection():
-    """Initialize Snowflake connection"""
+    """Initialize the shared Snowflake connection pool"""
     try:
-        # Snowflake Connection Credentials
-        conn = snowflake.connector.connect(
-            user="YASMEEN",
-            password="Yas@2003512meen",
-            account="WUUMPEX-SZ31095",
-            warehouse="COMPUTE_WH",
-            database="INVENTORYQ_OS_DB",
-            schema="PUBLIC"
-        )
+        pool = ConnectionPool(connect_snowflake)
         
-        # Test connection
-        cursor = conn.cursor()
-        cursor.execute("SELECT CURRENT_DATABASE(), CURRENT_SCHEMA(), CURRENT_WAREHOUSE()")
-        result = cursor.fetchone()
-        cursor.close()
+        # Test connection (the connection goes back into the pool afterwards)
+        with pool.cursor() as cursor:
+            cursor.execute("SELECT CURRENT_DATABASE(), CURRENT_SCHEMA(), CURRENT_WAREHOUSE()")
+            result = cursor.fetchone()
         
         st.success(f"CONNECTION ESTABLISHED: {result[0]}.{result[1]} via {result[2]}")
-        return conn
+        return pool
         
     except Exception as e:
         st.error(f"CRITICAL: Snowflake Connection Failed")
@@ -287,23 +296,27 @@ def init_snowflake_connection():
         
         st.stop()
 
-@st.cache_data(ttl=30)
-def load_inventory():
-    """Load real inventory data from unified_inventory_view"""
-    conn = init_snowflake_connection()
-    
-    try:
-        cursor = conn.cursor()
+def query_inventory(pool):
+    """Run the unified_inventory_view query (called by the snapshot cache, off the script thread)"""
+    with pool.cursor() as cursor:
         cursor.execute("SELECT * FROM unified_inventory_view ORDER BY priority_level ASC, days_remaining ASC")
         
         columns = [desc[0] for desc in cursor.description]
         data = cursor.fetchall()
-        df = pd.DataFrame(data, columns=columns)
-        
-        cursor.close()
-        conn.close()
-        
-        return df
+    
+    return pd.DataFrame(data, columns=columns)
+
+@st.cache_resource
+def get_inventory_cache():
+    """Shared inventory snapshot, revalidated in the background every 30 seconds"""
+    pool = init_snowflake_connection()
+    return SnapshotCache(lambda: query_inventory(pool), max_age_s=30)
+
+def load_inventory():
+    """Load real inventory data from unified_inventory_view"""
+    try:
+        # Served from the shared snapshot; an expired one is refreshed behind the scenes
+        return get_inventory_cache().get()
         
     except Exception as e:
         st.error(f"Inventory Query Failed: {str(e)}")
@@ -312,78 +325,74 @@ def load_inventory():
 @st.cache_data(ttl=30)
 def load_orders():
     """Load real purchase orders from purchase_orders table"""
-    conn = init_snowflake_connection()
+    pool = init_snowflake_connection()
     
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM purchase_orders ORDER BY created_at DESC LIMIT 50")
-        
-        columns = [desc[0] for desc in cursor.description]
-        data = cursor.fetchall()
-        df = pd.DataFrame(data, columns=columns)
-        
-        cursor.close()
-        conn.close()
+        with pool.cursor() as cursor:
+            cursor.execute("SELECT * FROM purchase_orders ORDER BY created_at DESC LIMIT 50")
+            
+            columns = [desc[0] for desc in cursor.description]
+            data = cursor.fetchall()
         
-        return df
+        return pd.DataFrame(data, columns=columns)
         
     except Exception as e:
         st.warning(f"Orders Query Failed: {str(e)}")
         return pd.DataFrame()
 
-def get_cortex_ai_insight(item, location):
-    """GenAI Integration using Snowflake Cortex AI"""
-    conn = init_snowflake_connection()
+CORTEX_INSIGHT_MODEL = 'llama2-70b-chat'
+
+@st.cache_resource
+def get_cortex_cache():
+    """Shared Cortex response cache (per model, prompt and snapshot version)"""
+    return CortexCache(model=CORTEX_INSIGHT_MODEL)
+
+def cortex_insight_prompt(item, location):
+    return f"Analyze the medical risk of running out of {item} in {location}. Urgent tone. Max 30 words."
+
+def fallback_insight(item, location):
+    # Fallback AI insight if Cortex is not available
+    return f"URGENT: {item} shortage in {location} poses significant operational risk. Immediate action required."
+
+def get_cortex_ai_insights(items):
+    """GenAI insights for many items with one set-based Snowflake Cortex query (cached per snapshot)"""
+    pool = init_snowflake_connection()
+    prompts = {
+        item['INVENTORY_ID']: cortex_insight_prompt(item['ITEM_TYPE'], item['LOCATION_CITY'])
+        for _, item in items.iterrows()
+    }
     
     try:
-        cursor = conn.cursor()
-        
-        # Use Snowflake Cortex AI for intelligent insights
-        prompt = f"Analyze the medical risk of running out of {item} in {location}. Urgent tone. Max 30 words."
-        
-        cursor.execute(f"""
-            SELECT SNOWFLAKE.CORTEX.COMPLETE(
-                'llama2-70b-chat', 
-                '{prompt}'
-            ) as ai_insight
-        """)
-        
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
-        
-        if result and result[0]:
-            return result[0].strip()
-        else:
-            return f"Critical shortage risk for {item} in {location}. Immediate procurement required."
-            
-    except Exception as e:
-        # Fallback AI insight if Cortex is not available
-        return f"URGENT: {item} shortage in {location} poses significant operational risk. Immediate action required."
+        with pool.cursor() as cursor:
+            responses = get_cortex_cache().complete_many(cursor, prompts, snapshot_version=get_inventory_cache().version)
+    except Exception:
+        responses = {}
+    
+    insights = {}
+    for _, item in items.iterrows():
+        response = responses.get(item['INVENTORY_ID'])
+        insights[item['INVENTORY_ID']] = (
+            response.strip() if response else fallback_insight(item['ITEM_TYPE'], item['LOCATION_CITY'])
+        )
+    return insights
+
+@st.cache_resource
+def get_audit_writer():
+    """Shared background audit writer flushing audit_log in multi-row batches"""
+    return AuditLogWriter(connector_audit_sink(init_snowflake_connection()))
 
 def log_action_to_unistore(action_type, inventory_id, details):
     """Log actions to audit_log table for audit trail"""
-    conn = init_snowflake_connection()
-    
     try:
-        cursor = conn.cursor()
-        
-        log_id = str(uuid.uuid4())
-        timestamp = datetime.now()
-        
-        cursor.execute(f"""
-            INSERT INTO audit_log (
-                log_id, action_type, inventory_id, 
-                new_values, timestamp, reasoning
-            ) VALUES (
-                '{log_id}', '{action_type}', '{inventory_id}',
-                '{details}', '{timestamp}', 'Streamlit UI Action'
-            )
-        """)
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+        # Queued for the background writer; spilled to disk if the queue is saturated
+        get_audit_writer().submit({
+            'log_id': str(uuid.uuid4()),
+            'action_type': action_type,
+            'inventory_id': inventory_id,
+            'new_values': details,
+            'timestamp': datetime.now(),
+            'reasoning': 'Streamlit UI Action'
+        })
         
         return True
         
@@ -678,7 +687,9 @@ def main():
     col1, col2 = st.sidebar.columns(2)
     with col1:
         if st.button("Refresh"):
-            st.cache_data.clear()
+            get_inventory_cache().invalidate()
+            get_inventory_cache().refresh(wait=True)
+            load_orders.clear()
             st.rerun()
     
     with col2:
@@ -818,6 +829,9 @@ def main():
             if not critical_items.empty:
                 st.markdown('<h3 class="critical-text">AI-Generated Order Recommendations</h3>', unsafe_allow_html=True)
                 
+                # One Cortex query for every item's insight instead of one per expander
+                ai_insights = get_cortex_ai_insights(critical_items)
+                
                 for _, item in critical_items.iterrows():
                     with st.expander(f"URGENT: {item['ITEM_TYPE']} - {item['LOCATION_CITY']}", expanded=True):
                         col1, col2, col3 = st.columns(3)
@@ -833,7 +847,7 @@ def main():
                         
                         with col3:
                             # Cortex AI Insight
-                            ai_insight = get_cortex_ai_insight(item['ITEM_TYPE'], item['LOCATION_CITY'])
+                            ai_insight = ai_insights[item['INVENTORY_ID']]
                             st.markdown(f"**AI Insight:**")
                             st.info(ai_insight)
                         
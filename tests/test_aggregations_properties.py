@@ -0,0 +1,155 @@
+"""
+Property-based tests for warehouse-side dashboard aggregations
+Feature: inventoryq-supply-chain
+"""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+from src.database.aggregations import (
+    DashboardAggregator, local_critical_by_city, local_heatmap, local_location_summary,
+    local_status_counts, local_top_stock
+)
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+
+
+COLUMNS = ['INVENTORY_ID', 'ITEM_TYPE', 'LOCATION_CITY', 'CURRENT_STOCK', 'DAYS_REMAINING', 'STATUS']
+
+
+class SqliteViewSession:
+    """Snowpark session stand-in executing the pushed-down SQL against SQLite"""
+
+    def __init__(self, table):
+        self.connection = sqlite3.connect(':memory:')
+        table.to_sql('unified_inventory_view', self.connection, index=False)
+        self.queries = []
+        self._result = None
+
+    def sql(self, query, params=None):
+        self.queries.append(query)
+        self._result = pd.read_sql_query(query, self.connection, params=params)
+        return self
+
+    def to_pandas(self):
+        return self._result
+
+
+class BrokenSession:
+    def sql(self, query, params=None):
+        raise RuntimeError("warehouse unavailable")
+
+
+@st.composite
+def inventory_frame_strategy(draw):
+    """unified_inventory_view-shaped frames with unique ids"""
+    n = draw(st.integers(min_value=0, max_value=30))
+    ids = draw(st.lists(st.text(alphabet='ABC123', min_size=1, max_size=6),
+                        min_size=n, max_size=n, unique=True))
+    row = st.fixed_dictionaries({
+        'ITEM_TYPE': st.sampled_from(['OXYGEN', 'RICE', 'WATER', None]),
+        'LOCATION_CITY': st.sampled_from(['Delhi', 'Mumbai', 'Chennai', None]),
+        'CURRENT_STOCK': st.one_of(st.integers(min_value=0, max_value=1000).map(float),
+                                   st.just(float('nan'))),
+        'DAYS_REMAINING': st.one_of(st.integers(min_value=0, max_value=6000).map(lambda d: d / 100),
+                                    st.just(999999.0), st.just(float('nan'))),
+        'STATUS': st.sampled_from(['CRITICAL', 'WARNING', 'NORMAL', None]),
+    })
+    rows = draw(st.lists(row, min_size=n, max_size=n))
+    for inventory_id, values in zip(ids, rows):
+        values['INVENTORY_ID'] = inventory_id
+    return pd.DataFrame(rows, columns=COLUMNS).astype({'CURRENT_STOCK': float, 'DAYS_REMAINING': float})
+
+
+def assert_frames_close(pushed, local):
+    pd.testing.assert_frame_equal(pushed, local, check_exact=False, atol=0.011, check_dtype=False,
+                                  check_index_type=False, check_column_type=False)
+
+
+def labels(frame):
+    """Rows as tuples with every missing value as None (SQLite returns None, pandas NaN)"""
+    return [tuple(None if pd.isna(value) else value for value in row) for row in frame.itertuples(index=False)]
+
+
+class TestAggregationPushdownProperties:
+    """Property-based tests for SQL/local equivalence of the dashboard aggregates"""
+
+    @settings(max_examples=40, deadline=None)
+    @given(inventory_frame_strategy())
+    def test_pushdown_matches_local_aggregates(self, df):
+        """
+        Property: Every pushed-down aggregate equals its pandas equivalent
+        """
+        session = SqliteViewSession(df)
+        aggregator = DashboardAggregator()
+
+        assert_frames_close(aggregator.heatmap(session), local_heatmap(df))
+        assert_frames_close(aggregator.location_summary(session), local_location_summary(df))
+        assert labels(aggregator.top_stock(session, n=5)) == labels(local_top_stock(df, 5))
+        pd.testing.assert_series_equal(aggregator.critical_by_city(session, limit=2),
+                                       local_critical_by_city(df, 2),
+                                       check_dtype=False, check_index_type=False)
+        pd.testing.assert_series_equal(aggregator.status_counts(session), local_status_counts(df),
+                                       check_dtype=False, check_index_type=False)
+        assert aggregator.stats['queries'] == 5
+
+    @settings(max_examples=40, deadline=None)
+    @given(inventory_frame_strategy())
+    def test_local_aggregates_match_original_pandas(self, df):
+        """
+        Property: The local aggregates reproduce the page computations they replace
+        """
+        if df['LOCATION_CITY'].notna().any():
+            expected = df.groupby('LOCATION_CITY')['STATUS'].apply(lambda x: (x == 'CRITICAL').sum())
+            got = local_critical_by_city(df)
+            assert got.to_dict() == expected.to_dict()
+            assert list(got.to_numpy()) == sorted(expected.to_numpy(), reverse=True)
+
+        summary = local_location_summary(df)
+        expected = df.groupby('LOCATION_CITY').agg({
+            'INVENTORY_ID': 'count', 'CURRENT_STOCK': 'sum', 'DAYS_REMAINING': 'mean'
+        }).round(2)
+        for city, row in expected.iterrows():
+            assert summary.loc[city, 'TOTAL_ITEMS'] == row['INVENTORY_ID']
+            assert np.isclose(summary.loc[city, 'TOTAL_STOCK'], row['CURRENT_STOCK'])
+            assert np.isclose(summary.loc[city, 'AVG_DAYS_REMAINING'], row['DAYS_REMAINING'], equal_nan=True)
+        assert len(summary) == len(expected)
+
+        status = local_status_counts(df)
+        assert status.to_dict() == df['STATUS'].value_counts().to_dict()
+
+        top = local_top_stock(df, 10)
+        expected_top = df.dropna(subset=['CURRENT_STOCK']).nlargest(10, 'CURRENT_STOCK')
+        assert sorted(top['CURRENT_STOCK']) == sorted(expected_top['CURRENT_STOCK'])
+
+    @settings(max_examples=20, deadline=None)
+    @given(inventory_frame_strategy())
+    def test_results_memoized_per_snapshot_version(self, df):
+        """
+        Property: A versioned snapshot is queried once per aggregate in the warehouse; a new version re-queries
+        """
+        session = SqliteViewSession(df)
+        aggregator = DashboardAggregator()
+        df.attrs[SNAPSHOT_VERSION_ATTR] = 1
+
+        first = aggregator.status_counts(session, df)
+        assert aggregator.status_counts(session, df) is first
+        assert len(session.queries) == 1
+        pd.testing.assert_series_equal(first, local_status_counts(df),
+                                       check_dtype=False, check_index_type=False)
+
+        df.attrs[SNAPSHOT_VERSION_ATTR] = 2
+        aggregator.status_counts(session, df)
+        assert len(session.queries) == 2
+        assert aggregator.stats == {'hits': 1, 'queries': 2, 'local': 0}
+
+    @settings(max_examples=20, deadline=None)
+    @given(inventory_frame_strategy())
+    def test_falls_back_to_frame_without_warehouse(self, df):
+        """
+        Property: Without a working session the aggregates come from the in-memory frame
+        """
+        aggregator = DashboardAggregator()
+        assert_frames_close(aggregator.heatmap(None, df), local_heatmap(df))
+        assert_frames_close(aggregator.location_summary(BrokenSession(), df), local_location_summary(df))
+        assert aggregator.stats['local'] == 2
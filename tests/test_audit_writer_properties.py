@@ -0,0 +1,188 @@
+"""
+Property-based tests for the asynchronous audit log writer
+Feature: inventoryq-supply-chain
+"""
+import tempfile
+import threading
+
+from hypothesis import given, settings, strategies as st
+from src.database import audit_writer
+from src.database.audit_writer import (
+    AuditLogWriter,
+    build_multi_row_insert,
+    connector_audit_sink,
+    snowpark_audit_sink
+)
+
+
+class RecordingSink:
+    """Flush function that records batches and can simulate an outage"""
+
+    def __init__(self):
+        self.batches = []
+        self.available = True
+        self.lock = threading.Lock()
+
+    def __call__(self, records):
+        if not self.available:
+            raise ConnectionError("warehouse unreachable")
+        with self.lock:
+            self.batches.append(list(records))
+
+    def written(self):
+        return [record for batch in self.batches for record in batch]
+
+
+class FakeSnowparkSession:
+    """Captures SQL and params passed to session.sql"""
+
+    def __init__(self):
+        self.statements = []
+
+    def sql(self, query, params=None):
+        self.statements.append((query, params))
+        return self
+
+    def collect(self):
+        return []
+
+
+class TestAuditWriterProperties:
+    """Property-based tests for batched, non-blocking audit logging"""
+
+    @settings(max_examples=20, deadline=None)
+    @given(st.lists(st.text(max_size=20), min_size=1, max_size=60), st.integers(min_value=1, max_value=25))
+    def test_every_record_is_written_once_in_batches(self, actions, batch_size):
+        """
+        Property: Every submitted record is flushed exactly once, in batches of at most batch_size
+        """
+        sink = RecordingSink()
+        writer = AuditLogWriter(sink, batch_size=batch_size, flush_interval_ms=10,
+                                spill_dir=tempfile.mkdtemp(), register_atexit=False)
+        for action in actions:
+            writer.submit({'action': action, 'details': 'test'})
+        writer.close()
+
+        assert [record['action'] for record in sink.written()] == actions
+        assert all(len(batch) <= batch_size for batch in sink.batches)
+
+    def test_outage_spills_to_disk_and_replays(self, tmp_path):
+        """Records survive an outage on disk and are replayed when the database returns"""
+        sink = RecordingSink()
+        sink.available = False
+        writer = AuditLogWriter(sink, batch_size=10, flush_interval_ms=10_000,
+                                spill_dir=str(tmp_path), register_atexit=False)
+
+        for i in range(5):
+            writer.submit({'action': f"A{i}", 'details': ''})
+        writer.flush()
+        assert writer.stats['spilled'] == 5
+        assert len(writer.spilled_files()) == 1
+
+        sink.available = True
+        writer.submit({'action': 'A5', 'details': ''})
+        writer.flush()
+        writer.close()
+
+        assert sorted(record['action'] for record in sink.written()) == [f"A{i}" for i in range(6)]
+        assert writer.spilled_files() == []
+
+    def test_each_sink_replays_only_its_own_spill(self, tmp_path, monkeypatch):
+        """Writers for different tables spill to separate directories"""
+        monkeypatch.setattr(audit_writer, 'DEFAULT_SPILL_ROOT', str(tmp_path))
+        app_log = AuditLogWriter(snowpark_audit_sink(lambda: None), register_atexit=False)
+        audit_log = AuditLogWriter(connector_audit_sink(None), register_atexit=False)
+        try:
+            assert app_log.spill_dir != audit_log.spill_dir
+            app_log._spill([{'action': 'A', 'details': ''}])
+            assert len(app_log.spilled_files()) == 1 and audit_log.spilled_files() == []
+        finally:
+            app_log.close()
+            audit_log.close()
+
+    def test_concurrent_replays_send_each_file_once(self, tmp_path):
+        """Writers sharing a spill directory (e.g. two processes) claim files before replaying them"""
+        sink = RecordingSink()
+        writers = [AuditLogWriter(sink, batch_size=3, flush_interval_ms=10_000,
+                                  spill_dir=str(tmp_path), register_atexit=False) for _ in range(4)]
+        for i in range(20):
+            writers[0]._spill([{'action': f"A{i}_{j}", 'details': ''} for j in range(5)])
+
+        start = threading.Barrier(len(writers))
+
+        def replay(writer):
+            start.wait(5)
+            writer._replay_spill()
+
+        threads = [threading.Thread(target=replay, args=(writer,)) for writer in writers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        for writer in writers:
+            writer.close()
+
+        actions = [record['action'] for record in sink.written()]
+        assert sorted(actions) == sorted(f"A{i}_{j}" for i in range(20) for j in range(5))
+        assert sum(writer.stats['replayed'] for writer in writers) == 100
+        assert list(tmp_path.iterdir()) == []
+
+    def test_interrupted_replay_keeps_only_unsent_records(self, tmp_path):
+        """A replay failing part-way returns the unsent records to the spill file"""
+        sent = []
+
+        def flaky_sink(records):
+            if sent:
+                raise ConnectionError("warehouse unreachable")
+            sent.extend(records)
+
+        writer = AuditLogWriter(flaky_sink, batch_size=2, flush_interval_ms=10_000,
+                                spill_dir=str(tmp_path), register_atexit=False)
+        writer._spill([{'action': f"A{i}", 'details': ''} for i in range(5)])
+        writer._replay_spill()
+
+        assert [record['action'] for record in sent] == ['A0', 'A1']
+        (path,) = writer.spilled_files()
+        with open(path, encoding='utf-8') as spill_file:
+            assert len(spill_file.readlines()) == 3
+        assert writer.stats['replayed'] == 2
+        writer.flush_fn = RecordingSink()
+        writer._replay_spill()
+        assert [record['action'] for record in writer.flush_fn.written()] == ['A2', 'A3', 'A4']
+        writer.close()
+
+    def test_full_queue_applies_backpressure_then_spills(self, tmp_path):
+        """A saturated queue never blocks longer than the enqueue timeout"""
+        release = threading.Event()
+
+        def slow_sink(records):
+            release.wait(5)
+
+        writer = AuditLogWriter(slow_sink, batch_size=1, flush_interval_ms=1, max_queue=1,
+                                spill_dir=str(tmp_path), enqueue_timeout=0.01, register_atexit=False)
+        accepted = [writer.submit({'action': str(i), 'details': ''}) for i in range(20)]
+        release.set()
+        writer.close()
+
+        assert not all(accepted)
+        assert writer.stats['spilled'] + writer.stats['enqueued'] == 20
+
+    def test_multi_row_insert_binds_all_values(self):
+        """One statement carries every row; SQL defaults are not bound"""
+        sql, params = build_multi_row_insert(
+            'APP_AUDIT_LOG', ('timestamp', 'user_name', 'action', 'details'),
+            [{'timestamp': 't1', 'action': 'A', 'details': "it's"},
+             {'timestamp': 't2', 'action': 'B', 'details': 'd'}],
+            sql_defaults={'user_name': 'CURRENT_USER()'}
+        )
+        assert sql.count('(?, CURRENT_USER(), ?, ?)') == 2
+        assert params == ['t1', 'A', "it's", 't2', 'B', 'd']
+
+    def test_snowpark_sink_issues_one_statement_per_batch(self):
+        """The Snowpark sink sends a whole batch in one round-trip"""
+        session = FakeSnowparkSession()
+        sink = snowpark_audit_sink(lambda: session)
+        sink([{'timestamp': 't', 'action': 'A', 'details': 'x'}] * 3)
+
+        assert len(session.statements) == 1
+        assert len(session.statements[0][1]) == 9
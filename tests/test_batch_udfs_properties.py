@@ -0,0 +1,69 @@
+"""
+Property-based tests for the vectorized simulation UDF variants
+Feature: inventoryq-supply-chain
+"""
+import sys
+import types
+
+import pandas as pd
+from hypothesis import given, strategies as st
+from src.udfs.simulation_udfs import get_weather_data, get_vendor_status
+from src.udfs.batch_udfs import (
+    get_weather_data_batch, get_vendor_status_batch,
+    get_snowflake_weather_batch_udf_sql, get_snowflake_vendor_batch_udf_sql
+)
+
+cities = st.sampled_from(['Bangalore', 'Delhi', 'Mumbai', 'Chennai', 'Kolkata', 'Pune', '', None])
+vendors = st.sampled_from(['Blinkit', 'Dunzo', 'Zepto', 'Swiggy_Instamart', 'BigBasket', 'UnknownVendor', None])
+
+
+def load_udf_handler(sql, handler):
+    """Execute a UDF body locally with a pass-through _snowflake.vectorized"""
+    snowflake_module = types.ModuleType('_snowflake')
+    snowflake_module.vectorized = lambda input: (lambda fn: fn)
+    previous = sys.modules.get('_snowflake')
+    sys.modules['_snowflake'] = snowflake_module
+    try:
+        namespace = {}
+        exec(sql.split('$$')[1], namespace)
+    finally:
+        if previous is None:
+            sys.modules.pop('_snowflake', None)
+        else:
+            sys.modules['_snowflake'] = previous
+    return namespace[handler]
+
+
+class TestBatchUdfProperties:
+    """Property-based tests for scalar / batch equivalence"""
+
+    @given(st.lists(cities, min_size=1, max_size=50))
+    def test_weather_batch_matches_scalar(self, city_values):
+        """
+        Property: The local and in-warehouse batch weather handlers equal per-row calls
+        """
+        series = pd.Series(city_values, index=range(100, 100 + len(city_values)), dtype=object)
+        expected = [get_weather_data(city) for city in city_values]
+
+        batch = get_weather_data_batch(series)
+        assert list(batch.index) == list(series.index)
+        assert list(batch) == expected
+
+        handler = load_udf_handler(get_snowflake_weather_batch_udf_sql(), 'get_weather_batch')
+        assert list(handler(pd.DataFrame({0: city_values}))) == expected
+
+    @given(st.lists(st.tuples(vendors, cities), min_size=1, max_size=50))
+    def test_vendor_batch_matches_scalar(self, pairs):
+        """
+        Property: The local and in-warehouse batch vendor handlers equal per-row calls
+        """
+        vendor_values = [vendor for vendor, _ in pairs]
+        city_values = [city for _, city in pairs]
+        expected = [get_vendor_status(vendor, city) for vendor, city in pairs]
+
+        batch = get_vendor_status_batch(pd.Series(vendor_values, dtype=object),
+                                        pd.Series(city_values, dtype=object))
+        assert list(batch) == expected
+
+        handler = load_udf_handler(get_snowflake_vendor_batch_udf_sql(), 'get_vendor_status_batch')
+        assert list(handler(pd.DataFrame({0: vendor_values, 1: city_values}))) == expected
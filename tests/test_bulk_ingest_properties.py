@@ -0,0 +1,136 @@
+"""
+Property-based tests for bulk inventory ingest
+Feature: inventoryq-supply-chain
+"""
+from hypothesis import given, settings, strategies as st
+from src.database.db_operations import DatabaseOperations
+from src.database.bulk_ingest import (
+    REJECT_DUPLICATE_ID, REJECT_DUPLICATE_IN_BATCH, REJECT_NEGATIVE_STOCK,
+    REJECT_THRESHOLD_ORDER, REJECT_ZERO_CONSUMPTION
+)
+from tests.test_multi_tenant_properties import inventory_item_strategy
+
+
+def expected_reasons(item):
+    """Rule violations the batch validator should report for an item"""
+    reasons = []
+    if item.current_stock < 0:
+        reasons.append(REJECT_NEGATIVE_STOCK)
+    if item.daily_consumption_rate <= 0:
+        reasons.append(REJECT_ZERO_CONSUMPTION)
+    if item.critical_threshold < 0 or item.critical_threshold > item.reorder_point:
+        reasons.append(REJECT_THRESHOLD_ORDER)
+    return reasons
+
+
+def as_columns(items):
+    return {
+        'INVENTORY_ID': [item.inventory_id for item in items],
+        'ORGANIZATION_ID': [item.organization_id for item in items],
+        'SECTOR_TYPE': [item.sector_type.value for item in items],
+        'ITEM_TYPE': [item.item_type for item in items],
+        'CURRENT_STOCK': [item.current_stock for item in items],
+        'DAILY_CONSUMPTION_RATE': [item.daily_consumption_rate for item in items],
+        'REORDER_POINT': [item.reorder_point for item in items],
+        'CRITICAL_THRESHOLD': [item.critical_threshold for item in items],
+        'LOCATION_CITY': [item.location.city for item in items],
+        'LOCATION_STATE': [item.location.state for item in items],
+        'LOCATION_COUNTRY': [item.location.country for item in items],
+    }
+
+
+class TestBulkIngestProperties:
+    """Property-based tests for insert_many / upsert_many"""
+
+    @given(st.lists(inventory_item_strategy(), min_size=1, max_size=40),
+           st.lists(st.sampled_from(['stock', 'rate']), max_size=5))
+    def test_insert_many_matches_per_item_inserts(self, inventory_items, corruptions):
+        """
+        Property: insert_many accepts exactly the valid, non-duplicate rows and
+        leaves the indexes as if they had been inserted one by one
+        """
+        for position, corruption in enumerate(corruptions):
+            item = inventory_items[position % len(inventory_items)]
+            if corruption == 'stock':
+                item.current_stock = -1.0
+            else:
+                item.daily_consumption_rate = 0.0
+
+        bulk_db = DatabaseOperations()
+        report = bulk_db.insert_many(inventory_items)
+
+        single_db = DatabaseOperations()
+        seen = set()
+        rejected = {}
+        for row, item in enumerate(inventory_items):
+            reasons = expected_reasons(item)
+            if item.inventory_id in seen:
+                reasons.append(REJECT_DUPLICATE_IN_BATCH)
+            seen.add(item.inventory_id)
+            if reasons:
+                rejected[row] = reasons
+            else:
+                single_db.insert_inventory_item(item)
+
+        assert report.total == len(inventory_items)
+        assert report.inserted == len(single_db.inventory_data)
+        assert {r.row: sorted(r.reasons) for r in report.rejected} == \
+            {row: sorted(reasons) for row, reasons in rejected.items()}
+
+        assert list(bulk_db.inventory_data) == list(single_db.inventory_data)
+        assert bulk_db._days_index == single_db._days_index
+        for item in single_db.inventory_data.values():
+            assert bulk_db.get_inventory_by_organization(item.organization_id) == \
+                single_db.get_inventory_by_organization(item.organization_id)
+
+    @settings(max_examples=25)
+    @given(st.lists(inventory_item_strategy(), min_size=1, max_size=20))
+    def test_upsert_replaces_and_insert_rejects_existing(self, inventory_items):
+        """
+        Property: Re-inserting loaded ids is rejected, upserting them updates in place
+        """
+        items = {item.inventory_id: item for item in inventory_items
+                 if not expected_reasons(item)}
+        db = DatabaseOperations()
+        db.insert_many(list(items.values()))
+
+        again = db.insert_many(list(items.values()))
+        assert again.inserted == 0
+        assert all(r.reasons == [REJECT_DUPLICATE_ID] for r in again.rejected)
+
+        for item in items.values():
+            item.current_stock += 10.0
+        report = db.upsert_many(as_columns(list(items.values())))
+        assert report.ok
+        assert report.updated == len(items)
+        assert len(db._days_index) == len(items)
+        for item_id, item in items.items():
+            assert db.inventory_data[item_id].current_stock == item.current_stock
+
+    def test_csv_source_with_threshold_violation(self, tmp_path):
+        """CSV rows are parsed, validated and reported by row number"""
+        path = tmp_path / "inventory.csv"
+        path.write_text(
+            "inventory_id,organization_id,sector_type,item_type,current_stock,"
+            "daily_consumption_rate,reorder_point,critical_threshold,location_city,"
+            "location_state,location_country\n"
+            "HOSP_9,ORG_H,HOSPITAL,OXYGEN,120,10,30,3,Mumbai,Maharashtra,India\n"
+            "PDS_9,ORG_P,PDS,RICE,500,25,5,7,Delhi,Delhi,India\n"
+            "NGO_9,ORG_N,FLEET,WATER,abc,5,15,5,,Maharashtra,India\n"
+        )
+        db = DatabaseOperations()
+        report = db.insert_many(str(path))
+
+        assert report.inserted == 1
+        assert db.inventory_data['HOSP_9'].current_stock == 120.0
+        assert [(r.row, r.reasons) for r in report.rejected] == [
+            (1, [REJECT_THRESHOLD_ORDER]),
+            (2, ['MISSING_VALUE', 'UNKNOWN_SECTOR', 'INVALID_NUMBER']),
+        ]
+
+    def test_insert_test_data_uses_bulk_path(self):
+        """Seed data loads all three sectors once"""
+        db = DatabaseOperations()
+        assert db.insert_test_data()
+        assert db.insert_test_data()
+        assert sorted(db.inventory_data) == ['HOSP_001', 'NGO_001', 'PDS_001']
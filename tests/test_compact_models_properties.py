@@ -0,0 +1,80 @@
+"""
+Property-based tests for the __slots__-based compact data models
+Feature: inventoryq-supply-chain
+"""
+import pickle
+from dataclasses import FrozenInstanceError
+
+import pytest
+from hypothesis import given
+from src.models.data_models import Location, PDSSupply, NGOSupply, SectorType
+from src.models.compact_models import (
+    CompactInventoryItem, CompactNGOSupply, CompactPDSSupply, FrozenInventoryItem,
+    FrozenLocation, shared_location
+)
+from tests.test_multi_tenant_properties import inventory_item_strategy
+
+
+class TestCompactModelProperties:
+    """Property-based tests for compact model equivalence"""
+
+    @given(inventory_item_strategy())
+    def test_compact_matches_dataclass(self, item):
+        """
+        Property: Compact items behave like the dataclass they were built from
+        """
+        compact = CompactInventoryItem.from_dataclass(item)
+
+        assert compact == item
+        assert compact.days_remaining() == item.days_remaining()
+        assert compact.is_critical() == item.is_critical()
+        assert compact.to_dataclass() == item
+        assert not hasattr(compact, '__dict__')
+        assert pickle.loads(pickle.dumps(compact)) == compact
+
+    @given(inventory_item_strategy(), inventory_item_strategy())
+    def test_locations_and_strings_are_shared(self, first, second):
+        """
+        Property: Equal locations resolve to one flyweight and string fields are interned
+        """
+        second.location = Location(
+            "".join(first.location.city), first.location.state, first.location.country,
+            first.location.latitude, first.location.longitude
+        )
+        second.organization_id = "".join([first.organization_id])
+
+        a = CompactInventoryItem.from_dataclass(first)
+        b = CompactInventoryItem.from_dataclass(second)
+
+        assert a.location is b.location
+        assert isinstance(a.location, FrozenLocation)
+        assert a.organization_id is b.organization_id
+
+    def test_frozen_items_are_immutable_and_hashable(self):
+        """Frozen variants reject assignment and can be used as dict keys"""
+        item = FrozenInventoryItem(
+            "INV_1", "ORG_1", SectorType.HOSPITAL, "Oxygen", 10.0, 2.0, 7.0, 3.0,
+            shared_location("Mumbai", "Maharashtra", "India")
+        )
+
+        with pytest.raises(FrozenInstanceError):
+            item.current_stock = 0.0
+        with pytest.raises(FrozenInstanceError):
+            item.location.city = "Delhi"
+        assert {item: 1}[item] == 1
+
+    def test_constructor_signature_matches_dataclasses(self):
+        """Defaults and mutable default fields mirror the dataclasses"""
+        location = shared_location("Delhi", "Delhi", "India")
+        args = ("INV_1", "ORG_1", SectorType.PDS, "Rice", 100.0, 10.0, 7.0, 3.0, location)
+
+        pds = CompactPDSSupply(*args)
+        assert pds.distribution_schedule == {} == PDSSupply(*args).distribution_schedule
+        assert pds.grain_quality_grade == "A"
+        assert CompactNGOSupply(*args).kit_contents == NGOSupply(*args).kit_contents == []
+        assert CompactNGOSupply(*args).kit_contents is not CompactNGOSupply(*args).kit_contents
+
+        with pytest.raises(TypeError):
+            CompactInventoryItem(*args[:-1])
+        with pytest.raises(TypeError):
+            CompactInventoryItem(*args, colour="red")
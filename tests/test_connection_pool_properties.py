@@ -0,0 +1,188 @@
+"""
+Property-based tests for the connector connection pool
+Feature: inventoryq-supply-chain
+"""
+import threading
+import time
+
+import pytest
+from hypothesis import given, settings, strategies as st
+from src.database.connection_pool import ConnectionPool, PoolExhaustedError
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        if self.conn.broken:
+            raise RuntimeError("250002: Connection is closed")
+        self.conn.queries.append(query)
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """snowflake.connector connection stand-in"""
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.queries = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    def commit(self):
+        pass
+
+
+class CountingConnector:
+    def __init__(self):
+        self.connections = []
+
+    def __call__(self):
+        conn = FakeConnection()
+        self.connections.append(conn)
+        return conn
+
+
+class TestConnectionPoolProperties:
+    """Property-based tests for checkout/checkin semantics"""
+
+    @settings(max_examples=25)
+    @given(st.integers(min_value=1, max_value=50), st.integers(min_value=1, max_value=4))
+    def test_sequential_queries_reuse_connections(self, queries, max_size):
+        """
+        Property: Sequential checkouts never open more than one physical connection
+        """
+        connector = CountingConnector()
+        pool = ConnectionPool(connector, max_size=max_size)
+
+        for _ in range(queries):
+            with pool.cursor() as cursor:
+                cursor.execute("SELECT 1")
+
+        assert len(connector.connections) == 1
+        assert pool.stats['reused'] == queries - 1
+
+    def test_concurrent_checkouts_respect_max_size(self):
+        """Concurrent users never exceed max_size physical connections"""
+        connector = CountingConnector()
+        pool = ConnectionPool(connector, max_size=3)
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(20):
+                    with pool.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                        time.sleep(0.001)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(connector.connections) <= 3
+        assert pool.size <= 3
+
+    def test_caller_closing_connection_does_not_poison_pool(self):
+        """A connection closed by a caller is dropped instead of being handed out again"""
+        connector = CountingConnector()
+        pool = ConnectionPool(connector)
+
+        with pool.connection() as conn:
+            conn.close()
+        with pool.connection() as conn:
+            assert not conn.is_closed()
+
+        assert len(connector.connections) == 2
+
+    def test_failed_health_check_replaces_connection(self):
+        """Stale connections that fail the ping are replaced on checkout"""
+        connector = CountingConnector()
+        pool = ConnectionPool(connector, health_check_interval=0)
+
+        with pool.connection():
+            pass
+        connector.connections[0].broken = True
+        with pool.connection() as conn:
+            assert conn is connector.connections[1]
+
+        assert pool.stats['failed_health_checks'] == 1
+
+    def test_slow_health_check_does_not_block_other_checkouts(self):
+        """The ping runs outside the pool lock, so another thread can check out meanwhile"""
+        connector = CountingConnector()
+        pool = ConnectionPool(connector, max_size=2, health_check_interval=0)
+        pool.checkin(pool.checkout())
+
+        pinging, release = threading.Event(), threading.Event()
+        slow = connector.connections[0]
+        original_cursor = slow.cursor
+
+        def slow_cursor():
+            pinging.set()
+            release.wait(5)
+            return original_cursor()
+
+        slow.cursor = slow_cursor
+        pinged = []
+        thread = threading.Thread(target=lambda: pinged.append(pool.checkout()))
+        thread.start()
+        assert pinging.wait(5)
+
+        started = time.monotonic()
+        other = pool.checkout()
+        assert time.monotonic() - started < 1 and not pinged
+        assert other is connector.connections[1]
+        release.set()
+        thread.join(5)
+        assert pinged == [slow] and pool.size == 2
+
+    def test_idle_connections_are_evicted(self):
+        """Connections idle past max_idle_seconds are closed"""
+        connector = CountingConnector()
+        pool = ConnectionPool(connector, max_idle_seconds=0)
+
+        with pool.connection():
+            pass
+        time.sleep(0.01)
+        with pool.connection():
+            pass
+
+        assert connector.connections[0].closed
+        assert pool.stats['evicted'] >= 1
+
+    def test_nested_use_on_one_thread_shares_connection(self):
+        """Nested helpers on the same thread reuse the held connection"""
+        pool = ConnectionPool(CountingConnector(), max_size=1, checkout_timeout=0.05)
+
+        with pool.connection() as outer:
+            with pool.connection() as inner:
+                assert inner is outer
+
+    def test_exhausted_pool_times_out(self):
+        """Checkout fails with PoolExhaustedError rather than blocking forever"""
+        pool = ConnectionPool(CountingConnector(), max_size=1, checkout_timeout=0.05)
+        held = pool.checkout()
+
+        with pytest.raises(PoolExhaustedError):
+            pool.checkout()
+
+        pool.checkin(held)
@@ -0,0 +1,116 @@
+"""
+Property-based tests for the token-budgeted AI context builder
+Feature: inventoryq-supply-chain
+"""
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+from src.ai.context_builder import (
+    BYTES_PER_TOKEN, CRITICALITY_MULTIPLIERS, ContextBuilder, _cell, build_inventory_context
+)
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+
+
+COLUMNS = ['ITEM_TYPE', 'LOCATION_CITY', 'SECTOR_TYPE', 'CURRENT_STOCK',
+           'DAILY_CONSUMPTION_RATE', 'DAYS_REMAINING', 'STATUS']
+
+row_strategy = st.fixed_dictionaries({
+    'ITEM_TYPE': st.sampled_from(['Insulin', 'Rice', 'Water|Bottled', 'Vaccine']),
+    'LOCATION_CITY': st.sampled_from(['Mumbai', 'Delhi', 'São Paulo', 'Chennai\nNorth']),
+    'SECTOR_TYPE': st.sampled_from(['HOSPITAL', 'PDS', 'NGO', None]),
+    'CURRENT_STOCK': st.integers(min_value=0, max_value=5000),
+    'DAILY_CONSUMPTION_RATE': st.integers(min_value=1, max_value=200),
+    'DAYS_REMAINING': st.one_of(st.none(), st.floats(min_value=0, max_value=400)),
+    'STATUS': st.sampled_from(['CRITICAL', 'WARNING', 'NORMAL'])
+})
+
+
+def inventory_frame(rows):
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+def section(text, title):
+    """Data rows of one section of the context text"""
+    lines = text.split('\n')
+    starts = [i for i, line in enumerate(lines) if line.startswith(title)]
+    if not starts:
+        return []
+    rows = []
+    for line in lines[starts[0] + 1:]:
+        if line.startswith(('BY CITY', 'TOP RISK', '(omitted')):
+            break
+        rows.append(line.split('|'))
+    return rows
+
+
+class TestContextBuilderProperties:
+    """Property-based tests for budgeting, risk ranking and per-snapshot caching"""
+
+    @settings(max_examples=80, deadline=None)
+    @given(st.lists(row_strategy, max_size=60), st.integers(min_value=0, max_value=200),
+           st.integers(min_value=0, max_value=30))
+    def test_context_never_exceeds_budget(self, rows, max_tokens, top_k):
+        """
+        Property: The text fits max_tokens * BYTES_PER_TOKEN bytes for any catalog and budget
+        """
+        context = build_inventory_context(inventory_frame(rows), max_tokens=max_tokens, top_k=top_k)
+        assert context.size_bytes <= max_tokens * BYTES_PER_TOKEN
+        assert len(section(context.text, 'BY CITY')) == context.rollup_rows
+        assert len(section(context.text, 'TOP RISK')) == context.top_items
+        assert all(len(cells) == 7 for cells in section(context.text, 'BY CITY'))
+        assert all(len(cells) == 7 for cells in section(context.text, 'TOP RISK'))
+
+    @settings(max_examples=60, deadline=None)
+    @given(st.lists(row_strategy, min_size=1, max_size=60), st.integers(min_value=1, max_value=15))
+    def test_unbounded_budget_is_complete_and_ranked(self, rows, top_k):
+        """
+        Property: With room to spare, every group is rolled up and the top items are the riskiest
+        """
+        df = inventory_frame(rows)
+        context = build_inventory_context(df, max_tokens=100000, top_k=top_k)
+        rollup = section(context.text, 'BY CITY')
+
+        assert context.rollup_rows == context.rollup_total == len(rollup)
+        assert sum(int(cells[2]) for cells in rollup) == len(df)
+        assert sum(int(cells[3]) for cells in rollup) == int((df['STATUS'] == 'CRITICAL').sum())
+
+        days = pd.to_numeric(df['DAYS_REMAINING'])
+        multipliers = df['SECTOR_TYPE'].map(CRITICALITY_MULTIPLIERS).fillna(1.0)
+        scores = (multipliers / days.clip(lower=0.1)).dropna().sort_values(ascending=False, kind='stable')
+        expected = min(top_k, len(scores))
+        top = section(context.text, 'TOP RISK')
+        assert context.top_items == expected and context.top_total == len(scores)
+        # Highest risk first, ties in snapshot order
+        riskiest = df.loc[scores.index[:expected], ['ITEM_TYPE', 'LOCATION_CITY', 'SECTOR_TYPE']]
+        assert [cells[:3] for cells in top] == [[_cell(value) for value in row]
+                                                for row in riskiest.itertuples(index=False, name=None)]
+
+    def test_tight_budget_keeps_both_sections(self):
+        """A budget too small for everything still shows totals, some groups and the riskiest item"""
+        rows = [{'ITEM_TYPE': f"Item{i}", 'LOCATION_CITY': f"City{i}", 'SECTOR_TYPE': 'HOSPITAL',
+                 'CURRENT_STOCK': i, 'DAILY_CONSUMPTION_RATE': 10, 'DAYS_REMAINING': 5 + i % 50,
+                 'STATUS': 'CRITICAL'} for i in range(5000)]
+        rows[4321]['DAYS_REMAINING'] = 0.2
+        context = build_inventory_context(inventory_frame(rows), max_tokens=150, top_k=25)
+
+        assert context.size_bytes <= 600 and context.truncated
+        assert context.text.startswith('TOTALS items=5000 critical=5000')
+        assert 0 < context.rollup_rows < 5000 and context.top_items > 0
+        assert section(context.text, 'TOP RISK')[0][0] == 'Item4321'
+        assert context.text.rsplit('\n', 1)[-1].startswith('(omitted')
+
+    def test_builder_memoizes_per_snapshot_version(self):
+        """Reruns on one snapshot reuse the context; a new version or budget rebuilds it"""
+        df = inventory_frame([{'ITEM_TYPE': 'Rice', 'LOCATION_CITY': 'Delhi', 'SECTOR_TYPE': 'PDS',
+                               'CURRENT_STOCK': 10, 'DAILY_CONSUMPTION_RATE': 5, 'DAYS_REMAINING': 2.0,
+                               'STATUS': 'CRITICAL'}])
+        df.attrs[SNAPSHOT_VERSION_ATTR] = 1
+        builder = ContextBuilder()
+        first = builder.build(df)
+        assert builder.build(df.copy()) is first
+        assert builder.stats == {'hits': 1, 'misses': 1}
+
+        newer = df.copy()
+        newer.attrs[SNAPSHOT_VERSION_ATTR] = 2
+        builder.build(newer)
+        builder.build(df, max_tokens=50)
+        assert builder.stats['misses'] == 3
@@ -0,0 +1,155 @@
+"""
+Property-based tests for the cached Cortex completion layer
+Feature: inventoryq-supply-chain
+"""
+import threading
+
+from hypothesis import given, settings, strategies as st
+from src.ai.cortex_cache import CortexCache, normalize_prompt
+
+
+class FakeCortexSession:
+    """Snowpark session stand-in answering CORTEX.COMPLETE deterministically"""
+
+    def __init__(self, gate=None):
+        self.queries = []
+        self.gate = gate
+        self._rows = []
+
+    def sql(self, query, params=None):
+        self.queries.append(query)
+        if self.gate is not None:
+            self.gate.wait(5)
+        model = params[0]
+        if 'FROM VALUES' in query:
+            pairs = params[1:]
+            self._rows = [{'PROMPT_KEY': pairs[i], 'RESPONSE': answer(model, pairs[i + 1])}
+                          for i in range(0, len(pairs), 2)]
+        else:
+            self._rows = [{'RESPONSE': answer(model, params[1])}]
+        return self
+
+    def collect(self):
+        return self._rows
+
+
+def answer(model, prompt):
+    return f"{model}|{normalize_prompt(prompt)}"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+prompt_strategy = st.text(alphabet="ab \n'", min_size=1, max_size=6).filter(lambda text: text.strip())
+
+
+class TestCortexCacheProperties:
+    """Property-based tests for response caching, batching and single-flight calls"""
+
+    @settings(max_examples=50, deadline=None)
+    @given(st.dictionaries(st.integers(0, 200), prompt_strategy, max_size=40),
+           st.integers(min_value=1, max_value=7))
+    def test_batch_matches_single_calls(self, prompts, batch_rows):
+        """
+        Property: complete_many equals one complete() per prompt, in ceil(unique / batch) queries
+        """
+        session = FakeCortexSession()
+        cache = CortexCache(batch_rows=batch_rows)
+        results = cache.complete_many(session, prompts, snapshot_version=1)
+
+        assert results == {name: answer(cache.model, prompt) for name, prompt in prompts.items()}
+        unique = {normalize_prompt(prompt) for prompt in prompts.values()}
+        assert len(session.queries) == -(-len(unique) // batch_rows)
+
+        # Everything is cached now: repeats and single calls cost nothing
+        assert cache.complete_many(session, prompts, snapshot_version=1) == results
+        for prompt in prompts.values():
+            assert cache.complete(session, prompt, snapshot_version=1) == answer(cache.model, prompt)
+        assert len(session.queries) == -(-len(unique) // batch_rows)
+
+    @settings(max_examples=50, deadline=None)
+    @given(prompt_strategy, st.integers(0, 3))
+    def test_key_is_model_normalized_prompt_and_version(self, prompt, padding):
+        """
+        Property: Whitespace variants hit the cache; another model or snapshot version misses
+        """
+        session = FakeCortexSession()
+        cache = CortexCache()
+        cache.complete(session, prompt, snapshot_version=1)
+        cache.complete(session, ' ' * padding + prompt.replace(' ', '  ') + '\n' * padding, snapshot_version=1)
+        assert len(session.queries) == 1
+
+        cache.complete(session, prompt, snapshot_version=2)
+        cache.complete(session, prompt, snapshot_version=1, model='mistral-large')
+        assert len(session.queries) == 3
+        assert cache.stats['hits'] == 1
+
+    def test_ttl_and_lru_bound_the_cache(self):
+        """Entries expire after the TTL and the least recently used entry is evicted first"""
+        session = FakeCortexSession()
+        clock = FakeClock()
+        cache = CortexCache(ttl_s=60, max_entries=2, clock=clock)
+        cache.complete(session, 'a')
+        cache.complete(session, 'b')
+        cache.complete(session, 'a')
+        cache.complete(session, 'c')
+        assert len(cache) == 2 and cache.stats['evictions'] == 1
+
+        cache.complete(session, 'a')
+        assert len(session.queries) == 3
+        cache.complete(session, 'b')
+        assert len(session.queries) == 4
+
+        clock.now += 60
+        cache.complete(session, 'b')
+        assert len(session.queries) == 5
+
+        cache.invalidate()
+        assert len(cache) == 0
+
+    @settings(max_examples=10, deadline=None)
+    @given(st.integers(min_value=2, max_value=12))
+    def test_concurrent_identical_prompts_share_one_call(self, sessions):
+        """
+        Property: N sessions asking the same question at once cause one Cortex query
+        """
+        gate = threading.Event()
+        session = FakeCortexSession(gate)
+        cache = CortexCache()
+        results = []
+
+        def ask():
+            results.append(cache.complete(session, 'Which items are critical?', snapshot_version=7))
+
+        threads = [threading.Thread(target=ask) for _ in range(sessions)]
+        for thread in threads:
+            thread.start()
+        while cache.stats['misses'] + cache.stats['coalesced'] < sessions:
+            pass
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(session.queries) == 1
+        assert len(results) == sessions and len(set(results)) == 1
+
+    def test_failures_are_not_cached(self):
+        """A failed call raises for its caller and the next call retries"""
+        class BrokenSession(FakeCortexSession):
+            def sql(self, query, params=None):
+                self.queries.append(query)
+                raise RuntimeError("Cortex unavailable")
+
+        cache = CortexCache()
+        for _ in range(2):
+            try:
+                cache.complete_many(BrokenSession(), {'A': 'x', 'B': 'y'})
+            except RuntimeError:
+                pass
+        assert len(cache) == 0
+        assert cache.complete(FakeCortexSession(), 'x') == answer(cache.model, 'x')
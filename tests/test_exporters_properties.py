@@ -0,0 +1,204 @@
+"""
+Property-based tests for the streaming export pipeline
+Feature: inventoryq-supply-chain
+"""
+import gzip
+import io
+import json
+import sqlite3
+
+import pandas as pd
+import pytest
+from hypothesis import given, settings, strategies as st
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+from src.database.query_layer import fetch_arrow_batches, fetch_batches, register_template
+from src.reports.exporters import (
+    DICTIONARY_COLUMNS, EXPORT_FORMATS, SUMMARY_COLUMNS, compression_choices, export_batches, export_frame,
+    read_columnar, scope_batches
+)
+
+
+SELECT_ITEMS = register_template('test.export.items', """
+    SELECT INVENTORY_ID, ITEM_TYPE, CURRENT_STOCK FROM items WHERE CURRENT_STOCK >= :min_stock ORDER BY INVENTORY_ID
+""")
+
+row_strategy = st.fixed_dictionaries({
+    'ITEM_TYPE': st.text(alphabet='ab,"\n é|', max_size=8),
+    'LOCATION_CITY': st.sampled_from(['Mumbai', 'Delhi', 'São Paulo']),
+    'CURRENT_STOCK': st.integers(min_value=0, max_value=10**6),
+    'DAYS_REMAINING': st.floats(min_value=0, max_value=1000, allow_nan=False).map(lambda x: round(x, 3)),
+    'STATUS': st.sampled_from(['CRITICAL', 'WARNING', 'NORMAL'])
+})
+
+
+def inventory_frame(rows):
+    df = pd.DataFrame(rows, columns=['ITEM_TYPE', 'LOCATION_CITY', 'CURRENT_STOCK', 'DAYS_REMAINING', 'STATUS'])
+    df.insert(0, 'INVENTORY_ID', [f"INV_{i:05d}" for i in range(len(df))])
+    return df
+
+
+def read_back(artifact):
+    data = b''.join(artifact.iter_bytes(chunk_bytes=64))
+    if artifact.compression == 'gzip':
+        data = gzip.decompress(data)
+    text = data.decode('utf-8')
+    if artifact.format == 'csv':
+        return pd.read_csv(io.StringIO(text), keep_default_na=False, dtype={'ITEM_TYPE': str})
+    if artifact.format == 'ndjson':
+        return pd.DataFrame([json.loads(line) for line in text.splitlines()])
+    return pd.DataFrame(json.loads(text))
+
+
+class PyformatCursor(sqlite3.Cursor):
+    """SQLite cursor accepting the connector's pyformat SQL"""
+
+    def execute(self, sql, params=()):
+        return super().execute(sql.replace('%s', '?'), params)
+
+
+class SnowparkBatches:
+    """Snowpark session stand-in whose results come back as pandas batches"""
+
+    def __init__(self, df, batch_rows):
+        self.df = df
+        self.batch_rows = batch_rows
+        self.queries = []
+
+    def sql(self, query, params=None):
+        self.queries.append((query, params))
+        return self
+
+    def to_pandas_batches(self):
+        for start in range(0, len(self.df), self.batch_rows):
+            yield self.df.iloc[start:start + self.batch_rows].reset_index(drop=True)
+
+
+class TestExportersProperties:
+    """Property-based tests for chunked writing, compression and batch sources"""
+
+    @settings(max_examples=60, deadline=None)
+    @given(st.lists(row_strategy, min_size=1, max_size=40), st.integers(min_value=1, max_value=12),
+           st.sampled_from(['csv', 'ndjson', 'json']), st.sampled_from([None, 'gzip']))
+    def test_chunked_export_round_trips(self, rows, chunk_rows, fmt, compression):
+        """
+        Property: Any chunking and compression reads back as the original frame
+        """
+        df = inventory_frame(rows)
+        artifact = export_frame(df, fmt, compression, chunk_rows=chunk_rows)
+
+        assert artifact.rows == len(df)
+        assert artifact.file_name.endswith(f".{fmt}" + ('.gz' if compression else ''))
+        pd.testing.assert_frame_equal(read_back(artifact), df, check_dtype=False)
+        # The artifact can be read more than once (download buttons re-read on rerun)
+        pd.testing.assert_frame_equal(read_back(artifact), df, check_dtype=False)
+
+    @settings(max_examples=30, deadline=None)
+    @given(st.integers(min_value=0, max_value=30), st.integers(min_value=1, max_value=7))
+    def test_cursor_batches_stream_with_fetchmany(self, count, batch_rows):
+        """
+        Property: A DB-API cursor is read batch_rows rows at a time and the export sees every row
+        """
+        connection = sqlite3.connect(':memory:')
+        connection.execute("CREATE TABLE items (INVENTORY_ID TEXT, ITEM_TYPE TEXT, CURRENT_STOCK INTEGER)")
+        connection.executemany("INSERT INTO items VALUES (?, ?, ?)",
+                               [(f"INV_{i:03d}", f"Item {i}", i) for i in range(count)])
+        cursor = connection.cursor(PyformatCursor)
+        batches = list(fetch_batches(cursor, SELECT_ITEMS, {'min_stock': 0}, batch_rows=batch_rows))
+        assert [len(batch) for batch in batches] == [min(batch_rows, count - start)
+                                                     for start in range(0, count, batch_rows)]
+
+        cursor = connection.cursor(PyformatCursor)
+        artifact = export_batches(fetch_batches(cursor, SELECT_ITEMS, {'min_stock': 0}, batch_rows),
+                                  'csv', columns=['INVENTORY_ID', 'ITEM_TYPE', 'CURRENT_STOCK'])
+        assert artifact.rows == count
+        text = artifact.file.read().decode('utf-8')
+        assert text.splitlines()[0] == 'INVENTORY_ID,ITEM_TYPE,CURRENT_STOCK'
+        assert len(text.splitlines()) == count + 1
+
+    def test_large_exports_spool_to_disk(self):
+        """Exports past spool_max_bytes roll over to a temporary file instead of memory"""
+        df = inventory_frame([{'ITEM_TYPE': 'Rice', 'LOCATION_CITY': 'Delhi', 'CURRENT_STOCK': i,
+                               'DAYS_REMAINING': 1.5, 'STATUS': 'NORMAL'} for i in range(2000)])
+        small = export_frame(df.head(5), 'csv', spool_max_bytes=1 << 20)
+        large = export_frame(df, 'ndjson', chunk_rows=100, spool_max_bytes=4096)
+        assert not small.on_disk and large.on_disk
+        assert large.size_bytes == sum(len(chunk) for chunk in large.iter_bytes())
+        pd.testing.assert_frame_equal(read_back(large), df, check_dtype=False)
+
+    def test_scopes_stream_from_the_warehouse_or_slice_the_snapshot(self):
+        """With a session each scope is one streamed query; without one the snapshot is sliced"""
+        df = inventory_frame([{'ITEM_TYPE': 'Rice', 'LOCATION_CITY': 'Delhi', 'CURRENT_STOCK': i,
+                               'DAYS_REMAINING': 1.0, 'STATUS': 'CRITICAL' if i % 3 == 0 else 'NORMAL'}
+                              for i in range(10)])
+        local = pd.concat(scope_batches(None, df, "Critical Items Only", chunk_rows=2))
+        assert list(local['STATUS'].unique()) == ['CRITICAL'] and len(local) == 4
+        summary = pd.concat(scope_batches(None, df, "Summary Report"))
+        assert list(summary.columns) == [column for column in SUMMARY_COLUMNS if column in df]
+
+        session = SnowparkBatches(df[df['STATUS'] == 'CRITICAL'], batch_rows=3)
+        artifact = export_batches(scope_batches(session, df, "Critical Items Only"), 'json')
+        (query, params), = session.queries
+        assert "WHERE STATUS = ?" in query and params == ['CRITICAL']
+        assert artifact.rows == 4 and len(read_back(artifact)) == 4
+
+        with pytest.raises(ValueError):
+            export_frame(df, 'parquet-ish')
+        empty = export_batches(iter(()), 'csv', columns=['A', 'B'])
+        assert empty.rows == 0 and empty.file.read() == b'A,B\n'
+
+    @settings(max_examples=40, deadline=None)
+    @given(st.lists(row_strategy, max_size=40), st.integers(min_value=1, max_value=12),
+           st.sampled_from([('parquet', None), ('parquet', 'zstd'), ('parquet', 'gzip'),
+                            ('arrow', None), ('arrow', 'zstd')]))
+    def test_columnar_export_round_trips(self, rows, chunk_rows, fmt_codec):
+        """
+        Property: Parquet/Arrow exports read back equal, with city/item/status dictionary-encoded
+        """
+        fmt, codec = fmt_codec
+        df = inventory_frame(rows)
+        df.attrs[SNAPSHOT_VERSION_ATTR] = 42
+        artifact = export_frame(df, fmt, codec, chunk_rows=chunk_rows)
+        assert artifact.rows == len(df) and artifact.file_name.endswith(f".{fmt}")
+
+        back = read_columnar(artifact.file)
+        assert back.attrs[SNAPSHOT_VERSION_ATTR] == 42
+        assert list(back.columns) == list(df.columns)
+        for column in DICTIONARY_COLUMNS:
+            assert isinstance(back[column].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(back.astype({column: object for column in DICTIONARY_COLUMNS}),
+                                      df, check_dtype=False)
+
+    def test_offered_compressions_all_export(self):
+        """Every compression offered for a format produces an export; unsupported ones are not offered"""
+        df = inventory_frame([{'ITEM_TYPE': 'a', 'LOCATION_CITY': 'Delhi', 'CURRENT_STOCK': 5,
+                               'DAYS_REMAINING': 1.5, 'STATUS': 'CRITICAL'}])
+        # xlsx needs openpyxl and takes no compression
+        for fmt in set(EXPORT_FORMATS) - {'xlsx'}:
+            for compression in compression_choices(fmt):
+                assert export_frame(df, fmt, compression).rows == 1
+        assert 'gzip' not in compression_choices('arrow')
+        assert compression_choices('xlsx') == [None] and compression_choices(None) == [None]
+        assert compression_choices('csv')[:2] == [None, 'gzip']
+
+    def test_arrow_batches_stream_without_pandas(self):
+        """Snowpark results become RecordBatches; Summary Report projects its columns"""
+        import pyarrow as pa
+
+        df = inventory_frame([{'ITEM_TYPE': f"Item {i // 7}", 'LOCATION_CITY': ['Delhi', 'Pune'][i % 2],
+                               'CURRENT_STOCK': i, 'DAYS_REMAINING': i / 2, 'STATUS': 'NORMAL'}
+                              for i in range(25)])
+        session = SnowparkBatches(df[SUMMARY_COLUMNS], batch_rows=7)
+        batches = list(scope_batches(session, df, "Summary Report", arrow=True))
+        assert all(isinstance(batch, pa.RecordBatch) for batch in batches)
+        assert [batch.num_rows for batch in batches] == [7, 7, 7, 4]
+
+        # Later batches add new categories: the dictionary grows by deltas
+        artifact = export_batches(batches, 'arrow', columns=SUMMARY_COLUMNS)
+        back = read_columnar(artifact.file)
+        assert list(back.columns) == SUMMARY_COLUMNS and len(back) == 25
+        assert sorted(back['ITEM_TYPE'].cat.categories) == [f"Item {i}" for i in range(4)]
+
+        with pytest.raises(ValueError):
+            export_batches(fetch_arrow_batches(session, 'test.export.items', {'min_stock': 0}), 'arrow', 'gzip')
+        empty = read_columnar(export_batches(iter(()), 'parquet', columns=SUMMARY_COLUMNS).file)
+        assert list(empty.columns) == SUMMARY_COLUMNS and empty.empty
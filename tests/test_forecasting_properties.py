@@ -0,0 +1,183 @@
+"""
+Property-based tests for the batched forecasting engine
+Feature: inventoryq-supply-chain
+"""
+import numpy as np
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+from src.analytics.forecasting import (
+    ForecastEngine,
+    project_enhanced,
+    project_linear,
+    runout_indices,
+    select_top_n_by_risk
+)
+
+
+@st.composite
+def inventory_frame_strategy(draw):
+    """Generate small unified_inventory_view-shaped frames"""
+    size = draw(st.integers(min_value=1, max_value=40))
+    rows = []
+    for i in range(size):
+        stock = draw(st.floats(min_value=0.0, max_value=1000.0))
+        rate = draw(st.floats(min_value=0.1, max_value=50.0))
+        rows.append({
+            'INVENTORY_ID': f"INV_{i:04d}",
+            'ITEM_TYPE': draw(st.sampled_from(["OXYGEN", "RICE", "BLANKETS"])),
+            'LOCATION_CITY': draw(st.sampled_from(["Bangalore", "Delhi", "Mumbai"])),
+            'CURRENT_STOCK': stock,
+            'DAILY_CONSUMPTION_RATE': rate,
+            'DAYS_REMAINING': stock / rate,
+            'STATUS': draw(st.sampled_from(["CRITICAL", "WARNING", "NORMAL"]))
+        })
+    return pd.DataFrame(rows)
+
+
+class FakeForecastSession:
+    """Snowpark session stand-in that counts forecast calls"""
+
+    def __init__(self, fail=False, predictions=None):
+        self.calls = 0
+        self.fail = fail
+        self.statements = []
+        self.predictions = predictions or {}
+        self._staged = []
+        self._rows = []
+
+    def sql(self, query, params=None):
+        self.statements.append((query, params))
+        if 'FORECAST(' not in query:
+            self._staged, self._rows = list(params or []), []
+            return self
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("STOCK_FORECAST_MODEL does not exist")
+        periods = params[-1]
+        self._rows = [{'SERIES': f'"{series}"', 'FORECAST': value}
+                      for series in self._staged for value in self.predictions.get(series, [])[:periods]]
+        return self
+
+    def collect(self):
+        return self._rows
+
+
+class TestForecastingProperties:
+    """Property-based tests for vectorized forecasting"""
+
+    @given(inventory_frame_strategy())
+    def test_linear_projection_matches_per_row_loop(self, df):
+        """
+        Property: The vectorized basic projection equals the old per-row loop
+        """
+        matrix = project_linear(df['CURRENT_STOCK'].to_numpy(), df['DAILY_CONSUMPTION_RATE'].to_numpy())
+
+        assert matrix.shape == (len(df), 30)
+        for position, (_, row) in enumerate(df.iterrows()):
+            expected = [max(0, row['CURRENT_STOCK'] - row['DAILY_CONSUMPTION_RATE'] * i) for i in range(30)]
+            assert np.allclose(matrix[position], expected)
+
+    @given(inventory_frame_strategy(), st.integers(min_value=0, max_value=10))
+    def test_top_n_selects_riskiest_series(self, df, top_n):
+        """
+        Property: Top-N selection matches a full status/days sort truncated to N
+        """
+        selected = select_top_n_by_risk(df, top_n)
+        rank = df['STATUS'].map({'CRITICAL': 0, 'WARNING': 1, 'NORMAL': 2})
+        expected = df.assign(_rank=rank).sort_values(['_rank', 'DAYS_REMAINING'], kind='stable').head(top_n)
+
+        assert len(selected) == min(top_n, len(df))
+        assert list(selected['STATUS']) == list(expected['STATUS'])
+        assert np.allclose(selected['DAYS_REMAINING'].to_numpy(), expected['DAYS_REMAINING'].to_numpy())
+
+    @given(inventory_frame_strategy())
+    def test_enhanced_projection_is_non_negative(self, df):
+        """
+        Property: Enhanced projections never go below zero and start at current stock
+        """
+        matrix = project_enhanced(df['CURRENT_STOCK'].to_numpy(), df['DAILY_CONSUMPTION_RATE'].to_numpy(),
+                                  rng=np.random.default_rng(7))
+
+        assert (matrix >= 0).all()
+        assert np.allclose(matrix[:, 0], df['CURRENT_STOCK'].to_numpy())
+
+    def test_runout_index_is_first_depleted_day(self):
+        """Runout is the first day at or below zero, or the last day if never depleted"""
+        projection = np.array([[5.0, 2.0, 0.0, 0.0], [5.0, 4.0, 3.0, 2.0]])
+        assert runout_indices(projection).tolist() == [2, 3]
+
+    @settings(max_examples=20)
+    @given(inventory_frame_strategy(), st.integers(min_value=1, max_value=7))
+    def test_ml_calls_are_chunked(self, df, chunk_size):
+        """
+        Property: Forecasting N series issues ceil(N / chunk_size) ML calls, not N
+        """
+        session = FakeForecastSession()
+        engine = ForecastEngine(session, chunk_size=chunk_size, seed=1)
+        results = engine.forecast(df)
+
+        assert len(results) == len(df)
+        assert session.calls == -(-len(df) // chunk_size)
+        assert all(result['source'] == 'ENHANCED_FORECAST' for result in results)
+
+    def test_missing_model_stops_after_first_chunk(self):
+        """An unavailable model falls back without retrying every chunk"""
+        df = pd.DataFrame({
+            'INVENTORY_ID': ['A', 'B', 'C'],
+            'ITEM_TYPE': ['OXYGEN'] * 3,
+            'LOCATION_CITY': ['Delhi'] * 3,
+            'CURRENT_STOCK': [10.0, 20.0, 30.0],
+            'DAILY_CONSUMPTION_RATE': [1.0, 2.0, 3.0],
+            'DAYS_REMAINING': [10.0, 10.0, 10.0],
+            'STATUS': ['NORMAL'] * 3
+        })
+        session = FakeForecastSession(fail=True)
+        results = ForecastEngine(session, chunk_size=1).forecast(df, top_n=5)
+
+        assert session.calls == 1
+        assert [result['inventory_id'] for result in results] == ['A', 'B', 'C']
+
+    def test_forecast_ids_are_bound_not_inlined(self):
+        """Series ids travel as bound values; every chunk runs the same CALL text"""
+        df = pd.DataFrame({
+            'INVENTORY_ID': ["O'BRIEN_01", 'B', 'C'],
+            'ITEM_TYPE': ['OXYGEN'] * 3,
+            'LOCATION_CITY': ['Delhi'] * 3,
+            'CURRENT_STOCK': [10.0, 20.0, 30.0],
+            'DAILY_CONSUMPTION_RATE': [1.0, 2.0, 3.0],
+            'DAYS_REMAINING': [10.0, 10.0, 10.0],
+            'STATUS': ['NORMAL'] * 3
+        })
+        session = FakeForecastSession()
+        ForecastEngine(session, chunk_size=2).forecast(df)
+
+        calls = {query for query, _ in session.statements if 'FORECAST(' in query}
+        staged = [value for query, params in session.statements if 'FORECAST(' not in query for value in params]
+        assert len(calls) == 1
+        assert "O'BRIEN_01" in staged
+        assert not any('BRIEN' in query for query, _ in session.statements)
+
+    def test_ml_rows_replace_the_fallback(self):
+        """Model output is used for the requested horizon; a short series keeps the fallback tail"""
+        df = pd.DataFrame({
+            'INVENTORY_ID': ['A', 'B', 'C'],
+            'ITEM_TYPE': ['OXYGEN'] * 3,
+            'LOCATION_CITY': ['Delhi'] * 3,
+            'CURRENT_STOCK': [100.0, 100.0, 100.0],
+            'DAILY_CONSUMPTION_RATE': [1.0, 1.0, 1.0],
+            'DAYS_REMAINING': [100.0, 100.0, 100.0],
+            'STATUS': ['NORMAL'] * 3
+        })
+        full = [float(60 - day) for day in range(40)]
+        session = FakeForecastSession(predictions={'A': full, 'B': [5.0, 0.0]})
+        engine = ForecastEngine(session, horizon=30, chunk_size=2, seed=1)
+        results = {result['inventory_id']: result for result in engine.forecast(df)}
+
+        assert all(params[-1] == 30 for query, params in session.statements if 'FORECAST(' in query)
+        assert results['A']['source'] == 'SNOWFLAKE_ML'
+        assert results['A']['predicted_stock'] == full[:30]
+        assert results['B']['source'] == 'SNOWFLAKE_ML'
+        assert results['B']['predicted_stock'][:2] == [5.0, 0.0]
+        assert len(results['B']['predicted_stock']) == 30
+        assert results['B']['runout_date'] == results['B']['dates'][1]
+        assert results['C']['source'] == 'ENHANCED_FORECAST'
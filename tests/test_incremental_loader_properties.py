@@ -0,0 +1,172 @@
+"""
+Property-based tests for the incremental inventory loader
+Feature: inventoryq-supply-chain
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from hypothesis import given, strategies as st
+from src.database.incremental_loader import (
+    IncrementalInventoryLoader,
+    inventory_sort_keys,
+    merge_ranked,
+    rank_inventory
+)
+
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def make_rows(ids, days, statuses, minutes=0):
+    """Build unified_inventory_view-shaped rows"""
+    return pd.DataFrame({
+        'INVENTORY_ID': ids,
+        'ITEM_TYPE': ['OXYGEN'] * len(ids),
+        'LOCATION_CITY': ['Delhi'] * len(ids),
+        'CURRENT_STOCK': [d * 2.0 for d in days],
+        'DAILY_CONSUMPTION_RATE': [2.0] * len(ids),
+        'DAYS_REMAINING': days,
+        'STATUS': statuses,
+        'LAST_UPDATED': [BASE_TIME + timedelta(minutes=minutes)] * len(ids)
+    })
+
+
+class FakeViewSession:
+    """Snowpark session stand-in serving a mutable unified_inventory_view"""
+
+    def __init__(self, table):
+        self.table = table
+        self.queries = []
+        self._result = None
+
+    def sql(self, query, params=None):
+        self.queries.append(query)
+        if 'COUNT(*)' in query:
+            self._result = [{'ROW_COUNT': len(self.table)}]
+        elif 'WHERE LAST_UPDATED >=' in query:
+            self._result = self.table[self.table['LAST_UPDATED'] >= params[0]]
+        else:
+            self._result = self.table
+        return self
+
+    def to_pandas(self):
+        return self._result.copy()
+
+    def collect(self):
+        return self._result
+
+
+status_strategy = st.sampled_from(['CRITICAL', 'WARNING', 'NORMAL'])
+days_strategy = st.floats(min_value=0.0, max_value=999999.0)
+
+
+class TestIncrementalLoaderProperties:
+    """Property-based tests for delta refresh and incremental re-rank"""
+
+    @given(
+        st.lists(st.tuples(days_strategy, status_strategy), min_size=1, max_size=30),
+        st.lists(st.tuples(st.integers(min_value=0, max_value=40), days_strategy, status_strategy), max_size=10)
+    )
+    def test_incremental_rerank_matches_full_sort(self, base_rows, changes):
+        """
+        Property: Merging a delta into a ranked snapshot yields the same order as a full re-sort
+        """
+        snapshot = rank_inventory(make_rows(
+            [f"INV_{i}" for i in range(len(base_rows))],
+            [row[0] for row in base_rows],
+            [row[1] for row in base_rows]
+        ))
+        delta = make_rows(
+            [f"INV_{change[0]}" for change in changes],
+            [change[1] for change in changes],
+            [change[2] for change in changes],
+            minutes=5
+        )
+
+        merged = merge_ranked(snapshot, delta)
+        expected = pd.concat([snapshot, delta.drop_duplicates('INVENTORY_ID', keep='last')])
+        expected = rank_inventory(expected.drop_duplicates('INVENTORY_ID', keep='last'))
+
+        assert sorted(merged['INVENTORY_ID']) == sorted(expected['INVENTORY_ID'])
+        assert np.array_equal(inventory_sort_keys(merged), inventory_sort_keys(expected))
+
+    def test_refresh_fetches_only_changed_rows(self):
+        """After the first load only rows at or past the high-water mark are read"""
+        table = pd.concat([
+            make_rows(['A'], [1.0], ['CRITICAL'], minutes=0),
+            make_rows(['B'], [20.0], ['WARNING'], minutes=1),
+            make_rows(['C'], [50.0], ['NORMAL'], minutes=2)
+        ], ignore_index=True)
+        session = FakeViewSession(table)
+        loader = IncrementalInventoryLoader()
+
+        first = loader.refresh(session)
+        assert list(first['INVENTORY_ID']) == ['A', 'B', 'C']
+
+        changed = make_rows(['C'], [0.5], ['CRITICAL'], minutes=10)
+        session.table = pd.concat([table[table['INVENTORY_ID'] != 'C'], changed], ignore_index=True)
+
+        second = loader.refresh(session)
+        assert loader.last_delta_rows == 1
+        assert list(second['INVENTORY_ID']) == ['C', 'A', 'B']
+        assert loader.high_water_mark == BASE_TIME + timedelta(minutes=10)
+
+    def test_unchanged_refresh_keeps_the_version(self):
+        """Re-reading the rows at the high-water mark is not a change: the version stays"""
+        table = make_rows(['A', 'B'], [1.0, 20.0], ['CRITICAL', 'WARNING'], minutes=5)
+        session = FakeViewSession(table)
+        loader = IncrementalInventoryLoader()
+        first = loader.refresh(session)
+        version = loader.version
+
+        for _ in range(3):
+            again = loader.refresh(session)
+            assert loader.version == version and loader.last_delta_rows == 0
+        assert again.attrs == first.attrs
+
+        session.table = pd.concat([table[table['INVENTORY_ID'] != 'B'],
+                                   make_rows(['B'], [0.5], ['CRITICAL'], minutes=5)], ignore_index=True)
+        loader.refresh(session)
+        assert loader.version != version and loader.last_delta_rows == 1
+
+    def test_deleted_rows_trigger_full_reload(self):
+        """A server-side delete is detected by the row count and forces a full load"""
+        table = make_rows(['A', 'B'], [1.0, 20.0], ['CRITICAL', 'WARNING'])
+        session = FakeViewSession(table)
+        loader = IncrementalInventoryLoader()
+        loader.refresh(session)
+
+        session.table = table[table['INVENTORY_ID'] == 'B']
+        result = loader.refresh(session)
+
+        assert list(result['INVENTORY_ID']) == ['B']
+
+    def test_invalidate_forces_full_load(self):
+        """invalidate() drops the snapshot and the high-water mark"""
+        session = FakeViewSession(make_rows(['A'], [1.0], ['CRITICAL']))
+        loader = IncrementalInventoryLoader()
+        loader.refresh(session)
+        loader.invalidate()
+
+        assert loader.snapshot is None
+        assert loader.high_water_mark is None
+
+    def test_discarded_rows_keep_refresh_incremental(self):
+        """Rows deleted by this process are dropped locally, so the next refresh stays a delta"""
+        table = make_rows(['A', 'B', 'C'], [1.0, 20.0, 50.0], ['CRITICAL', 'WARNING', 'NORMAL'])
+        session = FakeViewSession(table)
+        loader = IncrementalInventoryLoader()
+        loader.refresh(session)
+        version = loader.version
+
+        session.table = table[table['INVENTORY_ID'] != 'B']
+        assert loader.discard(['B', 'missing']) == 1
+        assert loader.last_removed_ids == ('B', 'missing')
+        assert loader.delta_base_version == version
+
+        session.queries.clear()
+        result = loader.refresh(session)
+        assert list(result['INVENTORY_ID']) == ['A', 'C']
+        full_loads = [query for query in session.queries if 'WHERE' not in query and 'COUNT' not in query]
+        assert not full_loads
@@ -0,0 +1,93 @@
+"""
+Property-based tests for the columnar InventoryFrame store
+Feature: inventoryq-supply-chain
+"""
+from dataclasses import replace
+
+import numpy as np
+from hypothesis import given, strategies as st
+from src.models.data_models import Location, SectorType
+from src.models.inventory_frame import InventoryFrame
+from tests.test_multi_tenant_properties import inventory_item_strategy
+
+
+def unique_items(items):
+    """Give generated items distinct ids"""
+    for i, item in enumerate(items):
+        item.inventory_id = f"{item.inventory_id}_{i}"
+    return items
+
+
+class TestInventoryFrameProperties:
+    """Property-based tests for vectorized inventory evaluation"""
+
+    @given(st.lists(inventory_item_strategy(), min_size=1, max_size=30))
+    def test_vectorized_matches_per_object(self, inventory_items):
+        """
+        Property: Vectorized days_remaining / is_critical equal the per-object methods
+        """
+        items = unique_items(inventory_items)
+        frame = InventoryFrame.from_items(items)
+
+        assert len(frame) == len(items)
+        assert np.allclose(frame.days_remaining(), [item.days_remaining() for item in items])
+        assert frame.is_critical().tolist() == [item.is_critical() for item in items]
+
+    @given(st.lists(inventory_item_strategy(), min_size=1, max_size=30))
+    def test_lazy_items_round_trip(self, inventory_items):
+        """
+        Property: Materialized InventoryItem views equal the inserted items
+        """
+        items = unique_items(inventory_items)
+        frame = InventoryFrame(capacity=1)
+        for item in items:
+            assert frame.append(item)
+
+        for original, materialized in zip(items, frame):
+            assert materialized == original
+        assert frame.get(items[-1].inventory_id) == items[-1]
+        assert not frame.append(items[0])
+
+    @given(st.lists(inventory_item_strategy(), min_size=1, max_size=30))
+    def test_categorical_masks_and_status(self, inventory_items):
+        """
+        Property: Dictionary-encoded masks select the same rows as attribute comparison,
+        and status counts add up to the catalog size
+        """
+        items = unique_items(inventory_items)
+        frame = InventoryFrame.from_items(items)
+
+        for sector in SectorType:
+            selected = frame.select(frame.mask('sector_type', sector))
+            assert selected.inventory_ids == [item.inventory_id for item in items if item.sector_type == sector]
+
+        for city in {item.location.city for item in items}:
+            assert frame.mask('city', city).sum() == sum(item.location.city == city for item in items)
+
+        assert not frame.mask('city', 'Atlantis').any()
+        assert sum(frame.status_counts().values()) == len(items)
+        assert (frame.status_labels()[frame.is_critical()] == 'CRITICAL').all()
+
+    @given(st.lists(inventory_item_strategy(), min_size=1, max_size=30))
+    def test_selected_frames_do_not_share_dictionaries(self, inventory_items):
+        """
+        Property: Appending to a selection never grows the parent's category dictionaries
+        """
+        items = unique_items(inventory_items)
+        frame = InventoryFrame.from_items(items)
+        cities = frame.categories('city')
+
+        subset = frame.select(np.ones(len(frame), dtype=bool))
+        assert subset.categories('city') == cities
+        assert subset.append(replace(items[0], inventory_id='NEW_ITEM',
+                                     location=Location('Atlantis', 'Sea', 'Ocean')))
+
+        assert frame.categories('city') == cities
+        assert 'Atlantis' in subset.categories('city')
+        assert [item.location.city for item in frame] == [item.location.city for item in items]
+
+    def test_categorical_columns_are_compact(self):
+        """Categorical columns store one small integer per row"""
+        frame = InventoryFrame()
+        assert frame.codes('city').dtype == np.int32
+        assert frame.categories('city') == []
@@ -0,0 +1,101 @@
+"""
+Property-based tests for the single-pass KPI engine
+Feature: inventoryq-supply-chain
+"""
+import math
+
+import numpy as np
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+from src.analytics.kpi_engine import KpiEngine, compute_kpis, snapshot_fingerprint
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+
+
+@st.composite
+def inventory_frame_strategy(draw):
+    """unified_inventory_view-shaped frames"""
+    n = draw(st.integers(min_value=0, max_value=40))
+    row = st.fixed_dictionaries({
+        'INVENTORY_ID': st.text(alphabet='ABC123', min_size=1, max_size=6),
+        'ITEM_TYPE': st.sampled_from(['OXYGEN', 'RICE', 'WATER', None]),
+        'LOCATION_CITY': st.sampled_from(['Delhi', 'Mumbai', 'Chennai', None]),
+        'CURRENT_STOCK': st.floats(min_value=0, max_value=1000),
+        'DAILY_CONSUMPTION_RATE': st.floats(min_value=0, max_value=50),
+        'REORDER_POINT': st.floats(min_value=1, max_value=100),
+        'DAYS_REMAINING': st.one_of(st.floats(min_value=0, max_value=60), st.just(999999.0),
+                                    st.just(float('nan'))),
+        'STATUS': st.sampled_from(['CRITICAL', 'WARNING', 'NORMAL']),
+    })
+    return pd.DataFrame(draw(st.lists(row, min_size=n, max_size=n)),
+                        columns=['INVENTORY_ID', 'ITEM_TYPE', 'LOCATION_CITY', 'CURRENT_STOCK',
+                                 'DAILY_CONSUMPTION_RATE', 'REORDER_POINT', 'DAYS_REMAINING', 'STATUS'])
+
+
+def same(a, b):
+    return (math.isnan(a) and math.isnan(b)) or math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+
+
+class TestKpiEngineProperties:
+    """Property-based tests for KPI equivalence and memoization"""
+
+    @settings(max_examples=50)
+    @given(inventory_frame_strategy())
+    def test_single_pass_matches_mask_filters(self, df):
+        """
+        Property: Every KPI equals the per-page boolean-mask computation it replaces
+        """
+        kpis = compute_kpis(df)
+
+        assert kpis.total_items == len(df)
+        for status in ('CRITICAL', 'WARNING', 'NORMAL'):
+            subset = df[df['STATUS'] == status]
+            assert kpis.status_counts[status] == len(subset)
+            assert same(kpis.status_stock_value[status], subset['CURRENT_STOCK'].sum() * 50)
+            assert same(kpis.status_reorder_value[status], subset['REORDER_POINT'].sum() * 50)
+
+        assert kpis.risk_counts['HIGH'] == len(df[df['DAYS_REMAINING'] < 3])
+        assert kpis.risk_counts['MEDIUM'] == len(df[(df['DAYS_REMAINING'] >= 3) & (df['DAYS_REMAINING'] < 7)])
+        assert kpis.risk_counts['LOW'] == len(df[df['DAYS_REMAINING'] >= 7])
+
+        assert same(kpis.avg_days, df['DAYS_REMAINING'].mean())
+        assert same(kpis.total_value, df['CURRENT_STOCK'].sum() * 50)
+        assert same(kpis.monthly_consumption_value, df['DAILY_CONSUMPTION_RATE'].sum() * 30 * 50)
+        assert kpis.location_count == df['LOCATION_CITY'].nunique()
+        assert kpis.category_count == df['ITEM_TYPE'].nunique()
+
+        expected = df.groupby('LOCATION_CITY').agg(
+            ITEMS=('INVENTORY_ID', 'count'), AVG_DAYS=('DAYS_REMAINING', 'mean')
+        )
+        by_city = kpis.by_city.set_index('LOCATION_CITY')
+        assert list(by_city.index) == list(expected.index)
+        assert by_city['ITEMS'].tolist() == expected['ITEMS'].tolist()
+        for city in expected.index:
+            assert same(by_city.loc[city, 'AVG_DAYS'], expected.loc[city, 'AVG_DAYS'])
+            assert by_city.loc[city, 'CRITICAL'] == \
+                len(df[(df['LOCATION_CITY'] == city) & (df['STATUS'] == 'CRITICAL')])
+
+    @settings(max_examples=25)
+    @given(inventory_frame_strategy())
+    def test_memoized_per_fingerprint(self, df):
+        """
+        Property: Equal snapshots reuse one KpiSnapshot; a changed snapshot is recomputed
+        """
+        engine = KpiEngine()
+        first = engine.kpis(df)
+        assert engine.kpis(df.copy()) is first
+        assert engine.stats == {'hits': 1, 'misses': 1}
+
+        if len(df):
+            changed = df.copy()
+            changed.loc[changed.index[0], 'CURRENT_STOCK'] += 1
+            assert snapshot_fingerprint(changed) != snapshot_fingerprint(df)
+            assert engine.kpis(changed) is not first
+
+    def test_loader_version_short_circuits_hashing(self):
+        """Frames stamped with a snapshot version are keyed by version and length"""
+        df = pd.DataFrame({'STATUS': ['CRITICAL', 'NORMAL'], 'CURRENT_STOCK': [1.0, 2.0]})
+        df.attrs[SNAPSHOT_VERSION_ATTR] = 7
+
+        assert snapshot_fingerprint(df) == ('version', 7, 2)
+        assert snapshot_fingerprint(df[df['STATUS'] == 'CRITICAL']) != snapshot_fingerprint(df)
+        assert np.isnan(compute_kpis(df).avg_days)
@@ -237,4 +237,64 @@ class TestMultiTenantProperties:
             total_org_items += len(org_items)
         
         assert total_org_items == len(successfully_inserted), \
-            f"Total items across organizations ({total_org_items}) != total inserted ({len(successfully_inserted)})"
\ No newline at end of file
+            f"Total items across organizations ({total_org_items}) != total inserted ({len(successfully_inserted)})"
+
+    @given(
+        st.lists(inventory_item_strategy(), min_size=1, max_size=20),
+        st.lists(st.tuples(st.sampled_from(['update', 'delete']), st.integers(min_value=0, max_value=19)), max_size=15),
+        st.floats(min_value=0.0, max_value=200.0)
+    )
+    def test_secondary_indexes_match_full_scan(self, inventory_items, operations, max_days):
+        """
+        Property: Secondary indexes stay consistent with the catalog
+        Feature: inventoryq-supply-chain, Indexed tenant and sector lookups
+        
+        For any sequence of inserts, updates and deletes, organization, sector,
+        city and days-remaining lookups return exactly what a full scan returns.
+        """
+        self.db.clear_data()
+        
+        for i, item in enumerate(inventory_items):
+            item.inventory_id = f"{item.inventory_id}_{i}"
+            assert self.db.insert_inventory_item(item)
+        
+        for operation, position in operations:
+            item = inventory_items[position % len(inventory_items)]
+            if operation == 'delete':
+                self.db.delete_inventory_item(item.inventory_id)
+            else:
+                moved = InventoryItem(
+                    inventory_id=item.inventory_id,
+                    organization_id="ORG_MOVED",
+                    sector_type=SectorType.NGO,
+                    item_type=item.item_type,
+                    current_stock=item.current_stock / 2,
+                    daily_consumption_rate=item.daily_consumption_rate,
+                    reorder_point=item.reorder_point,
+                    critical_threshold=item.critical_threshold,
+                    location=Location("Chennai", "Tamil Nadu", "India")
+                )
+                self.db.update_inventory_item(moved)
+        
+        catalog = self.db.get_unified_inventory()
+        
+        for org_id in set(item.organization_id for item in catalog) | {"ORG_MISSING"}:
+            indexed = sorted(item.inventory_id for item in self.db.get_inventory_by_organization(org_id))
+            scanned = sorted(item.inventory_id for item in catalog if item.organization_id == org_id)
+            assert indexed == scanned
+            assert self.db.validate_multi_tenant_access(org_id)
+        
+        for sector in SectorType:
+            indexed = sorted(item.inventory_id for item in self.db.get_inventory_by_sector(sector))
+            scanned = sorted(item.inventory_id for item in catalog if item.sector_type == sector)
+            assert indexed == scanned
+        
+        for city in set(item.location.city for item in catalog):
+            indexed = sorted(item.inventory_id for item in self.db.get_inventory_by_city(city))
+            scanned = sorted(item.inventory_id for item in catalog if item.location.city == city)
+            assert indexed == scanned
+        
+        by_days = self.db.get_inventory_by_days_remaining(max_days)
+        assert sorted(item.inventory_id for item in by_days) == \
+            sorted(item.inventory_id for item in catalog if item.days_remaining() <= max_days)
+        assert [item.days_remaining() for item in by_days] == sorted(item.days_remaining() for item in by_days)
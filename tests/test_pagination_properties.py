@@ -0,0 +1,154 @@
+"""
+Property-based tests for the paginated inventory grid
+Feature: inventoryq-supply-chain
+"""
+import sqlite3
+
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+from src.database.pagination import (
+    GRID_COLUMNS, MAX_PAGE_SIZE, SORTABLE_COLUMNS, GridQuery, InventoryGrid, LocalGridIndex
+)
+
+
+class SqliteViewSession:
+    """Snowpark session stand-in executing the grid SQL against SQLite"""
+
+    def __init__(self, table):
+        self.connection = sqlite3.connect(':memory:')
+        table.to_sql('unified_inventory_view', self.connection, index=False)
+        self.queries = []
+        self._result = None
+
+    def sql(self, query, params=None):
+        self.queries.append(query)
+        self._result = pd.read_sql_query(query, self.connection, params=params or None)
+        return self
+
+    def to_pandas(self):
+        return self._result
+
+    def collect(self):
+        return self._result.to_dict('records')
+
+
+@st.composite
+def inventory_frame_strategy(draw):
+    """Grid-shaped frames with unique ids and frequent ties in every sort column"""
+    n = draw(st.integers(min_value=0, max_value=40))
+    ids = draw(st.lists(st.text(alphabet='AB12_%', min_size=1, max_size=5),
+                        min_size=n, max_size=n, unique=True))
+    row = st.fixed_dictionaries({
+        'ITEM_TYPE': st.sampled_from(['OXYGEN', 'RICE', 'WATER_5%', 'Blood_Bag', None]),
+        'LOCATION_CITY': st.sampled_from(['Delhi', 'Mumbai', 'Chennai', None]),
+        'CURRENT_STOCK': st.one_of(st.sampled_from([0.0, 10.0, 55.5]), st.just(float('nan'))),
+        'DAILY_CONSUMPTION_RATE': st.sampled_from([0.5, 2.0, 7.0]),
+        'DAYS_REMAINING': st.one_of(st.sampled_from([0.0, 1.5, 4.0, 999999.0]), st.just(float('nan'))),
+        'STATUS': st.sampled_from(['CRITICAL', 'WARNING', 'NORMAL']),
+    })
+    rows = draw(st.lists(row, min_size=n, max_size=n))
+    for inventory_id, values in zip(ids, rows):
+        values['INVENTORY_ID'] = inventory_id
+    return pd.DataFrame(rows, columns=list(GRID_COLUMNS)).astype(
+        {'CURRENT_STOCK': float, 'DAILY_CONSUMPTION_RATE': float, 'DAYS_REMAINING': float}
+    )
+
+
+query_strategy = st.builds(
+    GridQuery,
+    search=st.sampled_from(['', 'ox', 'DEL', '_', '%', 'ai']),
+    status=st.sampled_from([None, 'CRITICAL', 'NORMAL']),
+    location=st.sampled_from([None, 'Delhi', 'Chennai']),
+    sort_by=st.sampled_from(SORTABLE_COLUMNS),
+    descending=st.booleans(),
+    page_size=st.integers(min_value=1, max_value=7)
+)
+
+
+def expected_ids(df, query):
+    """Reference: filter with plain pandas, then sort by (key, id)"""
+    mask = pd.Series(True, index=df.index)
+    if query.search:
+        term = query.search.lower()
+        mask &= (df['ITEM_TYPE'].fillna('').str.lower().str.contains(term, regex=False) |
+                 df['LOCATION_CITY'].fillna('').str.lower().str.contains(term, regex=False))
+    if query.status:
+        mask &= df['STATUS'] == query.status
+    if query.location:
+        mask &= df['LOCATION_CITY'] == query.location
+    rows = df[mask]
+    if query.sort_by in ('CURRENT_STOCK', 'DAILY_CONSUMPTION_RATE', 'DAYS_REMAINING'):
+        keys = rows[query.sort_by].fillna(1e300)
+    else:
+        keys = rows[query.sort_by].fillna('')
+    pairs = sorted(zip(keys, rows['INVENTORY_ID']), reverse=query.descending)
+    return [inventory_id for _, inventory_id in pairs]
+
+
+def walk(grid, query, **source):
+    """Follow next_cursor from the first page to the last"""
+    pages, cursor = [], None
+    while True:
+        page = grid.page(query, cursor, **source)
+        pages.append(page)
+        if not page.has_more:
+            return pages
+        cursor = page.next_cursor
+
+
+class TestPaginationProperties:
+    """Property-based tests for keyset pagination"""
+
+    @settings(max_examples=60, deadline=None)
+    @given(inventory_frame_strategy(), query_strategy)
+    def test_pages_cover_sorted_result_exactly_once(self, df, query):
+        """
+        Property: Walking every page yields each matching row once, in stable sort order
+        """
+        df.attrs[SNAPSHOT_VERSION_ATTR] = 1
+        expected = expected_ids(df, query)
+        pages = walk(InventoryGrid(), query, df_inventory=df)
+
+        assert all(len(page.rows) <= query.page_size for page in pages)
+        assert [i for page in pages for i in page.rows['INVENTORY_ID']] == expected
+        assert InventoryGrid().count(query, df_inventory=df) == len(expected)
+
+    @settings(max_examples=40, deadline=None)
+    @given(inventory_frame_strategy(), query_strategy)
+    def test_sql_pages_match_local_index(self, df, query):
+        """
+        Property: The keyset SQL and the local index return identical pages and cursors
+        """
+        session = SqliteViewSession(df)
+        grid = InventoryGrid()
+        sql_pages = walk(grid, query, session=session)
+        local_pages = walk(grid, query, df_inventory=df)
+
+        assert len(sql_pages) == len(local_pages)
+        for sql_page, local_page in zip(sql_pages, local_pages):
+            assert list(sql_page.rows['INVENTORY_ID']) == list(local_page.rows['INVENTORY_ID'])
+            assert sql_page.next_cursor == local_page.next_cursor
+        assert grid.count(query, session=session) == grid.count(query, df_inventory=df)
+
+    @given(st.integers(min_value=-5, max_value=10 ** 6))
+    def test_page_size_is_capped(self, page_size):
+        """
+        Property: Page size is always clamped to 1..MAX_PAGE_SIZE
+        """
+        assert 1 <= GridQuery(page_size=page_size).normalized().page_size <= MAX_PAGE_SIZE
+
+    @settings(max_examples=20, deadline=None)
+    @given(inventory_frame_strategy())
+    def test_index_built_once_per_snapshot_version(self, df):
+        """
+        Property: A versioned snapshot shares one index; a new version gets a new one
+        """
+        grid = InventoryGrid()
+        df.attrs[SNAPSHOT_VERSION_ATTR] = 7
+        first = grid.local_index(df)
+        assert isinstance(first, LocalGridIndex)
+        assert grid.local_index(df) is first
+
+        df.attrs[SNAPSHOT_VERSION_ATTR] = 8
+        assert grid.local_index(df) is not first
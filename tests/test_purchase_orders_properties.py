@@ -0,0 +1,137 @@
+"""
+Property-based tests for the vectorized purchase-order engine
+Feature: inventoryq-supply-chain
+"""
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from hypothesis import given, settings, strategies as st
+from src.analytics.purchase_orders import (
+    PURCHASE_ORDER_INSERT_SQL, build_purchase_orders, persist_purchase_orders
+)
+
+
+row_strategy = st.fixed_dictionaries({
+    'CURRENT_STOCK': st.floats(min_value=0, max_value=10**5, allow_nan=False),
+    'REORDER_POINT': st.floats(min_value=0, max_value=10**4, allow_nan=False),
+    'DAILY_CONSUMPTION_RATE': st.floats(min_value=0, max_value=500, allow_nan=False),
+    'DAYS_REMAINING': st.floats(min_value=0, max_value=60, allow_nan=False)
+})
+
+
+def candidates(rows):
+    df = pd.DataFrame(rows, columns=['CURRENT_STOCK', 'REORDER_POINT', 'DAILY_CONSUMPTION_RATE', 'DAYS_REMAINING'])
+    df.insert(0, 'INVENTORY_ID', [f"INV_{i:04d}" for i in range(len(df))])
+    df.insert(1, 'ITEM_TYPE', 'Oxygen')
+    df.insert(2, 'LOCATION_CITY', 'Delhi')
+    return df
+
+
+def expected_order(item, rule):
+    """The per-row computation the engine replaces"""
+    if rule == 'cover':
+        quantity = max(item['REORDER_POINT'] - item['CURRENT_STOCK'], item['DAILY_CONSUMPTION_RATE'] * 14)
+    else:
+        quantity = item['DAILY_CONSUMPTION_RATE'] * 7 + max(0, item['REORDER_POINT'] - item['CURRENT_STOCK'])
+    quantity = max(quantity, 0)
+    if item['DAYS_REMAINING'] <= 1:
+        urgency = "CRITICAL"
+    elif item['DAYS_REMAINING'] <= 3:
+        urgency = "HIGH"
+    else:
+        urgency = "MEDIUM"
+    return quantity, urgency
+
+
+class RecordingSession:
+    """Snowpark session stand-in recording each statement"""
+
+    def __init__(self):
+        self.statements = []
+
+    def sql(self, query, params=None):
+        self.statements.append((query, params))
+        return self
+
+    def collect(self):
+        return []
+
+
+class RecordingCursor:
+    """DB-API cursor stand-in recording executemany calls"""
+
+    def __init__(self):
+        self.calls = []
+
+    def executemany(self, query, rows):
+        self.calls.append((query, list(rows)))
+
+
+class TestPurchaseOrderProperties:
+    """Property-based tests for vectorized quantities, urgency, ids and batch persistence"""
+
+    @settings(max_examples=60, deadline=None)
+    @given(st.lists(row_strategy, max_size=40), st.sampled_from(['cover', 'safety']), st.booleans())
+    def test_vectorized_orders_match_row_by_row(self, rows, rule, lower_case):
+        """
+        Property: Quantity, urgency and cost equal the per-row formulas, with unique ids in candidate order
+        """
+        df = candidates(rows)
+        source = df.rename(columns=str.lower) if lower_case else df
+        batch = build_purchase_orders(source, rule=rule, unit_cost=50, now=datetime(2024, 1, 2, 3, 4, 5))
+        orders = batch.orders
+
+        assert batch.count == len(df)
+        assert list(orders['INVENTORY_ID']) == list(df['INVENTORY_ID'])
+        for (_, item), quantity, urgency, cost in zip(df.iterrows(), orders['QUANTITY'],
+                                                      orders['URGENCY_LEVEL'], orders['ESTIMATED_COST']):
+            expected_quantity, expected_urgency = expected_order(item, rule)
+            assert quantity == pytest.approx(expected_quantity)
+            assert urgency == expected_urgency
+            assert cost == pytest.approx(expected_quantity * 50)
+
+        ids = list(orders['ORDER_ID'])
+        assert len(set(ids)) == len(ids) and ids == sorted(ids)
+        assert all(order_id.startswith("PO-20240102030405-") for order_id in ids)
+        assert batch.total_cost == pytest.approx(float(orders['ESTIMATED_COST'].sum()))
+        assert sum(batch.urgency_counts().values()) == len(df)
+
+    def test_batches_created_together_get_distinct_ids(self):
+        """Two batches in the same second never share an order id"""
+        df = candidates([{'CURRENT_STOCK': 1.0, 'REORDER_POINT': 10.0, 'DAILY_CONSUMPTION_RATE': 2.0,
+                          'DAYS_REMAINING': 0.5}] * 3)
+        now = datetime(2024, 1, 1)
+        first = build_purchase_orders(df, now=now)
+        second = build_purchase_orders(df, now=now)
+        assert not set(first.orders['ORDER_ID']) & set(second.orders['ORDER_ID'])
+        with pytest.raises(ValueError):
+            build_purchase_orders(df, rule='guess')
+
+    @settings(max_examples=30, deadline=None)
+    @given(st.integers(min_value=0, max_value=60), st.integers(min_value=1, max_value=25))
+    def test_batch_persists_in_multi_row_statements(self, count, batch_rows):
+        """
+        Property: A Snowpark session gets one multi-row INSERT per batch_rows orders; a cursor one executemany
+        """
+        df = candidates([{'CURRENT_STOCK': float(i), 'REORDER_POINT': 40.0, 'DAILY_CONSUMPTION_RATE': 3.0,
+                          'DAYS_REMAINING': i / 3} for i in range(count)])
+        batch = build_purchase_orders(df, rule='safety', prefix='AI')
+
+        session = RecordingSession()
+        assert persist_purchase_orders(session, batch, batch_rows=batch_rows) == count
+        assert len(session.statements) == -(-count // batch_rows)
+        per_row = len(PURCHASE_ORDER_INSERT_SQL.params)
+        bound = [value for _, params in session.statements for value in params]
+        assert len(bound) == count * per_row
+        assert bound[0::per_row] == list(batch.orders['ORDER_ID'])
+        for query, params in session.statements:
+            assert query.count("DATEADD") == len(params) // per_row
+
+        cursor = RecordingCursor()
+        persist_purchase_orders(cursor, batch, supplier='Acme', lead_days=5)
+        assert len(cursor.calls) == (1 if count else 0)
+        if count:
+            (query, rows), = cursor.calls
+            assert query == PURCHASE_ORDER_INSERT_SQL.pyformat_sql
+            assert all(row[4] == 'Acme' and row[6] == 5 for row in rows)
@@ -0,0 +1,122 @@
+"""
+Property-based tests for the parameterized statement layer
+Feature: inventoryq-supply-chain
+"""
+import sqlite3
+
+import pytest
+from hypothesis import given, settings, strategies as st
+from src.database.query_layer import (
+    compile_named, execute, executemany, get_template, register_template
+)
+
+
+INSERT_NOTE = register_template('test.notes.insert', """
+    INSERT INTO notes (note_id, body, weight) VALUES (:note_id, :body, :weight)
+""")
+SELECT_NOTE = register_template('test.notes.select', """
+    SELECT body, weight FROM notes WHERE note_id = :note_id AND body <> ':not_a_param' AND weight::REAL >= 0
+""")
+
+
+class SqliteSnowparkSession:
+    """Snowpark session stand-in (qmark binding) backed by SQLite"""
+
+    def __init__(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.execute("CREATE TABLE notes (note_id TEXT, body TEXT, weight REAL)")
+        self.statements = []
+        self._rows = []
+
+    def sql(self, query, params=None):
+        self.statements.append(query)
+        # SQLite has no :: casts; strip the one used above
+        self._rows = self.connection.execute(query.replace('::REAL', ''), params or []).fetchall()
+        return self
+
+    def collect(self):
+        return self._rows
+
+
+class RecordingCursor:
+    """DB-API cursor stand-in recording pyformat statements"""
+
+    def __init__(self):
+        self.calls = []
+        self.description = None
+
+    def execute(self, sql, params):
+        self.calls.append(('execute', sql, params))
+
+    def executemany(self, sql, seq):
+        self.calls.append(('executemany', sql, list(seq)))
+
+    def fetchall(self):
+        return []
+
+
+note_text = st.text(alphabet="ab'\":%?;", max_size=12)
+notes_strategy = st.lists(
+    st.fixed_dictionaries({'body': note_text, 'weight': st.integers(min_value=0, max_value=100)}),
+    max_size=30
+)
+
+
+class TestQueryLayerProperties:
+    """Property-based tests for named binding, templates and batch execution"""
+
+    @given(st.lists(st.from_regex(r'[a-z_][a-z0-9_]{0,6}', fullmatch=True), min_size=1, max_size=6),
+           st.text(alphabet="ab:'%", max_size=8))
+    def test_named_parameters_compile_in_order(self, names, literal):
+        """
+        Property: Placeholders become positional in order; quoted text and casts are left alone
+        """
+        quoted = "'" + literal.replace("'", "''") + "'"
+        sql = "SELECT " + ", ".join(f":{name}" for name in names) + f", {quoted}, x::INT"
+        qmark, pyformat, params = compile_named(sql)
+
+        assert params == tuple(names)
+        assert qmark == "SELECT " + ", ".join('?' for _ in names) + f", {quoted}, x::INT"
+        assert pyformat == ("SELECT " + ", ".join('%s' for _ in names) + ", "
+                            + quoted.replace('%', '%%') + ", x::INT")
+
+    @settings(max_examples=40, deadline=None)
+    @given(notes_strategy, st.integers(min_value=1, max_value=8))
+    def test_executemany_matches_row_by_row(self, notes, batch_rows):
+        """
+        Property: Batched inserts store exactly what per-row inserts would, in ceil(N / batch) calls
+        """
+        rows = [dict(note, note_id=f"N{i}") for i, note in enumerate(notes)]
+        session = SqliteSnowparkSession()
+        assert executemany(session, INSERT_NOTE, rows, batch_rows=batch_rows) == len(rows)
+        assert len(session.statements) == -(-len(rows) // batch_rows)
+
+        for row in rows:
+            assert execute(session, 'test.notes.select', {'note_id': row['note_id']}) == \
+                [(row['body'], row['weight'])]
+        # One statement text per template, whatever the values
+        assert len(set(session.statements[-len(rows):])) <= 1
+
+    def test_cursor_path_uses_connector_paramstyle(self):
+        """Cursors get pyformat SQL and positional params; executemany is a single call"""
+        cursor = RecordingCursor()
+        execute(cursor, SELECT_NOTE, {'note_id': "O'Brien"})
+        executemany(cursor, INSERT_NOTE, [{'note_id': '1', 'body': 'x', 'weight': 1},
+                                          {'note_id': '2', 'body': "it's", 'weight': 2}])
+
+        (kind, sql, params), (many, many_sql, seq) = cursor.calls
+        assert kind == 'execute' and params == ["O'Brien"] and "note_id = %s" in sql
+        assert "':not_a_param'" in sql
+        assert many == 'executemany' and seq == [['1', 'x', 1], ['2', "it's", 2]]
+        assert many_sql.count('%s') == 3
+
+    def test_templates_register_once(self):
+        """Re-registering identical SQL returns the same template; conflicting SQL is refused"""
+        again = register_template('test.notes.insert', INSERT_NOTE.sql)
+        assert again is INSERT_NOTE is get_template('test.notes.insert')
+        with pytest.raises(ValueError):
+            register_template('test.notes.insert', "DELETE FROM notes")
+        with pytest.raises(KeyError):
+            INSERT_NOTE.bind({'note_id': '1'})
+        with pytest.raises(ValueError):
+            executemany(SqliteSnowparkSession(), SELECT_NOTE, [{'note_id': '1'}])
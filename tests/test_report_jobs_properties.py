@@ -0,0 +1,223 @@
+"""
+Property-based tests for background report jobs and the on-disk artifact cache
+Feature: inventoryq-supply-chain
+"""
+import os
+import tempfile
+import threading
+
+import pandas as pd
+import pytest
+from hypothesis import given, settings, strategies as st
+from src.analytics.kpi_engine import get_kpis
+from src.database.aggregations import local_location_summary
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+from src.reports import jobs as report_jobs
+from src.reports.jobs import ArtifactStore, ReportJobs
+from src.reports.report_renderer import prepare_report, render_report
+from src.reports.summaries import critical_items, executive_summary, forecast, location_analysis, payload_frame
+
+
+def inventory(version, rows=12):
+    df = pd.DataFrame({
+        'INVENTORY_ID': [f"INV_{i:03d}" for i in range(rows)],
+        'ITEM_TYPE': [f"Item {i % 4}" for i in range(rows)],
+        'LOCATION_CITY': [['Delhi', 'Pune', 'Mumbai'][i % 3] for i in range(rows)],
+        'CURRENT_STOCK': [float(i * 10) for i in range(rows)],
+        'DAILY_CONSUMPTION_RATE': [float(i % 5 + 1) for i in range(rows)],
+        'REORDER_POINT': [60.0] * rows,
+        'DAYS_REMAINING': [i * 10 / (i % 5 + 1) for i in range(rows)],
+        'STATUS': [['CRITICAL', 'WARNING', 'NORMAL'][i % 3] for i in range(rows)]
+    })
+    df.attrs[SNAPSHOT_VERSION_ATTR] = version
+    return df
+
+
+def blob_files(root):
+    objects = os.path.join(root, 'objects')
+    return {name for _, _, names in os.walk(objects) for name in names if not name.endswith('.tmp')}
+
+
+class CountingBuilder:
+    """Builder that records its calls and can be held until released"""
+
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+        self._lock = threading.Lock()
+
+    def __call__(self, df, **params):
+        with self._lock:
+            self.calls.append((df.attrs.get(SNAPSHOT_VERSION_ATTR), params))
+        if self.gate is not None:
+            self.gate.wait(5)
+        return {'rows': len(df), 'params': params}
+
+
+class TestReportJobsProperties:
+    """Property-based tests for keyed caching, single-flight jobs and eviction"""
+
+    @settings(max_examples=40, deadline=None)
+    @given(st.lists(st.tuples(st.sampled_from('abcdef'), st.sampled_from([b'x' * 10, b'y' * 30, b'z' * 50])),
+                    min_size=1, max_size=25),
+           st.integers(min_value=40, max_value=200))
+    def test_store_stays_within_budget_and_shares_blobs(self, puts, max_bytes):
+        """
+        Property: The cache keeps the latest content per key, dedupes blobs and respects its byte budget
+        """
+        with tempfile.TemporaryDirectory() as root:
+            store = ArtifactStore(root, max_bytes=max_bytes)
+            latest = {}
+            for key, data in puts:
+                store.put(key, 'test', data, f"{key}.bin", 'application/octet-stream')
+                latest[key] = data
+
+                assert store.total_bytes <= max_bytes or len(store) == 1
+                assert key in store
+                assert blob_files(root) == {store.get(k).digest for k in latest if k in store}
+
+            for key in latest:
+                entry = store.get(key)
+                if entry is not None:
+                    assert entry.read_bytes() == latest[key]
+
+            # The index is rebuilt from disk
+            reopened = ArtifactStore(root, max_bytes=max_bytes)
+            assert sorted(reopened._entries) == sorted(store._entries)
+            assert all(reopened.get(key).read_bytes() == latest[key] for key in list(reopened._entries))
+
+    def test_eviction_is_least_recently_used(self):
+        """Reading an entry protects it from the next eviction"""
+        with tempfile.TemporaryDirectory() as root:
+            store = ArtifactStore(root, max_bytes=30)
+            store.put('a', 'test', b'a' * 10, 'a', 'text/plain')
+            store.put('b', 'test', b'b' * 10, 'b', 'text/plain')
+            store.put('c', 'test', b'c' * 10, 'c', 'text/plain')
+            store.get('a')
+            store.put('d', 'test', b'd' * 10, 'd', 'text/plain')
+            assert 'b' not in store and all(key in store for key in 'acd')
+            assert store.stats['evictions'] == 1
+
+    @settings(max_examples=20, deadline=None)
+    @given(st.lists(st.tuples(st.integers(min_value=1, max_value=3), st.sampled_from(['pdf', 'html'])),
+                    min_size=1, max_size=12))
+    def test_repeat_requests_are_served_from_the_cache(self, requests):
+        """
+        Property: Each (report, params, snapshot version) is built once; repeats come from disk
+        """
+        with tempfile.TemporaryDirectory() as root:
+            builder = CountingBuilder()
+            jobs = ReportJobs({'summary': builder}, ArtifactStore(root), workers=2)
+            try:
+                for version, fmt in requests:
+                    report = jobs.get('summary', inventory(version), {'format': fmt}, timeout=5)
+                    assert report.payload() == {'rows': 12, 'params': {'format': fmt}}
+                assert len(builder.calls) == len(set(requests))
+                assert {(version, params['format']) for version, params in builder.calls} == set(requests)
+                assert jobs.stats['cached'] == len(requests) - len(set(requests))
+            finally:
+                jobs.shutdown()
+
+    def test_restarted_process_does_not_reuse_version_keys(self, monkeypatch):
+        """A new process restarts the version counter, so version 1 there is a different snapshot"""
+        with tempfile.TemporaryDirectory() as root:
+            before = ReportJobs({'summary': CountingBuilder()}, ArtifactStore(root))
+            try:
+                before.get('summary', inventory(1), timeout=5)
+            finally:
+                before.shutdown()
+
+            monkeypatch.setattr(report_jobs, 'BOOT_ID', 'restarted')
+            builder = CountingBuilder()
+            after = ReportJobs({'summary': builder}, ArtifactStore(root))
+            try:
+                assert after.cached('summary', inventory(1)) is None
+                after.get('summary', inventory(1), timeout=5)
+                assert len(builder.calls) == 1
+
+                # Content-fingerprinted snapshots are the same data in any process
+                unversioned = inventory(1)
+                unversioned.attrs.clear()
+                key = after.key('summary', unversioned)
+                monkeypatch.setattr(report_jobs, 'BOOT_ID', 'replica')
+                assert after.key('summary', unversioned) == key
+            finally:
+                after.shutdown()
+
+    def test_concurrent_requests_share_one_job(self):
+        """Clicks arriving while a report is being built wait for that build"""
+        with tempfile.TemporaryDirectory() as root:
+            gate = threading.Event()
+            builder = CountingBuilder(gate)
+            jobs = ReportJobs({'summary': builder}, ArtifactStore(root), workers=4)
+            try:
+                df = inventory(7)
+                futures = [jobs.submit('summary', df) for _ in range(5)]
+                assert jobs.running('summary', df)
+                gate.set()
+                reports = [future.result(5) for future in futures]
+                assert len(builder.calls) == 1 and jobs.stats['coalesced'] == 4
+                assert len({report.key for report in reports}) == 1
+                assert not jobs.running('summary', df) and jobs.cached('summary', df) is not None
+
+                with pytest.raises(ValueError):
+                    jobs.submit('unknown', df)
+            finally:
+                jobs.shutdown()
+
+    def test_prebuild_once_per_snapshot_and_builds_every_report(self):
+        """New snapshot versions trigger one prebuild of every listed report"""
+        with tempfile.TemporaryDirectory() as root:
+            builders = {
+                'executive_summary': lambda df: executive_summary(get_kpis(df)),
+                'critical_items': lambda df: critical_items(df),
+                'forecast': lambda df: forecast(df),
+                'location_analysis': lambda df: location_analysis(local_location_summary(df)),
+                'professional': lambda df, report_type, fmt: render_report(prepare_report(df, report_type), fmt)
+            }
+            requests = [('executive_summary', {}), ('critical_items', {}), ('forecast', {}), ('location_analysis', {}),
+                        ('professional', {'report_type': 'Critical Items Alert', 'fmt': 'pdf'})]
+            jobs = ReportJobs(builders, ArtifactStore(root))
+            try:
+                df = inventory(1)
+                futures = jobs.prebuild_if_new(df, requests)
+                assert len(futures) == 5
+                assert all(future.result(10) for future in futures)
+                assert jobs.prebuild_if_new(df, requests) == []
+                assert jobs.prebuild(df, requests) == []
+
+                critical = payload_frame(jobs.cached('critical_items', df).payload()['items'])
+                expected = df[df['STATUS'] == 'CRITICAL']
+                assert list(critical['ITEM_TYPE']) == list(expected['ITEM_TYPE'])
+                assert (critical['RECOMMENDED_ORDER'] >= expected['DAILY_CONSUMPTION_RATE'].to_numpy() * 14).all()
+                locations = payload_frame(jobs.cached('location_analysis', df).payload()['locations'])
+                pd.testing.assert_frame_equal(locations, local_location_summary(df), check_dtype=False)
+                report = jobs.cached('professional', df, requests[4][1])
+                assert report.read_bytes().startswith(b"%PDF") and report.mime == 'application/pdf'
+
+                assert len(jobs.prebuild_if_new(inventory(2), requests)) == 5
+            finally:
+                jobs.shutdown()
+
+    def test_background_prebuild_follows_the_snapshot(self):
+        """The prebuild thread builds reports for each snapshot it sees"""
+        with tempfile.TemporaryDirectory() as root:
+            snapshots = [inventory(1)]
+            built = threading.Event()
+
+            def build(df):
+                if df.attrs[SNAPSHOT_VERSION_ATTR] == 2:
+                    built.set()
+                return {'version': df.attrs[SNAPSHOT_VERSION_ATTR]}
+
+            jobs = ReportJobs({'summary': build}, ArtifactStore(root))
+            try:
+                jobs.start_prebuild(lambda: snapshots[-1], [('summary', {})], interval_s=0.01)
+                snapshots.append(inventory(2))
+                assert built.wait(5)
+                jobs.stop_prebuild(timeout=5)
+                for future in list(jobs._inflight.values()):
+                    future.result(5)
+                assert jobs.cached('summary', snapshots[-1]).payload() == {'version': 2}
+            finally:
+                jobs.shutdown()
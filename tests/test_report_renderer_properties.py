@@ -0,0 +1,137 @@
+"""
+Property-based tests for the template-compiled report renderer
+Feature: inventoryq-supply-chain
+"""
+from html.parser import HTMLParser
+import re
+import zlib
+
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+from src.reports.report_renderer import CompiledTemplate, prepare_report, render_html, render_report
+
+
+COLUMNS = ['ITEM_TYPE', 'LOCATION_CITY', 'CURRENT_STOCK', 'DAILY_CONSUMPTION_RATE',
+           'REORDER_POINT', 'DAYS_REMAINING', 'STATUS']
+
+row_strategy = st.fixed_dictionaries({
+    'ITEM_TYPE': st.text(alphabet='ab<>&"() \\é', min_size=1, max_size=8),
+    'LOCATION_CITY': st.sampled_from(['Mumbai', 'Delhi', 'Pune (East)', 'A&B']),
+    'CURRENT_STOCK': st.integers(min_value=0, max_value=10**6),
+    'DAILY_CONSUMPTION_RATE': st.integers(min_value=1, max_value=100),
+    'REORDER_POINT': st.integers(min_value=0, max_value=1000),
+    'DAYS_REMAINING': st.floats(min_value=0, max_value=500, allow_nan=False),
+    'STATUS': st.sampled_from(['CRITICAL', 'WARNING', 'NORMAL'])
+})
+
+
+class CellCollector(HTMLParser):
+    """Collects the text of every table row"""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            self.rows.append([])
+        elif tag in ('td', 'th'):
+            self._cell = ''
+
+    def handle_endtag(self, tag):
+        if tag in ('td', 'th'):
+            self.rows[-1].append(self._cell)
+            self._cell = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell += data
+
+
+def pdf_objects(data):
+    """Object number -> offset from the xref table, checked against the file"""
+    xref_at = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    lines = data[xref_at:].split(b"\n")
+    assert lines[0] == b"xref"
+    first, count = map(int, lines[1].split())
+    entries = lines[2:2 + count]
+    offsets = {number: int(entry[:10]) for number, entry in enumerate(entries) if number}
+    for number, offset in offsets.items():
+        assert data[offset:].startswith(f"{number} 0 obj".encode('ascii'))
+    return offsets
+
+
+def pdf_text(data):
+    """Decompressed content of every page stream"""
+    streams = re.findall(rb"/Filter /FlateDecode >>\nstream\n(.*?)\nendstream", data, re.DOTALL)
+    return b"\n".join(zlib.decompress(stream) for stream in streams).decode('cp1252')
+
+
+class TestReportRendererProperties:
+    """Property-based tests for compiled templates, streamed HTML and PDF output"""
+
+    @given(st.dictionaries(st.sampled_from(['a', 'b', 'c']), st.text(alphabet='{}x$%', max_size=5), min_size=3))
+    def test_compiled_template_matches_substitution(self, values):
+        """
+        Property: Rendering equals plain substitution, with literal braces left intact
+        """
+        source = "{ css } {{a}} {{ b }}{{c}} {{a}} }"
+        expected = source.replace('{{a}}', values['a']).replace('{{ b }}', values['b']).replace('{{c}}', values['c'])
+        assert CompiledTemplate(source).render(values) == expected
+
+    @settings(max_examples=40, deadline=None)
+    @given(st.lists(row_strategy, max_size=40), st.integers(min_value=1, max_value=9))
+    def test_html_rows_match_critical_items(self, rows, rows_per_chunk):
+        """
+        Property: The critical table has one escaped row per critical item, whatever the chunking
+        """
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        data = prepare_report(df, "Critical <Items> Alert")
+        chunks = list(render_html(data, rows_per_chunk=rows_per_chunk))
+        assert ''.join(chunks) == ''.join(render_html(data, rows_per_chunk=1000))
+
+        parser = CellCollector()
+        parser.feed(''.join(chunks))
+        critical_rows = [row for row in parser.rows if len(row) == 5 and row[4] == 'CRITICAL']
+        critical = df[df['STATUS'] == 'CRITICAL']
+        assert critical_rows == [[item, city, f"{stock:.0f}", f"{days:.1f}", 'CRITICAL'] for item, city, stock, days in
+                                 zip(critical['ITEM_TYPE'], critical['LOCATION_CITY'],
+                                     critical['CURRENT_STOCK'], critical['DAYS_REMAINING'])]
+        location_rows = [row for row in parser.rows if len(row) == 4][1:]
+        assert sorted(row[0] for row in location_rows) == sorted(df['LOCATION_CITY'].unique())
+
+    @settings(max_examples=25, deadline=None)
+    @given(st.lists(row_strategy, max_size=30), st.booleans(), st.booleans())
+    def test_pdf_is_well_formed_and_lists_every_critical_item(self, rows, charts, recommendations):
+        """
+        Property: The PDF's xref points at every object and its pages show each critical row
+        """
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        artifact = render_report(prepare_report(df, "Complete Inventory Report", charts, recommendations), 'pdf')
+        data = artifact.file.read()
+        assert data.startswith(b"%PDF-1.4") and artifact.size_bytes == len(data)
+        pdf_objects(data)
+
+        text = pdf_text(data)
+        critical = df[df['STATUS'] == 'CRITICAL']
+        escaped = [item.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')[:26]
+                   for item in critical['ITEM_TYPE']]
+        assert all(f"({item}" in text for item in escaped)
+        assert ("Recommendations" in text) == recommendations
+
+    def test_large_reports_paginate(self):
+        """Thousands of critical items spread over pages with the table header repeated"""
+        df = pd.DataFrame({
+            'ITEM_TYPE': [f"Item {i}" for i in range(5000)], 'LOCATION_CITY': 'Delhi',
+            'CURRENT_STOCK': 1.0, 'DAILY_CONSUMPTION_RATE': 1.0, 'REORDER_POINT': 10.0,
+            'DAYS_REMAINING': 0.5, 'STATUS': 'CRITICAL'
+        })
+        artifact = render_report(prepare_report(df, "Critical Items Alert"), 'pdf')
+        data = artifact.file.read()
+        pages = int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", data).group(1))
+        text = pdf_text(data)
+        assert pages > 50
+        assert text.count("(Item Type") >= pages - 1
+        assert all(f"(Item {i} " in text for i in (0, 2500, 4999))
+        assert artifact.file_name.endswith('.pdf') and artifact.mime == 'application/pdf'
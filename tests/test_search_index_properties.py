@@ -0,0 +1,145 @@
+"""
+Property-based tests for the inverted inventory search index
+Feature: inventoryq-supply-chain
+"""
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+from src.analytics.search_index import (
+    EXACT_WEIGHT, InventorySearchIndex, SearchIndexManager, query_terms, tokenize
+)
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR, merge_ranked
+from src.database.pagination import GridQuery, InventoryGrid
+
+
+ITEMS = ['OXYGEN', 'RICE', 'EMERGENCY_KIT', 'BLOOD_BAGS', 'WATER']
+CITIES = ['Delhi', 'Mumbai', 'New Delhi', 'Chennai', None]
+SECTORS = ['HOSPITAL', 'PDS', 'NGO']
+
+
+@st.composite
+def inventory_frame_strategy(draw, min_size=0, max_size=40):
+    """Searchable inventory frames with unique ids"""
+    n = draw(st.integers(min_value=min_size, max_value=max_size))
+    ids = draw(st.lists(st.from_regex(r'(HOSP|PDS|NGO)_[0-9]{1,3}', fullmatch=True),
+                        min_size=n, max_size=n, unique=True))
+    rows = draw(st.lists(st.fixed_dictionaries({
+        'ITEM_TYPE': st.sampled_from(ITEMS),
+        'LOCATION_CITY': st.sampled_from(CITIES),
+        'SECTOR_TYPE': st.sampled_from(SECTORS),
+        'ORGANIZATION_ID': st.sampled_from(['ORG_HOSPITAL_001', 'ORG_NGO_002']),
+        'STATUS': st.sampled_from(['CRITICAL', 'WARNING', 'NORMAL']),
+        'DAYS_REMAINING': st.floats(min_value=0, max_value=60),
+    }), min_size=n, max_size=n))
+    for inventory_id, row in zip(ids, rows):
+        row['INVENTORY_ID'] = inventory_id
+    return pd.DataFrame(rows, columns=['INVENTORY_ID', 'ITEM_TYPE', 'LOCATION_CITY', 'SECTOR_TYPE',
+                                       'ORGANIZATION_ID', 'STATUS', 'DAYS_REMAINING'])
+
+
+def brute_force_ids(df, text):
+    """Reference: rows where every query term is a prefix of some token or of the id"""
+    matches = []
+    for row in df.itertuples(index=False):
+        tokens = [token for field in ('ITEM_TYPE', 'LOCATION_CITY', 'SECTOR_TYPE', 'ORGANIZATION_ID')
+                  for token in tokenize(getattr(row, field))]
+        tokens.append(row.INVENTORY_ID.lower())
+        if all(any(token.startswith(term) for token in tokens) for term in query_terms(text)):
+            matches.append(row.INVENTORY_ID)
+    return set(matches)
+
+
+query_strategy = st.sampled_from([
+    'oxygen', 'OXY', 'delhi', 'new delhi', 'emergency kit', 'emergency_kit', 'kit',
+    'hosp', 'hosp_1', 'pds_', 'org_ngo', 'hospital oxygen', 'mum rice', 'c'
+])
+
+
+class TestSearchIndexProperties:
+    """Property-based tests for search correctness, ranking and incremental updates"""
+
+    @settings(max_examples=60, deadline=None)
+    @given(inventory_frame_strategy(), query_strategy)
+    def test_prefix_and_multi_term_matches_are_complete(self, df, text):
+        """
+        Property: Every row whose tokens cover each query term (exactly or by prefix) is found
+        """
+        index = InventorySearchIndex(df)
+        found = set(index.match_ids(text))
+        assert brute_force_ids(df, text) <= found
+        assert {inventory_id for inventory_id, _ in index.search(text, limit=None)} == found
+
+    @settings(max_examples=40, deadline=None)
+    @given(inventory_frame_strategy(min_size=1), st.sampled_from(['oxygne', 'dehli', 'chenai', 'mumbia']))
+    def test_fuzzy_terms_tolerate_one_typo(self, df, typo):
+        """
+        Property: A query one edit (or swap) away from a word still finds that word's rows
+        """
+        intended = {'oxygne': 'OXYGEN', 'dehli': 'Delhi', 'chenai': 'Chennai', 'mumbia': 'Mumbai'}[typo]
+        index = InventorySearchIndex(df)
+        expected = set(df.loc[df['ITEM_TYPE'].eq(intended) | df['LOCATION_CITY'].str.contains(intended, na=False),
+                              'INVENTORY_ID'])
+        assert expected <= set(index.match_ids(typo))
+
+    @settings(max_examples=40, deadline=None)
+    @given(inventory_frame_strategy(min_size=1), st.integers(min_value=1, max_value=10))
+    def test_ranking_is_ordered_and_limited(self, df, limit):
+        """
+        Property: Hits are sorted by score, capped at the limit, and exact beats prefix
+        """
+        index = InventorySearchIndex(df)
+        hits = index.search('delhi', limit=limit)
+        assert len(hits) <= limit
+        assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+
+        everything = dict(index.search('oxy', limit=None))
+        exact = dict(index.search('oxygen', limit=None))
+        for inventory_id, score in exact.items():
+            assert score >= EXACT_WEIGHT
+            assert everything[inventory_id] < score
+
+    @settings(max_examples=40, deadline=None)
+    @given(inventory_frame_strategy(), inventory_frame_strategy(max_size=15), query_strategy)
+    def test_incremental_delta_matches_rebuild(self, base, delta, text):
+        """
+        Property: Applying a delta gives the same results as indexing the merged snapshot
+        """
+        index = InventorySearchIndex(base)
+        index.apply_delta(delta)
+        merged = merge_ranked(base, delta)
+        rebuilt = InventorySearchIndex(merged)
+
+        assert sorted(index.match_ids(text)) == sorted(rebuilt.match_ids(text))
+        assert len(index) == len(merged)
+
+    @settings(max_examples=20, deadline=None)
+    @given(inventory_frame_strategy(min_size=1), inventory_frame_strategy(min_size=1, max_size=5))
+    def test_manager_applies_loader_deltas(self, base, delta):
+        """
+        Property: The manager builds once per snapshot and folds consecutive loader deltas in
+        """
+        class Loader:
+            pass
+
+        loader = Loader()
+        manager = SearchIndexManager()
+        base.attrs[SNAPSHOT_VERSION_ATTR] = 1
+        first = manager.index_for(base, loader)
+        assert manager.index_for(base, loader) is first
+
+        merged = merge_ranked(base, delta)
+        merged.attrs[SNAPSHOT_VERSION_ATTR] = 2
+        loader.version, loader.delta_base_version, loader.last_delta = 2, 1, delta
+        assert manager.index_for(merged, loader) is first
+        assert manager.stats == {'builds': 1, 'deltas': 1}
+        assert sorted(first.match_ids('delhi')) == sorted(InventorySearchIndex(merged).match_ids('delhi'))
+
+    @settings(max_examples=20, deadline=None)
+    @given(inventory_frame_strategy(), query_strategy)
+    def test_grid_search_uses_index(self, df, text):
+        """
+        Property: With the index hooked in, the grid returns exactly the index matches
+        """
+        df.attrs[SNAPSHOT_VERSION_ATTR] = 1
+        grid = InventoryGrid(search=lambda frame, term: InventorySearchIndex(frame).match_ids(term))
+        page = grid.page(GridQuery(search=text, page_size=500), df_inventory=df)
+        assert set(page.rows['INVENTORY_ID']) == set(InventorySearchIndex(df).match_ids(text))
@@ -0,0 +1,199 @@
+"""
+Property-based tests for inbound shipment posting
+Feature: inventoryq-supply-chain
+"""
+import json
+import sqlite3
+
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+from src.database.shipments import (
+    ShipmentPoster, read_receipt_file, resolve_lines, receipt_frame, single_receipt
+)
+
+
+ITEMS = [
+    ('HOSP_001', 'ORG_A', 'OXYGEN', 'Delhi', 100.0),
+    ('HOSP_002', 'ORG_A', 'RICE', 'Delhi', 50.0),
+    ('PDS_001', 'ORG_B', 'RICE', 'Mumbai', 4000.0),
+    ('NGO_001', 'ORG_C', 'WATER', 'Chennai', 200.0),
+    ('NGO_002', 'ORG_D', 'WATER', 'Chennai', 10.0),
+]
+
+
+class SqliteWarehouseSession:
+    """Snowpark session stand-in running the posting SQL against SQLite"""
+
+    def __init__(self):
+        self.connection = sqlite3.connect(':memory:', isolation_level=None)
+        self.connection.execute(
+            "CREATE TABLE inventory_master (inventory_id TEXT PRIMARY KEY, current_stock REAL, last_updated TEXT)")
+        self.connection.execute(
+            "CREATE TABLE inventory_transactions (transaction_id TEXT PRIMARY KEY, inventory_id TEXT, "
+            "transaction_date TEXT, stock_level REAL, consumption_amount REAL, transaction_type TEXT)")
+        self.connection.executemany("INSERT INTO inventory_master VALUES (?, ?, NULL)",
+                                    [(item[0], item[4]) for item in ITEMS])
+        self.statements = []
+        self.fail_on = None
+        self._rows = []
+
+    def sql(self, query, params=None):
+        self.statements.append(query)
+        if self.fail_on and self.fail_on in query:
+            raise RuntimeError("warehouse error")
+        cursor = self.connection.execute(query, params or [])
+        columns = [column[0] for column in cursor.description or []]
+        self._rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self
+
+    def collect(self):
+        return self._rows
+
+    def stock(self):
+        return dict(self.connection.execute("SELECT inventory_id, current_stock FROM inventory_master"))
+
+    def movements(self):
+        return pd.read_sql_query("SELECT * FROM inventory_transactions ORDER BY rowid", self.connection)
+
+
+def inventory_frame():
+    return pd.DataFrame(ITEMS, columns=['INVENTORY_ID', 'ORGANIZATION_ID', 'ITEM_TYPE', 'LOCATION_CITY',
+                                        'CURRENT_STOCK'])
+
+
+line_strategy = st.one_of(
+    st.fixed_dictionaries({
+        'inventory_id': st.sampled_from([item[0] for item in ITEMS]),
+        'quantity': st.integers(min_value=1, max_value=500).map(float),
+    }),
+    st.fixed_dictionaries({
+        'item_type': st.sampled_from(['OXYGEN', 'oxygen']),
+        'location_city': st.just('Delhi'),
+        'quantity': st.integers(min_value=1, max_value=500).map(float),
+    }),
+)
+
+
+def with_line_numbers(lines):
+    return [dict(line, reference='ASN_1', line_number=number) for number, line in enumerate(lines, 1)]
+
+
+class TestShipmentPostingProperties:
+    """Property-based tests for batched, idempotent shipment posting"""
+
+    @settings(max_examples=40, deadline=None)
+    @given(st.lists(line_strategy, min_size=1, max_size=40), st.integers(min_value=1, max_value=7))
+    def test_posting_adds_quantities_and_logs_restocks(self, lines, chunk_rows):
+        """
+        Property: Stock grows by the summed line quantities and every line becomes one RESTOCK row
+        """
+        session = SqliteWarehouseSession()
+        before = session.stock()
+        lines = with_line_numbers(lines)
+        result = ShipmentPoster(chunk_rows=chunk_rows).post(session, lines, inventory_frame())
+
+        assert result.ok and result.posted == len(lines) and result.duplicates == 0
+        expected = dict(before)
+        for line in lines:
+            inventory_id = line.get('inventory_id', 'HOSP_001')
+            expected[inventory_id] += line['quantity']
+        assert session.stock() == expected
+
+        movements = session.movements()
+        assert len(movements) == len(lines)
+        assert set(movements['transaction_type']) == {'RESTOCK'}
+        # The last movement of each item carries its final stock level
+        last = movements.groupby('inventory_id')['stock_level'].last()
+        assert all(last[inventory_id] == expected[inventory_id] for inventory_id in last.index)
+
+        # Statements grow with the number of chunks, not the number of lines
+        staging = -(-len(lines) // chunk_rows)
+        assert len(session.statements) == staging + 8
+
+    @settings(max_examples=40, deadline=None)
+    @given(st.lists(line_strategy, min_size=1, max_size=20), st.integers(min_value=0, max_value=20))
+    def test_retries_never_double_post(self, lines, overlap):
+        """
+        Property: Re-posting a document (fully or partly) only posts lines not seen before
+        """
+        session = SqliteWarehouseSession()
+        lines = with_line_numbers(lines)
+        poster = ShipmentPoster()
+        poster.post(session, lines[:overlap], inventory_frame())
+        after_first = session.stock()
+
+        result = poster.post(session, lines, inventory_frame())
+        already = min(overlap, len(lines))
+        assert result.duplicates == already
+        assert result.posted == len(lines) - already
+        assert len(session.movements()) == len(lines)
+
+        assert poster.post(session, lines, inventory_frame()).posted == 0
+        assert sum(session.stock().values()) == sum(after_first.values()) + result.total_quantity
+
+    def test_failed_posting_rolls_back(self):
+        """A failure after the stock update leaves stock and movements untouched"""
+        session = SqliteWarehouseSession()
+        before = session.stock()
+        session.fail_on = 'INSERT INTO inventory_transactions'
+        try:
+            ShipmentPoster().post(session, single_receipt('HOSP_001', 25, reference='FORM_1'), inventory_frame())
+        except RuntimeError:
+            pass
+        assert session.stock() == before
+        assert session.movements().empty
+
+    def test_unresolvable_lines_are_rejected(self):
+        """Unknown, ambiguous and non-positive lines are rejected with reasons"""
+        frame = receipt_frame(with_line_numbers([
+            {'inventory_id': 'MISSING', 'quantity': 5},
+            {'item_type': 'WATER', 'location_city': 'Chennai', 'quantity': 5},
+            {'item_type': 'WATER', 'location_city': 'Chennai', 'organization_id': 'ORG_D', 'quantity': 5},
+            {'item': 'RICE', 'city': 'Mumbai', 'qty': 0},
+            {'inventory_id': 'PDS_001', 'quantity': 'ten'},
+        ]) + [{'inventory_id': 'PDS_001', 'quantity': 3}])
+        accepted, rejected = resolve_lines(frame, inventory_frame())
+
+        assert list(accepted['inventory_id']) == ['NGO_002']
+        assert {r.row: r.reasons for r in rejected} == {
+            0: ['UNRESOLVED_ITEM'], 1: ['AMBIGUOUS_ITEM'],
+            3: ['INVALID_QUANTITY'], 4: ['INVALID_QUANTITY'], 5: ['MISSING_REFERENCE'],
+        }
+
+    def test_reads_csv_and_asn_uploads(self, tmp_path):
+        """CSV headers and ASN header fields map onto receipt lines"""
+        csv_path = tmp_path / 'receipts.csv'
+        csv_path.write_text("Inventory ID,Qty,Vendor,PO Number\nHOSP_001,12,Acme,PO_9\n")
+        asn = {'asn_number': 'ASN_7', 'supplier': 'Acme',
+               'lines': [{'line': 1, 'item': 'RICE', 'city': 'Mumbai', 'quantity': 40}]}
+
+        csv_lines = read_receipt_file(str(csv_path))
+        asn_lines = read_receipt_file(json.dumps(asn).encode(), name='asn.json')
+
+        assert csv_lines.loc[0, ['inventory_id', 'quantity', 'supplier', 'reference']].tolist() == \
+            ['HOSP_001', '12', 'Acme', 'PO_9']
+        assert asn_lines.loc[0, ['item_type', 'location_city', 'reference', 'supplier']].tolist() == \
+            ['RICE', 'Mumbai', 'ASN_7', 'Acme']
+
+        session = SqliteWarehouseSession()
+        result = ShipmentPoster().post(session, pd.concat([csv_lines, asn_lines]), inventory_frame())
+        assert result.quantities == {'HOSP_001': 12.0, 'PDS_001': 40.0}
+
+    def test_reference_less_uploads_never_collide(self):
+        """Two different uploads without a reference column both post once each"""
+        upload = b"Inventory ID,Qty\nHOSP_001,10\n"
+        session = SqliteWarehouseSession()
+        before = session.stock()['HOSP_001']
+        poster = ShipmentPoster()
+
+        unreferenced = poster.post(session, read_receipt_file(upload, name='day1.csv'), inventory_frame())
+        assert unreferenced.posted == 0 and [r.reasons for r in unreferenced.rejected] == [['MISSING_REFERENCE']]
+
+        first = poster.post(session, read_receipt_file(upload, name='day1.csv', reference='UPLOAD_1'),
+                            inventory_frame())
+        retry = poster.post(session, read_receipt_file(upload, name='day1.csv', reference='UPLOAD_1'),
+                            inventory_frame())
+        second = poster.post(session, read_receipt_file(upload, name='day2.csv', reference='UPLOAD_2'),
+                             inventory_frame())
+        assert (first.posted, retry.duplicates, second.posted) == (1, 1, 1)
+        assert session.stock()['HOSP_001'] == before + 20
@@ -455,4 +455,53 @@ class TestValidationViewProperties:
                 assert key in sim_results[0] and key in sim_results[1], f"Missing key {key} in simulation results"
                 
                 if key in ['data_source', 'realism_percentage']:
-                    assert sim_results[0][key] == sim_results[1][key], f"Inconsistent {key} in simulation results"
\ No newline at end of file
+                    assert sim_results[0][key] == sim_results[1][key], f"Inconsistent {key} in simulation results"
+
+class TestSimulationTableProperties:
+    """Property-based tests for the precomputed simulation lookup tables"""
+
+    @given(st.sampled_from(['Blinkit', 'Dunzo', 'Zepto', 'Swiggy_Instamart', 'BigBasket', 'UnknownVendor']),
+           st.sampled_from(['Bangalore', 'Delhi', 'Mumbai', 'Chennai', 'Kolkata', 'Pune', '', None]))
+    def test_vendor_matrix_matches_coverage_rules(self, vendor, location):
+        """
+        Property: The vendor x city matrix agrees with the coverage-area rule
+        and the emitted UDF body returns the same status
+        """
+        from src.udfs.simulation_udfs import VENDOR_DATA, DEFAULT_VENDOR, get_snowflake_vendor_udf_sql
+
+        expected = dict(VENDOR_DATA.get(vendor, DEFAULT_VENDOR))
+        if location and expected['status'] == 'Available' and location not in expected['coverage_areas']:
+            expected['status'] = 'Not_Available_In_Location'
+            expected['delivery_time_minutes'] = None
+
+        udf_namespace = {}
+        exec(get_snowflake_vendor_udf_sql().split('$$')[1], udf_namespace)
+
+        assert get_vendor_status(vendor, location) == expected
+        assert udf_namespace['get_vendor_status'](vendor, location) == expected
+
+    def test_lookups_return_shared_read_only_tables(self):
+        """Repeated lookups return the same object, which callers cannot corrupt"""
+        weather = get_weather_data('Delhi')
+        assert weather is get_weather_data('Delhi')
+        assert get_vendor_status('Zepto', 'Delhi') is get_vendor_status('Zepto', 'Delhi')
+
+        with pytest.raises(TypeError):
+            weather['condition'] = 'Snow'
+        with pytest.raises(TypeError):
+            get_vendor_status('Blinkit')['coverage_areas'].append('Pune')
+
+        copy = weather.copy()
+        copy['condition'] = 'Snow'
+        assert get_weather_data('Delhi')['condition'] == 'Haze'
+
+    def test_simulation_snapshot_cached_per_bucket(self):
+        """Calls within one timestamp bucket share a snapshot; the next bucket rebuilds it"""
+        first = generate_realistic_simulation(now=1_700_000_000, bucket_seconds=60)
+        same_bucket = generate_realistic_simulation(now=1_700_000_030, bucket_seconds=60)
+        next_bucket = generate_realistic_simulation(now=1_700_000_090, bucket_seconds=60)
+
+        assert first is same_bucket
+        assert next_bucket is not first
+        assert next_bucket['timestamp'] > first['timestamp']
+        assert next_bucket['vendor_data'] == first['vendor_data']
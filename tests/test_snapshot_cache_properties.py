@@ -0,0 +1,198 @@
+"""
+Property-based tests for the stale-while-revalidate snapshot cache
+Feature: inventoryq-supply-chain
+"""
+import threading
+
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+from src.database.incremental_loader import SNAPSHOT_VERSION_ATTR
+from src.database.snapshot_cache import SnapshotCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class GatedLoader:
+    """load_fn whose loads can be held open to simulate a slow warehouse query"""
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+        self.started = threading.Semaphore(0)
+        self.fail = False
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            version = self.calls
+        self.started.release()
+        self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("warehouse unavailable")
+        frame = pd.DataFrame({'INVENTORY_ID': [f"INV_{version}"]})
+        frame.attrs[SNAPSHOT_VERSION_ATTR] = version
+        return frame
+
+
+def settle(cache):
+    """Wait for the running background refresh, if any"""
+    future = cache._inflight
+    if future is not None:
+        try:
+            future.result(5)
+        except RuntimeError:
+            pass
+
+
+class TestSnapshotCacheProperties:
+    """Property-based tests for single-flight loading and background revalidation"""
+
+    @settings(max_examples=15, deadline=None)
+    @given(st.integers(min_value=1, max_value=16))
+    def test_concurrent_first_loads_share_one_query(self, sessions):
+        """
+        Property: N sessions asking for an empty cache at once trigger exactly one load
+        """
+        loader = GatedLoader()
+        loader.gate.clear()
+        cache = SnapshotCache(loader)
+        results = []
+
+        def reader():
+            results.append(cache.get())
+
+        threads = [threading.Thread(target=reader) for _ in range(sessions)]
+        for thread in threads:
+            thread.start()
+        loader.started.acquire(timeout=5)
+        loader.gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert loader.calls == 1
+        assert len(results) == sessions
+        assert {frame['INVENTORY_ID'].iloc[0] for frame in results} == {'INV_1'}
+        assert cache.stats['loads'] == 1
+
+    @settings(max_examples=20, deadline=None)
+    @given(st.integers(min_value=1, max_value=10), st.floats(min_value=0, max_value=1000))
+    def test_stale_reads_never_block(self, readers, elapsed):
+        """
+        Property: After the TTL, readers get the old snapshot at once and one refresh runs behind them
+        """
+        loader = GatedLoader()
+        clock = FakeClock()
+        cache = SnapshotCache(loader, max_age_s=300, clock=clock)
+        cache.get()
+
+        clock.now += elapsed
+        loader.gate.clear()
+        frames = [cache.get() for _ in range(readers)]
+        assert all(frame['INVENTORY_ID'].iloc[0] == 'INV_1' for frame in frames)
+
+        loader.gate.set()
+        settle(cache)
+        if elapsed >= 300:
+            assert loader.calls == 2
+            assert cache.get()['INVENTORY_ID'].iloc[0] == 'INV_2'
+            assert cache.version == 2
+        else:
+            assert loader.calls == 1
+            assert cache.stats['hits'] == readers
+
+    def test_invalidate_during_refresh_schedules_another(self):
+        """A write during a running refresh is followed by a refresh that started after it"""
+        loader = GatedLoader()
+        cache = SnapshotCache(loader)
+        cache.get()
+
+        loader.gate.clear()
+        cache.refresh()
+        loader.started.acquire(timeout=5)
+        cache.invalidate()
+        assert cache.info().stale
+        loader.gate.set()
+
+        refreshed = cache.refresh(wait=True, timeout=5)
+        assert loader.calls == 3
+        assert refreshed['INVENTORY_ID'].iloc[0] == 'INV_3'
+        assert not cache.info().stale
+
+    def test_write_path_does_not_join_a_refresh_started_before_the_write(self):
+        """invalidate() then refresh(wait=True) returns data read after the write, not the stale in-flight load"""
+        warehouse = {'stock': 10}
+        started = threading.Semaphore(0)
+        hold = threading.Event()
+        calls = []
+
+        def load():
+            calls.append(warehouse['stock'])
+            seen, call = warehouse['stock'], len(calls)
+            started.release()
+            if call == 2:
+                hold.wait(5)
+            frame = pd.DataFrame({'CURRENT_STOCK': [seen]})
+            frame.attrs[SNAPSHOT_VERSION_ATTR] = call
+            return frame
+
+        clock = FakeClock()
+        cache = SnapshotCache(load, max_age_s=10, clock=clock)
+        cache.get()
+        clock.now += 10
+        cache.get()
+        started.acquire(timeout=5)
+        stale_flight = cache._inflight
+
+        warehouse['stock'] = 99
+        cache.invalidate()
+        refreshed = cache.refresh(wait=True, timeout=5)
+        assert refreshed['CURRENT_STOCK'].iloc[0] == 99
+        assert calls == [10, 10, 99]
+
+        hold.set()
+        stale_flight.result(5)
+        assert cache.get()['CURRENT_STOCK'].iloc[0] == 99
+        assert cache.version == 3
+
+    def test_failed_refresh_keeps_last_good_snapshot(self):
+        """Errors are recorded, the old frame keeps being served, and retries are spaced out"""
+        loader = GatedLoader()
+        clock = FakeClock()
+        cache = SnapshotCache(loader, max_age_s=10, retry_after_s=5, clock=clock)
+        cache.get()
+
+        loader.fail = True
+        clock.now += 10
+        assert cache.get()['INVENTORY_ID'].iloc[0] == 'INV_1'
+        settle(cache)
+        assert cache.info().last_error == "warehouse unavailable"
+
+        cache.get()
+        assert loader.calls == 2
+        clock.now += 5
+        loader.fail = False
+        cache.get()
+        settle(cache)
+        assert loader.calls == 3
+        assert cache.get()['INVENTORY_ID'].iloc[0] == 'INV_3'
+        assert cache.info().last_error is None
+
+    def test_drop_forces_blocking_reload_and_copies_are_isolated(self):
+        """invalidate(drop=True) empties the cache; callers cannot add columns to the shared frame"""
+        loader = GatedLoader()
+        cache = SnapshotCache(loader)
+        frame = cache.get()
+        frame['EXTRA'] = 1
+        assert 'EXTRA' not in cache.get()
+
+        cache.invalidate(drop=True)
+        assert cache.version is None
+        assert cache.get()['INVENTORY_ID'].iloc[0] == 'INV_2'
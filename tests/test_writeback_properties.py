@@ -0,0 +1,232 @@
+"""
+Property-based tests for the data editor write-back path
+Feature: inventoryq-supply-chain
+"""
+from datetime import datetime, timedelta
+import re
+
+import pandas as pd
+from hypothesis import given, settings, strategies as st
+from src.database.writeback import (
+    EDITABLE_COLUMNS, EDITOR_GRID_COLUMNS, OP_DELETE, OP_INSERT, OP_UPDATE, InventoryWriteBack,
+    diff_editor_frames, stage_sql
+)
+
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+APPLIED_AT = BASE_TIME + timedelta(hours=1)
+EDITOR_COLUMNS = [column for column in EDITOR_GRID_COLUMNS if column != 'LAST_UPDATED']
+
+
+class FakeMasterSession:
+    """
+    Snowpark session stand-in holding inventory_master in memory
+
+    Interprets the stage statement from its bound VALUES rows and applies the
+    MERGE with the same matching and last_updated guards as the SQL.
+    """
+
+    def __init__(self, rows):
+        self.master = {row['inventory_id']: dict(row) for row in rows}
+        self.stage = []
+        self.statements = []
+        self._result = None
+
+    def sql(self, query, params=None):
+        self.statements.append(query)
+        if 'CREATE OR REPLACE TEMPORARY TABLE' in query:
+            columns = re.findall(r"\$\d+::\w+ AS (\w+)", query)
+            self.stage = [dict(zip(columns, params[i:i + len(columns)]))
+                          for i in range(0, len(params), len(columns))]
+            self._result = []
+        elif query.strip().startswith('MERGE'):
+            self._result = [self._merge()]
+        else:
+            self._result = [{'INVENTORY_ID': inventory_id} for inventory_id in self._conflicts()]
+        return self
+
+    def collect(self):
+        return self._result
+
+    def _unchanged(self, target, staged):
+        expected = staged['expected_last_updated']
+        return target['last_updated'] == (pd.Timestamp(expected) if expected else None)
+
+    def _merge(self):
+        inserted = updated = deleted = 0
+        values = {column for column in EDITABLE_COLUMNS.values()}
+        for staged in self.stage:
+            target = self.master.get(staged['inventory_id'])
+            if target is not None and staged['op'] == OP_DELETE and self._unchanged(target, staged):
+                del self.master[staged['inventory_id']]
+                deleted += 1
+            elif target is not None and staged['op'] == OP_UPDATE and self._unchanged(target, staged):
+                target.update({k: v for k, v in staged.items() if k in values})
+                target['last_updated'] = APPLIED_AT
+                updated += 1
+            elif target is None and staged['op'] == OP_INSERT:
+                row = {k: v for k, v in staged.items() if k in values}
+                row.update(inventory_id=staged['inventory_id'], last_updated=APPLIED_AT)
+                self.master[staged['inventory_id']] = row
+                inserted += 1
+        return (inserted, updated, deleted)
+
+    def _conflicts(self):
+        conflicts = []
+        for staged in self.stage:
+            target = self.master.get(staged['inventory_id'])
+            if staged['op'] in (OP_INSERT, OP_UPDATE):
+                if target is None or target['last_updated'] != APPLIED_AT:
+                    conflicts.append(staged['inventory_id'])
+            elif target is not None:
+                conflicts.append(staged['inventory_id'])
+        return sorted(conflicts)
+
+
+def master_row(inventory_id, stock, minutes):
+    return {
+        'inventory_id': inventory_id, 'organization_id': 'ORG_1', 'sector_type': 'HOSPITAL',
+        'item_type': 'OXYGEN', 'location_city': 'Delhi', 'current_stock': float(stock),
+        'daily_consumption_rate': 2.0, 'reorder_point': 40.0, 'critical_threshold': 10.0,
+        'last_updated': pd.Timestamp(BASE_TIME + timedelta(minutes=minutes)),
+    }
+
+
+def page_frame(rows):
+    """Grid page as loaded (view column names, LAST_UPDATED token)"""
+    frame = pd.DataFrame([{
+        'INVENTORY_ID': row['inventory_id'], 'ORGANIZATION_ID': row['organization_id'],
+        'SECTOR_TYPE': row['sector_type'], 'ITEM_TYPE': row['item_type'],
+        'LOCATION_CITY': row['location_city'], 'CURRENT_STOCK': row['current_stock'],
+        'DAILY_CONSUMPTION_RATE': row['daily_consumption_rate'], 'REORDER_POINT': row['reorder_point'],
+        'CRITICAL_THRESHOLD': row['critical_threshold'], 'STATUS': 'NORMAL',
+        'LAST_UPDATED': row['last_updated'],
+    } for row in rows], columns=list(EDITOR_GRID_COLUMNS))
+    return frame
+
+
+@st.composite
+def edit_scenario(draw):
+    """A page of master rows and an editor result with updates, deletes and inserts"""
+    n = draw(st.integers(min_value=0, max_value=12))
+    rows = [master_row(f"INV_{i}", draw(st.integers(0, 500)), draw(st.integers(0, 60))) for i in range(n)]
+    original = page_frame(rows)
+
+    edited = original[EDITOR_COLUMNS].copy()
+    actions = draw(st.lists(st.sampled_from(['keep', 'stock', 'city', 'delete']), min_size=n, max_size=n))
+    for position, action in enumerate(actions):
+        if action == 'stock':
+            edited.loc[position, 'CURRENT_STOCK'] = float(draw(st.integers(0, 500)))
+        elif action == 'city':
+            edited.loc[position, 'LOCATION_CITY'] = draw(st.sampled_from(['Mumbai', 'Chennai']))
+    edited = edited[[action != 'delete' for action in actions]]
+
+    new_rows = draw(st.integers(min_value=0, max_value=3))
+    added = page_frame([master_row(f"NEW_{i}", draw(st.integers(0, 500)), 0) for i in range(new_rows)])
+    edited = pd.concat([edited, added[EDITOR_COLUMNS]], ignore_index=True)
+    return rows, original, edited
+
+
+def master_as_editor(session):
+    """Master table projected onto the editable columns, keyed by id"""
+    return {
+        inventory_id: {column: row[name] for column, name in EDITABLE_COLUMNS.items()}
+        for inventory_id, row in session.master.items()
+    }
+
+
+def editor_as_dict(edited):
+    return {
+        row['INVENTORY_ID']: {column: row[column] for column in EDITABLE_COLUMNS}
+        for _, row in edited.iterrows()
+    }
+
+
+class TestWriteBackProperties:
+    """Property-based tests for the staged MERGE write-back"""
+
+    @settings(max_examples=50, deadline=None)
+    @given(edit_scenario())
+    def test_save_makes_master_match_editor(self, scenario):
+        """
+        Property: Without concurrent writers, one save leaves master equal to the edited page
+        """
+        rows, original, edited = scenario
+        session = FakeMasterSession(rows)
+        result = InventoryWriteBack().apply(session, original, edited)
+
+        assert result.ok
+        assert master_as_editor(session) == editor_as_dict(edited)
+        changes = diff_editor_frames(original, edited)
+        assert result.applied == changes.total
+        assert len(session.statements) == (2 if changes.total else 0)
+
+    @settings(max_examples=50, deadline=None)
+    @given(edit_scenario())
+    def test_only_changed_rows_are_staged(self, scenario):
+        """
+        Property: Unedited rows are never staged; an untouched page stages nothing
+        """
+        rows, original, edited = scenario
+        assert diff_editor_frames(original, original[EDITOR_COLUMNS]).empty
+
+        changes = diff_editor_frames(original, edited)
+        before = editor_as_dict(original)
+        for record in changes.updates:
+            assert record['op'] == OP_UPDATE
+            row = before[record['inventory_id']]
+            assert any(record[name] != row[column] for column, name in EDITABLE_COLUMNS.items())
+
+        sql, params = stage_sql(changes)
+        assert len(params) == changes.total * (3 + len(changes.columns))
+        assert sql.count('(?') == changes.total
+
+    @settings(max_examples=50, deadline=None)
+    @given(edit_scenario(), st.data())
+    def test_concurrent_changes_are_reported_not_overwritten(self, scenario, data):
+        """
+        Property: Rows changed by another writer since the page loaded are left alone and reported
+        """
+        rows, original, edited = scenario
+        changes = diff_editor_frames(original, edited)
+        touched = [record['inventory_id'] for record in changes.updates + changes.deletes]
+        raced = set(data.draw(st.lists(st.sampled_from(touched), unique=True))) if touched else set()
+
+        session = FakeMasterSession(rows)
+        for inventory_id in raced:
+            session.master[inventory_id]['current_stock'] = -1.0
+            session.master[inventory_id]['last_updated'] = pd.Timestamp(BASE_TIME + timedelta(days=1))
+
+        result = InventoryWriteBack().apply(session, original, edited)
+
+        assert set(result.conflicts) == raced
+        assert result.applied == changes.total - len(raced)
+        for inventory_id in raced:
+            assert session.master[inventory_id]['current_stock'] == -1.0
+        assert not raced & set(result.changed_ids + result.deleted_ids)
+
+    def test_invalid_rows_are_rejected(self):
+        """Rows breaking the ingest rules, blank ids and duplicated ids are not written"""
+        rows = [master_row('A', 100, 0), master_row('B', 100, 0)]
+        original = page_frame(rows)
+        edited = original[EDITOR_COLUMNS].copy()
+        edited.loc[0, 'CURRENT_STOCK'] = -5.0
+        edited.loc[1, 'SECTOR_TYPE'] = 'FACTORY'
+        extra = pd.DataFrame([
+            {'INVENTORY_ID': None, 'ITEM_TYPE': 'RICE'},
+            {'INVENTORY_ID': 'A', 'ITEM_TYPE': 'RICE'},
+            {'INVENTORY_ID': 'C', 'ITEM_TYPE': 'RICE', 'CURRENT_STOCK': 5.0},
+            {'INVENTORY_ID': None},
+        ], columns=EDITOR_COLUMNS)
+        edited = pd.concat([edited, extra], ignore_index=True)
+
+        session = FakeMasterSession(rows)
+        result = InventoryWriteBack().apply(session, original, edited)
+
+        reasons = {rejection.row: rejection.reasons for rejection in result.rejected}
+        assert reasons == {
+            0: ['NEGATIVE_STOCK'], 1: ['UNKNOWN_SECTOR'], 2: ['MISSING_VALUE'],
+            3: ['DUPLICATE_IN_BATCH'], 4: ['MISSING_VALUE', 'INVALID_NUMBER'],
+        }
+        assert result.applied == 0
+        assert session.statements == []